@@ -0,0 +1,23 @@
+"""Helpers shared by the benchmark scripts."""
+
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = os.path.join(ROOT, 'templates')
+
+# cfn2py and the benchmarks import the cfntools package
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_cfn2py():
+    """Import the cfn2py script, which has no .py extension, as a module"""
+    path = os.path.join(ROOT, 'cfn2py')
+    loader = importlib.machinery.SourceFileLoader('cfn2py', path)
+    spec = importlib.util.spec_from_loader('cfn2py', loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+"""Round-trip check and benchmark for cfn2py.
+
+Each template is converted with cfn2py, the generated script is run in a
+separate interpreter (which needs troposphere installed, see --python) and
+the template it prints is compared with the original. The comparison is
+semantic: key order, the order of DependsOn and Tags, the short
+"Resource.Attribute" form of Fn::GetAtt and the type of scalars (9.6 vs
+"9.6", true vs "true") do not count as differences.
+
+Conversion time, conversion peak memory (tracemalloc), script run time and
+script peak RSS are recorded per template and can be written as JSON with
+--report. A report from an earlier run given as --baseline turns the run
+into a regression gate: it fails when any metric grows by more than
+--tolerance. The exit status is non-zero if a template fails to convert, the
+script fails, the output differs or a metric regressed.
+
+    python benchmarks/roundtrip.py --python /path/to/venv/bin/python \\
+        --report roundtrip.json
+"""
+
+from __future__ import print_function
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import ROOT, TEMPLATES, load_cfn2py
+
+cfn2py = load_cfn2py()
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+
+# Metrics compared against a baseline, with the smallest increase which
+# counts as a regression whatever the tolerance (timer and allocator noise)
+gated_metrics = {
+    'convert_seconds': 0.005,
+    'convert_peak_bytes': 64 * 1024,
+    'exec_seconds': 0.05,
+    'exec_peak_rss_kb': 2048,
+}
+
+
+def normalize(v, key=None):
+    """Canonical form of a template value for comparison"""
+    if isinstance(v, dict):
+        if list(v) == ['Fn::GetAtt'] and \
+                isinstance(v['Fn::GetAtt'], basestring):
+            return {'Fn::GetAtt': v['Fn::GetAtt'].split('.', 1)}
+        return dict((k, normalize(e, k)) for k, e in v.items())
+    if isinstance(v, list):
+        items = [normalize(e) for e in v]
+        if key in ('Tags', 'FileSystemTags'):
+            items.sort(key=lambda e: json.dumps(e, sort_keys=True))
+        elif key == 'DependsOn':
+            items.sort()
+        return items
+    if key == 'DependsOn':
+        return [v]
+    if isinstance(v, bool):
+        return 'true' if v else 'false'
+    if isinstance(v, (int, float)):
+        return str(v)
+    return v
+
+
+def differences(a, b, path=''):
+    """Yield (path, expected, actual) for each place a and b differ"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        for k in sorted(set(a) | set(b)):
+            p = '{}/{}'.format(path, k)
+            if k not in b:
+                yield p, a[k], None
+            elif k not in a:
+                yield p, None, b[k]
+            else:
+                for d in differences(a[k], b[k], p):
+                    yield d
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (x, y) in enumerate(zip(a, b)):
+            for d in differences(x, y, '{}/{}'.format(path, i)):
+                yield d
+    elif a != b:
+        yield path or '/', a, b
+
+
+def time_conversion(d, options, repeat):
+    """Best wall time and peak traced memory of converting d"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ctx = cfn2py.ConversionContext(**options)
+        script = ''.join(cfn2py.convert(d, ctx))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    ''.join(cfn2py.convert(d, cfn2py.ConversionContext(**options)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return script, best, peak
+
+
+def run_script(python, path, workdir):
+    """Run a generated script, returning (stdout, stderr, returncode,
+    seconds, peak RSS in KiB of that process alone)
+    """
+    env = dict(os.environ, PYTHONWARNINGS='ignore')
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen([python, path], stdout=out, stderr=err,
+                                cwd=workdir, env=env)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        return (out.read().decode('utf-8'), err.read().decode('utf-8'),
+                proc.returncode, elapsed, usage.ru_maxrss)
+
+
+def check_template(filename, args, workdir):
+    result = {'template': os.path.relpath(filename, ROOT)}
+    try:
+        with open(filename, 'rb') as f:
+            d = cfn2py.parse_template(f.read(), filename)
+        result['resources'] = len(d.get('Resources', {}))
+        options = {'hoist': args.hoist, 'module': args.module}
+        script, seconds, peak = time_conversion(d, options, args.repeat)
+    except Exception as e:
+        result.update(status='error', error='convert: {}: {}'.format(
+            type(e).__name__, e))
+        return result
+    result.update(convert_seconds=seconds, convert_peak_bytes=peak,
+                  script_bytes=len(script.encode('utf-8')))
+
+    path = os.path.join(workdir, cfn2py.output_path(filename, workdir))
+    with open(path, 'w') as f:
+        f.write(script)
+    out, err, returncode, seconds, rss = run_script(args.python, path,
+                                                    workdir)
+    result.update(exec_seconds=seconds, exec_peak_rss_kb=rss)
+    if returncode != 0:
+        lines = err.strip().splitlines() or ['exit status {}'.format(
+            returncode)]
+        result.update(status='error', error='run: ' + lines[-1])
+        return result
+
+    found = list(differences(normalize(d), normalize(json.loads(out))))
+    result['differences'] = [
+        {'path': p, 'expected': a, 'actual': b}
+        for p, a, b in found[:args.max_differences]]
+    result['difference_count'] = len(found)
+    result['status'] = 'mismatch' if found else 'ok'
+    return result
+
+
+def regressions(results, baseline, tolerance):
+    """Yield a message for each metric which grew beyond tolerance"""
+    previous = dict((r['template'], r) for r in baseline['results'])
+    for r in results:
+        old = previous.get(r['template'])
+        if old is None:
+            continue
+        for metric, floor in sorted(gated_metrics.items()):
+            if metric not in r or metric not in old:
+                continue
+            limit = max(old[metric] * (1 + tolerance), old[metric] + floor)
+            if r[metric] > limit:
+                yield '{}: {} {:.6g} > {:.6g} (baseline {:.6g})'.format(
+                    r['template'], metric, r[metric], limit, old[metric])
+
+
+def print_table(results):
+    print('{:<32} {:>5} {:>9} {:>9} {:>9} {:>9}  {}'.format(
+        'template', 'res', 'conv ms', 'conv KiB', 'run ms', 'run RSS',
+        'status'))
+    for r in results:
+        def metric(k, scale):
+            return '{:.1f}'.format(r[k] * scale) if k in r else '-'
+        print('{:<32} {:>5} {:>9} {:>9} {:>9} {:>9}  {}'.format(
+            os.path.basename(r['template']), r.get('resources', '-'),
+            metric('convert_seconds', 1000),
+            metric('convert_peak_bytes', 1 / 1024.0),
+            metric('exec_seconds', 1000),
+            '{}K'.format(r['exec_peak_rss_kb'])
+            if 'exec_peak_rss_kb' in r else '-',
+            r['status']))
+        if 'error' in r:
+            print('    ' + r['error'])
+        for d in r.get('differences', []):
+            print('    {}: expected {!r}, got {!r}'.format(
+                d['path'], d['expected'], d['actual']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('templates', nargs='*',
+                        help='templates to check (default templates/*.json)')
+    parser.add_argument('--python', default=sys.executable,
+                        help='interpreter with troposphere to run the '
+                             'generated scripts (default %(default)s)')
+    parser.add_argument('--hoist', action='store_true',
+                        help='convert with common subexpression hoisting')
+    parser.add_argument('--module', action='store_true',
+                        help='convert into build() modules')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='conversions timed per template, the best is '
+                             'reported (default %(default)s)')
+    parser.add_argument('--report', help='write the results as JSON')
+    parser.add_argument('--baseline',
+                        help='JSON report of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative growth of each metric over '
+                             'the baseline (default %(default)s)')
+    parser.add_argument('--max-differences', type=int, default=20,
+                        help='differences listed per template')
+    args = parser.parse_args()
+
+    templates = args.templates or sorted(
+        glob.glob(os.path.join(TEMPLATES, '*.json')))
+    with tempfile.TemporaryDirectory(prefix='cfn2py-roundtrip-') as workdir:
+        results = [check_template(filename, args, workdir)
+                   for filename in templates]
+    print_table(results)
+
+    report = {
+        'cfn2py_version': cfn2py.__version__,
+        'converter_digest': cfn2py.converter_digest(),
+        'python': platform.python_version(),
+        'script_python': args.python,
+        'hoist': args.hoist,
+        'module': args.module,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': results,
+    }
+    failed = [r for r in results if r['status'] != 'ok']
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = list(regressions(
+                results, json.load(f), args.tolerance))
+        for message in report['regressions']:
+            print('regression: ' + message, file=sys.stderr)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+    print('{} ok, {} failed'.format(len(results) - len(failed), len(failed)),
+          file=sys.stderr)
+    if failed or report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""Measure the startup time of the scripts generated by cfn2py.
+
+For each template the generated script is run --repeat times with the
+--python interpreter (which needs troposphere installed), along with its
+import block alone and, for comparison, that block preceded by the fixed
+imports cfn2py used to emit before the header was computed from the names
+the script uses. The median wall time of each is reported, and with
+--importtime the slowest modules imported by the script (from
+python -X importtime).
+
+    python benchmarks/startup.py --python /path/to/venv/bin/python
+"""
+
+from __future__ import print_function
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, TEMPLATES, load_cfn2py
+
+cfn2py = load_cfn2py()
+
+# troposphere's deprecation warnings would be timed too
+quiet = dict(os.environ, PYTHONWARNINGS='ignore')
+
+legacy_imports = '''\
+from troposphere import Base64, Select, FindInMap, GetAtt
+from troposphere import GetAZs, Join, Output, If, And, Not
+from troposphere import Or, Equals, Condition
+from troposphere import Cidr, ImportValue, Split, Sub
+from troposphere import Export
+from troposphere import Parameter, Ref, Tags, Template
+from troposphere.cloudfront import Distribution
+from troposphere.cloudfront import DistributionConfig
+from troposphere.cloudfront import Origin, DefaultCacheBehavior
+from troposphere.ec2 import PortRange
+'''
+
+
+def header_of(script):
+    """The import block at the top of a generated script"""
+    return script[:script.index('\n\nt = Template()')] + '\n'
+
+
+def median_run(python, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call([python, path], stdout=subprocess.DEVNULL,
+                              env=quiet)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def slowest_imports(python, path, count):
+    """(cumulative microseconds, module) of the slowest imports"""
+    err = subprocess.run([python, '-X', 'importtime', path],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                         env=quiet, check=True).stderr.decode('utf-8')
+    found = []
+    for line in err.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            fields = line[len('import time:'):].split('|')
+            if fields[1].strip().isdigit():
+                found.append((int(fields[1]), fields[2].strip()))
+    return sorted(found, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('templates', nargs='*',
+                        help='templates to measure (default templates/*.json)')
+    parser.add_argument('--python', default=sys.executable,
+                        help='interpreter with troposphere to run the '
+                             'generated scripts (default %(default)s)')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='runs per measurement, the median is reported '
+                             '(default %(default)s)')
+    parser.add_argument('--importtime', type=int, metavar='N', default=0,
+                        help='list the N slowest imports of each script')
+    parser.add_argument('--report', help='write the results as JSON')
+    args = parser.parse_args()
+
+    templates = args.templates or sorted(
+        glob.glob(os.path.join(TEMPLATES, '*.json')))
+    results = []
+    print('{:<28} {:>9} {:>9} {:>9} {:>7}'.format(
+        'template', 'script', 'imports', 'legacy', 'saved'))
+    with tempfile.TemporaryDirectory(prefix='cfn2py-startup-') as workdir:
+        for filename in templates:
+            with open(filename, 'rb') as f:
+                script = ''.join(cfn2py.convert(
+                    cfn2py.parse_template(f.read(), filename)))
+            path = os.path.join(workdir, cfn2py.output_path(filename, workdir))
+            header = path[:-len('.py')] + '_header.py'
+            legacy = path[:-len('.py')] + '_legacy.py'
+            with open(path, 'w') as f:
+                f.write(script)
+            with open(header, 'w') as f:
+                f.write(header_of(script))
+            with open(legacy, 'w') as f:
+                f.write(legacy_imports + header_of(script))
+            legacy_seconds = median_run(args.python, legacy, args.repeat)
+            r = {
+                'template': os.path.relpath(filename, ROOT),
+                'script_seconds': median_run(args.python, path, args.repeat),
+                'import_seconds': median_run(args.python, header,
+                                             args.repeat),
+                'legacy_import_seconds': legacy_seconds,
+            }
+            results.append(r)
+            print('{:<28} {:>7.1f}ms {:>7.1f}ms {:>7.1f}ms {:>6.1f}ms'.format(
+                os.path.basename(filename), r['script_seconds'] * 1000,
+                r['import_seconds'] * 1000, legacy_seconds * 1000,
+                (legacy_seconds - r['import_seconds']) * 1000))
+            if args.importtime:
+                r['slowest_imports'] = slowest_imports(args.python, path,
+                                                       args.importtime)
+                for (us, module) in r['slowest_imports']:
+                    print('    {:>8.1f}ms  {}'.format(us / 1000.0, module))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
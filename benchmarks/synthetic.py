@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+"""Benchmark cfn2py on synthetic templates of growing size.
+
+Templates with 10 to 10,000 resources are generated with the shapes which
+are expensive to convert in the real templates: cfn-init metadata built
+from Fn::Join of Fn::Sub lines whose variables are nested Fn::If (as in
+ClusterNodeLaunchConfig, nested --depth levels deep), FindInMap lookups in
+a large AWSInstanceType2Arch style mapping (--mapping-rows), security
+groups, subnets, records and outputs.
+
+Each size is converted in a fresh interpreter, which reports the
+throughput in resources per second, the time spent in each section of the
+script and the peak RSS of the process. The results are appended with the
+cfn2py version, converter digest and git commit to --results (one JSON
+document per line) and compared with the last stored run with the same
+parameters, so regressions between versions show up.
+
+    python benchmarks/synthetic.py --sizes 10,100,1000,10000
+"""
+
+from __future__ import print_function
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from common import ROOT, load_cfn2py
+
+RESULTS = os.path.join(ROOT, 'benchmarks', 'results', 'synthetic.jsonl')
+
+instance_families = ['t3', 'm5', 'm5d', 'c5', 'c5d', 'r5', 'r5d', 'i3']
+instance_sizes = ['large', 'xlarge', '2xlarge', '4xlarge', '8xlarge',
+                  '12xlarge', '16xlarge', '24xlarge']
+
+
+def instance_types(rows):
+    """rows distinct instance type names: m5.large, ..., m5g1.large, ..."""
+    types = []
+    for generation in itertools.count():
+        suffix = 'g{}'.format(generation) if generation else ''
+        for size in instance_sizes:
+            for family in instance_families:
+                types.append('{}{}.{}'.format(family, suffix, size))
+                if len(types) == rows:
+                    return types
+
+
+def nested_value(depth, i):
+    """Fn::Join of Fn::Sub whose variable is an Fn::If, recursively"""
+    if depth == 0:
+        return {'Ref': 'Param{}'.format(i % 10)}
+    return {'Fn::Join': ['', [
+        'level{}-'.format(depth),
+        {'Fn::Sub': ['${Value}', {'Value': {'Fn::If': [
+            'Cond{}'.format((i + depth) % 5),
+            nested_value(depth - 1, i),
+            {'Ref': 'AWS::NoValue'},
+        ]}}]},
+    ]]}
+
+
+def launch_config(i, depth, types):
+    lines = [
+        {'Fn::Sub': ['ATL_SETTING_{}=${{Value}}'.format(n),
+                     {'Value': nested_value(depth, i + n)}]}
+        for n in range(4)
+    ]
+    lines.append({'Fn::Sub': 'ATL_AWS_STACK_NAME=${AWS::StackName}'})
+    return {
+        'Type': 'AWS::AutoScaling::LaunchConfiguration',
+        'Metadata': {'AWS::CloudFormation::Init': {'config': {
+            'files': {'/etc/atl': {
+                'content': {'Fn::Join': ['\n', lines]},
+                'mode': '000640', 'owner': 'root', 'group': 'root',
+            }},
+            'commands': {'010_init': {
+                'command': {'Fn::Sub': '/opt/atl/init ${Param1}'},
+                'ignoreErrors': True,
+            }},
+        }}},
+        'Properties': {
+            'ImageId': {'Fn::FindInMap': [
+                'AWSRegionArch2AMI', {'Ref': 'AWS::Region'},
+                {'Fn::FindInMap': ['AWSInstanceType2Arch',
+                                   types[i % len(types)], 'Arch']}]},
+            'InstanceType': types[i % len(types)],
+            'SecurityGroups': [{'Ref': 'Resource{}'.format(i - 2)}],
+            'UserData': {'Fn::Base64': {'Fn::Join': ['', [
+                '#!/bin/bash -xe\n',
+                {'Fn::Sub': '/opt/aws/bin/cfn-init -v --stack '
+                            '${AWS::StackName} --resource Resource' +
+                            str(i) + ' --region ${AWS::Region}\n'},
+            ]]}},
+        },
+    }
+
+
+def security_group(i):
+    return {
+        'Type': 'AWS::EC2::SecurityGroup',
+        'Properties': {
+            'GroupDescription': 'Synthetic group {}'.format(i),
+            'VpcId': {'Fn::ImportValue': 'ATL-VPCID'},
+            'SecurityGroupIngress': [
+                {'IpProtocol': 'tcp', 'FromPort': port, 'ToPort': port,
+                 'CidrIp': {'Ref': 'Param{}'.format(i % 10)}}
+                for port in (22, 80, 443, 8080)
+            ],
+            'Tags': [{'Key': 'Name', 'Value': {'Fn::Sub': [
+                '${StackName} group ' + str(i),
+                {'StackName': {'Ref': 'AWS::StackName'}}]}}],
+        },
+    }
+
+
+def subnet(i):
+    return {
+        'Type': 'AWS::EC2::Subnet',
+        'Condition': 'Cond{}'.format(i % 5),
+        'Properties': {
+            'VpcId': {'Fn::ImportValue': 'ATL-VPCID'},
+            'CidrBlock': {'Fn::Select': [i % 256, {'Fn::Cidr': [
+                '10.0.0.0/8', 256, 8]}]},
+            'AvailabilityZone': {'Fn::Select': [
+                i % 2, {'Fn::GetAZs': {'Ref': 'AWS::Region'}}]},
+        },
+    }
+
+
+def record_set(i):
+    return {
+        'Type': 'AWS::Route53::RecordSet',
+        'DependsOn': ['Resource{}'.format(i - 1)],
+        'Properties': {
+            'HostedZoneName': {'Ref': 'Param2'},
+            'Name': {'Fn::Join': ['.', [
+                {'Ref': 'AWS::StackName'}, 'r{}'.format(i),
+                {'Ref': 'Param2'}]]},
+            'Type': 'CNAME',
+            'TTL': 900,
+            'ResourceRecords': [{'Fn::GetAtt': [
+                'Resource{}'.format(i - 1), 'DNSName']}],
+        },
+    }
+
+
+def generate_template(resources, depth=4, mapping_rows=500, seed=0):
+    """A synthetic template with the given number of resources"""
+    rng = random.Random(seed)
+    types = instance_types(mapping_rows)
+    kinds = [security_group, subnet,
+             lambda i: launch_config(i, depth, types), record_set]
+    d = {
+        'AWSTemplateFormatVersion': '2010-09-09',
+        'Description': 'Synthetic template with {} resources'.format(
+            resources),
+        'Parameters': dict(
+            ('Param{}'.format(n), {'Type': 'String',
+                                   'Default': 'value{}'.format(n)})
+            for n in range(10)),
+        'Conditions': dict(
+            ('Cond{}'.format(n), {'Fn::Equals': [
+                {'Ref': 'Param{}'.format(n)}, 'enabled']})
+            for n in range(5)),
+        'Mappings': {
+            'AWSInstanceType2Arch': dict(
+                (t, {'Arch': 'HVM64',
+                     'Jvmheap': '{}m'.format(rng.randrange(512, 65536))})
+                for t in types),
+            'AWSRegionArch2AMI': dict(
+                (r, {'HVM64': 'ami-{:017x}'.format(rng.getrandbits(68))})
+                for r in ('us-east-1', 'us-west-2', 'eu-west-1',
+                          'ap-southeast-2')),
+        },
+        'Resources': {},
+        'Outputs': {},
+    }
+    for i in range(resources):
+        d['Resources']['Resource{}'.format(i)] = kinds[i % len(kinds)](i)
+    for i in range(0, resources, 10):
+        d['Outputs']['Output{}'.format(i)] = {
+            'Value': {'Ref': 'Resource{}'.format(i)},
+            'Export': {'Name': {'Fn::Sub': '${AWS::StackName}-' + str(i)}},
+        }
+    return d
+
+
+def timed_sections(cfn2py, d, ctx):
+    """Convert d, returning (script size, seconds per section)"""
+    timings = []
+    size = 0
+
+    def run(name, fragments):
+        start = time.perf_counter()
+        n = sum(len(f) for f in fragments)
+        timings.append((name, time.perf_counter() - start))
+        return n
+
+    for s in cfn2py.sections:
+        if s == 'Resources' and ctx.hoist:
+            size += run('Hoisted', cfn2py.do_hoisted(d, ctx))
+        if s in d:
+            size += run(s, getattr(cfn2py, 'do_' + s.lower())(d, ctx))
+    size += run('Trailer', cfn2py.do_trailer(d, ctx))
+    # the header imports the names recorded while emitting the rest
+    size += run('Header', cfn2py.do_header(d, ctx))
+    return size, timings
+
+
+def run_one(args):
+    """Measure one size in this process and print the result as JSON"""
+    cfn2py = load_cfn2py()
+    d = generate_template(args.one, args.depth, args.mapping_rows)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    size, timings = timed_sections(cfn2py,
+                                   d, cfn2py.ConversionContext(args.hoist))
+    elapsed = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    json.dump({
+        'resources': args.one,
+        'seconds': elapsed,
+        'resources_per_second': args.one / elapsed,
+        'script_bytes': size,
+        'sections': dict(timings),
+        'peak_rss_kb': rss,
+        'conversion_rss_kb': rss - rss_before,
+    }, sys.stdout)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            stderr=subprocess.DEVNULL).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_run(path, params):
+    """The last stored run with the same parameters, or None"""
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            run = json.loads(line)
+            if run['parameters'] == params:
+                last = run
+    return last
+
+
+def change(new, old):
+    if not old:
+        return ''
+    return '{:+.0%}'.format(new / old - 1)
+
+
+def print_table(run, previous):
+    old = {}
+    if previous:
+        old = dict((r['resources'], r) for r in previous['results'])
+        print('compared with {} ({}, {})'.format(
+            previous['timestamp'], previous['cfn2py_version'],
+            previous['git_commit']))
+    print('{:>9} {:>10} {:>7} {:>9} {:>7} {:>10} {:>7}  {}'.format(
+        'resources', 'res/s', '', 'peak RSS', '', 'Resources', 'Mappings',
+        'slowest section'))
+    for r in run['results']:
+        o = old.get(r['resources'], {})
+        sections = r['sections']
+        slowest = max(sections, key=sections.get)
+        print('{:>9} {:>10.0f} {:>7} {:>8}K {:>7} {:>9.1f}ms {:>6.1f}ms'
+              '  {} {:.1f}ms'.format(
+                  r['resources'], r['resources_per_second'],
+                  change(r['resources_per_second'],
+                         o.get('resources_per_second')),
+                  r['peak_rss_kb'],
+                  change(r['peak_rss_kb'], o.get('peak_rss_kb')),
+                  sections.get('Resources', 0) * 1000,
+                  sections.get('Mappings', 0) * 1000,
+                  slowest, sections[slowest] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='10,100,1000,10000',
+                        help='comma separated resource counts '
+                             '(default %(default)s)')
+    parser.add_argument('--depth', type=int, default=4,
+                        help='Fn::Join/Fn::Sub/Fn::If nesting levels in '
+                             'the cfn-init metadata (default %(default)s)')
+    parser.add_argument('--mapping-rows', type=int, default=500,
+                        help='instance types in the AWSInstanceType2Arch '
+                             'mapping (default %(default)s)')
+    parser.add_argument('--hoist', action='store_true',
+                        help='convert with common subexpression hoisting')
+    parser.add_argument('--results', default=RESULTS,
+                        help='JSON lines file the results are appended to '
+                             '(default %(default)s)')
+    parser.add_argument('--no-store', action='store_true',
+                        help='only compare, do not append the results')
+    parser.add_argument('--dump', metavar='N', type=int,
+                        help='print the synthetic template with N resources '
+                             'and exit')
+    parser.add_argument('--one', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.dump is not None:
+        json.dump(generate_template(args.dump, args.depth,
+                                    args.mapping_rows), sys.stdout, indent=2)
+        return
+    if args.one is not None:
+        return run_one(args)
+
+    params = {'depth': args.depth, 'mapping_rows': args.mapping_rows,
+              'hoist': args.hoist}
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        command = [sys.executable, os.path.abspath(__file__), '--one',
+                   str(size), '--depth', str(args.depth),
+                   '--mapping-rows', str(args.mapping_rows)]
+        if args.hoist:
+            command.append('--hoist')
+        results.append(json.loads(subprocess.check_output(command)))
+
+    cfn2py = load_cfn2py()
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'cfn2py_version': cfn2py.__version__,
+        'converter_digest': cfn2py.converter_digest(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'parameters': params,
+        'results': results,
+    }
+    print_table(run, previous_run(args.results, params))
+    if not args.no_store:
+        directory = os.path.dirname(args.results)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(args.results, 'a') as f:
+            f.write(json.dumps(run, sort_keys=True) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""Compare building template variants in-process with build(**overrides)
+against running a generated script once per variant.
+
+The template is converted twice with cfn2py: as a script, which is run in
+a new --python interpreter for each variant (the old way of producing
+environment variants), and with --module, which is imported once in a
+single interpreter whose build() is then called for every variant. Each
+variant sets the parameters with AllowedValues to a different combination
+and is serialised with to_json(). Variants per second of both ways are
+reported.
+
+    python benchmarks/variants.py --python /path/to/venv/bin/python \\
+        templates/jira_dc.json
+"""
+
+from __future__ import print_function
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT
+
+quiet = dict(os.environ, PYTHONWARNINGS='ignore')
+
+
+def variant_overrides(d, i):
+    """Parameter overrides of the i-th variant of template d"""
+    overrides = {}
+    for j, (name, p) in enumerate(sorted(d.get('Parameters', {}).items())):
+        if p.get('AllowedValues'):
+            value = p['AllowedValues'][(i + j) % len(p['AllowedValues'])]
+            if p.get('Type') != 'Number' and not isinstance(value, str):
+                value = json.dumps(value)
+            overrides[name] = value
+    return overrides
+
+
+def in_process(module_path, template, count):
+    """Import the module and build count variants, run by the child"""
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location('variants_module',
+                                                  module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    with open(template) as f:
+        d = json.load(f)
+    size = 0
+    for i in range(count):
+        size += len(module.build(**variant_overrides(d, i)).to_json())
+    end = time.perf_counter()
+    json.dump({'import_seconds': imported - start,
+               'build_seconds': end - imported,
+               'bytes': size}, sys.stdout)
+
+
+def convert(template, workdir, module):
+    command = [sys.executable, os.path.join(ROOT, 'cfn2py'), template]
+    if module:
+        command.append('--module')
+    path = os.path.join(workdir, 'module.py' if module else 'script.py')
+    with open(path, 'w') as f:
+        subprocess.check_call(command, stdout=f)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('template', nargs='?',
+                        default=os.path.join(ROOT, 'templates',
+                                             'jira_dc.json'))
+    parser.add_argument('--python', default=sys.executable,
+                        help='interpreter with troposphere to build the '
+                             'variants (default %(default)s)')
+    parser.add_argument('--variants', type=int, default=200,
+                        help='variants built in-process (default '
+                             '%(default)s)')
+    parser.add_argument('--launches', type=int, default=20,
+                        help='script runs timed for the subprocess way '
+                             '(default %(default)s)')
+    parser.add_argument('--in-process', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.in_process:
+        return in_process(args.in_process[0], args.in_process[1],
+                          args.variants)
+
+    with tempfile.TemporaryDirectory(prefix='cfn2py-variants-') as workdir:
+        script = convert(args.template, workdir, module=False)
+        module = convert(args.template, workdir, module=True)
+
+        start = time.perf_counter()
+        for _ in range(args.launches):
+            subprocess.check_call([args.python, script],
+                                  stdout=subprocess.DEVNULL, env=quiet)
+        per_launch = (time.perf_counter() - start) / args.launches
+
+        start = time.perf_counter()
+        result = json.loads(subprocess.check_output(
+            [args.python, os.path.abspath(__file__), '--variants',
+             str(args.variants), '--in-process', module, args.template],
+            env=quiet))
+        total = time.perf_counter() - start
+
+    print('subprocess per variant: {:8.1f} variants/s '
+          '({:.1f}ms per launch)'.format(1 / per_launch, per_launch * 1000))
+    print('build() in-process:     {:8.1f} variants/s '
+          '({:.1f}ms per build, {:.1f}ms import once)'.format(
+              args.variants / result['build_seconds'],
+              result['build_seconds'] / args.variants * 1000,
+              result['import_seconds'] * 1000))
+    print('including interpreter start: {:.1f} variants/s, {:.1f}x'.format(
+        args.variants / total, per_launch * args.variants / total))
+
+
+if __name__ == '__main__':
+    main()
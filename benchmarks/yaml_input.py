@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Compare converting YAML templates directly with cfn2py against the
+YAML -> JSON -> cfn2py chain.
+
+The upstream quickstarts are YAML with short form tags; the JSON templates
+in templates/ are dumped back to that form so both paths convert the same
+documents. The chain loads the YAML, serialises it to JSON and has cfn2py
+parse that; the direct path has cfn2py load the YAML itself. Both use the
+loader cfn2py uses (libyaml when available), so the speedup is that of
+skipping the JSON step. With libyaml, the chain with the pure Python loader,
+as YAML to JSON tools usually run it, is reported as well.
+"""
+
+from __future__ import print_function
+import argparse
+import glob
+import json
+import os
+import timeit
+
+import yaml
+
+from common import TEMPLATES, load_cfn2py
+from cfntools.template import cfn_yaml_loader, construct_cfn_tag
+from cfntools.template import construct_timestamp_string
+
+cfn2py = load_cfn2py()
+
+
+class short_form_dumper(yaml.SafeDumper):
+    """Dump intrinsic functions as CloudFormation short form tags"""
+
+
+def represent_template_dict(dumper, data):
+    if len(data) == 1:
+        ((k, v),) = data.items()
+        if k in ('Ref', 'Condition') or k.startswith('Fn::'):
+            tag = '!' + k.replace('Fn::', '')
+            if k == 'Fn::GetAtt' and isinstance(v, list):
+                return dumper.represent_scalar(tag, '.'.join(v))
+            if isinstance(v, list):
+                return dumper.represent_sequence(tag, v)
+            if isinstance(v, dict):
+                return dumper.represent_mapping(tag, v)
+            return dumper.represent_scalar(tag, str(v))
+    return dumper.represent_dict(data.items())
+
+
+short_form_dumper.add_representer(dict, represent_template_dict)
+
+
+class pure_python_loader(yaml.SafeLoader):
+    """The same tag handling as cfn2py, without libyaml"""
+
+
+pure_python_loader.add_multi_constructor('!', construct_cfn_tag)
+pure_python_loader.add_constructor('tag:yaml.org,2002:timestamp',
+                                   construct_timestamp_string)
+
+
+def via_json(text, loader=cfn_yaml_loader):
+    """The YAML -> JSON -> cfn2py chain"""
+    d = yaml.load(text, Loader=loader)
+    data = json.dumps(d, indent=2).encode('utf-8')
+    return cfn2py.convert_data(data, 'template.json')
+
+
+def direct(text):
+    """cfn2py reading the YAML itself"""
+    return cfn2py.convert_data(text.encode('utf-8'), 'template.yaml')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("templates", nargs='*',
+                        default=sorted(glob.glob(os.path.join(TEMPLATES,
+                                                              '*.json'))))
+    parser.add_argument("-n", "--number", type=int, default=5,
+                        help="conversions per timing run")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="timing runs, the fastest is reported")
+    args = parser.parse_args()
+
+    libyaml = cfn_yaml_loader.__bases__[0].__name__ == 'CSafeLoader'
+    print('libyaml loader: {}'.format(libyaml))
+    header = '{:<24} {:>10} {:>12} {:>12} {:>8}'.format(
+        'template', 'yaml bytes', 'chain ms', 'direct ms', 'speedup')
+    if libyaml:
+        header += ' {:>14} {:>8}'.format('pure chain ms', 'speedup')
+    print(header)
+
+    def best(f):
+        return min(timeit.repeat(f, number=args.number,
+                                 repeat=args.repeat)) / args.number
+
+    for path in args.templates:
+        with open(path) as f:
+            text = yaml.dump(json.load(f), Dumper=short_form_dumper,
+                             default_flow_style=False, sort_keys=False)
+        if via_json(text) != direct(text) or \
+                via_json(text, pure_python_loader) != direct(text):
+            raise SystemExit('{}: outputs differ'.format(path))
+        chain = best(lambda: via_json(text))
+        fast = best(lambda: direct(text))
+        line = '{:<24} {:>10} {:>12.2f} {:>12.2f} {:>7.1f}x'.format(
+            os.path.basename(path), len(text), chain * 1000, fast * 1000,
+            chain / fast)
+        if libyaml:
+            pure = best(lambda: via_json(text, pure_python_loader))
+            line += ' {:>14.2f} {:>7.1f}x'.format(pure * 1000, pure / fast)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
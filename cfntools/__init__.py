@@ -0,0 +1 @@
+"""Tools for reading, analysing and transforming CloudFormation templates."""
@@ -0,0 +1,129 @@
+"""Bake time of the cluster node image against the boot time of the nodes
+of a Jira stack.
+
+With BakeClusterNodeImage the stack builds ClusterNodeImage with EC2 Image
+Builder; how long each build took comes from the CREATE/UPDATE events of
+the resource in the stack events. Every node publishes NodeReadyTime to
+CloudWatch when Jira first answers after a boot: the seconds since the
+boot, including the bootstrap. A baked image moves the package, deployment
+automation and Ansible installs out of that time, into the bake; the
+report shows both, so the bake can be weighed against how often nodes
+launch.
+
+    python -m cfntools.boottime STACK --region us-east-1
+
+Needs boto3 and credentials which may read the stack events and the
+CloudWatch metrics.
+"""
+
+from __future__ import print_function
+import argparse
+import datetime
+import sys
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+image_resource = 'ClusterNodeImage'
+metric_namespace = 'Jira'
+metric_name = 'NodeReadyTime'
+
+
+def resource_durations(events, logical_id):
+    """[(start, seconds)] of each completed create or update of
+    logical_id, oldest first, from stack events in any order
+    """
+    found = []
+    start = None
+    for e in sorted(events, key=lambda e: e['Timestamp']):
+        if e['LogicalResourceId'] != logical_id:
+            continue
+        status = e['ResourceStatus']
+        if status in ('CREATE_IN_PROGRESS', 'UPDATE_IN_PROGRESS'):
+            # the second IN_PROGRESS event of a create carries the
+            # physical id, the build started with the first
+            start = start or e['Timestamp']
+        elif status in ('CREATE_COMPLETE', 'UPDATE_COMPLETE') and start:
+            found.append((start, (e['Timestamp'] - start).total_seconds()))
+            start = None
+        else:
+            start = None
+    return found
+
+
+def boot_summary(datapoints):
+    """Boots, and their average, fastest and slowest NodeReadyTime, from
+    the datapoints of get_metric_statistics; None without any boots
+    """
+    boots = sum(p['SampleCount'] for p in datapoints)
+    if not boots:
+        return None
+    return {
+        'boots': int(boots),
+        'average': sum(p['Average'] * p['SampleCount']
+                       for p in datapoints) / boots,
+        'minimum': min(p['Minimum'] for p in datapoints),
+        'maximum': max(p['Maximum'] for p in datapoints),
+    }
+
+
+def minutes(seconds):
+    return '{}:{:02d}'.format(int(seconds) // 60, int(seconds) % 60)
+
+
+def print_report(bakes, boots, days, out=sys.stdout):
+    if bakes:
+        for start, seconds in bakes:
+            print('bake  {:%Y-%m-%d %H:%M}  {:>7}'.format(
+                start, minutes(seconds)), file=out)
+    else:
+        print('no bakes of {}; is BakeClusterNodeImage set?'.format(
+            image_resource), file=out)
+    if boots:
+        print('boot  {} in {} days  average {}  fastest {}  slowest '
+              '{}'.format(boots['boots'], days, minutes(boots['average']),
+                          minutes(boots['minimum']),
+                          minutes(boots['maximum'])), file=out)
+    else:
+        print('no {} in {} days'.format(metric_name, days), file=out)
+    if bakes and boots and boots['average']:
+        print('the last bake takes as long as {:.1f} boots'.format(
+            bakes[-1][1] / boots['average']), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare the bake time of the cluster node image of a '
+                    'Jira stack with the boot time of its nodes.')
+    parser.add_argument('stack')
+    parser.add_argument('--region')
+    parser.add_argument('--days', type=int, default=14,
+                        help='boots of the last days (default %(default)s)')
+    args = parser.parse_args(argv)
+    if boto3 is None:
+        parser.exit(1, 'boottime needs boto3\n')
+
+    session = boto3.session.Session(region_name=args.region)
+    events = []
+    pages = session.client('cloudformation').get_paginator(
+        'describe_stack_events').paginate(StackName=args.stack)
+    for page in pages:
+        events.extend(page['StackEvents'])
+
+    end = datetime.datetime.utcnow()
+    datapoints = session.client('cloudwatch').get_metric_statistics(
+        Namespace=metric_namespace, MetricName=metric_name,
+        Dimensions=[{'Name': 'Cluster', 'Value': args.stack}],
+        StartTime=end - datetime.timedelta(days=args.days), EndTime=end,
+        Period=86400, Unit='Seconds',
+        Statistics=['SampleCount', 'Average', 'Minimum', 'Maximum'],
+    )['Datapoints']
+
+    print_report(resource_durations(events, image_resource),
+                 boot_summary(datapoints), args.days)
+
+
+if __name__ == '__main__':
+    main()
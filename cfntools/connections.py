@@ -0,0 +1,350 @@
+"""Database connection budget of a Jira cluster.
+
+Every cluster node opens up to DBPoolMaxSize connections, so the database
+has to accept (ClusterNodeMax + WarmPoolSize + surge_nodes) x DBPoolMaxSize
+of them, plus the connections RDS reserves. Warm pool nodes run Jira while
+they are prepared, and surge_nodes covers the extra node of a rolling
+replacement or of a scale-out overlapping a scale-in. PostgreSQL
+on RDS allows LEAST(DBInstanceClassMemory / 9531392, 5000) connections by
+default; DBInstanceClassMemory is estimated from the RAM of the instance
+class in instance_types.json.
+
+solve() picks consistent values for a DB instance class, a cluster node
+instance type and a maximum node count: Tomcat threads from the vCPUs of
+the nodes, the pool sizes from the threads, capped by the share of the
+connection budget of each node and rounded down to pool_sizes. check()
+tells what is inconsistent in a set of parameter values.
+
+CloudFormation Rules cannot add or multiply, so rules() encodes the budget
+as a table: for each number of nodes a DB instance class and pool size
+allow, when max_cluster_nodes nodes with a warm pool of max_warm_pool
+would overrun it, the ClusterNodeMax values that fit with each
+WarmPoolSize. The DB instance classes and pool sizes which allow the same
+number of nodes share one assertion. --update writes them into the
+template next to its other Rules, with those bounds as the MaxValue of
+ClusterNodeMax and WarmPoolSize and pool_sizes as the AllowedValues of
+DBPoolMaxSize, so the Rules cover every value the parameters allow.
+
+    python -m cfntools.connections templates/jira_dc.json \\
+        --db-instance-class db.r4.large --instance-type c5.2xlarge \\
+        --nodes 4 -o params.json
+    python -m cfntools.connections templates/jira_dc.json --check params.json
+    python -m cfntools.connections templates/jira_dc.json --update
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import sys
+
+from cfntools.evaluate import read_parameters
+from cfntools.jvm import catalog_path, load_catalog
+from cfntools.template import load_template, update_json
+
+bytes_per_connection = 9531392
+max_rds_connections = 5000
+# share of the RAM of an instance class left as DBInstanceClassMemory
+rds_memory_fraction = 0.9
+# superuser_reserved_connections, and room for admin and monitoring
+reserved_connections = 3 + 10
+surge_nodes = 1
+
+threads_per_vcpu = 50
+min_threads = 100
+max_threads = 400
+# up to max_threads // 4, the largest pool solve() picks
+pool_sizes = [10, 20, 30, 40, 50, 75, 100]
+
+# the MaxValue of ClusterNodeMax and WarmPoolSize, which bound the Rules
+max_cluster_nodes = 12
+max_warm_pool = 3
+
+
+class BudgetError(ValueError):
+    """No pool size fits the connection budget"""
+
+
+def max_connections(db_class, catalog):
+    """The default max_connections of PostgreSQL on db_class"""
+    memory = catalog[db_class]['memory_gib'] * 2 ** 30 * rds_memory_fraction
+    return min(max_rds_connections, int(memory // bytes_per_connection))
+
+
+def node_budget(db_class, nodes, catalog, warm_pool=0):
+    """Connections each of nodes cluster nodes, and of the warm_pool
+    nodes, may open
+    """
+    return (max_connections(db_class, catalog) - reserved_connections) // \
+        (nodes + warm_pool + surge_nodes)
+
+
+def max_nodes(db_class, pool_size, catalog):
+    """The most nodes, warm pool included, with pools of pool_size which fit
+    the budget
+    """
+    return (max_connections(db_class, catalog) - reserved_connections) // \
+        pool_size - surge_nodes
+
+
+def solve(db_class, instance_type, nodes, catalog, warm_pool=0):
+    """Consistent parameter values, a dict of strings"""
+    vcpus = catalog[instance_type]['vcpus']
+    threads = min(max_threads, max(min_threads, vcpus * threads_per_vcpu))
+    budget = node_budget(db_class, nodes, catalog, warm_pool)
+    fitting = [p for p in pool_sizes if p <= min(threads // 4, budget)]
+    if not fitting:
+        raise BudgetError(
+            '{} allows {} connections per node for {} nodes and {} warm '
+            'pool nodes, less than the smallest pool of {}; use a larger '
+            'DBInstanceClass or fewer nodes'.format(
+                db_class, budget, nodes, warm_pool, pool_sizes[0]))
+    pool = fitting[-1]
+    min_idle = max(5, pool // 4)
+    values = {
+        'DBInstanceClass': db_class,
+        'ClusterNodeInstanceType': instance_type,
+        'ClusterNodeMax': nodes,
+        'WarmPoolSize': warm_pool,
+        'TomcatMaxThreads': threads,
+        'TomcatAcceptCount': max(10, threads // 10),
+        'DBPoolMaxSize': pool,
+        'DBMaxIdle': pool,
+        'DBPoolMinSize': min_idle,
+        'DBMinIdle': min_idle,
+    }
+    return dict((k, str(v)) for k, v in values.items())
+
+
+def check(values, catalog):
+    """Yield a message for each inconsistency in the parameter values"""
+    def number(name):
+        return int(values[name])
+
+    db_class = values['DBInstanceClass']
+    nodes = number('ClusterNodeMax')
+    warm_pool = int(values.get('WarmPoolSize', 0))
+    pool = number('DBPoolMaxSize')
+    needed = (nodes + warm_pool + surge_nodes) * pool + reserved_connections
+    available = max_connections(db_class, catalog)
+    if needed > available:
+        yield ('(ClusterNodeMax {} + WarmPoolSize {} + {}) x DBPoolMaxSize '
+               '{} + {} reserved is {} connections, {} allows {}'.format(
+                   nodes, warm_pool, surge_nodes, pool,
+                   reserved_connections, needed, db_class, available))
+    for smaller, larger in [('DBPoolMinSize', 'DBPoolMaxSize'),
+                            ('DBMinIdle', 'DBMaxIdle'),
+                            ('DBMaxIdle', 'DBPoolMaxSize'),
+                            ('DBPoolMaxSize', 'TomcatMaxThreads')]:
+        if number(smaller) > number(larger):
+            yield '{} {} is larger than {} {}'.format(
+                smaller, values[smaller], larger, values[larger])
+
+
+def numbers(first, last):
+    return [str(n) for n in range(first, last + 1)]
+
+
+def one_of(name, values):
+    """Condition that the parameter name is one of values"""
+    if len(values) == 1:
+        return {'Fn::Equals': [{'Ref': name}, values[0]]}
+    return {'Fn::Contains': [values, {'Ref': name}]}
+
+
+def at_most(name, n, limit):
+    """Condition that the Number parameter name, whose MaxValue is limit,
+    is at most n, or None if it always is
+    """
+    if n >= limit:
+        return None
+    if 2 * n <= limit:
+        return one_of(name, numbers(1, n))
+    return {'Fn::Not': [one_of(name, numbers(n + 1, limit))]}
+
+
+def at_least(name, n, low, high):
+    """Condition that the Number parameter name, from low to high, is at
+    least n, where low < n <= high
+    """
+    if high - n < n - low:
+        return one_of(name, numbers(n, high))
+    return {'Fn::Not': [one_of(name, numbers(low, n - 1))]}
+
+
+def fitting(fit):
+    """Conditions, one of which holds if ClusterNodeMax + WarmPoolSize is at
+    most fit
+    """
+    found = []
+    any_nodes = []
+    for warm_pool in range(min(max_warm_pool, fit - 1) + 1):
+        nodes = at_most('ClusterNodeMax', fit - warm_pool, max_cluster_nodes)
+        if nodes is None:
+            any_nodes.append(str(warm_pool))
+        else:
+            found.append({'Fn::And': [
+                one_of('WarmPoolSize', [str(warm_pool)]), nodes]})
+    if any_nodes:
+        found.insert(0, one_of('WarmPoolSize', any_nodes))
+    return found
+
+
+def overrunning(fit):
+    """Conditions, one of which holds if ClusterNodeMax + WarmPoolSize is
+    more than fit
+    """
+    found = []
+    if fit < max_cluster_nodes:
+        found.append(at_least('ClusterNodeMax', fit + 1, 1,
+                              max_cluster_nodes))
+    for warm_pool in range(1, max_warm_pool + 1):
+        # ClusterNodeMax only fits with fewer than warm_pool warm nodes
+        nodes = fit - warm_pool + 1
+        if 1 <= nodes <= max_cluster_nodes:
+            found.append({'Fn::And': [
+                one_of('ClusterNodeMax', [str(nodes)]),
+                at_least('WarmPoolSize', warm_pool, 0, max_warm_pool)]})
+    return found
+
+
+def either(conditions):
+    return conditions[0] if len(conditions) == 1 else {'Fn::Or': conditions}
+
+
+def compact_json(v):
+    return json.dumps(v, separators=(',', ':'))
+
+
+def rules(db_classes, catalog):
+    """Rules rejecting ClusterNodeMax, WarmPoolSize and DBPoolMaxSize
+    combinations which overrun the connection budget of the DBInstanceClass
+    """
+    groups = {}
+    for db_class in db_classes:
+        groups.setdefault(max_connections(db_class, catalog), []).append(
+            db_class)
+    # nodes which fit -> {DB instance classes: pool sizes}
+    limits = {}
+    for limit, classes in sorted(groups.items()):
+        for pool in pool_sizes:
+            fit = max(0, max_nodes(classes[0], pool, catalog))
+            if fit < max_cluster_nodes + max_warm_pool:
+                limits.setdefault(fit, {}).setdefault(
+                    tuple(classes), []).append(str(pool))
+    assertions = []
+    for fit in sorted(limits, reverse=True):
+        applies = [{'Fn::And': [one_of('DBInstanceClass', list(classes)),
+                                one_of('DBPoolMaxSize', pools)]}
+                   for classes, pools in limits[fit].items()]
+        applies = either(applies)
+        if fit < 1:
+            assertions.append({
+                'Assert': {'Fn::Not': [applies]},
+                'AssertDescription': 'DBPoolMaxSize does not fit any nodes '
+                                     'with this DBInstanceClass',
+            })
+            continue
+        # whichever is shorter
+        asserts = [{'Fn::Or': [{'Fn::Not': [applies]}] + fitting(fit)},
+                   {'Fn::Not': [{'Fn::And': [applies,
+                                             either(overrunning(fit))]}]}]
+        assertions.append({
+            'Assert': min(asserts, key=lambda a: len(compact_json(a))),
+            'AssertDescription': 'ClusterNodeMax + WarmPoolSize may be at '
+                                 'most {} with this DBInstanceClass and '
+                                 'DBPoolMaxSize'.format(fit),
+        })
+    if not assertions:
+        return {}
+    return {'DBConnections': {'Assertions': assertions}}
+
+
+def parameter_file(values):
+    """values in the format of aws cloudformation --parameters"""
+    return [{'ParameterKey': k, 'ParameterValue': v}
+            for k, v in sorted(values.items())]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Work out consistent database pool, Tomcat and RDS '
+                    'settings of a Jira cluster, check them, or write '
+                    'Rules enforcing them into the template.')
+    parser.add_argument('template')
+    parser.add_argument('--db-instance-class')
+    parser.add_argument('--instance-type',
+                        help='cluster node instance type (default: the '
+                             'ClusterNodeInstanceType default)')
+    parser.add_argument('--nodes', type=int, help='ClusterNodeMax')
+    parser.add_argument('--warm-pool', type=int, default=0,
+                        help='WarmPoolSize (default %(default)s)')
+    parser.add_argument('-o', '--output', help='write the parameter file here')
+    parser.add_argument('--check', metavar='PARAMETERS',
+                        help='check a parameter file (the template '
+                             'defaults fill in the rest)')
+    parser.add_argument('--update', action='store_true',
+                        help='write the Rules into the template')
+    parser.add_argument('--catalog', default=catalog_path,
+                        help='instance type catalog (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    d = load_template(args.template)
+    catalog = load_catalog(args.catalog)
+    parameters = d['Parameters']
+
+    if args.update:
+        classes = parameters['DBInstanceClass']['AllowedValues']
+        found = rules(classes, catalog)
+        # keep the Rules of the template which are not about connections
+        for name, rule in d.get('Rules', {}).items():
+            if not name.startswith('DBConnections'):
+                found[name] = rule
+        update_json(args.template, ['Rules'], found, before='Conditions')
+        # the Rules only hold for the values these allow
+        for path, value in [
+                (['ClusterNodeMax', 'MaxValue'], max_cluster_nodes),
+                (['WarmPoolSize', 'MaxValue'], max_warm_pool),
+                (['DBPoolMaxSize', 'AllowedValues'],
+                 [str(p) for p in pool_sizes])]:
+            update_json(args.template, ['Parameters'] + path, value,
+                        before='Type')
+        return
+
+    if args.check:
+        values = dict((k, str(p['Default'])) for k, p in parameters.items()
+                      if 'Default' in p)
+        values.update(read_parameters(args.check))
+        problems = list(check(values, catalog))
+        for message in problems:
+            print(message)
+        sys.exit(1 if problems else 0)
+
+    if not args.db_instance_class or not args.nodes:
+        parser.error('--db-instance-class and --nodes are required')
+    if args.nodes > max_cluster_nodes or args.warm_pool > max_warm_pool:
+        parser.error('the template allows at most {} nodes and a warm pool of '
+                     '{}'.format(max_cluster_nodes, max_warm_pool))
+    instance_type = args.instance_type or \
+        parameters['ClusterNodeInstanceType']['Default']
+    try:
+        values = solve(args.db_instance_class, instance_type, args.nodes,
+                       catalog, args.warm_pool)
+    except BudgetError as e:
+        parser.exit(1, '{}\n'.format(e))
+    text = json.dumps(parameter_file(values), indent=4) + '\n'
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    needed = (args.nodes + args.warm_pool + surge_nodes) * \
+        int(values['DBPoolMaxSize']) + reserved_connections
+    print('{} of {} connections of {} for {} nodes (+{} warm pool, +{} '
+          'surge)'.format(needed,
+                          max_connections(args.db_instance_class, catalog),
+                          args.db_instance_class, args.nodes, args.warm_pool,
+                          surge_nodes), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,622 @@
+"""Offline partial evaluation of CloudFormation templates.
+
+Given values for some or all of the parameters (and pseudo parameters such
+as AWS::Region), the intrinsic functions and conditions which only depend
+on them are evaluated the way CloudFormation would: conditions are
+resolved, resources and outputs whose condition is false are pruned,
+Fn::If, Fn::Equals, Fn::Not, Fn::And, Fn::Or, Fn::FindInMap, Fn::Select,
+Fn::Sub, Fn::Join and Fn::Split are folded, and mappings and parameters
+which are no longer used are dropped. Rules are checked as far as the
+values allow, a failed assertion being an error. Whatever depends on
+values only known at deploy time (resource attributes, secrets without
+defaults) is kept, simplified.
+
+A matrix of parameter combinations, such as every instance type in every
+region, is evaluated by specializing the template for the fixed
+parameters once and then for each combination, reporting the combinations
+which fail (a value not allowed by its parameter, a missing mapping key,
+an index out of range).
+
+    python -m cfntools.evaluate templates/jira_dc.json -p params.json \\
+        --region us-east-1 -o jira_dc.us-east-1.json
+    python -m cfntools.evaluate templates/jira_dc.json \\
+        --matrix ClusterNodeInstanceType \\
+        --matrix AWS::Region=us-east-1,eu-west-1
+"""
+
+from __future__ import print_function
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import re
+import sys
+
+from cfntools.template import depends_on, load_template
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+NO_VALUE = {'Ref': 'AWS::NoValue'}
+
+sub_variable = re.compile(r'\$\{([^}]*)\}')
+
+
+class EvaluationError(ValueError):
+    """The template cannot be deployed with the given parameters"""
+
+
+def is_scalar(v):
+    return isinstance(v, (basestring, bool, int, float))
+
+
+def as_string(v):
+    """A scalar as CloudFormation sees it when comparing or joining"""
+    if isinstance(v, bool):
+        return 'true' if v else 'false'
+    return v if isinstance(v, basestring) else str(v)
+
+
+def parameter_value(p, value):
+    """A parameter value as Ref returns it: lists for list types"""
+    if isinstance(value, list):
+        return [as_string(e) for e in value]
+    value = as_string(value)
+    t = p.get('Type', 'String')
+    if t == 'CommaDelimitedList' or t.startswith('List<'):
+        return [e.strip() for e in value.split(',')] if value else []
+    return value
+
+
+def check_parameter(name, p, value):
+    """Yield a message for each constraint of parameter p which value
+    breaks
+    """
+    values = value if isinstance(value, list) else [value]
+    allowed = [as_string(a) for a in p.get('AllowedValues', [])]
+    for v in values:
+        if allowed and v not in allowed:
+            yield '{}: {!r} is not one of the AllowedValues'.format(name, v)
+        if 'AllowedPattern' in p and \
+                not re.match('(?:{})\\Z'.format(p['AllowedPattern']), v):
+            yield '{}: {!r} does not match the AllowedPattern'.format(name, v)
+        if len(v) < int(p.get('MinLength', 0)) or \
+                len(v) > int(p.get('MaxLength', len(v))):
+            yield '{}: {!r} has the wrong length'.format(name, v)
+        if p.get('Type') == 'Number':
+            try:
+                number = float(v)
+            except ValueError:
+                yield '{}: {!r} is not a number'.format(name, v)
+                continue
+            if number < float(p.get('MinValue', number)) or \
+                    number > float(p.get('MaxValue', number)):
+                yield '{}: {!r} is out of range'.format(name, v)
+
+
+class Evaluator(object):
+    """Evaluates template values with the known parameter values, caching
+    the result of each condition
+    """
+    def __init__(self, d, values):
+        self.values = values
+        self.mappings = d.get('Mappings', {})
+        self.definitions = d.get('Conditions', {})
+        self.conditions = {}
+
+    def condition(self, name):
+        """True, False, or the simplified definition of condition name"""
+        if name not in self.conditions:
+            if name not in self.definitions:
+                raise EvaluationError('unknown condition {}'.format(name))
+            self.conditions[name] = self.evaluate(self.definitions[name])
+        return self.conditions[name]
+
+    def evaluate(self, v):
+        """v with everything which can be known now evaluated"""
+        if isinstance(v, list):
+            return [e for e in (self.evaluate(e) for e in v)
+                    if e != NO_VALUE]
+        if not isinstance(v, dict):
+            return v
+        if len(v) == 1:
+            ((k, arg),) = v.items()
+            handler = self.functions.get(k)
+            if handler is not None:
+                return handler(self, arg)
+        return dict((k, e) for k, e in
+                    ((k, self.evaluate(e)) for k, e in v.items())
+                    if e != NO_VALUE)
+
+    def do_ref(self, name):
+        if isinstance(name, basestring) and name in self.values:
+            return self.values[name]
+        return {'Ref': name}
+
+    def do_condition(self, name):
+        c = self.condition(name)
+        return c if isinstance(c, bool) else {'Condition': name}
+
+    def do_if(self, arg):
+        c = self.condition(arg[0])
+        if c is True:
+            return self.evaluate(arg[1])
+        if c is False:
+            return self.evaluate(arg[2])
+        return {'Fn::If': [arg[0], self.evaluate(arg[1]),
+                           self.evaluate(arg[2])]}
+
+    def do_equals(self, arg):
+        a, b = self.evaluate(arg)
+        if is_scalar(a) and is_scalar(b):
+            return as_string(a) == as_string(b)
+        return {'Fn::Equals': [a, b]}
+
+    def do_not(self, arg):
+        (c,) = self.evaluate(arg)
+        return (not c) if isinstance(c, bool) else {'Fn::Not': [c]}
+
+    def do_and(self, arg):
+        return self.combine('Fn::And', arg, False)
+
+    def do_or(self, arg):
+        return self.combine('Fn::Or', arg, True)
+
+    def combine(self, function, arg, decisive):
+        """Fn::And (decisive False) or Fn::Or (decisive True)"""
+        unknown = []
+        for c in self.evaluate(arg):
+            if c is decisive:
+                return decisive
+            if not isinstance(c, bool):
+                unknown.append(c)
+        if not unknown:
+            return not decisive
+        if len(unknown) == 1:
+            c = unknown[0]
+            # a condition definition cannot be a bare Condition reference
+            return self.condition(c['Condition']) if 'Condition' in c else c
+        return {function: unknown}
+
+    def do_findinmap(self, arg):
+        args = self.evaluate(arg)
+        if not all(is_scalar(a) for a in args):
+            return {'Fn::FindInMap': args}
+        m, first, second = [as_string(a) for a in args]
+        try:
+            return self.mappings[m][first][second]
+        except KeyError:
+            raise EvaluationError('Fn::FindInMap: no {}/{} in mapping {}'
+                                  .format(first, second, m))
+
+    def do_select(self, arg):
+        index, items = self.evaluate(arg)
+        if is_scalar(index) and isinstance(items, list):
+            i = int(as_string(index))
+            if not 0 <= i < len(items):
+                raise EvaluationError('Fn::Select: index {} out of range '
+                                      'of {} items'.format(i, len(items)))
+            return items[i]
+        return {'Fn::Select': [index, items]}
+
+    def do_join(self, arg):
+        delimiter, items = self.evaluate(arg)
+        if not isinstance(items, list):
+            return {'Fn::Join': [delimiter, items]}
+        merged = []
+        for e in items:
+            if is_scalar(e) and merged and is_scalar(merged[-1]):
+                merged[-1] = as_string(merged[-1]) + delimiter + as_string(e)
+            else:
+                merged.append(as_string(e) if is_scalar(e) else e)
+        if not merged:
+            return ''
+        if len(merged) == 1 and is_scalar(merged[0]):
+            return merged[0]
+        return {'Fn::Join': [delimiter, merged]}
+
+    def do_contains(self, arg):
+        items, value = self.evaluate(arg)
+        if isinstance(items, list) and all(is_scalar(i) for i in items) \
+                and is_scalar(value):
+            return as_string(value) in [as_string(i) for i in items]
+        return {'Fn::Contains': [items, value]}
+
+    def do_split(self, arg):
+        delimiter, text = self.evaluate(arg)
+        if isinstance(text, basestring):
+            return text.split(delimiter)
+        return {'Fn::Split': [delimiter, text]}
+
+    def do_sub(self, arg):
+        if isinstance(arg, basestring):
+            text, variables = arg, {}
+        else:
+            text = arg[0]
+            variables = self.evaluate(arg[1]) if len(arg) > 1 else {}
+        used = set()
+
+        def substitute(m):
+            name = m.group(1)
+            if name.startswith('!'):
+                return m.group(0)
+            if name in variables:
+                value = variables[name]
+            else:
+                value = self.values.get(name)
+            if is_scalar(value):
+                # the value is now part of the Fn::Sub string
+                return as_string(value).replace('${', '${!')
+            if name in variables:
+                used.add(name)
+            return m.group(0)
+
+        text = sub_variable.sub(substitute, text)
+        if any(not m.group(1).startswith('!')
+               for m in sub_variable.finditer(text)):
+            if used:
+                return {'Fn::Sub': [text, dict(
+                    (k, v) for k, v in variables.items() if k in used)]}
+            return {'Fn::Sub': text}
+        return text.replace('${!', '${')
+
+    def keep(function):
+        """Evaluate the arguments of function but not the function"""
+        def handler(self, arg):
+            return {function: self.evaluate(arg)}
+        return handler
+
+    functions = {
+        'Ref': do_ref,
+        'Condition': do_condition,
+        'Fn::If': do_if,
+        'Fn::Equals': do_equals,
+        'Fn::Not': do_not,
+        'Fn::And': do_and,
+        'Fn::Or': do_or,
+        'Fn::FindInMap': do_findinmap,
+        'Fn::Select': do_select,
+        'Fn::Join': do_join,
+        'Fn::Split': do_split,
+        'Fn::Contains': do_contains,
+        'Fn::Sub': do_sub,
+        'Fn::Base64': keep('Fn::Base64'),
+        'Fn::Cidr': keep('Fn::Cidr'),
+        'Fn::GetAtt': keep('Fn::GetAtt'),
+        'Fn::GetAZs': keep('Fn::GetAZs'),
+        'Fn::ImportValue': keep('Fn::ImportValue'),
+        'Fn::EachMemberEquals': keep('Fn::EachMemberEquals'),
+        'Fn::EachMemberIn': keep('Fn::EachMemberIn'),
+        'Fn::RefAll': keep('Fn::RefAll'),
+        'Fn::ValueOf': keep('Fn::ValueOf'),
+        'Fn::ValueOfAll': keep('Fn::ValueOfAll'),
+    }
+    del keep
+
+
+def mappings_used(v, found=None):
+    """Names of the mappings v looks up (or all, if a lookup computes the
+    mapping name)
+    """
+    found = set() if found is None else found
+    if isinstance(v, list):
+        for e in v:
+            mappings_used(e, found)
+    elif isinstance(v, dict):
+        if list(v) == ['Fn::FindInMap']:
+            name = v['Fn::FindInMap'][0]
+            found.add(name if isinstance(name, basestring) else None)
+        for e in v.values():
+            mappings_used(e, found)
+    return found
+
+
+def known_values(d, parameters, use_defaults=True, unknown=()):
+    """The value of each parameter which is given, or has a default and
+    use_defaults is set, leaving out those in unknown and NoEcho ones,
+    which are checked but never written into the template, and SSM
+    parameter types, whose value CloudFormation reads from Parameter Store;
+    plus the given pseudo parameters. Raises EvaluationError for values
+    which break the constraints of their parameter.
+    """
+    definitions = d.get('Parameters', {})
+    values = {}
+    errors = []
+    for name, value in parameters.items():
+        if name.startswith('AWS::'):
+            values[name] = as_string(value)
+        elif name not in definitions:
+            errors.append('{}: not a parameter of the template'.format(name))
+        else:
+            values[name] = parameter_value(definitions[name], value)
+            errors.extend(check_parameter(name, definitions[name],
+                                          values[name]))
+    if use_defaults:
+        for name, p in definitions.items():
+            if name not in values and 'Default' in p:
+                values[name] = parameter_value(p, p['Default'])
+    if errors:
+        raise EvaluationError('; '.join(errors))
+    for name, p in definitions.items():
+        if name in unknown or as_string(p.get('NoEcho', False)) == 'true' \
+                or p.get('Type', '').startswith('AWS::SSM::Parameter::Value<'):
+            values.pop(name, None)
+    return values
+
+
+def evaluate_rules(e, rules):
+    """The rules, with the assertions which hold and the rules which do
+    not apply left out. Raises EvaluationError for a failed assertion.
+    """
+    out = {}
+    for name, rule in rules.items():
+        rule = dict(rule)
+        if 'RuleCondition' in rule:
+            c = e.evaluate(rule['RuleCondition'])
+            if c is False:
+                continue
+            if c is True:
+                del rule['RuleCondition']
+            else:
+                rule['RuleCondition'] = c
+        assertions = []
+        for a in rule.get('Assertions', []):
+            holds = e.evaluate(a['Assert'])
+            if holds is False:
+                raise EvaluationError('rule {}: {}'.format(
+                    name, a.get('AssertDescription', 'assertion failed')))
+            if holds is not True:
+                assertions.append(dict(a, Assert=holds))
+        if assertions:
+            out[name] = dict(rule, Assertions=assertions)
+    return out
+
+
+def specialize(d, parameters, use_defaults=True, unknown=()):
+    """Return (template, stats): d evaluated with the given parameter
+    values (see known_values()), and counts of what was resolved, pruned
+    and folded.
+    """
+    values = known_values(d, parameters, use_defaults, unknown)
+    e = Evaluator(d, values)
+    out = {}
+    stats = {'conditions': 0, 'resources': [], 'outputs': [],
+             'mappings': [], 'parameters': 0}
+
+    rules = evaluate_rules(e, d.get('Rules', {}))
+    conditions = {}
+    for name in d.get('Conditions', {}):
+        c = e.condition(name)
+        if isinstance(c, bool):
+            stats['conditions'] += 1
+        else:
+            conditions[name] = c
+
+    def included(item, pruned, name):
+        c = item.get('Condition')
+        if c is None or not isinstance(e.condition(c), bool):
+            return True
+        if e.condition(c) is False:
+            pruned.append(name)
+            return False
+        return True
+
+    resources = {}
+    for name, r in d.get('Resources', {}).items():
+        if included(r, stats['resources'], name):
+            resources[name] = r
+    for name, r in resources.items():
+        r = dict((k, v) for k, v in r.items()
+                 if k != 'Condition' or
+                 not isinstance(e.condition(v), bool))
+        for k in list(r):
+            if k not in ('Type', 'DependsOn', 'Condition'):
+                r[k] = e.evaluate(r[k])
+        if 'DependsOn' in r:
+            names = [n for n in depends_on(r) if n in resources]
+            if names:
+                r['DependsOn'] = names
+            else:
+                del r['DependsOn']
+        resources[name] = r
+
+    outputs = {}
+    for name, o in d.get('Outputs', {}).items():
+        if included(o, stats['outputs'], name):
+            o = dict((k, v) for k, v in o.items()
+                     if k != 'Condition' or
+                     not isinstance(e.condition(v), bool))
+            outputs[name] = e.evaluate(o)
+
+    for k in d:
+        if k not in ('Parameters', 'Rules', 'Conditions', 'Mappings',
+                     'Resources', 'Outputs', 'Metadata'):
+            out[k] = d[k]
+    parameters = dict((k, p) for k, p in d.get('Parameters', {}).items()
+                      if k not in values)
+    stats['parameters'] = len(d.get('Parameters', {})) - len(parameters)
+    if 'Metadata' in d:
+        out['Metadata'] = interface_for(d['Metadata'], parameters)
+    if parameters:
+        out['Parameters'] = parameters
+    if rules:
+        out['Rules'] = rules
+    used = mappings_used([conditions, resources, outputs])
+    mappings = dict((k, m) for k, m in d.get('Mappings', {}).items()
+                    if k in used or None in used)
+    stats['mappings'] = sorted(set(d.get('Mappings', {})) - set(mappings))
+    if mappings:
+        out['Mappings'] = mappings
+    if conditions:
+        out['Conditions'] = conditions
+    out['Resources'] = resources
+    if outputs:
+        out['Outputs'] = outputs
+    return out, stats
+
+
+def interface_for(metadata, parameters):
+    """Template Metadata with the parameters which are gone removed from
+    the AWS::CloudFormation::Interface groups and labels
+    """
+    interface = metadata.get('AWS::CloudFormation::Interface')
+    if interface is None:
+        return metadata
+    interface = copy.deepcopy(interface)
+    groups = []
+    for g in interface.get('ParameterGroups', []):
+        g['Parameters'] = [p for p in g.get('Parameters', [])
+                           if p in parameters]
+        if g['Parameters']:
+            groups.append(g)
+    if 'ParameterGroups' in interface:
+        interface['ParameterGroups'] = groups
+    if 'ParameterLabels' in interface:
+        interface['ParameterLabels'] = dict(
+            (k, v) for k, v in interface['ParameterLabels'].items()
+            if k in parameters)
+    return dict(metadata, **{'AWS::CloudFormation::Interface': interface})
+
+
+def evaluate_matrix(d, parameters, axes, use_defaults=True):
+    """Specialize d for every combination of the axes, a list of
+    (parameter name, values), with the other parameters fixed.
+
+    The template is specialized once for the fixed parameters and each
+    combination is then evaluated on that smaller template. Returns a
+    list of (combination dict, template or None, stats or error message).
+    """
+    names = [name for (name, _) in axes]
+    base, _ = specialize(d, parameters, use_defaults, unknown=names)
+    results = []
+    for combination in itertools.product(*(values for (_, values) in axes)):
+        combination = dict(zip(names, combination))
+        try:
+            # constraints are checked against the original definitions
+            known_values(d, combination, use_defaults=False)
+            t, stats = specialize(base, combination, use_defaults)
+            results.append((combination, t, stats))
+        except EvaluationError as e:
+            results.append((combination, None, str(e)))
+    return results
+
+
+def template_digest(t):
+    return hashlib.sha256(json.dumps(t, sort_keys=True).encode('utf-8')) \
+        .hexdigest()[:12]
+
+
+def read_parameters(filename):
+    """Parameter values from a JSON file, either {name: value} or the
+    [{"ParameterKey": ..., "ParameterValue": ...}] list the AWS CLI takes
+    """
+    with open(filename) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return dict((p['ParameterKey'], p['ParameterValue']) for p in data)
+    return data
+
+
+def parse_parameters(specs):
+    """Parameter values from a list of NAME=VALUE and parameter files"""
+    parameters = {}
+    for p in specs:
+        if '=' in p:
+            name, _, value = p.partition('=')
+            parameters[name] = value
+        else:
+            parameters.update(read_parameters(p))
+    return parameters
+
+
+def matrix_axis(d, spec):
+    """(name, values) from NAME=v1,v2 or NAME, for the AllowedValues of
+    the parameter
+    """
+    name, _, values = spec.partition('=')
+    if values:
+        return name, values.split(',')
+    allowed = d.get('Parameters', {}).get(name, {}).get('AllowedValues')
+    if not allowed:
+        raise EvaluationError('{} has no AllowedValues, give NAME=v1,v2'
+                              .format(name))
+    return name, [as_string(v) for v in allowed]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Specialize a CloudFormation template for a set of '
+                    'parameter values, or check a matrix of them.')
+    parser.add_argument('template')
+    parser.add_argument('-p', '--parameters', action='append', default=[],
+                        help='JSON parameter file, or NAME=VALUE')
+    parser.add_argument('--region', help='value of AWS::Region')
+    parser.add_argument('--no-defaults', action='store_true',
+                        help='keep parameters which are not given as '
+                             'parameters, instead of using their defaults')
+    parser.add_argument('--matrix', action='append', default=[],
+                        metavar='NAME[=V1,V2...]',
+                        help='evaluate every combination of these '
+                             'parameters (all AllowedValues if no values '
+                             'are listed)')
+    parser.add_argument('-o', '--output',
+                        help='write the specialized template here')
+    parser.add_argument('--json', action='store_true',
+                        help='print the matrix results as JSON')
+    args = parser.parse_args(argv)
+
+    d = load_template(args.template)
+    parameters = parse_parameters(args.parameters)
+    if args.region:
+        parameters['AWS::Region'] = args.region
+    use_defaults = not args.no_defaults
+
+    try:
+        if args.matrix:
+            axes = [matrix_axis(d, spec) for spec in args.matrix]
+            results = evaluate_matrix(d, parameters, axes, use_defaults)
+        else:
+            t, stats = specialize(d, parameters, use_defaults)
+    except EvaluationError as e:
+        parser.exit(1, '{}: {}\n'.format(args.template, e))
+
+    if args.matrix:
+        failed = [r for r in results if r[1] is None]
+        if args.json:
+            json.dump([{'parameters': c, 'error': s if t is None else None,
+                        'resources': len(t['Resources']) if t else None,
+                        'digest': template_digest(t) if t else None}
+                       for (c, t, s) in results], sys.stdout, indent=2)
+            print()
+        else:
+            for (c, t, s) in results:
+                print('{}  {}'.format(
+                    ' '.join('{}={}'.format(k, v)
+                             for k, v in sorted(c.items())),
+                    s if t is None else 'ok, {} resources, {}'.format(
+                        len(t['Resources']), template_digest(t))))
+        print('{} combinations, {} failed, {} distinct templates'.format(
+            len(results), len(failed),
+            len(set(template_digest(t) for (_, t, _) in results if t))),
+            file=sys.stderr)
+        sys.exit(1 if failed else 0)
+
+    text = json.dumps(t, indent=2) + '\n'
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    print('{} parameters inlined, {} conditions resolved; pruned '
+          'resources: {}; pruned outputs: {}; folded mappings: {}'.format(
+              stats['parameters'], stats['conditions'],
+              ', '.join(stats['resources']) or '-',
+              ', '.join(stats['outputs']) or '-',
+              ', '.join(stats['mappings']) or '-'), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
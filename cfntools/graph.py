@@ -0,0 +1,489 @@
+"""Resource dependency graph of a CloudFormation template and the critical
+path of creating its stack.
+
+A resource depends on another when it refers to it with Ref, Fn::GetAtt or
+a ${Name} / ${Name.Attribute} in an Fn::Sub string, or lists it in
+DependsOn. Fn::ImportValue makes it depend on an export of another stack,
+which has to exist before this one is created and so costs no time here.
+
+CloudFormation creates every resource as soon as all its dependencies are
+complete, so with an estimated creation time per resource type the
+earliest finish of each resource, and the chain of dependencies which
+decides when the stack is complete (the critical path), follow from the
+graph. The template is specialized for its parameter defaults, or the
+values given with -p, first (see cfntools.evaluate), so resources which
+would not be created do not count. Each edge on the critical path is then
+removed in turn to see how much wall clock time it costs; explicit
+DependsOn edges are also checked for being implied by references anyway.
+
+    python -m cfntools.graph templates/jira_dc.json
+    python -m cfntools.graph templates/jira_dc.json \\
+        -p BakeClusterNodeImage=true
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import re
+import sys
+
+from cfntools.evaluate import EvaluationError, parse_parameters, specialize
+from cfntools.template import depends_on, load_template
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+# Typical creation times in seconds, for the resource types the stacks
+# here create; anything else takes default_duration
+type_durations = {
+    'AWS::AutoScaling::AutoScalingGroup': 420,
+    'AWS::AutoScaling::LaunchConfiguration': 5,
+    'AWS::CloudFormation::Stack': 600,
+    'AWS::CloudFormation::WaitCondition': 600,
+    'AWS::CloudFormation::WaitConditionHandle': 2,
+    'AWS::EC2::EIP': 10,
+    'AWS::EC2::Instance': 90,
+    'AWS::EC2::InternetGateway': 15,
+    'AWS::EC2::LaunchTemplate': 5,
+    'AWS::EC2::NatGateway': 120,
+    'AWS::EC2::Route': 5,
+    'AWS::EC2::SecurityGroup': 5,
+    'AWS::EC2::SecurityGroupIngress': 2,
+    'AWS::EC2::Subnet': 5,
+    'AWS::EC2::VPC': 15,
+    'AWS::EC2::VPCGatewayAttachment': 15,
+    'AWS::EFS::FileSystem': 15,
+    'AWS::EFS::MountTarget': 90,
+    'AWS::ElasticLoadBalancing::LoadBalancer': 60,
+    'AWS::ElasticLoadBalancingV2::Listener': 5,
+    'AWS::ElasticLoadBalancingV2::LoadBalancer': 180,
+    'AWS::ElasticLoadBalancingV2::TargetGroup': 5,
+    'AWS::IAM::InstanceProfile': 120,
+    'AWS::ImageBuilder::Component': 5,
+    'AWS::ImageBuilder::Image': 1800,
+    'AWS::ImageBuilder::ImageRecipe': 5,
+    'AWS::ImageBuilder::InfrastructureConfiguration': 5,
+    'AWS::IAM::Policy': 15,
+    'AWS::IAM::Role': 20,
+    'AWS::KMS::Alias': 2,
+    'AWS::KMS::Key': 10,
+    'AWS::RDS::DBInstance': 720,
+    'AWS::RDS::DBSubnetGroup': 5,
+    'AWS::Route53::RecordSet': 60,
+    'AWS::S3::Bucket': 10,
+}
+default_duration = 30
+
+# Attributes of a resource which are not searched for references
+ignored_attributes = ('Type', 'DependsOn', 'Condition', 'DeletionPolicy',
+                      'UpdateReplacePolicy')
+
+sub_variable = re.compile(r'\$\{([^!}][^}]*)\}')
+
+
+def sub_references(text, defined=()):
+    """(name, attribute or None) for each ${...} in an Fn::Sub string which
+    is not one of the variables defined alongside it
+    """
+    for m in sub_variable.finditer(text):
+        name, _, attribute = m.group(1).strip().partition('.')
+        if name not in defined:
+            yield name, attribute or None
+
+
+def references(v, conditional=True):
+    """Yield (kind, name) for each reference in the template value v:
+    kind is Ref, GetAtt, Sub or ImportValue. Pseudo parameters (AWS::...)
+    are skipped; ImportValue yields the export name, or the Fn::Sub
+    pattern computing it. Unless conditional is set, references inside
+    Fn::If, which may not be taken, are skipped too.
+    """
+    if isinstance(v, list):
+        for e in v:
+            for r in references(e, conditional):
+                yield r
+        return
+    if not isinstance(v, dict):
+        return
+    if len(v) == 1:
+        ((k, arg),) = v.items()
+        if k == 'Fn::If' and not conditional:
+            return
+        if k == 'Ref' and isinstance(arg, basestring):
+            if not arg.startswith('AWS::'):
+                yield 'Ref', arg
+            return
+        if k == 'Fn::GetAtt':
+            if isinstance(arg, basestring):
+                arg = arg.split('.', 1)
+            if isinstance(arg[0], basestring):
+                yield 'GetAtt', arg[0]
+            for r in references(arg[1:], conditional):
+                yield r
+            return
+        if k == 'Fn::Sub':
+            text, variables = (arg, {}) if isinstance(arg, basestring) \
+                else (arg[0], arg[1] if len(arg) > 1 else {})
+            for name, _ in sub_references(text, variables):
+                if not name.startswith('AWS::'):
+                    yield 'Sub', name
+            for r in references(list(variables.values()), conditional):
+                yield r
+            return
+        if k == 'Fn::ImportValue':
+            if isinstance(arg, basestring):
+                yield 'ImportValue', arg
+            elif list(arg) == ['Fn::Sub']:
+                sub = arg['Fn::Sub']
+                yield 'ImportValue', sub if isinstance(sub, basestring) \
+                    else sub[0]
+            for r in references(arg, conditional):
+                yield r
+            return
+    for e in v.values():
+        for r in references(e, conditional):
+            yield r
+
+
+def dependency_graph(d, conditional=True):
+    """Map each resource of template d, in template order, to a dict of
+    the resources it depends on, each with the set of kinds of reference
+    (Ref, GetAtt, Sub, DependsOn). References to parameters and other
+    non-resources are left out, as are references inside Fn::If unless
+    conditional is set.
+    """
+    resources = d.get('Resources', {})
+    graph = {}
+    for name, r in resources.items():
+        edges = graph[name] = {}
+        for (kind, target) in references(
+                [v for k, v in r.items() if k not in ignored_attributes],
+                conditional):
+            if target in resources:
+                edges.setdefault(target, set()).add(kind)
+        for target in depends_on(r):
+            edges.setdefault(target, set()).add('DependsOn')
+    return graph
+
+
+def imports(d):
+    """Map each export imported with Fn::ImportValue to the resources
+    importing it
+    """
+    found = {}
+    for name, r in d.get('Resources', {}).items():
+        for (kind, export) in references(r):
+            if kind == 'ImportValue':
+                users = found.setdefault(export, [])
+                if name not in users:
+                    users.append(name)
+    return found
+
+
+class CycleError(ValueError):
+    """The dependencies of some resources form a cycle"""
+    def __init__(self, cycle):
+        ValueError.__init__(self, 'dependency cycle: ' + ' -> '.join(cycle))
+        self.cycle = cycle
+
+
+def find_cycle(graph, nodes):
+    """A cycle among nodes, as a list of names starting and ending with
+    the same one
+    """
+    path = []
+    on_path = {}
+    done = set()
+
+    def visit(n):
+        on_path[n] = len(path)
+        path.append(n)
+        for m in graph[n]:
+            if m not in nodes or m in done:
+                continue
+            if m in on_path:
+                return path[on_path[m]:] + [m]
+            cycle = visit(m)
+            if cycle:
+                return cycle
+        path.pop()
+        del on_path[n]
+        done.add(n)
+        return None
+
+    for n in nodes:
+        if n not in done:
+            cycle = visit(n)
+            if cycle:
+                return cycle
+    return None
+
+
+def topological_order(graph, strict=True):
+    """The resources of graph ordered so that each comes after everything
+    it depends on, otherwise keeping the template order.
+
+    If there is a cycle CycleError is raised, unless strict is False: then
+    the resources on or behind cycles follow the others in template order.
+    """
+    remaining = dict((n, set(m for m in deps if m in graph))
+                     for n, deps in graph.items())
+    order = []
+    while remaining:
+        ready = [n for n in graph if n in remaining and not remaining[n]]
+        if not ready:
+            if strict:
+                raise CycleError(find_cycle(graph, remaining))
+            order.extend(n for n in graph if n in remaining)
+            break
+        for n in ready:
+            del remaining[n]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+        order.extend(ready)
+    return order
+
+
+def durations_for(d, overrides=None):
+    """Estimated creation time of each resource of d; overrides maps
+    resource types or names to seconds
+    """
+    overrides = overrides or {}
+    found = {}
+    for name, r in d.get('Resources', {}).items():
+        found[name] = overrides.get(name, overrides.get(
+            r['Type'], type_durations.get(r['Type'], default_duration)))
+    return found
+
+
+def schedule(graph, durations, removed=()):
+    """Earliest (start, finish, critical predecessor) of every resource,
+    ignoring the (source, target) edges in removed
+    """
+    times = {}
+    for n in topological_order(graph):
+        start, critical = 0, None
+        for m in graph[n]:
+            if m in times and (n, m) not in removed and \
+                    times[m][1] > start:
+                start, critical = times[m][1], m
+        times[n] = (start, start + durations[n], critical)
+    return times
+
+
+def critical_path(times):
+    """The resources on the critical path of a schedule, first to last"""
+    if not times:
+        return []
+    n = max(times, key=lambda k: times[k][1])
+    path = []
+    while n is not None:
+        path.append(n)
+        n = times[n][2]
+    return path[::-1]
+
+
+def makespan(times):
+    return max(t[1] for t in times.values()) if times else 0
+
+
+def reaches(graph, source, target):
+    """Whether target is among the transitive dependencies of source"""
+    seen = set()
+    stack = [source]
+    while stack:
+        n = stack.pop()
+        if n == target:
+            return True
+        if n not in seen and n in graph:
+            seen.add(n)
+            stack.extend(graph[n])
+    return False
+
+
+def implied(graph, source, target):
+    """How the dependency of source on target follows without its
+    DependsOn: the kinds of direct reference, 'through' the dependency
+    of source which leads to target, or None
+    """
+    kinds = graph[source][target] - set(['DependsOn'])
+    if kinds:
+        return ' and '.join(sorted(kinds))
+    for first in graph[source]:
+        if first != target and reaches(graph, first, target):
+            return 'through ' + first
+    return None
+
+
+def redundant_depends_on(d):
+    """Map each resource of d to the set of its DependsOn entries which
+    its references already imply, directly or through other resources.
+    References inside Fn::If do not count, as the branch with them may
+    not be taken.
+    """
+    graph = dependency_graph(d, conditional=False)
+    resources = d.get('Resources', {})
+    found = {}
+    for source in graph:
+        for target in depends_on(resources[source]):
+            if target in graph and implied(graph, source, target):
+                found.setdefault(source, set()).add(target)
+    return found
+
+
+def analyse(d, duration_overrides=None, parameters=None):
+    """The dependency graph of d with its critical path and the cost of
+    each edge on it, as a JSON serialisable dict. d is first specialized
+    for parameters, the defaults filling in the rest, so resources whose
+    Condition is false and the untaken branches of Fn::If leave the graph.
+    """
+    d, _ = specialize(d, parameters or {})
+    graph = dependency_graph(d)
+    durations = durations_for(d, duration_overrides)
+    times = schedule(graph, durations)
+    total = makespan(times)
+    path = critical_path(times)
+    resources = d.get('Resources', {})
+
+    critical_edges = []
+    for target, source in zip(path, path[1:]):
+        cost = total - makespan(schedule(graph, durations,
+                                         [(source, target)]))
+        critical_edges.append({
+            'source': source, 'target': target,
+            'kinds': sorted(graph[source][target]), 'seconds': cost,
+        })
+
+    # references in Fn::If do not count for making a DependsOn redundant
+    unconditional = dependency_graph(d, conditional=False)
+    explicit = []
+    for source in graph:
+        for target in depends_on(resources[source]):
+            if target not in graph:
+                continue
+            why = implied(unconditional, source, target)
+            cost = 0 if why else total - makespan(
+                schedule(graph, durations, [(source, target)]))
+            explicit.append({
+                'source': source, 'target': target,
+                'implied_by': why, 'seconds': cost,
+            })
+
+    return {
+        'seconds': total,
+        'resources': dict(
+            (n, {'type': resources[n]['Type'], 'start': times[n][0],
+                 'finish': times[n][1],
+                 'depends_on': dict((m, sorted(k))
+                                    for m, k in graph[n].items())})
+            for n in graph),
+        'critical_path': path,
+        'critical_edges': critical_edges,
+        'depends_on': explicit,
+        'imports': imports(d),
+    }
+
+
+def minutes(seconds):
+    return '{}:{:02d}'.format(int(seconds) // 60, int(seconds) % 60)
+
+
+def print_report(report, out=sys.stdout):
+    resources = report['resources']
+    print('Estimated creation time {} (critical path of {} resources)'
+          .format(minutes(report['seconds']), len(report['critical_path'])),
+          file=out)
+    print('', file=out)
+    print('  start finish  resource', file=out)
+    for n in report['critical_path']:
+        print('{:>7} {:>6}  {} ({})'.format(
+            minutes(resources[n]['start']), minutes(resources[n]['finish']),
+            n, resources[n]['type']), file=out)
+
+    if report['critical_edges']:
+        print('', file=out)
+        print('Edges on the critical path, and the time each adds (edges '
+              'made by references', file=out)
+        print('only go if the value is found some other way):', file=out)
+        for e in sorted(report['critical_edges'],
+                        key=lambda e: -e['seconds']):
+            print('{:>7}  {} -> {} ({})'.format(
+                minutes(e['seconds']), e['source'], e['target'],
+                ', '.join(e['kinds'])), file=out)
+
+    if report['depends_on']:
+        print('', file=out)
+        print('DependsOn edges:', file=out)
+        for e in report['depends_on']:
+            if e['implied_by']:
+                note = 'redundant ({})'.format(e['implied_by'])
+            else:
+                note = 'ordering only, removing it saves {}'.format(
+                    minutes(e['seconds']))
+            print('  {} -> {}: {}'.format(e['source'], e['target'], note),
+                  file=out)
+
+    if report['imports']:
+        print('', file=out)
+        print('Exports of other stacks, which must exist first:', file=out)
+        for export, users in sorted(report['imports'].items()):
+            print('  {}: {}'.format(export, ', '.join(users)), file=out)
+
+
+def to_dot(report):
+    """The dependency graph in Graphviz dot syntax, with the critical
+    path in red
+    """
+    on_path = set(zip(report['critical_path'][1:], report['critical_path']))
+    lines = ['digraph dependencies {', '  rankdir=LR;']
+    for n, r in report['resources'].items():
+        lines.append('  "{}" [label="{}\\n{}"];'.format(
+            n, n, minutes(r['finish'] - r['start'])))
+        for m, kinds in r['depends_on'].items():
+            style = ' style=dashed' if kinds == ['DependsOn'] else ''
+            color = ' color=red' if (n, m) in on_path else ''
+            lines.append('  "{}" -> "{}" [label="{}"{}{}];'.format(
+                n, m, ','.join(kinds), style, color))
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Report the resource dependency graph and creation '
+                    'critical path of a CloudFormation template.')
+    parser.add_argument('template')
+    parser.add_argument('-p', '--parameters', action='append', default=[],
+                        help='JSON parameter file, or NAME=VALUE; the '
+                             'defaults fill in the rest')
+    parser.add_argument('--durations',
+                        help='JSON file mapping resource types or names to '
+                             'creation seconds, overriding the estimates')
+    parser.add_argument('--json', action='store_true',
+                        help='print the analysis as JSON')
+    parser.add_argument('--dot', action='store_true',
+                        help='print the graph in Graphviz dot syntax')
+    args = parser.parse_args(argv)
+
+    overrides = None
+    if args.durations:
+        with open(args.durations) as f:
+            overrides = json.load(f)
+    try:
+        report = analyse(load_template(args.template), overrides,
+                         parse_parameters(args.parameters))
+    except (CycleError, EvaluationError) as e:
+        parser.exit(1, '{}: {}\n'.format(args.template, e))
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    elif args.dot:
+        sys.stdout.write(to_dot(report))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
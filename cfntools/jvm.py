@@ -0,0 +1,242 @@
+"""JVM memory sizing of the Jira cluster nodes per EC2 instance type.
+
+The heap and the other JVM memory areas are derived from the vCPUs and RAM
+of each instance type in instance_types.json. The RAM is shared out as:
+
+- a reserve for the OS and the agents on the node, growing with the vCPUs,
+- page cache for the Lucene index, a fraction of the RAM,
+- the non-heap memory of the JVM: metaspace, code cache, thread stacks,
+  direct buffers and the G1 bookkeeping, which grows with the heap,
+- the heap, which gets the rest, rounded down and capped below 32 GiB so
+  the JVM keeps using compressed object pointers; whatever a large node
+  has beyond that is left to the page cache.
+
+The G1 region size is chosen for about 1024 regions, fewer and larger than
+the JVM default, so the large arrays of the index are less often humongous
+objects.
+
+Instance types with the same vCPUs and RAM, a size class such as 4x16,
+get the same plan, so the cluster node group can launch any of them from
+the same launch template. An NVMe instance store does not change the plan:
+the index still goes through the page cache, and a stand-in without one
+runs the same plan. Burstable types are a size class of their own
+(4x16-burstable), as they only stand in for each other. size_classes()
+ranks the instance types of each class: newer generations first, then
+those without an NVMe instance store (nvme_gb in the catalog).
+
+    python -m cfntools.jvm templates/jira_dc.json
+    python -m cfntools.jvm templates/jira_dc.json --update
+
+--update writes three mappings of the template in place.
+InstanceType2Size gives the Size class of every instance type the
+ClusterNodeInstanceType parameter allows. Size2Node gives for each size
+class its JVM Plan, and Alt1 and Alt2 for the first instance types of the
+class (the last one repeated if the class has fewer). Plan2Jvm gives for
+each plan Jvmheap, and Jvmregion, Jvmmeta and Jvmdirect for the G1 region
+size, metaspace and direct memory. Many instance types share a size
+class, and many size classes a plan, so this keeps the mappings small.
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import os
+import re
+import sys
+
+from cfntools.template import load_template, update_json
+
+catalog_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'instance_types.json')
+
+size_mapping_name = 'InstanceType2Size'
+node_mapping_name = 'Size2Node'
+plan_mapping_name = 'Plan2Jvm'
+mapping_names = (size_mapping_name, node_mapping_name, plan_mapping_name)
+instance_type_parameter = 'ClusterNodeInstanceType'
+
+# All sizes in MiB
+os_reserve = 768
+os_reserve_per_vcpu = 32
+page_cache_fraction = 0.25
+min_page_cache = 512
+code_cache = 240
+thread_stacks = 256
+gc_overhead = 0.05
+min_heap = 1024
+max_heap = 31 * 1024
+heap_granularity = 256
+min_direct_memory = 256
+max_direct_memory = 2048
+target_regions = 1024
+
+# instance types of a size class in the mapping, Alt1 to Alt<alternatives>
+alternatives = 2
+
+
+def load_catalog(path=catalog_path):
+    """{instance type: {'vcpus': n, 'memory_gib': n}}, and 'nvme_gb' for
+    the size of the NVMe instance store of the types which have one
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def power_of_two_at_most(n, low, high):
+    p = low
+    while p * 2 <= min(n, high):
+        p *= 2
+    return p
+
+
+def size_jvm(vcpus, memory_gib):
+    """The memory plan of a node, a dict of sizes in MiB (and 'tight',
+    set when the node is too small for min_heap and the rest)
+    """
+    memory = int(memory_gib * 1024)
+    reserve = os_reserve + os_reserve_per_vcpu * vcpus
+    page_cache = max(min_page_cache, int(memory * page_cache_fraction))
+    metaspace = 512 if memory < 16 * 1024 else 1024
+    available = memory - reserve - page_cache - metaspace - code_cache - \
+        thread_stacks
+    # direct memory depends on the heap, which depends on direct memory
+    direct = min_direct_memory
+    for _ in range(3):
+        heap = int((available - direct) / (1 + gc_overhead))
+        direct = min(max_direct_memory, max(min_direct_memory, heap // 16))
+        direct -= direct % 64
+    heap -= heap % heap_granularity
+    tight = heap < min_heap
+    heap = min(max_heap, max(min_heap, heap))
+    return {
+        'memory': memory,
+        'reserve': reserve,
+        'heap': heap,
+        'metaspace': metaspace,
+        'direct_memory': direct,
+        'g1_region': power_of_two_at_most(heap // target_regions, 1, 32),
+        'page_cache': memory - reserve - heap - metaspace - direct -
+        code_cache - thread_stacks - int(heap * gc_overhead),
+        'tight': tight,
+    }
+
+
+def family(instance_type):
+    """('m', 5) for m5d.xlarge"""
+    m = re.match(r'([a-z]+)(\d+)', instance_type)
+    return (m.group(1), int(m.group(2)))
+
+
+def size_class(instance_type, catalog):
+    """'4x16' for the vCPUs and GiB of RAM of m5.xlarge, '4x16-burstable'
+    for t3.xlarge
+    """
+    name = '{}x{:g}'.format(catalog[instance_type]['vcpus'],
+                            catalog[instance_type]['memory_gib'])
+    if family(instance_type)[0] == 't':
+        name += '-burstable'
+    return name
+
+
+def size_classes(instance_types, catalog):
+    """{size class: instance_types of the class, best substitutes first}"""
+    classes = {}
+    for i in instance_types:
+        classes.setdefault(size_class(i, catalog), []).append(i)
+    for members in classes.values():
+        members.sort(key=lambda i: (-family(i)[1],
+                                    bool(catalog[i].get('nvme_gb')), i))
+    return classes
+
+
+def instance_mappings(instance_types, catalog):
+    """The InstanceType2Size, Size2Node and Plan2Jvm mappings of
+    instance_types
+    """
+    missing = [i for i in instance_types if i not in catalog]
+    if missing:
+        raise ValueError('not in the instance type catalog: {}'.format(
+            ', '.join(missing)))
+    sizes = dict((i, {'Size': size_class(i, catalog)})
+                 for i in instance_types)
+    nodes = {}
+    plans = {}
+    for name, members in size_classes(instance_types, catalog).items():
+        i = members[0]
+        plan = size_jvm(catalog[i]['vcpus'], catalog[i]['memory_gib'])
+        jvm = {
+            'Jvmheap': '{}m'.format(plan['heap']),
+            'Jvmregion': '{}m'.format(plan['g1_region']),
+            'Jvmmeta': '{}m'.format(plan['metaspace']),
+            'Jvmdirect': '{}m'.format(plan['direct_memory']),
+        }
+        # '3328m-2m-512m-256m'
+        key = '-'.join(jvm[k] for k in ('Jvmheap', 'Jvmregion', 'Jvmmeta',
+                                        'Jvmdirect'))
+        plans[key] = jvm
+        nodes[name] = {'Plan': key}
+        for n in range(alternatives):
+            nodes[name]['Alt{}'.format(n + 1)] = \
+                members[min(n, len(members) - 1)]
+    return {size_mapping_name: sizes, node_mapping_name: nodes,
+            plan_mapping_name: plans}
+
+
+def print_report(instance_types, catalog, current, out=sys.stdout):
+    """current is the Mappings of the template, for the heap it sets now"""
+    print('{:<14} {:>5} {:>8} {:>8} {:>8} {:>7} {:>6} {:>6} {:>8} '
+          '{:>6}'.format('instance type', 'vcpu', 'RAM', 'heap', 'was',
+                         'region', 'meta', 'direct', 'cache', 'nvme'),
+          file=out)
+    for i in instance_types:
+        plan = size_jvm(catalog[i]['vcpus'], catalog[i]['memory_gib'])
+        size = current.get(size_mapping_name, {}).get(i, {}).get('Size')
+        key = current.get(node_mapping_name, {}).get(size, {}).get('Plan')
+        was = current.get(plan_mapping_name, {}).get(key, {}).get(
+            'Jvmheap', '-')
+        nvme = catalog[i].get('nvme_gb')
+        print('{:<14} {:>5} {:>7.1f}G {:>7}m {:>8} {:>6}m {:>5}m {:>5}m '
+              '{:>7.1f}G {:>6}{}'.format(
+                  i, catalog[i]['vcpus'], plan['memory'] / 1024.0,
+                  plan['heap'], was, plan['g1_region'], plan['metaspace'],
+                  plan['direct_memory'], plan['page_cache'] / 1024.0,
+                  '{}G'.format(nvme) if nvme else '-',
+                  '  tight' if plan['tight'] else ''), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Size the JVM of the cluster nodes for every instance '
+                    'type a template allows.')
+    parser.add_argument('template')
+    parser.add_argument('--parameter', default=instance_type_parameter,
+                        help='parameter listing the instance types '
+                             '(default %(default)s)')
+    parser.add_argument('--catalog', default=catalog_path,
+                        help='instance type catalog (default %(default)s)')
+    parser.add_argument('--update', action='store_true',
+                        help='write the {}, {} and {} mappings of the '
+                             'template'.format(*mapping_names))
+    parser.add_argument('--json', action='store_true',
+                        help='print the mappings as JSON')
+    args = parser.parse_args(argv)
+
+    d = load_template(args.template)
+    catalog = load_catalog(args.catalog)
+    instance_types = d['Parameters'][args.parameter]['AllowedValues']
+    try:
+        mappings = instance_mappings(instance_types, catalog)
+    except ValueError as e:
+        parser.exit(1, '{}\n'.format(e))
+    if args.update:
+        for name in mapping_names:
+            update_json(args.template, ['Mappings', name], mappings[name])
+    elif args.json:
+        json.dump(mappings, sys.stdout, indent=4, sort_keys=True)
+        print()
+    else:
+        print_report(instance_types, catalog, d.get('Mappings', {}))
+
+
+if __name__ == '__main__':
+    main()
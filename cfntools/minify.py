@@ -0,0 +1,747 @@
+"""Shrink CloudFormation templates to fit the TemplateBody size limit.
+
+A template body passed inline to CloudFormation may be at most 51,200
+bytes, anything larger has to be uploaded to S3 first. Besides writing
+compact JSON, the template is rewritten in ways which keep its meaning:
+
+- conditions with the same definition are merged into one,
+- mapping attributes with the same value in every row of the mapping are
+  replaced by the value where they are looked up (a lookup of a row
+  which does not exist now succeeds instead of failing the stack),
+- Fn::If with the same value both ways becomes that value, a double
+  Fn::Not goes and an Fn::And or Fn::Or of Fn::Not becomes one Fn::Not
+  of an Fn::Or or Fn::And, Fn::Sub variables which are a plain Ref or
+  Fn::GetAtt are written as ${Name} or ${Name.Attribute}, and each run
+  of strings, references and Fn::Sub in an Fn::Join becomes one shorter
+  Fn::Sub,
+- conditions, mappings and mapping keys and attributes get short names,
+  the most used first,
+- rule assertions with the same description are merged into one,
+- comment and blank lines and indentation are taken out of shell scripts
+  ("#!" first lines) in the resources, except in here-documents,
+- cfn-init file owners and groups of root and commands' ignoreErrors of
+  false, which are the defaults, are dropped.
+
+Then what only the console shows is dropped: the
+AWS::CloudFormation::Interface metadata, which groups and labels the
+parameters, the descriptions of parameters and outputs and the Comment
+in resource metadata. The stack is the same without them; skip these
+steps for a template people deploy from the console.
+
+With --yaml, or an output file ending in .yaml or .yml, the result is
+written as YAML in flow style on one line with the short form tags
+(!Ref, !Sub, ...), which is smaller still as most strings need no quotes.
+
+The template is read from a file or stdin, so the output of a script
+generated by cfn2py can be piped through it; a module generated with
+--module can also pass build() to minify().
+
+    python scripts/jira_dc.py | python -m cfntools.minify - -o jira_dc.yaml
+"""
+
+from __future__ import print_function
+import argparse
+import copy
+import json
+import os
+import re
+import sys
+
+from cfntools.template import load_template, parse_template, yaml_extensions
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+TEMPLATE_BODY_LIMIT = 51200
+
+sub_variable = re.compile(r'\$\{([^!}][^}]*)\}')
+here_document = re.compile(r'<<-?\s*[\'"]?(\w+)')
+
+# plain YAML scalars must not start with an indicator, hold a flow
+# indicator, ': ' or ' #', or read back as a boolean, null or number
+plain_scalar = re.compile(r'[\w/$.(][^,\[\]{}#:"\'\\\n\t]*(?<! )\Z')
+yaml_keyword = re.compile(r'(y|n|yes|no|on|off|true|false|null)\Z', re.I)
+yaml_number = re.compile(r'[-+.\d][\w.+-]*\Z')
+short_forms = ('Ref', 'Fn::Base64', 'Fn::Cidr', 'Fn::FindInMap',
+               'Fn::GetAtt', 'Fn::GetAZs', 'Fn::ImportValue', 'Fn::Join',
+               'Fn::Select', 'Fn::Split', 'Fn::Sub', 'Fn::And', 'Fn::Equals',
+               'Fn::If', 'Fn::Not', 'Fn::Or')
+
+
+def compact_json(d):
+    return json.dumps(d, separators=(',', ':'))
+
+
+def canonical(v):
+    return json.dumps(v, sort_keys=True, separators=(',', ':'))
+
+
+def size(d):
+    return len(compact_json(d).encode('utf-8'))
+
+
+def function_of(v):
+    """(name, arguments) if v is an intrinsic function, else None"""
+    if isinstance(v, dict) and len(v) == 1:
+        ((k, arg),) = v.items()
+        if k.startswith('Fn::') or k in ('Ref', 'Condition'):
+            return k, arg
+    return None
+
+
+def reference_name(v):
+    """The ${} name of a Ref or Fn::GetAtt, or None"""
+    f = function_of(v)
+    if f is None:
+        return None
+    name, arg = f
+    if name == 'Ref' and isinstance(arg, basestring) and \
+            arg != 'AWS::NoValue':
+        return arg
+    if name == 'Fn::GetAtt':
+        if isinstance(arg, basestring):
+            return arg
+        if all(isinstance(a, basestring) for a in arg):
+            return '.'.join(arg)
+    return None
+
+
+def lookups(v, found=None):
+    """The arguments of every Fn::FindInMap in v"""
+    found = [] if found is None else found
+    if isinstance(v, list):
+        for e in v:
+            lookups(e, found)
+    elif isinstance(v, dict):
+        if function_of(v) and function_of(v)[0] == 'Fn::FindInMap':
+            found.append(v['Fn::FindInMap'])
+        for e in v.values():
+            lookups(e, found)
+    return found
+
+
+def rewrite(v, f):
+    """v with f applied to every list and dict in it, innermost first"""
+    if isinstance(v, list):
+        return f([rewrite(e, f) for e in v])
+    if isinstance(v, dict):
+        return f(dict((k, rewrite(e, f)) for k, e in v.items()))
+    return v
+
+
+def body_sections(d):
+    """Names of the sections of d which may hold intrinsic functions"""
+    return [k for k in ('Conditions', 'Resources', 'Outputs') if k in d]
+
+
+def merge_conditions(d):
+    """Merge conditions with the same definition into the first one"""
+    conditions = d.get('Conditions', {})
+    while True:
+        first = {}
+        renames = {}
+        for name, definition in conditions.items():
+            renames[name] = first.setdefault(canonical(definition), name)
+        renames = dict((k, v) for k, v in renames.items() if k != v)
+        if not renames:
+            return d
+        for name in renames:
+            del conditions[name]
+        rename_conditions(d, renames)
+
+
+def condition_references(v, f):
+    """v with f applied to the name in each Fn::If and Condition"""
+    def rename(v):
+        g = function_of(v)
+        if g and g[0] == 'Fn::If' and isinstance(g[1], list) and \
+                isinstance(g[1][0], basestring):
+            return {'Fn::If': [f(g[1][0])] + g[1][1:]}
+        if g and g[0] == 'Condition' and isinstance(g[1], basestring):
+            return {'Condition': f(g[1])}
+        return v
+
+    return rewrite(v, rename)
+
+
+def rename_conditions(d, renames):
+    """Rename the conditions in renames, and the references to them"""
+    def f(name):
+        return renames.get(name, name)
+
+    if 'Conditions' in d:
+        d['Conditions'] = dict((f(k), v) for k, v in d['Conditions'].items())
+    for k in body_sections(d):
+        d[k] = condition_references(d[k], f)
+    # the Condition attribute of resources and outputs
+    for k in ('Resources', 'Outputs'):
+        for item in d.get(k, {}).values():
+            c = item.get('Condition')
+            if isinstance(c, basestring):
+                item['Condition'] = f(c)
+    return d
+
+
+def short_names(count, taken):
+    """count names A, B, ... Z, AA, AB, ... which are not in taken"""
+    names = []
+    n = 0
+    while len(names) < count:
+        name = ''
+        i = n
+        while True:
+            name = chr(ord('A') + i % 26) + name
+            i = i // 26 - 1
+            if i < 0:
+                break
+        n += 1
+        if name not in taken:
+            names.append(name)
+    return names
+
+
+def template_names(d):
+    return set(name for k in ('Parameters', 'Conditions', 'Mappings',
+                              'Resources', 'Outputs')
+               for name in d.get(k, {}))
+
+
+def nested_keys(found):
+    """{mapping: (other mapping, attribute)} for the mappings only looked up
+    by the values of that attribute of the other mapping, where nothing
+    else looks up the attribute
+    """
+    sources = {}
+    keyed = {}
+    for args in found:
+        f = function_of(args[1])
+        if f and f[0] == 'Fn::FindInMap' and \
+                isinstance(f[1][0], basestring) and \
+                isinstance(f[1][2], basestring):
+            source = (f[1][0], f[1][2])
+            keyed[source] = keyed.get(source, 0) + 1
+        else:
+            source = None
+        sources.setdefault(args[0], set()).add(source)
+    uses = {}
+    for args in found:
+        if isinstance(args[2], basestring):
+            uses[(args[0], args[2])] = uses.get((args[0], args[2]), 0) + 1
+    nested = {}
+    for name, found_sources in sources.items():
+        source = found_sources.pop()
+        if not found_sources and source is not None and \
+                source[0] != name and uses[source] == keyed[source]:
+            nested[name] = source
+    return nested
+
+
+def shorten_names(d):
+    """Give the conditions, the mappings, the attributes of mappings, and
+    the keys of mappings only looked up through another mapping, one or two
+    letter names, the most used the shortest
+    """
+    used = {}
+
+    def count(name):
+        used[name] = used.get(name, 0) + 1
+        return name
+
+    for k in body_sections(d):
+        condition_references(d[k], count)
+    for k in ('Resources', 'Outputs'):
+        for item in d.get(k, {}).values():
+            if isinstance(item.get('Condition'), basestring):
+                count(item['Condition'])
+    conditions = sorted(d.get('Conditions', {}),
+                        key=lambda name: (-used.get(name, 0), name))
+    rename_conditions(d, dict(zip(conditions, short_names(
+        len(conditions), template_names(d)))))
+
+    if 'Mappings' not in d:
+        return d
+    mappings = d['Mappings']
+    found = lookups([d[k] for k in body_sections(d)])
+    if any(not isinstance(args[0], basestring) for args in found):
+        return d
+
+    for name, (source, attribute) in nested_keys(found).items():
+        if name not in mappings or source not in mappings:
+            continue
+        rows = [row for row in mappings[source].values() if attribute in row]
+        values = [row[attribute] for row in rows]
+        order = sorted(mappings[name],
+                       key=lambda k: (-values.count(k), k))
+        keys = dict(zip(order, short_names(len(order), values)))
+        mappings[name] = dict((keys[k], row)
+                              for k, row in mappings[name].items())
+        for row in rows:
+            row[attribute] = keys.get(row[attribute], row[attribute])
+
+    # {mapping: {attribute: lookups}}, None where an attribute is only
+    # known at deploy time
+    attributes = {}
+    for args in found:
+        if not isinstance(args[2], basestring):
+            attributes[args[0]] = None
+        elif attributes.setdefault(args[0], {}) is not None:
+            attributes[args[0]][args[2]] = \
+                attributes[args[0]].get(args[2], 0) + 1
+    names = dict(zip(sorted(mappings), short_names(
+        len(mappings), template_names(d))))
+    keys = {}
+    for name in mappings:
+        if attributes.get(name) is None:
+            continue
+        rows = mappings[name].values()
+        order = sorted(set(k for row in rows for k in row),
+                       key=lambda k: (-attributes[name].get(k, 0), k))
+        keys[name] = dict(zip(order, short_names(len(order), ())))
+        for row in rows:
+            renamed = dict((keys[name][k], v) for k, v in row.items())
+            row.clear()
+            row.update(renamed)
+
+    def rename(v):
+        f = function_of(v)
+        if f and f[0] == 'Fn::FindInMap':
+            m, key, attribute = f[1]
+            if m in keys:
+                attribute = keys[m].get(attribute, attribute)
+            return {'Fn::FindInMap': [names.get(m, m), key, attribute]}
+        return v
+
+    for k in body_sections(d):
+        d[k] = rewrite(d[k], rename)
+    d['Mappings'] = dict((names[k], m) for k, m in mappings.items())
+    return d
+
+
+def collapse_mappings(d):
+    """Replace lookups of mapping attributes with the same value in every
+    row by the value, dropping the attributes and mappings left empty
+    """
+    mappings = d.get('Mappings', {})
+    for name in list(mappings):
+        used = lookups([d[k] for k in body_sections(d)])
+        if any(not isinstance(args[0], basestring) for args in used):
+            return d
+        used = [args for args in used if args[0] == name]
+        if any(not isinstance(args[2], basestring) for args in used):
+            continue
+        rows = list(mappings[name].values())
+        uniform = {}
+        for key in rows[0] if rows else ():
+            if all(key in row and row[key] == rows[0][key] for row in rows):
+                uniform[key] = rows[0][key]
+        if not uniform:
+            continue
+
+        def fold(v):
+            f = function_of(v)
+            if f and f[0] == 'Fn::FindInMap' and f[1][0] == name and \
+                    f[1][2] in uniform:
+                return copy.deepcopy(uniform[f[1][2]])
+            return v
+
+        for k in body_sections(d):
+            d[k] = rewrite(d[k], fold)
+        for row_name, row in list(mappings[name].items()):
+            for key in uniform:
+                del row[key]
+            if not row:
+                del mappings[name][row_name]
+        if not mappings[name]:
+            del mappings[name]
+    if 'Mappings' in d and not mappings:
+        del d['Mappings']
+    return d
+
+
+def escape_sub(text):
+    return text.replace('${', '${!')
+
+
+def simplify_sub(arg):
+    if isinstance(arg, basestring):
+        text, variables = arg, {}
+    else:
+        text = arg[0]
+        variables = dict(arg[1]) if len(arg) > 1 else {}
+    for name, value in list(variables.items()):
+        target = reference_name(value)
+        if target is None or target != name and target in variables:
+            continue
+        del variables[name]
+        text = re.sub(r'\$\{' + re.escape(name) + r'\}',
+                      lambda m: '${' + target + '}', text)
+    if variables:
+        return {'Fn::Sub': [text, variables]}
+    if not sub_variable.search(text):
+        return text.replace('${!', '${')
+    return {'Fn::Sub': text}
+
+
+def sub_part(e):
+    """(Fn::Sub text, variables) for e, or None if e cannot be part of an
+    Fn::Sub
+    """
+    if isinstance(e, basestring):
+        return escape_sub(e), {}
+    if reference_name(e) is not None:
+        return '${' + reference_name(e) + '}', {}
+    f = function_of(e)
+    if f and f[0] == 'Fn::Sub':
+        if isinstance(f[1], basestring):
+            return f[1], {}
+        if isinstance(f[1], list) and len(f[1]) == 2 and \
+                isinstance(f[1][0], basestring) and isinstance(f[1][1], dict):
+            return f[1][0], f[1][1]
+    return None
+
+
+def join_run(delimiter, run):
+    """The items of run, joined with delimiter, as one value"""
+    if all(isinstance(e, basestring) for e in run):
+        return delimiter.join(run)
+    text = escape_sub(delimiter).join(part for (part, _) in run)
+    variables = {}
+    for (_, v) in run:
+        variables.update(v)
+    if variables:
+        return {'Fn::Sub': [text, variables]}
+    return {'Fn::Sub': text}
+
+
+def simplify_join(arg):
+    original = {'Fn::Join': arg}
+    delimiter, items = arg
+    if not isinstance(delimiter, basestring) or not isinstance(items, list):
+        return original
+    if all(isinstance(e, basestring) for e in items):
+        return delimiter.join(items)
+    merged = []
+    run = []
+    strings = []
+    for e in items + [None]:
+        part = None if e is None else sub_part(e)
+        if part is not None and not any(
+                k in v and v[k] != part[1][k] for k in part[1]
+                for (_, v) in run):
+            run.append(part)
+            strings.append(e)
+            continue
+        if run:
+            if all(isinstance(s, basestring) for s in strings):
+                merged.append(delimiter.join(strings))
+            else:
+                merged.append(join_run(delimiter, run))
+        run = []
+        strings = []
+        if part is not None:
+            run.append(part)
+            strings.append(e)
+        elif e is not None:
+            merged.append(e)
+    if len(merged) == 1:
+        simplified = merged[0]
+    else:
+        simplified = {'Fn::Join': [delimiter, merged]}
+    return simplified if size(simplified) < size(original) else original
+
+
+def negated(v):
+    """x for {'Fn::Not': [x]}, else None"""
+    f = function_of(v)
+    if f and f[0] == 'Fn::Not' and isinstance(f[1], list) and len(f[1]) == 1:
+        return f[1][0]
+    return None
+
+
+def simplify(v):
+    f = function_of(v)
+    if f is None:
+        return v
+    name, arg = f
+    if name == 'Fn::If' and len(arg) == 3 and arg[1] == arg[2]:
+        return arg[1]
+    if name == 'Fn::Not' and negated(v) is not None and \
+            negated(negated(v)) is not None:
+        return negated(negated(v))
+    if name in ('Fn::And', 'Fn::Or') and isinstance(arg, list) and \
+            all(negated(e) is not None for e in arg):
+        # not a or not b is not (a and b)
+        other = 'Fn::Or' if name == 'Fn::And' else 'Fn::And'
+        return {'Fn::Not': [{other: [negated(e) for e in arg]}]}
+    if name == 'Fn::Sub':
+        return simplify_sub(arg)
+    if name == 'Fn::Join' and isinstance(arg, list) and len(arg) == 2:
+        return simplify_join(arg)
+    return v
+
+
+def simplify_intrinsics(d):
+    """Fold Fn::If, Fn::Not, Fn::And, Fn::Or, Fn::Sub and Fn::Join into
+    shorter equivalents
+    """
+    for k in ('Rules', 'Conditions', 'Resources', 'Outputs'):
+        if k in d:
+            d[k] = rewrite(d[k], simplify)
+    return d
+
+
+def trim_script(text):
+    """A shell script without its comment and blank lines and indentation,
+    or text if it is not one or a quoted string may span lines
+    """
+    lines = text.split('\n')
+    if not text.startswith('#!') or 'sh' not in lines[0]:
+        return text
+    kept = lines[:1]
+    end = None
+    for line in lines[1:]:
+        if end is not None:
+            kept.append(line)
+            if line.strip() == end:
+                end = None
+            continue
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if line.count("'") % 2 or line.count('"') % 2:
+            return text
+        m = here_document.search(line)
+        if m:
+            end = m.group(1)
+        kept.append(line.lstrip())
+    if text.endswith('\n'):
+        kept.append('')
+    return '\n'.join(kept)
+
+
+def trim_scripts(d):
+    """Take the comments and indentation out of the shell scripts in the
+    resources
+    """
+    def trim(v):
+        if isinstance(v, list):
+            return [trim_script(e) if isinstance(e, basestring) else e
+                    for e in v]
+        return dict((k, trim_script(e) if isinstance(e, basestring) else e)
+                    for k, e in v.items())
+
+    if 'Resources' in d:
+        d['Resources'] = rewrite(d['Resources'], trim)
+    return d
+
+
+def merge_assertions(d):
+    """Merge the assertions of each rule with the same AssertDescription
+    into one asserting all of them
+    """
+    for rule in d.get('Rules', {}).values():
+        merged = []
+        asserts = {}
+        for assertion in rule.get('Assertions', []):
+            description = assertion.get('AssertDescription')
+            if description not in asserts:
+                asserts[description] = []
+                merged.append(assertion)
+            asserts[description].append(assertion['Assert'])
+        for assertion in merged:
+            found = asserts[assertion.get('AssertDescription')]
+            # Fn::And takes 2 to 10 conditions
+            while len(found) > 1:
+                found = [{'Fn::And': found[i:i + 10]}
+                         if len(found[i:i + 10]) > 1 else found[i]
+                         for i in range(0, len(found), 10)]
+            assertion['Assert'] = found[0]
+        if merged:
+            rule['Assertions'] = merged
+    return d
+
+
+def drop_init_defaults(d):
+    """Drop the owner and group root of cfn-init files, and ignoreErrors
+    false of its commands, which cfn-init assumes anyway
+    """
+    for resource in d.get('Resources', {}).values():
+        init = resource.get('Metadata', {}).get('AWS::CloudFormation::Init')
+        if not isinstance(init, dict):
+            continue
+        for (name, config) in init.items():
+            if name == 'configSets' or not isinstance(config, dict):
+                continue
+            for f in config.get('files', {}).values():
+                for k in ('owner', 'group'):
+                    if f.get(k) == 'root':
+                        del f[k]
+            for command in config.get('commands', {}).values():
+                if command.get('ignoreErrors') is False:
+                    del command['ignoreErrors']
+    return d
+
+
+def drop_interface(d):
+    """Drop the parameter groups and labels of the console"""
+    metadata = d.get('Metadata', {})
+    metadata.pop('AWS::CloudFormation::Interface', None)
+    if 'Metadata' in d and not metadata:
+        del d['Metadata']
+    return d
+
+
+def drop_descriptions(d):
+    """Drop the descriptions of parameters and outputs, and the comments in
+    the metadata of resources
+    """
+    for k in ('Parameters', 'Outputs'):
+        for item in d.get(k, {}).values():
+            item.pop('Description', None)
+            item.pop('ConstraintDescription', None)
+    for resource in d.get('Resources', {}).values():
+        metadata = resource.get('Metadata')
+        if isinstance(metadata, dict) and \
+                isinstance(metadata.get('Comment'), basestring):
+            del metadata['Comment']
+            if not metadata:
+                del resource['Metadata']
+    return d
+
+
+steps = [
+    ('merge conditions', merge_conditions),
+    ('collapse mappings', collapse_mappings),
+    ('simplify intrinsics', simplify_intrinsics),
+    ('shorten names', shorten_names),
+    ('merge assertions', merge_assertions),
+    ('trim scripts', trim_scripts),
+    ('drop cfn-init defaults', drop_init_defaults),
+    ('drop interface', drop_interface),
+    ('drop descriptions', drop_descriptions),
+]
+
+
+def yaml_scalar(s):
+    """s as a plain YAML scalar if it reads back as the same string, else
+    double-quoted (a JSON string is a valid YAML one)
+    """
+    if plain_scalar.match(s) and not yaml_keyword.match(s) and \
+            not yaml_number.match(s):
+        return s
+    return json.dumps(s)
+
+
+def flow_yaml(v):
+    """v as YAML on one line, in flow style with the short form tags.
+
+    A tag cannot be followed by another, so the argument of a short form
+    function which is itself a function is written in the long form.
+    """
+    f = function_of(v)
+    if f is not None and f[0] in short_forms:
+        name, arg = f
+        if name == 'Fn::GetAtt' and isinstance(arg, list) and \
+                reference_name(v) is not None and '.' not in arg[0]:
+            arg = reference_name(v)
+        if function_of(arg) is not None:
+            ((k, e),) = arg.items()
+            value = '{' + yaml_scalar(k) + ': ' + flow_yaml(e) + '}'
+        else:
+            value = flow_yaml(arg)
+        return '!' + name.replace('Fn::', '') + ' ' + value
+    if isinstance(v, dict):
+        return '{' + ','.join(yaml_scalar(k) + ': ' + flow_yaml(e)
+                              for k, e in v.items()) + '}'
+    if isinstance(v, list):
+        return '[' + ','.join(flow_yaml(e) for e in v) + ']'
+    if isinstance(v, basestring):
+        return yaml_scalar(v)
+    return json.dumps(v)
+
+
+def yaml_size(d):
+    return len(flow_yaml(d).encode('utf-8'))
+
+
+def minify(d, skip=(), as_yaml=False):
+    """Return (template, report) with d (a dict, or a troposphere Template)
+    minimized by every step not in skip; the report lists the compact
+    size after each step as (step, bytes), and with as_yaml the size of
+    the result written by flow_yaml() last.
+    """
+    if hasattr(d, 'to_dict'):
+        d = d.to_dict()
+    d = copy.deepcopy(d)
+    report = [('compact', size(d))]
+    for (name, step) in steps:
+        if name not in skip:
+            before = copy.deepcopy(d)
+            d = step(d)
+            if size(d) > size(before):
+                d = before
+            report.append((name, size(d)))
+    if as_yaml:
+        report.append(('flow YAML', yaml_size(d)))
+    return d, report
+
+
+def print_report(report, original, out=sys.stderr):
+    print('{:<22} {:>9}'.format('input', original), file=out)
+    for (name, n) in report:
+        print('{:<22} {:>9} {:>7.1%}'.format(name, n, 1 - n / float(original)),
+              file=out)
+    n = report[-1][1]
+    if n <= TEMPLATE_BODY_LIMIT:
+        print('fits the {} byte TemplateBody limit'.format(
+            TEMPLATE_BODY_LIMIT), file=out)
+    else:
+        print('{} bytes over the {} byte TemplateBody limit, upload it to S3{}'
+              .format(n - TEMPLATE_BODY_LIMIT, TEMPLATE_BODY_LIMIT,
+                      '' if report[-1][0] == 'flow YAML'
+                      else ' or try --yaml'), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Minimize a CloudFormation template and report its size '
+                    'before and after.')
+    parser.add_argument('template', help='template file, or - for stdin')
+    parser.add_argument('-o', '--output',
+                        help='write the minimized template here')
+    parser.add_argument('--skip', action='append', default=[],
+                        choices=[name for (name, _) in steps],
+                        help='leave out a step')
+    parser.add_argument('--yaml', action='store_true',
+                        help='write YAML in flow style with the short form '
+                             'tags, the default for a .yaml or .yml output')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with status 1 if the result is over the '
+                             'TemplateBody limit')
+    args = parser.parse_args(argv)
+
+    if args.template == '-':
+        data = sys.stdin.read()
+        d = parse_template(data)
+        original = len(data.encode('utf-8'))
+    else:
+        d = load_template(args.template)
+        with open(args.template, 'rb') as f:
+            original = len(f.read())
+    as_yaml = args.yaml or bool(args.output) and \
+        os.path.splitext(args.output)[1].lower() in yaml_extensions
+    d, report = minify(d, args.skip, as_yaml)
+    text = flow_yaml(d) if as_yaml else compact_json(d)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+    print_report(report, original)
+    if args.check and report[-1][1] > TEMPLATE_BODY_LIMIT:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""Reading CloudFormation templates in JSON or YAML.
+
+YAML templates may use the short form intrinsic function tags (!Ref,
+!GetAtt, !Sub, ...), which are expanded into the long form, so the result
+is the same dict as for the equivalent JSON template.
+
+update_json() rewrites one value of a JSON template in place, for the
+tools which generate parts of the templates here.
+"""
+
+import json
+import os
+import re
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+yaml_extensions = ('.yaml', '.yml')
+template_extensions = ('.json', '.template') + yaml_extensions
+
+
+if yaml is not None:
+    class cfn_yaml_loader(getattr(yaml, 'CSafeLoader', yaml.SafeLoader)):
+        """YAML loader for CloudFormation templates, using the libyaml C
+        parser when PyYAML was built with it.
+        """
+
+    def construct_cfn_tag(loader, tag_suffix, node):
+        """Expand a short form tag such as !Ref or !GetAtt into the
+        equivalent long form intrinsic function.
+        """
+        if isinstance(node, yaml.ScalarNode):
+            value = loader.construct_scalar(node)
+        elif isinstance(node, yaml.SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_mapping(node, deep=True)
+        if tag_suffix in ('Ref', 'Condition'):
+            return {tag_suffix: value}
+        if tag_suffix == 'GetAtt' and isinstance(value, basestring):
+            value = value.split('.', 1)
+        return {'Fn::' + tag_suffix: value}
+
+    def construct_timestamp_string(loader, node):
+        """CloudFormation reads unquoted dates such as the
+        AWSTemplateFormatVersion as plain strings.
+        """
+        return loader.construct_scalar(node)
+
+    cfn_yaml_loader.add_multi_constructor('!', construct_cfn_tag)
+    cfn_yaml_loader.add_constructor('tag:yaml.org,2002:timestamp',
+                                    construct_timestamp_string)
+
+
+def is_yaml(data, filename=None):
+    """Decide whether a template is YAML, from its extension if known or
+    else from its first character (JSON templates start with '{').
+    """
+    if filename is not None:
+        ext = os.path.splitext(filename)[1].lower()
+        if ext in yaml_extensions:
+            return True
+        if ext == '.json':
+            return False
+    return not data.lstrip().startswith(b'{' if isinstance(data, bytes)
+                                        else '{')
+
+
+def parse_template(data, filename=None):
+    """Parse template bytes or text, in JSON or YAML, into a dict"""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    if not is_yaml(data, filename):
+        return json.loads(data)
+    if yaml is None:
+        raise ValueError("PyYAML is required to convert YAML templates")
+    return yaml.load(data, Loader=cfn_yaml_loader)
+
+
+def load_template(filename):
+    """Read and parse the template in filename"""
+    with open(filename, 'rb') as f:
+        return parse_template(f.read(), filename)
+
+
+def depends_on(resource):
+    """The DependsOn of a resource as a list"""
+    names = resource.get('DependsOn', [])
+    return [names] if isinstance(names, basestring) else list(names)
+
+
+whitespace = re.compile(r'[ \t\n\r]*')
+
+
+def json_members(text, start):
+    """Yield (key, key start, value start, value end) for each member of
+    the JSON object starting at text[start]
+    """
+    decoder = json.JSONDecoder()
+    pos = whitespace.match(text, start + 1).end()
+    while text[pos] != '}':
+        key_start = pos
+        key, pos = json.decoder.scanstring(text, pos + 1)
+        pos = whitespace.match(text, pos).end() + 1
+        pos = whitespace.match(text, pos).end()
+        _, end = decoder.raw_decode(text, pos)
+        yield key, key_start, pos, end
+        pos = whitespace.match(text, end).end()
+        if text[pos] == ',':
+            pos = whitespace.match(text, pos + 1).end()
+
+
+def update_json(filename, path, value, before=None):
+    """Set the value at path, a list of keys, of the JSON template in
+    filename, rewriting only the text of that value so the formatting of
+    the rest of the file is kept. A missing last key is added in front of
+    the member before, or else at the end.
+    """
+    with open(filename) as f:
+        text = f.read()
+    start = whitespace.match(text).end()
+    for i, key in enumerate(path):
+        members = dict((k, (key_start, value_start, value_end))
+                       for (k, key_start, value_start, value_end)
+                       in json_members(text, start))
+        if key in members:
+            key_start, start, end = members[key]
+            continue
+        if i < len(path) - 1 or not members:
+            raise KeyError(key)
+        if before in members:
+            key_start = members[before][0]
+            start = end = key_start
+            suffix = ',\n' + line_indent(text, key_start)
+        else:
+            key_start = max(members.values())[2]
+            start = end = key_start
+            suffix = ''
+        break
+    else:
+        suffix = None
+    indent = line_indent(text, key_start)
+    body = json.dumps(value, indent=4, separators=(',', ': '))
+    body = body.replace('\n', '\n' + indent)
+    if suffix is not None:
+        body = '"{}": {}'.format(path[-1], body)
+        if suffix:
+            body += suffix
+        else:
+            body = ',\n' + indent + body
+    with open(filename, 'w') as f:
+        f.write(text[:start] + body + text[end:])
+
+
+def line_indent(text, pos):
+    line = text[text.rindex('\n', 0, pos) + 1:pos]
+    return line[:len(line) - len(line.lstrip())]
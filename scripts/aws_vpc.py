@@ -0,0 +1,1280 @@
+from troposphere import And, Condition, Equals, Export, GetAtt, If, Not, Or
+from troposphere import Output, Parameter, Ref, Select, Split, Sub, Tags
+from troposphere import Template
+from troposphere.ec2 import DHCPOptions, EIP, InternetGateway, NatGateway
+from troposphere.ec2 import NetworkAcl, NetworkAclEntry, Route, RouteTable
+from troposphere.ec2 import Subnet, SubnetNetworkAclAssociation
+from troposphere.ec2 import SubnetRouteTableAssociation, VPC
+from troposphere.ec2 import VPCDHCPOptionsAssociation, VPCEndpoint
+from troposphere.ec2 import VPCGatewayAttachment
+
+
+def build(**overrides):
+    """Return the Template, with the Default of each parameter named in
+    overrides replaced by its value.
+    """
+    t = Template()
+
+    t.add_version("2010-09-09")
+
+    t.add_description("This template creates a Multi-AZ, multi-subnet VPC infrastructure with managed NAT gateways in the public subnet for each Availability Zone. You can also create additional private subnets with dedicated custom network access control lists (ACLs). If you deploy the Quick Start in a region that doesn't support NAT gateways, NAT instances are deployed instead. **WARNING** This template creates AWS resources. You will be billed for the AWS resources used if you create a stack from this template. QS(0027)")
+    t.add_metadata({ "AWS::CloudFormation::Interface": { "ParameterGroups": [{ "Label": { "default": "Availability Zone Configuration" }, "Parameters": ["AvailabilityZones", "NumberOfAZs"] }, { "Label": { "default": "Network Configuration" }, "Parameters": ["VPCCIDR", "PublicSubnet1CIDR", "PublicSubnet2CIDR", "PublicSubnet3CIDR", "PublicSubnet4CIDR", "PublicSubnetTag1", "PublicSubnetTag2", "PublicSubnetTag3", "CreatePrivateSubnets", "PrivateSubnet1ACIDR", "PrivateSubnet2ACIDR", "PrivateSubnet3ACIDR", "PrivateSubnet4ACIDR", "PrivateSubnetATag1", "PrivateSubnetATag2", "PrivateSubnetATag3", "CreateAdditionalPrivateSubnets", "PrivateSubnet1BCIDR", "PrivateSubnet2BCIDR", "PrivateSubnet3BCIDR", "PrivateSubnet4BCIDR", "PrivateSubnetBTag1", "PrivateSubnetBTag2", "PrivateSubnetBTag3", "VPCTenancy"] }, { "Label": { "default": "Deprecated: NAT Instance Configuration" }, "Parameters": ["KeyPairName", "NATInstanceType"] }], "ParameterLabels": { "AvailabilityZones": { "default": "Availability Zones" }, "CreateAdditionalPrivateSubnets": { "default": "Create additional private subnets with dedicated network ACLs" }, "CreatePrivateSubnets": { "default": "Create private subnets" }, "KeyPairName": { "default": "Deprecated: Key pair name" }, "NATInstanceType": { "default": "Deprecated: NAT instance type" }, "NumberOfAZs": { "default": "Number of Availability Zones" }, "PrivateSubnet1ACIDR": { "default": "Private subnet 1A CIDR" }, "PrivateSubnet1BCIDR": { "default": "Private subnet 1B with dedicated network ACL CIDR" }, "PrivateSubnet2ACIDR": { "default": "Private subnet 2A CIDR" }, "PrivateSubnet2BCIDR": { "default": "Private subnet 2B with dedicated network ACL CIDR" }, "PrivateSubnet3ACIDR": { "default": "Private subnet 3A CIDR" }, "PrivateSubnet3BCIDR": { "default": "Private subnet 3B with dedicated network ACL CIDR" }, "PrivateSubnet4ACIDR": { "default": "Private subnet 4A CIDR" }, "PrivateSubnet4BCIDR": { "default": "Private subnet 4B with dedicated network ACL CIDR" }, "PrivateSubnetATag1": { "default": "Tag for Private A Subnets" }, "PrivateSubnetATag2": { "default": "Tag for Private A Subnets" }, "PrivateSubnetATag3": { "default": "Tag for Private A Subnets" }, "PrivateSubnetBTag1": { "default": "Tag for Private B Subnets" }, "PrivateSubnetBTag2": { "default": "Tag for Private B Subnets" }, "PrivateSubnetBTag3": { "default": "Tag for Private B Subnets" }, "PublicSubnet1CIDR": { "default": "Public subnet 1 CIDR" }, "PublicSubnet2CIDR": { "default": "Public subnet 2 CIDR" }, "PublicSubnet3CIDR": { "default": "Public subnet 3 CIDR" }, "PublicSubnet4CIDR": { "default": "Public subnet 4 CIDR" }, "PublicSubnetTag1": { "default": "Tag for Public Subnets" }, "PublicSubnetTag2": { "default": "Tag for Public Subnets" }, "PublicSubnetTag3": { "default": "Tag for Public Subnets" }, "VPCCIDR": { "default": "VPC CIDR" }, "VPCTenancy": { "default": "VPC Tenancy" } } } })
+
+    AvailabilityZones = t.add_parameter(Parameter(
+        "AvailabilityZones",
+        Description="List of Availability Zones to use for the subnets in the VPC. Note: The logical order is preserved.",
+        Type="List<AWS::EC2::AvailabilityZone::Name>",
+    ))
+
+    CreateAdditionalPrivateSubnets = t.add_parameter(Parameter(
+        "CreateAdditionalPrivateSubnets",
+        AllowedValues=["true", "false"],
+        Default="false",
+        Description="Set to true to create a network ACL protected subnet in each Availability Zone. If false, the CIDR parameters for those subnets will be ignored. If true, it also requires that the 'Create private subnets' parameter is also true to have any effect.",
+        Type="String",
+    ))
+
+    CreatePrivateSubnets = t.add_parameter(Parameter(
+        "CreatePrivateSubnets",
+        AllowedValues=["true", "false"],
+        Default="true",
+        Description="Set to false to create only public subnets. If false, the CIDR parameters for ALL private subnets will be ignored.",
+        Type="String",
+    ))
+
+    KeyPairName = t.add_parameter(Parameter(
+        "KeyPairName",
+        Description="Deprecated. NAT gateways are now supported in all regions.",
+        Type="String",
+        Default="deprecated",
+    ))
+
+    NATInstanceType = t.add_parameter(Parameter(
+        "NATInstanceType",
+        Default="deprecated",
+        Description="Deprecated. NAT gateways are now supported in all regions.",
+        Type="String",
+    ))
+
+    NumberOfAZs = t.add_parameter(Parameter(
+        "NumberOfAZs",
+        AllowedValues=["2", "3", "4"],
+        Default="2",
+        Description="Number of Availability Zones to use in the VPC. This must match your selections in the list of Availability Zones parameter.",
+        Type="String",
+    ))
+
+    PrivateSubnet1ACIDR = t.add_parameter(Parameter(
+        "PrivateSubnet1ACIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.0.0/19",
+        Description="CIDR block for private subnet 1A located in Availability Zone 1",
+        Type="String",
+    ))
+
+    PrivateSubnet1BCIDR = t.add_parameter(Parameter(
+        "PrivateSubnet1BCIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.192.0/21",
+        Description="CIDR block for private subnet 1B with dedicated network ACL located in Availability Zone 1",
+        Type="String",
+    ))
+
+    PrivateSubnet2ACIDR = t.add_parameter(Parameter(
+        "PrivateSubnet2ACIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.32.0/19",
+        Description="CIDR block for private subnet 2A located in Availability Zone 2",
+        Type="String",
+    ))
+
+    PrivateSubnet2BCIDR = t.add_parameter(Parameter(
+        "PrivateSubnet2BCIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.200.0/21",
+        Description="CIDR block for private subnet 2B with dedicated network ACL located in Availability Zone 2",
+        Type="String",
+    ))
+
+    PrivateSubnet3ACIDR = t.add_parameter(Parameter(
+        "PrivateSubnet3ACIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.64.0/19",
+        Description="CIDR block for private subnet 3A located in Availability Zone 3",
+        Type="String",
+    ))
+
+    PrivateSubnet3BCIDR = t.add_parameter(Parameter(
+        "PrivateSubnet3BCIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.208.0/21",
+        Description="CIDR block for private subnet 3B with dedicated network ACL located in Availability Zone 3",
+        Type="String",
+    ))
+
+    PrivateSubnet4ACIDR = t.add_parameter(Parameter(
+        "PrivateSubnet4ACIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.96.0/19",
+        Description="CIDR block for private subnet 4A located in Availability Zone 4",
+        Type="String",
+    ))
+
+    PrivateSubnet4BCIDR = t.add_parameter(Parameter(
+        "PrivateSubnet4BCIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.216.0/21",
+        Description="CIDR block for private subnet 4B with dedicated network ACL located in Availability Zone 4",
+        Type="String",
+    ))
+
+    PrivateSubnetATag1 = t.add_parameter(Parameter(
+        "PrivateSubnetATag1",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="Network=Private",
+        Description="tag to add to private subnets A, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PrivateSubnetATag2 = t.add_parameter(Parameter(
+        "PrivateSubnetATag2",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="",
+        Description="tag to add to private subnets A, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PrivateSubnetATag3 = t.add_parameter(Parameter(
+        "PrivateSubnetATag3",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="",
+        Description="tag to add to private subnets A, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PrivateSubnetBTag1 = t.add_parameter(Parameter(
+        "PrivateSubnetBTag1",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="Network=Private",
+        Description="tag to add to private subnets B, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PrivateSubnetBTag2 = t.add_parameter(Parameter(
+        "PrivateSubnetBTag2",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="",
+        Description="tag to add to private subnets B, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PrivateSubnetBTag3 = t.add_parameter(Parameter(
+        "PrivateSubnetBTag3",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="",
+        Description="tag to add to private subnets B, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PublicSubnet1CIDR = t.add_parameter(Parameter(
+        "PublicSubnet1CIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.128.0/20",
+        Description="CIDR block for the public DMZ subnet 1 located in Availability Zone 1",
+        Type="String",
+    ))
+
+    PublicSubnet2CIDR = t.add_parameter(Parameter(
+        "PublicSubnet2CIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.144.0/20",
+        Description="CIDR block for the public DMZ subnet 2 located in Availability Zone 2",
+        Type="String",
+    ))
+
+    PublicSubnet3CIDR = t.add_parameter(Parameter(
+        "PublicSubnet3CIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.160.0/20",
+        Description="CIDR block for the public DMZ subnet 3 located in Availability Zone 3",
+        Type="String",
+    ))
+
+    PublicSubnet4CIDR = t.add_parameter(Parameter(
+        "PublicSubnet4CIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.176.0/20",
+        Description="CIDR block for the public DMZ subnet 4 located in Availability Zone 4",
+        Type="String",
+    ))
+
+    PublicSubnetTag1 = t.add_parameter(Parameter(
+        "PublicSubnetTag1",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="Network=Public",
+        Description="tag to add to public subnets, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PublicSubnetTag2 = t.add_parameter(Parameter(
+        "PublicSubnetTag2",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="",
+        Description="tag to add to public subnets, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    PublicSubnetTag3 = t.add_parameter(Parameter(
+        "PublicSubnetTag3",
+        AllowedPattern="^([a-zA-Z0-9+\\-._:/@]+=[a-zA-Z0-9+\\-.,_:/@ *\\\\\"'\\[\\]\\{\\}]*)?$",
+        ConstraintDescription="tags must be in format \"Key=Value\" keys can only contain [a-zA-Z0-9+\\-._:/@], values can contain [a-zA-Z0-9+\\-._:/@ *\\\\\"'\\[\\]\\{\\}]",
+        Default="",
+        Description="tag to add to public subnets, in format Key=Value (Optional)",
+        Type="String",
+    ))
+
+    VPCCIDR = t.add_parameter(Parameter(
+        "VPCCIDR",
+        AllowedPattern="^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/(1[6-9]|2[0-8]))$",
+        ConstraintDescription="CIDR block parameter must be in the form x.x.x.x/16-28",
+        Default="10.0.0.0/16",
+        Description="CIDR block for the VPC",
+        Type="String",
+    ))
+
+    VPCTenancy = t.add_parameter(Parameter(
+        "VPCTenancy",
+        AllowedValues=["default", "dedicated"],
+        Default="default",
+        Description="The allowed tenancy of instances launched into the VPC",
+        Type="String",
+    ))
+
+    t.add_condition("3AZCondition",
+        Or(Equals(Ref(NumberOfAZs), "3"), Condition("4AZCondition"))
+    )
+
+    t.add_condition("4AZCondition",
+        Equals(Ref(NumberOfAZs), "4")
+    )
+
+    t.add_condition("AdditionalPrivateSubnetsCondition",
+        And(Equals(Ref(CreatePrivateSubnets), "true"), Equals(Ref(CreateAdditionalPrivateSubnets), "true"))
+    )
+
+    t.add_condition("AdditionalPrivateSubnets&3AZCondition",
+        And(Condition("AdditionalPrivateSubnetsCondition"), Condition("3AZCondition"))
+    )
+
+    t.add_condition("AdditionalPrivateSubnets&4AZCondition",
+        And(Condition("AdditionalPrivateSubnetsCondition"), Condition("4AZCondition"))
+    )
+
+    t.add_condition("GovCloudCondition",
+        Equals(Ref("AWS::Region"), "us-gov-west-1")
+    )
+
+    t.add_condition("NVirginiaRegionCondition",
+        Equals(Ref("AWS::Region"), "us-east-1")
+    )
+
+    t.add_condition("PrivateSubnetsCondition",
+        Equals(Ref(CreatePrivateSubnets), "true")
+    )
+
+    t.add_condition("PrivateSubnets&3AZCondition",
+        And(Condition("PrivateSubnetsCondition"), Condition("3AZCondition"))
+    )
+
+    t.add_condition("PrivateSubnets&4AZCondition",
+        And(Condition("PrivateSubnetsCondition"), Condition("4AZCondition"))
+    )
+
+    t.add_condition("PrivateSubnetATag1Condition",
+        Not(Equals(Ref(PrivateSubnetATag1), ""))
+    )
+
+    t.add_condition("PrivateSubnetATag2Condition",
+        Not(Equals(Ref(PrivateSubnetATag2), ""))
+    )
+
+    t.add_condition("PrivateSubnetATag3Condition",
+        Not(Equals(Ref(PrivateSubnetATag3), ""))
+    )
+
+    t.add_condition("PrivateSubnetBTag1Condition",
+        Not(Equals(Ref(PrivateSubnetBTag1), ""))
+    )
+
+    t.add_condition("PrivateSubnetBTag2Condition",
+        Not(Equals(Ref(PrivateSubnetBTag2), ""))
+    )
+
+    t.add_condition("PrivateSubnetBTag3Condition",
+        Not(Equals(Ref(PrivateSubnetBTag3), ""))
+    )
+
+    t.add_condition("PublicSubnetTag1Condition",
+        Not(Equals(Ref(PublicSubnetTag1), ""))
+    )
+
+    t.add_condition("PublicSubnetTag2Condition",
+        Not(Equals(Ref(PublicSubnetTag2), ""))
+    )
+
+    t.add_condition("PublicSubnetTag3Condition",
+        Not(Equals(Ref(PublicSubnetTag3), ""))
+    )
+
+    DHCPOptions_ = t.add_resource(DHCPOptions(
+        "DHCPOptions",
+        DomainName=If("NVirginiaRegionCondition", "ec2.internal", Sub("${AWS::Region}.compute.internal")),
+        DomainNameServers=["AmazonProvidedDNS"],
+    ))
+
+    VPC_ = t.add_resource(VPC(
+        "VPC",
+        CidrBlock=Ref(VPCCIDR),
+        InstanceTenancy=Ref(VPCTenancy),
+        EnableDnsSupport=True,
+        EnableDnsHostnames=True,
+        Tags=Tags(
+            Name=Ref("AWS::StackName"),
+        ),
+    ))
+
+    InternetGateway_ = t.add_resource(InternetGateway(
+        "InternetGateway",
+        Tags=Tags(
+            Name=Ref("AWS::StackName"),
+        ),
+    ))
+
+    VPCDHCPOptionsAssociation_ = t.add_resource(VPCDHCPOptionsAssociation(
+        "VPCDHCPOptionsAssociation",
+        VpcId=Ref(VPC_),
+        DhcpOptionsId=Ref(DHCPOptions_),
+    ))
+
+    VPCGatewayAttachment_ = t.add_resource(VPCGatewayAttachment(
+        "VPCGatewayAttachment",
+        VpcId=Ref(VPC_),
+        InternetGatewayId=Ref(InternetGateway_),
+    ))
+
+    PrivateSubnet1A = t.add_resource(Subnet(
+        "PrivateSubnet1A",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet1ACIDR),
+        AvailabilityZone=Select("0", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 1A" }, If("PrivateSubnetATag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag3))) }, Ref("AWS::NoValue"))],
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet1B = t.add_resource(Subnet(
+        "PrivateSubnet1B",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet1BCIDR),
+        AvailabilityZone=Select("0", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 1B" }, If("PrivateSubnetBTag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag3))) }, Ref("AWS::NoValue"))],
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2A = t.add_resource(Subnet(
+        "PrivateSubnet2A",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet2ACIDR),
+        AvailabilityZone=Select("1", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 2A" }, If("PrivateSubnetATag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag3))) }, Ref("AWS::NoValue"))],
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2B = t.add_resource(Subnet(
+        "PrivateSubnet2B",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet2BCIDR),
+        AvailabilityZone=Select("1", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 2B" }, If("PrivateSubnetBTag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag3))) }, Ref("AWS::NoValue"))],
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet3A = t.add_resource(Subnet(
+        "PrivateSubnet3A",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet3ACIDR),
+        AvailabilityZone=Select("2", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 3A" }, If("PrivateSubnetATag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag3))) }, Ref("AWS::NoValue"))],
+        Condition="PrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet3B = t.add_resource(Subnet(
+        "PrivateSubnet3B",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet3BCIDR),
+        AvailabilityZone=Select("2", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 3B" }, If("PrivateSubnetBTag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag3))) }, Ref("AWS::NoValue"))],
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet4A = t.add_resource(Subnet(
+        "PrivateSubnet4A",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet4ACIDR),
+        AvailabilityZone=Select("3", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 4A" }, If("PrivateSubnetATag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetATag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetATag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetATag3))) }, Ref("AWS::NoValue"))],
+        Condition="PrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet4B = t.add_resource(Subnet(
+        "PrivateSubnet4B",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PrivateSubnet4BCIDR),
+        AvailabilityZone=Select("3", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Private subnet 4B" }, If("PrivateSubnetBTag1Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag1))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag1))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag2Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag2))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag2))) }, Ref("AWS::NoValue")), If("PrivateSubnetBTag3Condition", { "Key": Select("0", Split("=", Ref(PrivateSubnetBTag3))), "Value": Select("1", Split("=", Ref(PrivateSubnetBTag3))) }, Ref("AWS::NoValue"))],
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    PublicSubnet1 = t.add_resource(Subnet(
+        "PublicSubnet1",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PublicSubnet1CIDR),
+        AvailabilityZone=Select("0", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Public subnet 1" }, If("PublicSubnetTag1Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag1))), "Value": Select("1", Split("=", Ref(PublicSubnetTag1))) }, Ref("AWS::NoValue")), If("PublicSubnetTag2Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag2))), "Value": Select("1", Split("=", Ref(PublicSubnetTag2))) }, Ref("AWS::NoValue")), If("PublicSubnetTag3Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag3))), "Value": Select("1", Split("=", Ref(PublicSubnetTag3))) }, Ref("AWS::NoValue"))],
+        MapPublicIpOnLaunch=True,
+    ))
+
+    PublicSubnet2 = t.add_resource(Subnet(
+        "PublicSubnet2",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PublicSubnet2CIDR),
+        AvailabilityZone=Select("1", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Public subnet 2" }, If("PublicSubnetTag1Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag1))), "Value": Select("1", Split("=", Ref(PublicSubnetTag1))) }, Ref("AWS::NoValue")), If("PublicSubnetTag2Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag2))), "Value": Select("1", Split("=", Ref(PublicSubnetTag2))) }, Ref("AWS::NoValue")), If("PublicSubnetTag3Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag3))), "Value": Select("1", Split("=", Ref(PublicSubnetTag3))) }, Ref("AWS::NoValue"))],
+        MapPublicIpOnLaunch=True,
+    ))
+
+    PublicSubnet3 = t.add_resource(Subnet(
+        "PublicSubnet3",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PublicSubnet3CIDR),
+        AvailabilityZone=Select("2", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Public subnet 3" }, If("PublicSubnetTag1Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag1))), "Value": Select("1", Split("=", Ref(PublicSubnetTag1))) }, Ref("AWS::NoValue")), If("PublicSubnetTag2Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag2))), "Value": Select("1", Split("=", Ref(PublicSubnetTag2))) }, Ref("AWS::NoValue")), If("PublicSubnetTag3Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag3))), "Value": Select("1", Split("=", Ref(PublicSubnetTag3))) }, Ref("AWS::NoValue"))],
+        MapPublicIpOnLaunch=True,
+        Condition="3AZCondition",
+    ))
+
+    PublicSubnet4 = t.add_resource(Subnet(
+        "PublicSubnet4",
+        VpcId=Ref(VPC_),
+        CidrBlock=Ref(PublicSubnet4CIDR),
+        AvailabilityZone=Select("3", Ref(AvailabilityZones)),
+        Tags=[{ "Key": "Name", "Value": "Public subnet 4" }, If("PublicSubnetTag1Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag1))), "Value": Select("1", Split("=", Ref(PublicSubnetTag1))) }, Ref("AWS::NoValue")), If("PublicSubnetTag2Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag2))), "Value": Select("1", Split("=", Ref(PublicSubnetTag2))) }, Ref("AWS::NoValue")), If("PublicSubnetTag3Condition", { "Key": Select("0", Split("=", Ref(PublicSubnetTag3))), "Value": Select("1", Split("=", Ref(PublicSubnetTag3))) }, Ref("AWS::NoValue"))],
+        MapPublicIpOnLaunch=True,
+        Condition="4AZCondition",
+    ))
+
+    PrivateSubnet1ARouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet1ARouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 1A",
+            Network="Private",
+        ),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2ARouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet2ARouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 2A",
+            Network="Private",
+        ),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet3ARouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet3ARouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 3A",
+            Network="Private",
+        ),
+        Condition="PrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet4ARouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet4ARouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 4A",
+            Network="Private",
+        ),
+        Condition="PrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet1BRouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet1BRouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 1B",
+            Network="Private",
+        ),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet1BNetworkAcl = t.add_resource(NetworkAcl(
+        "PrivateSubnet1BNetworkAcl",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="NACL Protected subnet 1",
+            Network="NACL Protected",
+        ),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2BRouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet2BRouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 2B",
+            Network="Private",
+        ),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2BNetworkAcl = t.add_resource(NetworkAcl(
+        "PrivateSubnet2BNetworkAcl",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="NACL Protected subnet 2",
+            Network="NACL Protected",
+        ),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet3BRouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet3BRouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 3B",
+            Network="Private",
+        ),
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet3BNetworkAcl = t.add_resource(NetworkAcl(
+        "PrivateSubnet3BNetworkAcl",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="NACL Protected subnet 3",
+            Network="NACL Protected",
+        ),
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet4BRouteTable = t.add_resource(RouteTable(
+        "PrivateSubnet4BRouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Private subnet 4B",
+            Network="Private",
+        ),
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet4BNetworkAcl = t.add_resource(NetworkAcl(
+        "PrivateSubnet4BNetworkAcl",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="NACL Protected subnet 4",
+            Network="NACL Protected",
+        ),
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    PublicSubnetRouteTable = t.add_resource(RouteTable(
+        "PublicSubnetRouteTable",
+        VpcId=Ref(VPC_),
+        Tags=Tags(
+            Name="Public Subnets",
+            Network="Public",
+        ),
+    ))
+
+    PrivateSubnet1ARouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet1ARouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet1A),
+        RouteTableId=Ref(PrivateSubnet1ARouteTable),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2ARouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet2ARouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet2A),
+        RouteTableId=Ref(PrivateSubnet2ARouteTable),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet3ARouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet3ARouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet3A),
+        RouteTableId=Ref(PrivateSubnet3ARouteTable),
+        Condition="PrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet4ARouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet4ARouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet4A),
+        RouteTableId=Ref(PrivateSubnet4ARouteTable),
+        Condition="PrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet1BRouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet1BRouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet1B),
+        RouteTableId=Ref(PrivateSubnet1BRouteTable),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet1BNetworkAclEntryInbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet1BNetworkAclEntryInbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=False,
+        NetworkAclId=Ref(PrivateSubnet1BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet1BNetworkAclEntryOutbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet1BNetworkAclEntryOutbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=True,
+        NetworkAclId=Ref(PrivateSubnet1BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet1BNetworkAclAssociation = t.add_resource(SubnetNetworkAclAssociation(
+        "PrivateSubnet1BNetworkAclAssociation",
+        SubnetId=Ref(PrivateSubnet1B),
+        NetworkAclId=Ref(PrivateSubnet1BNetworkAcl),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2BRouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet2BRouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet2B),
+        RouteTableId=Ref(PrivateSubnet2BRouteTable),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2BNetworkAclEntryInbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet2BNetworkAclEntryInbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=False,
+        NetworkAclId=Ref(PrivateSubnet2BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2BNetworkAclEntryOutbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet2BNetworkAclEntryOutbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=True,
+        NetworkAclId=Ref(PrivateSubnet2BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2BNetworkAclAssociation = t.add_resource(SubnetNetworkAclAssociation(
+        "PrivateSubnet2BNetworkAclAssociation",
+        SubnetId=Ref(PrivateSubnet2B),
+        NetworkAclId=Ref(PrivateSubnet2BNetworkAcl),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet3BRouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet3BRouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet3B),
+        RouteTableId=Ref(PrivateSubnet3BRouteTable),
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet3BNetworkAclEntryInbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet3BNetworkAclEntryInbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=False,
+        NetworkAclId=Ref(PrivateSubnet3BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet3BNetworkAclEntryOutbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet3BNetworkAclEntryOutbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=True,
+        NetworkAclId=Ref(PrivateSubnet3BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet3BNetworkAclAssociation = t.add_resource(SubnetNetworkAclAssociation(
+        "PrivateSubnet3BNetworkAclAssociation",
+        SubnetId=Ref(PrivateSubnet3B),
+        NetworkAclId=Ref(PrivateSubnet3BNetworkAcl),
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet4BRouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PrivateSubnet4BRouteTableAssociation",
+        SubnetId=Ref(PrivateSubnet4B),
+        RouteTableId=Ref(PrivateSubnet4BRouteTable),
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet4BNetworkAclEntryInbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet4BNetworkAclEntryInbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=False,
+        NetworkAclId=Ref(PrivateSubnet4BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet4BNetworkAclEntryOutbound = t.add_resource(NetworkAclEntry(
+        "PrivateSubnet4BNetworkAclEntryOutbound",
+        CidrBlock="0.0.0.0/0",
+        Egress=True,
+        NetworkAclId=Ref(PrivateSubnet4BNetworkAcl),
+        Protocol=-1,
+        RuleAction="allow",
+        RuleNumber=100,
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet4BNetworkAclAssociation = t.add_resource(SubnetNetworkAclAssociation(
+        "PrivateSubnet4BNetworkAclAssociation",
+        SubnetId=Ref(PrivateSubnet4B),
+        NetworkAclId=Ref(PrivateSubnet4BNetworkAcl),
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    PublicSubnetRoute = t.add_resource(Route(
+        "PublicSubnetRoute",
+        RouteTableId=Ref(PublicSubnetRouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        GatewayId=Ref(InternetGateway_),
+        DependsOn=VPCGatewayAttachment_,
+    ))
+
+    PublicSubnet1RouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PublicSubnet1RouteTableAssociation",
+        SubnetId=Ref(PublicSubnet1),
+        RouteTableId=Ref(PublicSubnetRouteTable),
+    ))
+
+    PublicSubnet2RouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PublicSubnet2RouteTableAssociation",
+        SubnetId=Ref(PublicSubnet2),
+        RouteTableId=Ref(PublicSubnetRouteTable),
+    ))
+
+    PublicSubnet3RouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PublicSubnet3RouteTableAssociation",
+        SubnetId=Ref(PublicSubnet3),
+        RouteTableId=Ref(PublicSubnetRouteTable),
+        Condition="3AZCondition",
+    ))
+
+    PublicSubnet4RouteTableAssociation = t.add_resource(SubnetRouteTableAssociation(
+        "PublicSubnet4RouteTableAssociation",
+        SubnetId=Ref(PublicSubnet4),
+        RouteTableId=Ref(PublicSubnetRouteTable),
+        Condition="4AZCondition",
+    ))
+
+    NAT1EIP = t.add_resource(EIP(
+        "NAT1EIP",
+        Domain="vpc",
+        DependsOn=VPCGatewayAttachment_,
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    NAT2EIP = t.add_resource(EIP(
+        "NAT2EIP",
+        Domain="vpc",
+        DependsOn=VPCGatewayAttachment_,
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    NAT3EIP = t.add_resource(EIP(
+        "NAT3EIP",
+        Domain="vpc",
+        DependsOn=VPCGatewayAttachment_,
+        Condition="PrivateSubnets&3AZCondition",
+    ))
+
+    NAT4EIP = t.add_resource(EIP(
+        "NAT4EIP",
+        Domain="vpc",
+        DependsOn=VPCGatewayAttachment_,
+        Condition="PrivateSubnets&4AZCondition",
+    ))
+
+    S3VPCEndpoint = t.add_resource(VPCEndpoint(
+        "S3VPCEndpoint",
+        PolicyDocument={ "Version": "2012-10-17", "Statement": [{ "Action": "*", "Effect": "Allow", "Resource": "*", "Principal": "*" }] },
+        RouteTableIds=[Ref(PrivateSubnet1ARouteTable), Ref(PrivateSubnet2ARouteTable), If("PrivateSubnets&3AZCondition", Ref(PrivateSubnet3ARouteTable), Ref("AWS::NoValue")), If("PrivateSubnets&4AZCondition", Ref(PrivateSubnet4ARouteTable), Ref("AWS::NoValue")), If("AdditionalPrivateSubnetsCondition", Ref(PrivateSubnet1BRouteTable), Ref("AWS::NoValue")), If("AdditionalPrivateSubnetsCondition", Ref(PrivateSubnet2BRouteTable), Ref("AWS::NoValue")), If("AdditionalPrivateSubnets&3AZCondition", Ref(PrivateSubnet3BRouteTable), Ref("AWS::NoValue")), If("AdditionalPrivateSubnets&4AZCondition", Ref(PrivateSubnet4BRouteTable), Ref("AWS::NoValue"))],
+        ServiceName=Sub("com.amazonaws.${AWS::Region}.s3"),
+        VpcId=Ref(VPC_),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    NATGateway1 = t.add_resource(NatGateway(
+        "NATGateway1",
+        AllocationId=GetAtt(NAT1EIP, "AllocationId"),
+        SubnetId=Ref(PublicSubnet1),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    NATGateway2 = t.add_resource(NatGateway(
+        "NATGateway2",
+        AllocationId=GetAtt(NAT2EIP, "AllocationId"),
+        SubnetId=Ref(PublicSubnet2),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    NATGateway3 = t.add_resource(NatGateway(
+        "NATGateway3",
+        AllocationId=GetAtt(NAT3EIP, "AllocationId"),
+        SubnetId=Ref(PublicSubnet3),
+        Condition="PrivateSubnets&3AZCondition",
+    ))
+
+    NATGateway4 = t.add_resource(NatGateway(
+        "NATGateway4",
+        AllocationId=GetAtt(NAT4EIP, "AllocationId"),
+        SubnetId=Ref(PublicSubnet4),
+        Condition="PrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet1ARoute = t.add_resource(Route(
+        "PrivateSubnet1ARoute",
+        RouteTableId=Ref(PrivateSubnet1ARouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway1),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2ARoute = t.add_resource(Route(
+        "PrivateSubnet2ARoute",
+        RouteTableId=Ref(PrivateSubnet2ARouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway2),
+        Condition="PrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet3ARoute = t.add_resource(Route(
+        "PrivateSubnet3ARoute",
+        RouteTableId=Ref(PrivateSubnet3ARouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway3),
+        Condition="PrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet4ARoute = t.add_resource(Route(
+        "PrivateSubnet4ARoute",
+        RouteTableId=Ref(PrivateSubnet4ARouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway4),
+        Condition="PrivateSubnets&4AZCondition",
+    ))
+
+    PrivateSubnet1BRoute = t.add_resource(Route(
+        "PrivateSubnet1BRoute",
+        RouteTableId=Ref(PrivateSubnet1BRouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway1),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet2BRoute = t.add_resource(Route(
+        "PrivateSubnet2BRoute",
+        RouteTableId=Ref(PrivateSubnet2BRouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway2),
+        Condition="AdditionalPrivateSubnetsCondition",
+    ))
+
+    PrivateSubnet3BRoute = t.add_resource(Route(
+        "PrivateSubnet3BRoute",
+        RouteTableId=Ref(PrivateSubnet3BRouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway3),
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+    ))
+
+    PrivateSubnet4BRoute = t.add_resource(Route(
+        "PrivateSubnet4BRoute",
+        RouteTableId=Ref(PrivateSubnet4BRouteTable),
+        DestinationCidrBlock="0.0.0.0/0",
+        NatGatewayId=Ref(NATGateway4),
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+    ))
+
+    t.add_output(Output(
+        "NAT1EIP",
+        Condition="PrivateSubnetsCondition",
+        Description="NAT 1 IP address",
+        Value=Ref(NAT1EIP),
+        Export=Export(Sub("${AWS::StackName}-NAT1EIP")),
+    ))
+
+    t.add_output(Output(
+        "NAT2EIP",
+        Condition="PrivateSubnetsCondition",
+        Description="NAT 2 IP address",
+        Value=Ref(NAT2EIP),
+        Export=Export(Sub("${AWS::StackName}-NAT2EIP")),
+    ))
+
+    t.add_output(Output(
+        "NAT3EIP",
+        Condition="PrivateSubnets&3AZCondition",
+        Description="NAT 3 IP address",
+        Value=Ref(NAT3EIP),
+        Export=Export(Sub("${AWS::StackName}-NAT3EIP")),
+    ))
+
+    t.add_output(Output(
+        "NAT4EIP",
+        Condition="PrivateSubnets&4AZCondition",
+        Description="NAT 4 IP address",
+        Value=Ref(NAT4EIP),
+        Export=Export(Sub("${AWS::StackName}-NAT4EIP")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet1ACIDR",
+        Condition="PrivateSubnetsCondition",
+        Description="Private subnet 1A CIDR in Availability Zone 1",
+        Value=Ref(PrivateSubnet1ACIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet1ACIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet1AID",
+        Condition="PrivateSubnetsCondition",
+        Description="Private subnet 1A ID in Availability Zone 1",
+        Value=Ref(PrivateSubnet1A),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet1AID")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet1BCIDR",
+        Condition="AdditionalPrivateSubnetsCondition",
+        Description="Private subnet 1B CIDR in Availability Zone 1",
+        Value=Ref(PrivateSubnet1BCIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet1BCIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet1BID",
+        Condition="AdditionalPrivateSubnetsCondition",
+        Description="Private subnet 1B ID in Availability Zone 1",
+        Value=Ref(PrivateSubnet1B),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet1BID")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet2ACIDR",
+        Condition="PrivateSubnetsCondition",
+        Description="Private subnet 2A CIDR in Availability Zone 2",
+        Value=Ref(PrivateSubnet2ACIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet2ACIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet2AID",
+        Condition="PrivateSubnetsCondition",
+        Description="Private subnet 2A ID in Availability Zone 2",
+        Value=Ref(PrivateSubnet2A),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet2AID")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet2BCIDR",
+        Condition="AdditionalPrivateSubnetsCondition",
+        Description="Private subnet 2B CIDR in Availability Zone 2",
+        Value=Ref(PrivateSubnet2BCIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet2BCIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet2BID",
+        Condition="AdditionalPrivateSubnetsCondition",
+        Description="Private subnet 2B ID in Availability Zone 2",
+        Value=Ref(PrivateSubnet2B),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet2BID")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet3ACIDR",
+        Condition="PrivateSubnets&3AZCondition",
+        Description="Private subnet 3A CIDR in Availability Zone 3",
+        Value=Ref(PrivateSubnet3ACIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet3ACIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet3AID",
+        Condition="PrivateSubnets&3AZCondition",
+        Description="Private subnet 3A ID in Availability Zone 3",
+        Value=Ref(PrivateSubnet3A),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet3AID")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet3BCIDR",
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+        Description="Private subnet 3B CIDR in Availability Zone 3",
+        Value=Ref(PrivateSubnet3BCIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet3BCIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet3BID",
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+        Description="Private subnet 3B ID in Availability Zone 3",
+        Value=Ref(PrivateSubnet3B),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet3BID")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet4ACIDR",
+        Condition="PrivateSubnets&4AZCondition",
+        Description="Private subnet 4A CIDR in Availability Zone 4",
+        Value=Ref(PrivateSubnet4ACIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet4ACIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet4AID",
+        Condition="PrivateSubnets&4AZCondition",
+        Description="Private subnet 4A ID in Availability Zone 4",
+        Value=Ref(PrivateSubnet4A),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet4AID")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet4BCIDR",
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+        Description="Private subnet 4B CIDR in Availability Zone 4",
+        Value=Ref(PrivateSubnet4BCIDR),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet4BCIDR")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet4BID",
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+        Description="Private subnet 4B ID in Availability Zone 4",
+        Value=Ref(PrivateSubnet4B),
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet4BID")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet1CIDR",
+        Description="Public subnet 1 CIDR in Availability Zone 1",
+        Value=Ref(PublicSubnet1CIDR),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet1CIDR")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet1ID",
+        Description="Public subnet 1 ID in Availability Zone 1",
+        Value=Ref(PublicSubnet1),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet1ID")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet2CIDR",
+        Description="Public subnet 2 CIDR in Availability Zone 2",
+        Value=Ref(PublicSubnet2CIDR),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet2CIDR")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet2ID",
+        Description="Public subnet 2 ID in Availability Zone 2",
+        Value=Ref(PublicSubnet2),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet2ID")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet3CIDR",
+        Condition="3AZCondition",
+        Description="Public subnet 3 CIDR in Availability Zone 3",
+        Value=Ref(PublicSubnet3CIDR),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet3CIDR")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet3ID",
+        Condition="3AZCondition",
+        Description="Public subnet 3 ID in Availability Zone 3",
+        Value=Ref(PublicSubnet3),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet3ID")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet4CIDR",
+        Condition="4AZCondition",
+        Description="Public subnet 4 CIDR in Availability Zone 4",
+        Value=Ref(PublicSubnet4CIDR),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet4CIDR")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnet4ID",
+        Condition="4AZCondition",
+        Description="Public subnet 4 ID in Availability Zone 4",
+        Value=Ref(PublicSubnet4),
+        Export=Export(Sub("${AWS::StackName}-PublicSubnet4ID")),
+    ))
+
+    t.add_output(Output(
+        "S3VPCEndpoint",
+        Condition="PrivateSubnetsCondition",
+        Description="S3 VPC Endpoint",
+        Value=Ref(S3VPCEndpoint),
+        Export=Export(Sub("${AWS::StackName}-S3VPCEndpoint")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet1ARouteTable",
+        Condition="PrivateSubnetsCondition",
+        Value=Ref(PrivateSubnet1ARouteTable),
+        Description="Private subnet 1A route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet1ARouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet1BRouteTable",
+        Condition="AdditionalPrivateSubnetsCondition",
+        Value=Ref(PrivateSubnet1BRouteTable),
+        Description="Private subnet 1B route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet1BRouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet2ARouteTable",
+        Condition="PrivateSubnetsCondition",
+        Value=Ref(PrivateSubnet2ARouteTable),
+        Description="Private subnet 2A route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet2ARouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet2BRouteTable",
+        Condition="AdditionalPrivateSubnetsCondition",
+        Value=Ref(PrivateSubnet2BRouteTable),
+        Description="Private subnet 2B route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet2BRouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet3ARouteTable",
+        Condition="PrivateSubnets&3AZCondition",
+        Value=Ref(PrivateSubnet3ARouteTable),
+        Description="Private subnet 3A route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet3ARouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet3BRouteTable",
+        Condition="AdditionalPrivateSubnets&3AZCondition",
+        Value=Ref(PrivateSubnet3BRouteTable),
+        Description="Private subnet 3B route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet3BRouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet4ARouteTable",
+        Condition="PrivateSubnets&4AZCondition",
+        Value=Ref(PrivateSubnet4ARouteTable),
+        Description="Private subnet 4A route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet4ARouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PrivateSubnet4BRouteTable",
+        Condition="AdditionalPrivateSubnets&4AZCondition",
+        Value=Ref(PrivateSubnet4BRouteTable),
+        Description="Private subnet 4B route table",
+        Export=Export(Sub("${AWS::StackName}-PrivateSubnet4BRouteTable")),
+    ))
+
+    t.add_output(Output(
+        "PublicSubnetRouteTable",
+        Value=Ref(PublicSubnetRouteTable),
+        Description="Public subnet route table",
+        Export=Export(Sub("${AWS::StackName}-PublicSubnetRouteTable")),
+    ))
+
+    t.add_output(Output(
+        "VPCCIDR",
+        Value=Ref(VPCCIDR),
+        Description="VPC CIDR",
+        Export=Export(Sub("${AWS::StackName}-VPCCIDR")),
+    ))
+
+    t.add_output(Output(
+        "VPCID",
+        Value=Ref(VPC_),
+        Description="VPC ID",
+        Export=Export(Sub("${AWS::StackName}-VPCID")),
+    ))
+
+    for name, value in overrides.items():
+        if name not in t.parameters:
+            raise ValueError("unknown parameter {}".format(name))
+        t.parameters[name].Default = value
+    return t
+
+
+if __name__ == '__main__':
+    print(build().to_json())
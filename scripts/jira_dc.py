@@ -1,815 +1,1655 @@
-from troposphere import Base64, Select, FindInMap, GetAtt
-from troposphere import GetAZs, Join, Output, If, And, Not
-from troposphere import Or, Equals, Condition
-from troposphere import Parameter, Ref, Tags, Template
-from troposphere.cloudformation import Init
-from troposphere.cloudfront import Distribution
-from troposphere.cloudfront import DistributionConfig
-from troposphere.cloudfront import Origin, DefaultCacheBehavior
-from troposphere.ec2 import PortRange
-from troposphere.route53 import RecordSet, RecordSetType
-from troposphere.autoscaling import AutoScalingGroup
-from troposphere.rds import DBInstance
-from troposphere.efs import FileSystem
-from troposphere.ec2 import SecurityGroup
+from troposphere import AWSObject, And, Base64, Condition, Equals, Export
+from troposphere import FindInMap, GetAtt, If, ImportValue, Join, Not, Or
+from troposphere import Output, Parameter, Ref, Select, Split, Sub, Tags
+from troposphere import Template, autoscaling, elasticloadbalancingv2
+from troposphere.autoscaling import AutoScalingGroup, InstancesDistribution
+from troposphere.autoscaling import LaunchTemplateOverrides
+from troposphere.autoscaling import LaunchTemplateSpecification
+from troposphere.autoscaling import MixedInstancesPolicy
+from troposphere.autoscaling import PredefinedMetricSpecification
+from troposphere.autoscaling import ScalingPolicy, ScheduledAction
+from troposphere.autoscaling import StepAdjustments
+from troposphere.autoscaling import TargetTrackingConfiguration
+from troposphere.cloudformation import WaitConditionHandle
+from troposphere.cloudwatch import Alarm, MetricDataQuery, MetricDimension
+from troposphere.ec2 import EBSBlockDevice, IamInstanceProfile, LaunchTemplate
+from troposphere.ec2 import LaunchTemplateBlockDeviceMapping
+from troposphere.ec2 import LaunchTemplateData, MetadataOptions, SecurityGroup
 from troposphere.ec2 import SecurityGroupIngress
-from troposphere.rds import DBSubnetGroup
-from troposphere.iam import Role
-from troposphere.kms import Alias
-from troposphere.efs import MountTarget
-from troposphere.elasticloadbalancing import LoadBalancer, HealthCheck, ConnectionDrainingPolicy, AccessLoggingPolicy
-from troposphere.iam import InstanceProfile
-from troposphere.kms import Key
-from troposphere.autoscaling import LaunchConfiguration
-
-
-t = Template()
-
-t.add_version("2010-09-09")
-
-t.add_description("""\
-Atlassian Jira Data Center QS(0035)""")
-DBPoolMaxSize = t.add_parameter(Parameter(
-    "DBPoolMaxSize",
-    Default=20,
-    Type="String",
-    Description="The maximum number of database connections that can be opened at any time",
-))
-
-ClusterNodeInstanceType = t.add_parameter(Parameter(
-    "ClusterNodeInstanceType",
-    Default="c5.xlarge",
-    Type="String",
-    ConstraintDescription="Must be an EC2 instance type from the selection list",
-    Description="Instance type for the cluster application nodes.",
-    AllowedValues=["c4.large", "c4.xlarge", "c4.2xlarge", "c4.4xlarge", "c4.8xlarge", "c5.large", "c5.xlarge", "c5.2xlarge", "c5.4xlarge", "c5.9xlarge", "c5.18xlarge", "c5d.large", "c5d.xlarge", "c5d.2xlarge", "c5d.4xlarge", "c5d.9xlarge", "c5d.18xlarge", "d2.xlarge", "d2.2xlarge", "d2.4xlarge", "d2.8xlarge", "h1.2xlarge", "h1.4xlarge", "h1.8xlarge", "h1.16xlarge", "i3.large", "i3.xlarge", "i3.2xlarge", "i3.4xlarge", "i3.8xlarge", "i3.16xlarge", "i3.metal", "m4.large", "m4.xlarge", "m4.2xlarge", "m4.4xlarge", "m4.10xlarge", "m4.16xlarge", "m5.large", "m5.xlarge", "m5.2xlarge", "m5.4xlarge", "m5.12xlarge", "m5.24xlarge", "m5d.large", "m5d.xlarge", "m5d.2xlarge", "m5d.4xlarge", "m5d.12xlarge", "m5d.24xlarge", "r4.large", "r4.xlarge", "r4.2xlarge", "r4.4xlarge", "r4.8xlarge", "r4.16xlarge", "r5.large", "r5.xlarge", "r5.2xlarge", "r5.4xlarge", "r5.12xlarge", "r5.24xlarge", "r5d.large", "r5d.xlarge", "r5d.2xlarge", "r5d.4xlarge", "r5d.12xlarge", "r5d.24xlarge", "t2.medium", "t2.large", "t2.xlarge", "t2.2xlarge", "t3.medium", "t3.large", "t3.xlarge", "t3.2xlarge", "x1.16xlarge", "x1.32xlarge", "x1e.xlarge", "x1e.2xlarge", "x1e.4xlarge", "x1e.8xlarge", "x1e.16xlarge", "x1e.32xlarge", "z1d.large", "z1d.xlarge", "z1d.2xlarge", "z1d.3xlarge", "z1d.6xlarge", "z1d.12xlarge"],
-))
-
-TomcatEnableLookups = t.add_parameter(Parameter(
-    "TomcatEnableLookups",
-    Default=False,
-    Type="String",
-    Description="Set to true if you want calls to request.getRemoteHost() to perform DNS lookups in order to return the actual host name of the remote client",
-))
-
-ClusterNodeMin = t.add_parameter(Parameter(
-    "ClusterNodeMin",
-    Default=1,
-    Type="Number",
-    Description="Set to 1 for new deployment. Can be updated post launch.",
-))
-
-DBTimeBetweenEvictionRunsMillis = t.add_parameter(Parameter(
-    "DBTimeBetweenEvictionRunsMillis",
-    Default=60000,
-    Type="String",
-    Description="The number of milliseconds to sleep between runs of the idle object eviction thread. When non-positive, no idle object eviction thread will be run",
-))
-
-DBPassword = t.add_parameter(Parameter(
-    "DBPassword",
-    Type="String",
-    Description="Database user account password.",
-    MinLength=8,
-    AllowedPattern="[a-zA-Z0-9]*",
-    NoEcho=True,
-    MaxLength=128,
-    ConstraintDescription="Must be at least 8 alphanumeric characters.",
-))
-
-DBMaxWaitMillis = t.add_parameter(Parameter(
-    "DBMaxWaitMillis",
-    Default=10000,
-    Type="String",
-    Description="The length of time (in milliseconds) that Jira is allowed to wait for a database connection to become available (while there are no free ones available in the pool), before returning an error",
-))
-
-ClusterNodeVolumeSize = t.add_parameter(Parameter(
-    "ClusterNodeVolumeSize",
-    Default=50,
-    Type="Number",
-    Description="Size of cluster node root volume in Gb (note - size based upon Application indexes x 4)",
-))
-
-KeyPairName = t.add_parameter(Parameter(
-    "KeyPairName",
-    Default="",
-    Type="String",
-    ConstraintDescription="Must be the name of an existing EC2 Key Pair.",
-    Description="The EC2 Key Pair to allow SSH access to the instances",
-))
-
-DBTestWhileIdle = t.add_parameter(Parameter(
-    "DBTestWhileIdle",
-    Default=True,
-    Type="String",
-    Description="Periodically tests if the database connection is valid when it is idle",
-))
-
-TomcatProtocol = t.add_parameter(Parameter(
-    "TomcatProtocol",
-    Default="HTTP/1.1",
-    Type="String",
-    Description="Sets the protocol to handle incoming traffic",
-))
-
-TomcatRedirectPort = t.add_parameter(Parameter(
-    "TomcatRedirectPort",
-    Default=8443,
-    Type="String",
-    Description="The port number for Catalina to use when automatically redirecting a non-SSL connector actioning a redirect to a SSL URI",
-))
-
-DeploymentAutomationPlaybook = t.add_parameter(Parameter(
-    "DeploymentAutomationPlaybook",
-    Default="aws_jira_dc_node.yml",
-    Type="String",
-    Description="The Ansible playbook to invoke to initialise the Jira node on first start.",
-))
-
-JiraProduct = t.add_parameter(Parameter(
-    "JiraProduct",
-    Default="Software",
-    ConstraintDescription="Must be \"Core\", \"Software\", or \"ServiceDesk\"",
-    Type="String",
-    Description="The Jira product to install.",
-    AllowedValues=["Core", "Software", "ServiceDesk"],
-))
-
-DBMaxIdle = t.add_parameter(Parameter(
-    "DBMaxIdle",
-    Default=20,
-    Type="String",
-    Description="The maximum number of database connections that are allowed to remain idle in the pool",
-))
-
-DBStorage = t.add_parameter(Parameter(
-    "DBStorage",
-    Default=200,
-    Type="Number",
-    Description="Database allocated storage size, in gigabytes (GB)",
-))
-
-DBPoolMinSize = t.add_parameter(Parameter(
-    "DBPoolMinSize",
-    Default=20,
-    Type="String",
-    Description="The minimum number of idle database connections that are kept open at any time",
-))
-
-DBTestOnBorrow = t.add_parameter(Parameter(
-    "DBTestOnBorrow",
-    Default=False,
-    Type="String",
-    Description="Tests if the database connection is valid when it is borrowed from the database connection pool by Jira",
-))
-
-TomcatConnectionTimeout = t.add_parameter(Parameter(
-    "TomcatConnectionTimeout",
-    Default=20000,
-    Type="String",
-    Description="The number of milliseconds this Connector will wait, after accepting a connection, for the request URI line to be presented",
-))
-
-DeploymentAutomationBranch = t.add_parameter(Parameter(
-    "DeploymentAutomationBranch",
-    Default="master",
-    Type="String",
-    Description="The deployment automation repository branch to pull from.",
-))
-
-JiraVersion = t.add_parameter(Parameter(
-    "JiraVersion",
-    Default="7.13.3",
-    AllowedPattern="(\\d+\\.\\d+\\.\\d+(-?.*))|(latest)",
-    Type="String",
-    ConstraintDescription="Must be a valid version number or 'latest'; for example, 8.1.0 for Jira Software, or 4.1.0 for ServiceDesk.",
-    Description="The version of Jira Software or Jira Service Desk to install. Find valid versions at https://confluence.atlassian.com/x/TVlNLg (Jira Software), https://confluence.atlassian.com/x/jh9-Lg (Jira Service Desk), or https://confluence.atlassian.com/x/XM2EO (Atlassian Enterprise Releases).",
-))
-
-DeploymentAutomationKeyName = t.add_parameter(Parameter(
-    "DeploymentAutomationKeyName",
-    Default="",
-    Type="String",
-    Description="Named KeyPair name to use with this repository. The key should be imported into the SSM parameter store. (Optional)",
-))
-
-DeploymentAutomationRepository = t.add_parameter(Parameter(
-    "DeploymentAutomationRepository",
-    Default="https://bitbucket.org/atlassian/dc-deployments-automation.git",
-    Type="String",
-    Description="The deployment automation repository to use for per-node initialisation. Leave this as default unless you have customisations.",
-))
-
-DBRemoveAbandoned = t.add_parameter(Parameter(
-    "DBRemoveAbandoned",
-    Default=True,
-    Type="String",
-    Description="Flag to remove abandoned database connections if they exceed the Removed Abandoned Timeout",
-))
-
-MailEnabled = t.add_parameter(Parameter(
-    "MailEnabled",
-    Default=True,
-    Type="String",
-    ConstraintDescription="Must be 'true' or 'false'.",
-    Description="Enable mail processing and sending",
-    AllowedValues=[True, False],
-))
-
-TomcatDefaultConnectorPort = t.add_parameter(Parameter(
-    "TomcatDefaultConnectorPort",
-    Default=8080,
-    Type="String",
-    Description="The port on which to serve the application",
-))
-
-TomcatAcceptCount = t.add_parameter(Parameter(
-    "TomcatAcceptCount",
-    Default=10,
-    Type="String",
-    Description="The maximum queue length for incoming connection requests when all possible request processing threads are in use",
-))
-
-CatalinaOpts = t.add_parameter(Parameter(
-    "CatalinaOpts",
-    Default="",
-    Type="String",
-    Description="Pass in any additional jvm options to tune Catalina",
-))
-
-CustomDnsName = t.add_parameter(Parameter(
-    "CustomDnsName",
-    Default="",
-    Type="String",
-    Description="Use custom existing DNS name for your Data Center instance. This will take precedence over HostedZone. Please note: you must own the domain and configure it to point at the load balancer.",
-))
-
-DBIops = t.add_parameter(Parameter(
-    "DBIops",
-    Description="Must be in the range of 1000 - 30000 and a multiple of 1000. This value is only used with Provisioned IOPS. Note: The ratio of IOPS per allocated-storage must be between 3.00 and 10.00",
-    Default=1000,
-    ConstraintDescription="Must be in the range 1000 - 30000",
-    MaxValue=30000,
-    MinValue=1000,
-    Type="Number",
-))
-
-TomcatMaxThreads = t.add_parameter(Parameter(
-    "TomcatMaxThreads",
-    Default=200,
-    Type="String",
-    Description="The maximum number of request processing threads to be created by this Connector, which therefore determines the maximum number of simultaneous requests that can be handled",
-))
-
-SSLCertificateARN = t.add_parameter(Parameter(
-    "SSLCertificateARN",
-    Default="",
-    MinLength=0,
-    Type="String",
-    Description="Amazon Resource Name (ARN) of your SSL certificate. Every certificate created with the AWS Certificate Manager has a corresponding ARN. To use a certificate generated outside of AWS, you need to import it into AWS Certificate Manager first. AWS Certificate Manager will provide you with its ARN, which you can use here.",
-    MaxLength=90,
-))
-
-DBMinEvictableIdleTimeMillis = t.add_parameter(Parameter(
-    "DBMinEvictableIdleTimeMillis",
-    Default=180000,
-    Type="String",
-    Description="The minimum amount of time an object may sit idle in the database connection pool before it is eligible for eviction by the idle object eviction",
-))
-
-DBMasterUserPassword = t.add_parameter(Parameter(
-    "DBMasterUserPassword",
-    Type="String",
-    Description="Database admin account password.",
-    MinLength=8,
-    AllowedPattern="[a-zA-Z0-9]*",
-    NoEcho=True,
-    MaxLength=128,
-    ConstraintDescription="Must be at least 8 alphanumeric characters.",
-))
-
-AssociatePublicIpAddress = t.add_parameter(Parameter(
-    "AssociatePublicIpAddress",
-    Default=True,
-    Type="String",
-    ConstraintDescription="Must be 'true' or 'false'.",
-    Description="Controls if the EC2 instances are assigned a public IP address",
-    AllowedValues=[True, False],
-))
-
-DBStorageType = t.add_parameter(Parameter(
-    "DBStorageType",
-    Default="General Purpose (SSD)",
-    Type="String",
-    ConstraintDescription="Must be 'General Purpose (SSD)' or 'Provisioned IOPS'.",
-    Description="Database storage type",
-    AllowedValues=["General Purpose (SSD)", "Provisioned IOPS"],
-))
-
-DBStorageEncrypted = t.add_parameter(Parameter(
-    "DBStorageEncrypted",
-    Default=False,
-    Type="String",
-    Description="Whether or not to encrypt the database",
-    AllowedValues=[True, False],
-))
-
-TomcatScheme = t.add_parameter(Parameter(
-    "TomcatScheme",
-    Default="http",
-    Type="String",
-    Description="The name of the protocol you wish to have returned, ie 'https' for an SSL Connector. The value of this setting also configures Tomcat's proxy port (443/80) and secure (true/false) settings appropriately.",
-    AllowedValues=["http", "https"],
-))
-
-TomcatMinSpareThreads = t.add_parameter(Parameter(
-    "TomcatMinSpareThreads",
-    Default=10,
-    Type="String",
-    Description="The minimum number of threads always kept running",
-))
-
-JvmHeapOverride = t.add_parameter(Parameter(
-    "JvmHeapOverride",
-    Default="",
-    Type="String",
-    Description="Override the default amount of memory to allocate to the JVM for your instance type - set size in meg or gig e.g. 1024m or 1g",
-))
-
-DBMultiAZ = t.add_parameter(Parameter(
-    "DBMultiAZ",
-    Default=True,
-    Type="String",
-    ConstraintDescription="Must be 'true' or 'false'.",
-    Description="Whether to provision a multi-AZ RDS instance.",
-    AllowedValues=[True, False],
-))
-
-DBMinIdle = t.add_parameter(Parameter(
-    "DBMinIdle",
-    Default=10,
-    Type="String",
-    Description="The minimum number of idle database connections that are kept open at any time",
-))
-
-DBRemoveAbandonedTimeout = t.add_parameter(Parameter(
-    "DBRemoveAbandonedTimeout",
-    Default=60,
-    Type="String",
-    Description="The length of time (in seconds) that a database connection can be idle before it is considered abandoned",
-))
-
-HostedZone = t.add_parameter(Parameter(
-    "HostedZone",
-    Default="",
-    Type="String",
-    ConstraintDescription="Must be the name of an existing Route53 Hosted Zone.",
-    Description="The domain name of the Route53 PRIVATE Hosted Zone in which to create cnames",
-))
-
-DBInstanceClass = t.add_parameter(Parameter(
-    "DBInstanceClass",
-    Default="db.m4.large",
-    Type="String",
-    ConstraintDescription="Must be a valid RDS instance class, from the selection list",
-    Description="RDS instance type",
-    AllowedValues=["db.m4.large", "db.m4.xlarge", "db.m4.2xlarge", "db.m4.4xlarge", "db.m4.10xlarge", "db.m4.16xlarge", "db.r4.large", "db.r4.xlarge", "db.r4.2xlarge", "db.r4.4xlarge", "db.r4.8xlarge", "db.r4.16xlarge", "db.t2.medium", "db.t2.large", "db.t2.xlarge", "db.t2.2xlarge"],
-))
-
-CidrBlock = t.add_parameter(Parameter(
-    "CidrBlock",
-    Description="CIDR Block allowed to access the Atlassian product. This should be set to a trusted IP range; if you want to give public access use '0.0.0.0/0'.",
-    ConstraintDescription="Must be a valid IP CIDR range of the form x.x.x.x/x.",
-    AllowedPattern="(\\d{1,3})\\.(\\d{1,3})\\.(\\d{1,3})\\.(\\d{1,3})/(\\d{1,2})",
-    MinLength=9,
-    MaxLength=18,
-    Type="String",
-))
-
-TomcatContextPath = t.add_parameter(Parameter(
-    "TomcatContextPath",
-    Default="",
-    AllowedPattern="^(\\/[A-z_\\-0-9\\.]+)?$",
-    Type="String",
-    Description="The context path of this web application, which is matched against the beginning of each request URI to select the appropriate web application for processing. If used, must include leading \"/\"",
-))
-
-ClusterNodeMax = t.add_parameter(Parameter(
-    "ClusterNodeMax",
-    Default=1,
-    Type="Number",
-    Description="Maximum number of nodes in the cluster.",
-))
-
-t.add_condition("DoSetDBMasterUserPassword",
-    Not(Equals(Ref(DBMasterUserPassword), ""))
-)
-
-t.add_condition("SSLScheme",
-    Equals(Ref(TomcatScheme), "https")
-)
-
-t.add_condition("KeyProvided",
-    Not(Equals(Ref(KeyPairName), ""))
-)
-
-t.add_condition("UseDatabaseEncryption",
-    Equals(Ref(DBStorageEncrypted), True)
-)
-
-t.add_condition("OverrideHeap",
-    Not(Equals(Ref(JvmHeapOverride), ""))
-)
-
-t.add_condition("UseContextPath",
-    Not(Equals(Ref(TomcatContextPath), ""))
-)
-
-t.add_condition("UseCustomDnsName",
-    Not(Equals(Ref(CustomDnsName), ""))
-)
-
-t.add_condition("UsePublicIp",
-    Equals(Ref(AssociatePublicIpAddress), "true")
-)
-
-t.add_condition("DBProvisionedIops",
-    Equals(Ref(DBStorageType), "Provisioned IOPS")
-)
-
-t.add_condition("UseHostedZone",
-    Not(Equals(Ref(HostedZone), ""))
-)
-
-t.add_condition("DisableMail",
-    Not(Equals(Ref(MailEnabled), True))
-)
-
-t.add_condition("DoSSL",
-    Not(Equals(Ref(SSLCertificateARN), ""))
-)
-
-t.add_mapping("JIRAProduct2NameAndVersion",
-{u'Core': {u'fulldisplayname': u'"Atlassian Jira Core"',
-           u'name': u'jira-core',
-           u'shortdisplayname': u'"Jira Core"'},
- u'ServiceDesk': {u'fulldisplayname': u'"Atlassian Jira Service Desk"',
-                  u'name': u'servicedesk',
-                  u'shortdisplayname': u'"Jira SD"'},
- u'Software': {u'fulldisplayname': u'"Atlassian Jira Software"',
-               u'name': u'jira-software',
-               u'shortdisplayname': u'"Jira SW"'}}
-)
-
-t.add_mapping("AWSInstanceType2Arch",
-{u'c4.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c4.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c4.8xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c4.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'4608m'},
- u'c5.18xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5.9xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5.large': {u'Arch': u'HVM64', u'Jvmheap': u'2048m'},
- u'c5.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'5120m'},
- u'c5d.18xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5d.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5d.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5d.9xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'c5d.large': {u'Arch': u'HVM64', u'Jvmheap': u'2048m'},
- u'c5d.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'5120m'},
- u'd2.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'd2.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'd2.8xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'd2.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'h1.16xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'h1.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'h1.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'h1.8xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'i3.16xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'i3.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'i3.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'i3.8xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'i3.large': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'i3.metal': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'i3.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm4.10xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm4.16xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm4.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm4.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm4.large': {u'Arch': u'HVM64', u'Jvmheap': u'5120m'},
- u'm4.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5.12xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5.24xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5.large': {u'Arch': u'HVM64', u'Jvmheap': u'5120m'},
- u'm5.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5d.12xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5d.24xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5d.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5d.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'm5d.large': {u'Arch': u'HVM64', u'Jvmheap': u'5120m'},
- u'm5d.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r4.16xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r4.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r4.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r4.8xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r4.large': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r4.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5.12xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5.24xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5.large': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5d.12xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5d.24xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5d.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5d.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5d.large': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'r5d.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u't2.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u't2.large': {u'Arch': u'HVM64', u'Jvmheap': u'5120m'},
- u't2.medium': {u'Arch': u'HVM64', u'Jvmheap': u'2048m'},
- u't2.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u't3.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u't3.large': {u'Arch': u'HVM64', u'Jvmheap': u'5120m'},
- u't3.medium': {u'Arch': u'HVM64', u'Jvmheap': u'2048m'},
- u't3.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1.16xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1.32xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1e.16xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1e.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1e.32xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1e.4xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1e.8xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'x1e.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'z1d.12xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'z1d.2xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'z1d.3xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'z1d.6xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'z1d.large': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'},
- u'z1d.xlarge': {u'Arch': u'HVM64', u'Jvmheap': u'12288m'}}
-)
-
-t.add_mapping("AWSRegionArch2AMI",
-{u'ap-northeast-1': {u'HVM64': u'ami-00d101850e971728d',
-                     u'HVMG2': u'NOT_SUPPORTED'},
- u'ap-northeast-2': {u'HVM64': u'ami-08ab3f7e72215fe91',
-                     u'HVMG2': u'NOT_SUPPORTED'},
- u'ap-south-1': {u'HVM64': u'ami-00e782930f1c3dbc7',
-                 u'HVMG2': u'NOT_SUPPORTED'},
- u'ap-southeast-1': {u'HVM64': u'ami-0b5a47f8865280111',
-                     u'HVMG2': u'NOT_SUPPORTED'},
- u'ap-southeast-2': {u'HVM64': u'ami-0fb7513bcdc525c3b',
-                     u'HVMG2': u'NOT_SUPPORTED'},
- u'ca-central-1': {u'HVM64': u'ami-08a9b721ecc5b0a53',
-                   u'HVMG2': u'NOT_SUPPORTED'},
- u'eu-central-1': {u'HVM64': u'ami-0ebe657bc328d4e82',
-                   u'HVMG2': u'NOT_SUPPORTED'},
- u'eu-north-1': {u'HVM64': u'ami-1fb13961', u'HVMG2': u'NOT_SUPPORTED'},
- u'eu-west-1': {u'HVM64': u'ami-030dbca661d402413',
-                u'HVMG2': u'NOT_SUPPORTED'},
- u'eu-west-2': {u'HVM64': u'ami-0009a33f033d8b7b6',
-                u'HVMG2': u'NOT_SUPPORTED'},
- u'eu-west-3': {u'HVM64': u'ami-0ebb3a801d5fb8b9b',
-                u'HVMG2': u'NOT_SUPPORTED'},
- u'sa-east-1': {u'HVM64': u'ami-058141e091292ecf0',
-                u'HVMG2': u'NOT_SUPPORTED'},
- u'us-east-1': {u'HVM64': u'ami-0c6b1d09930fac512',
-                u'HVMG2': u'NOT_SUPPORTED'},
- u'us-east-2': {u'HVM64': u'ami-0ebbf2179e615c338',
-                u'HVMG2': u'NOT_SUPPORTED'},
- u'us-west-1': {u'HVM64': u'ami-015954d5e5548d13b',
-                u'HVMG2': u'NOT_SUPPORTED'},
- u'us-west-2': {u'HVM64': u'ami-0cb72367e98845d43',
-                u'HVMG2': u'NOT_SUPPORTED'}}
-)
-
-LoadBalancerCname = t.add_resource(RecordSetType(
-    "LoadBalancerCname",
-    Comment="Route53 cname for the ALB",
-    Name=Join(".", [Ref("AWS::StackName"), Ref(HostedZone)]),
-    HostedZoneName=Ref(HostedZone),
-    ResourceRecords=[GetAtt("LoadBalancer", "DNSName")],
-    TTL=900,
-    Type="CNAME",
-    Condition="UseHostedZone",
-))
-
-EFSCname = t.add_resource(RecordSetType(
-    "EFSCname",
-    Comment="Route53 cname for the efs",
-    Name=If("UseHostedZone", Join(".", [Ref("AWS::StackName"), "efs", Ref(HostedZone)]), ""),
-    HostedZoneName=Ref(HostedZone),
-    ResourceRecords=[Join(".", [Ref("ElasticFileSystem"), "efs", Ref("AWS::Region"), "amazonaws.com."])],
-    TTL=900,
-    Type="CNAME",
-    Condition="UseHostedZone",
-))
-
-DBCname = t.add_resource(RecordSetType(
-    "DBCname",
-    Comment="Route53 cname for the RDS",
-    Name=Join(".", [Ref("AWS::StackName"), "db", Ref(HostedZone)]),
-    HostedZoneName=Ref(HostedZone),
-    ResourceRecords=[GetAtt("DB", "Endpoint.Address")],
-    TTL=900,
-    Type="CNAME",
-    Condition="UseHostedZone",
-))
-
-ClusterNodeGroup = t.add_resource(AutoScalingGroup(
-    "ClusterNodeGroup",
-    DesiredCapacity=Ref(ClusterNodeMin),
-    Tags=Tags(
-        Name={ "Fn::Sub": ["${StackName} Jira Node", { "StackName": Ref("AWS::StackName") }] },
-        Cluster=Ref("AWS::StackName"),
-    ),
-    LaunchConfigurationName=Ref("ClusterNodeLaunchConfig"),
-    MinSize=Ref(ClusterNodeMin),
-    MaxSize=Ref(ClusterNodeMax),
-    VPCZoneIdentifier={ "Fn::Split": [",", { "Fn::ImportValue": "ATL-PriNets" }] },
-    LoadBalancerNames=[Ref("LoadBalancer")],
-))
-
-DB = t.add_resource(DBInstance(
-    "DB",
-    Engine="postgres",
-    MultiAZ=Ref(DBMultiAZ),
-    Tags=Tags(
-        Name={ "Fn::Sub": ["${StackName} Jira PostgreSQL Database", { "StackName": Ref("AWS::StackName") }] },
-    ),
-    MasterUsername="postgres",
-    MasterUserPassword=If("DoSetDBMasterUserPassword", Ref(DBMasterUserPassword), Ref("AWS::NoValue")),
-    KmsKeyId=If("UseDatabaseEncryption", GetAtt("EncryptionKey", "Arn"), Ref("AWS::NoValue")),
-    StorageType=If("DBProvisionedIops", "io1", "gp2"),
-    VPCSecurityGroups=[Ref("SecurityGroup")],
-    Iops=If("DBProvisionedIops", Ref(DBIops), Ref("AWS::NoValue")),
-    StorageEncrypted=If("UseDatabaseEncryption", Ref(DBStorageEncrypted), Ref("AWS::NoValue")),
-    AllocatedStorage=Ref(DBStorage),
-    EngineVersion=9.6,
-    DBInstanceClass=Ref(DBInstanceClass),
-    DBSubnetGroupName=Ref("DBSubnetGroup"),
-    DBInstanceIdentifier=Ref("AWS::StackName"),
-))
-
-ElasticFileSystem = t.add_resource(FileSystem(
-    "ElasticFileSystem",
-    FileSystemTags=[{ "Value": Join(" ", [Ref("AWS::StackName"), "cluster shared-files"]), "Key": "Name" }, { "Value": Ref("AWS::StackId"), "Key": "Application" }],
-))
-
-SecurityGroup = t.add_resource(SecurityGroup(
-    "SecurityGroup",
-    SecurityGroupIngress=[{ "ToPort": 22, "IpProtocol": "tcp", "CidrIp": Ref(CidrBlock), "FromPort": 22 }, { "ToPort": 80, "IpProtocol": "tcp", "CidrIp": Ref(CidrBlock), "FromPort": 80 }, { "ToPort": 443, "IpProtocol": "tcp", "CidrIp": Ref(CidrBlock), "FromPort": 443 }],
-    VpcId={ "Fn::ImportValue": "ATL-VPCID" },
-    GroupDescription="Security group allowing SSH and HTTP/HTTPS access",
-    Tags=Tags(
-        Name=Join(" ", [Ref("AWS::StackName"), "sg"]),
-    ),
-))
-
-SecurityGroupIngress = t.add_resource(SecurityGroupIngress(
-    "SecurityGroupIngress",
-    ToPort=-1,
-    IpProtocol=-1,
-    SourceSecurityGroupId=Ref(SecurityGroup),
-    GroupId=Ref(SecurityGroup),
-    FromPort=-1,
-))
-
-DBSubnetGroup = t.add_resource(DBSubnetGroup(
-    "DBSubnetGroup",
-    SubnetIds={ "Fn::Split": [",", { "Fn::ImportValue": "ATL-PriNets" }] },
-    DBSubnetGroupDescription="DBSubnetGroup",
-))
-
-JiraClusterNodeRole = t.add_resource(Role(
-    "JiraClusterNodeRole",
-    Path="/",
-    ManagedPolicyArns=["arn:aws:iam::aws:policy/service-role/AmazonEC2RoleforSSM"],
-    Policies=[{ "PolicyName": "JiraClusterNodePolicy", "PolicyDocument": { "Version": "2012-10-17", "Statement": [{ "Action": ["ec2:DescribeInstances", "route53:ListHostedZones", "route53:ListResourceRecordSet"], "Resource": ["*"], "Effect": "Allow" }, { "Action": ["route53:ChangeResourceRecordSets"], "Resource": ["arn:aws:route53:::healthcheck/*", "arn:aws:route53:::change/*", "arn:aws:route53:::hostedzone/*", "arn:aws:route53:::delegationset/*"], "Effect": "Allow" }] } }],
-    AssumeRolePolicyDocument={ "Version": "2012-10-17", "Statement": [{ "Action": ["sts:AssumeRole"], "Effect": "Allow", "Principal": { "Service": ["ec2.amazonaws.com"] } }] },
-))
-
-EncryptionKeyAlias = t.add_resource(Alias(
-    "EncryptionKeyAlias",
-    TargetKeyId=Ref("EncryptionKey"),
-    AliasName={ "Fn::Sub": "alias/${AWS::StackName}" },
-    Condition="UseDatabaseEncryption",
-))
-
-EFSMountAz1 = t.add_resource(MountTarget(
-    "EFSMountAz1",
-    SubnetId=Select(0, { "Fn::Split": [",", { "Fn::ImportValue": "ATL-PriNets" }] }),
-    FileSystemId=Ref(ElasticFileSystem),
-    SecurityGroups=[Ref(SecurityGroup)],
-))
-
-LoadBalancer = t.add_resource(LoadBalancer(
-    "LoadBalancer",
-    AppCookieStickinessPolicy=[{ "PolicyName": "JSessionIdStickiness", "CookieName": "JSESSIONID" }],
-    ConnectionDrainingPolicy=ConnectionDrainingPolicy(
-        Enabled=True,
-        Timeout=30,
-    ),
-    Subnets={ "Fn::Split": [",", { "Fn::ImportValue": "ATL-PubNets" }] },
-    HealthCheck=HealthCheck(
-        HealthyThreshold=2,
-        Interval=30,
-        Target=If("UseContextPath", Join("", ["HTTP:", Ref(TomcatDefaultConnectorPort), Ref(TomcatContextPath), "/status"]), Join("", ["HTTP:", Ref(TomcatDefaultConnectorPort), "/status"])),
-        Timeout=29,
-        UnhealthyThreshold=2,
-    ),
-    Tags=Tags(
-        Name={ "Fn::Sub": ["${StackName}-LoadBalancer", { "StackName": Ref("AWS::StackName") }] },
-        Cluster=Ref("AWS::StackName"),
-    ),
-    Listeners=[{ "InstancePort": Ref(TomcatDefaultConnectorPort), "PolicyNames": ["JSessionIdStickiness"], "LoadBalancerPort": 80, "Protocol": "HTTP", "InstanceProtocol": "HTTP" }, If("DoSSL", { "InstancePort": Ref(TomcatDefaultConnectorPort), "Protocol": "HTTPS", "InstanceProtocol": "HTTP", "LoadBalancerPort": "443", "PolicyNames": ["JSessionIdStickiness"], "SSLCertificateId": Ref(SSLCertificateARN) }, Ref("AWS::NoValue"))],
-    CrossZone=True,
-    SecurityGroups=[Ref(SecurityGroup)],
-    ConnectionSettings={ "IdleTimeout": 3600 },
-    Scheme=If("UsePublicIp", "internet-facing", "internal"),
-))
-
-EFSMountAz2 = t.add_resource(MountTarget(
-    "EFSMountAz2",
-    SubnetId=Select(1, { "Fn::Split": [",", { "Fn::ImportValue": "ATL-PriNets" }] }),
-    FileSystemId=Ref(ElasticFileSystem),
-    SecurityGroups=[Ref(SecurityGroup)],
-))
-
-JiraClusterNodeInstanceProfile = t.add_resource(InstanceProfile(
-    "JiraClusterNodeInstanceProfile",
-    Path="/",
-    Roles=[Ref(JiraClusterNodeRole)],
-))
-
-EncryptionKey = t.add_resource(Key(
-    "EncryptionKey",
-    KeyPolicy={ "Version": "2012-10-17", "Id": { "Fn::Sub": "${AWS::StackName}" }, "Statement": [{ "Action": "kms:*", "Resource": "*", "Effect": "Allow", "Principal": { "AWS": [{ "Fn::Sub": "arn:aws:iam::${AWS::AccountId}:root" }] } }] },
-    Tags=Tags(
-        Name={ "Fn::Sub": ["${StackName} Encryption Key", { "StackName": Ref("AWS::StackName") }] },
-    ),
-    Condition="UseDatabaseEncryption",
-))
-
-ClusterNodeLaunchConfig = t.add_resource(LaunchConfiguration(
-    "ClusterNodeLaunchConfig",
-    Comment="",
-    Metadata=Init(
-        { "config": { "files": { "/opt/atlassian/bin/clone_deployment_repo": { "content": { "Fn::Sub": "#!/bin/bash\nkey_location=/root/.ssh/deployment_repo_key\nkey_name=\"${DeploymentAutomationKeyName}\"\n\nyum install -y git\nif [[ ! -z \"$key_name\" ]]; then\n    # Ensure awscli is up to date\n    yum install -y awscli jq\n    key_val=$(aws --region=${AWS::Region} ssm get-parameters --names \"$key_name\" --with-decryption | jq --raw-output '.Parameters[0] .Value')\n    echo -e $key_val > $key_location\n    chmod 600 $key_location\n    export GIT_SSH_COMMAND=\"ssh -o IdentitiesOnly=yes -o StrictHostKeyChecking=no -i $key_location\"\nelse\n    export GIT_SSH_COMMAND=\"ssh -o IdentitiesOnly=yes -o StrictHostKeyChecking=no\"\nfi\n\ngit clone \"${DeploymentAutomationRepository}\" -b \"${DeploymentAutomationBranch}\" /opt/atlassian/dc-deployments-automation/\n" }, "owner": "root", "group": "root", "mode": "000750" }, "/etc/atl": { "owner": "root", "content": Join("\n", ["ATL_PRODUCT_FAMILY=jira", "ATL_DB_DRIVER=org.postgresql.Driver", "ATL_JDBC_DB_NAME=jira", "ATL_JDBC_USER=atljira", "ATL_APP_DATA_MOUNT_ENABLED=false", "ATL_ENABLED_PRODUCTS=Jira", "ATL_ENABLED_SHARED_HOMES=", "ATL_NGINX_ENABLED=false", "ATL_POSTGRES_ENABLED=false", "ATL_RELEASE_S3_BUCKET=atlassian-software", "ATL_RELEASE_S3_PATH=releases", "ATL_SSL_SELF_CERT_ENABLED=false", "", { "Fn::Sub": ["ATL_PRODUCT_EDITION=${Edition}", { "Edition": Ref(JiraProduct) }] }, { "Fn::Sub": ["ATL_PRODUCT_VERSION=${ProductVersion}", { "ProductVersion": Ref(JiraVersion) }] }, { "Fn::Sub": ["ATL_EFS_ID=${ElasticFileSystem}", { "ElasticFileSystem": Ref(ElasticFileSystem) }] }, If("SSLScheme", "ATL_SSL_PROXY=true", Ref("AWS::NoValue")), { "Fn::Sub": ["ATL_AWS_STACK_NAME=${StackName}", { "StackName": Ref("AWS::StackName") }] }, { "Fn::Sub": ["ATL_CATALINA_OPTS=\"${CatalinaOpts} ${MailOpts}\"", { "CatalinaOpts": Ref(CatalinaOpts), "MailOpts": If("DisableMail", "-Datlassian.mail.senddisabled=true -Datlassian.mail.fetchdisabled=true -Datlassian.mail.popdisabled=true", "") }] }, { "Fn::Sub": ["ATL_DB_HOST=${DBEndpointAddress}", { "DBEndpointAddress": GetAtt(DB, "Endpoint.Address") }] }, { "Fn::Sub": ["ATL_DB_MAXIDLE=${DBMaxIdle}", { "DBMaxIdle": Ref(DBMaxIdle) }] }, { "Fn::Sub": ["ATL_DB_MAXWAITMILLIS=${DBMaxWaitMillis}", { "DBMaxWaitMillis": Ref(DBMaxWaitMillis) }] }, { "Fn::Sub": ["ATL_DB_MINEVICTABLEIDLETIMEMILLIS=${DBMinEvictableIdleTimeMillis}", { "DBMinEvictableIdleTimeMillis": Ref(DBMinEvictableIdleTimeMillis) }] }, { "Fn::Sub": ["ATL_DB_MINIDLE=${DBMinIdle}", { "DBMinIdle": Ref(DBMinIdle) }] }, { "Fn::Sub": ["ATL_DB_ROOT_PASSWORD='${DBMasterUserPassword}'", { "DBMasterUserPassword": Ref(DBMasterUserPassword) }] }, { "Fn::Sub": ["ATL_DB_POOLMAXSIZE=${DBPoolMaxSize}", { "DBPoolMaxSize": Ref(DBPoolMaxSize) }] }, { "Fn::Sub": ["ATL_DB_POOLMINSIZE=${DBPoolMinSize}", { "DBPoolMinSize": Ref(DBPoolMinSize) }] }, { "Fn::Sub": ["ATL_DB_PORT=${DBEndpointPort}", { "DBEndpointPort": GetAtt(DB, "Endpoint.Port") }] }, { "Fn::Sub": ["ATL_DB_REMOVEABANDONED=${DBRemoveAbandoned}", { "DBRemoveAbandoned": Ref(DBRemoveAbandoned) }] }, { "Fn::Sub": ["ATL_DB_REMOVEABANDONEDTIMEOUT=${DBRemoveAbandonedTimeout}", { "DBRemoveAbandonedTimeout": Ref(DBRemoveAbandonedTimeout) }] }, { "Fn::Sub": ["ATL_DB_TESTONBORROW=${DBTestOnBorrow}", { "DBTestOnBorrow": Ref(DBTestOnBorrow) }] }, { "Fn::Sub": ["ATL_DB_TESTWHILEIDLE=${DBTestWhileIdle}", { "DBTestWhileIdle": Ref(DBTestWhileIdle) }] }, { "Fn::Sub": ["ATL_DB_TIMEBETWEENEVICTIONRUNSMILLIS=${DBTimeBetweenEvictionRunsMillis}", { "DBTimeBetweenEvictionRunsMillis": Ref(DBTimeBetweenEvictionRunsMillis) }] }, { "Fn::Sub": ["ATL_HOSTEDZONE=${HostedZone}", { "HostedZone": Ref(HostedZone) }] }, { "Fn::Sub": ["ATL_JDBC_PASSWORD='${DBPassword}'", { "DBPassword": Ref(DBPassword) }] }, { "Fn::Sub": ["ATL_JDBC_URL=jdbc:postgresql://${DBEndpointAddress}:${DBEndpointPort}/jira", { "DBEndpointPort": GetAtt(DB, "Endpoint.Port"), "DBEndpointAddress": GetAtt(DB, "Endpoint.Address") }] }, { "Fn::Sub": ["ATL_JIRA_FULL_DISPLAY_NAME=${JiraFullDisplayName}", { "JiraFullDisplayName": FindInMap("JIRAProduct2NameAndVersion", Ref(JiraProduct), "fulldisplayname") }] }, { "Fn::Sub": ["ATL_JIRA_NAME=${JiraProductName}", { "JiraProductName": FindInMap("JIRAProduct2NameAndVersion", Ref(JiraProduct), "name") }] }, { "Fn::Sub": ["ATL_JIRA_SHORT_DISPLAY_NAME=${JiraShortDisplayName}", { "JiraShortDisplayName": FindInMap("JIRAProduct2NameAndVersion", Ref(JiraProduct), "shortdisplayname") }] }, { "Fn::Sub": ["ATL_JVM_HEAP=${AtlJvmHeap}", { "AtlJvmHeap": If("OverrideHeap", Ref(JvmHeapOverride), FindInMap("AWSInstanceType2Arch", Ref(ClusterNodeInstanceType), "Jvmheap")) }] }, { "Fn::Sub": ["ATL_PROXY_NAME=${AtlProxyName}", { "AtlProxyName": If("UseCustomDnsName", Ref(CustomDnsName), If("UseHostedZone", Ref(LoadBalancerCname), GetAtt(LoadBalancer, "DNSName"))) }] }, { "Fn::Sub": ["ATL_TOMCAT_ACCEPTCOUNT=${TomcatAcceptCount}", { "TomcatAcceptCount": Ref(TomcatAcceptCount) }] }, { "Fn::Sub": ["ATL_TOMCAT_CONNECTIONTIMEOUT=${TomcatConnectionTimeout}", { "TomcatConnectionTimeout": Ref(TomcatConnectionTimeout) }] }, { "Fn::Sub": ["ATL_TOMCAT_CONTEXTPATH=${TomcatContextPath}", { "TomcatContextPath": Ref(TomcatContextPath) }] }, { "Fn::Sub": ["ATL_TOMCAT_DEFAULTCONNECTORPORT=${TomcatDefaultConnectorPort}", { "TomcatDefaultConnectorPort": Ref(TomcatDefaultConnectorPort) }] }, { "Fn::Sub": ["ATL_TOMCAT_ENABLELOOKUPS=${TomcatEnableLookups}", { "TomcatEnableLookups": Ref(TomcatEnableLookups) }] }, { "Fn::Sub": ["ATL_TOMCAT_MAXTHREADS=${TomcatMaxThreads}", { "TomcatMaxThreads": Ref(TomcatMaxThreads) }] }, { "Fn::Sub": ["ATL_TOMCAT_MINSPARETHREADS=${TomcatMinSpareThreads}", { "TomcatMinSpareThreads": Ref(TomcatMinSpareThreads) }] }, { "Fn::Sub": ["ATL_TOMCAT_PROTOCOL=${TomcatProtocol}", { "TomcatProtocol": Ref(TomcatProtocol) }] }, { "Fn::Sub": ["ATL_TOMCAT_PROXYPORT=${TomcatProxyPort}", { "TomcatProxyPort": If("SSLScheme", 443, 80) }] }, { "Fn::Sub": ["ATL_TOMCAT_REDIRECTPORT=${TomcatRedirectPort}", { "TomcatRedirectPort": Ref(TomcatRedirectPort) }] }, { "Fn::Sub": ["ATL_TOMCAT_SCHEME=${TomcatScheme}", { "TomcatScheme": If("SSLScheme", "https", "http") }] }, { "Fn::Sub": ["ATL_TOMCAT_SECURE=${TomcatSecure}", { "TomcatSecure": If("SSLScheme", True, False) }] }, { "Fn::Sub": ["ATL_DEPLOYMENT_REPOSITORY=${DeployRepository}", { "DeployRepository": Ref(DeploymentAutomationRepository) }] }, { "Fn::Sub": ["ATL_DEPLOYMENT_REPOSITORY_BRANCH=${DeployRepositoryBranch}", { "DeployRepositoryBranch": Ref(DeploymentAutomationBranch) }] }, { "Fn::Sub": ["ATL_DEPLOYMENT_REPOSITORY_PLAYBOOK=${DeployRepositoryPlaybook}", { "DeployRepositoryPlaybook": Ref(DeploymentAutomationPlaybook) }] }, { "Fn::Sub": ["ATL_DEPLOYMENT_REPOSITORY_KEYNAME=${DeployRepositoryKeyName}", { "DeployRepositoryKeyName": Ref(DeploymentAutomationKeyName) }] }]), "group": "root", "mode": "000640" } }, "commands": { "071_install_packages": { "ignoreErrors": True, "command": "yum install -y git python-virtualenv" }, "072_clone_atl_scripts": { "test": "test ! -d /opt/atlassian/dc-deployments-automation/", "ignoreErrors": True, "command": "/opt/atlassian/bin/clone_deployment_repo" }, "070_create_atl_dir": { "test": "test ! -d /opt/atlassian/", "ignoreErrors": False, "command": "mkdir -p /opt/atlassian" }, "080_run_atl_init_node": { "ignoreErrors": True, "command": { "Fn::Sub": "cd /opt/atlassian/dc-deployments-automation/ && ./bin/install-ansible && ./bin/ansible-with-atl-env inv/aws_node_local ${DeploymentAutomationPlaybook} /var/log/ansible-bootstrap.log\n" } } } } },
-    ),
-    UserData=Base64(Join("", ["#!/bin/bash -xe\n", "yum update -y aws-cfn-bootstrap\n", { "Fn::Sub": ["/opt/aws/bin/cfn-init -v --stack ${StackName}", { "StackName": Ref("AWS::StackName") }] }, { "Fn::Sub": [" --resource ClusterNodeLaunchConfig --region ${Region}\n", { "Region": Ref("AWS::Region") }] }, { "Fn::Sub": ["/opt/aws/bin/cfn-signal -e $? --stack ${StackName}", { "StackName": Ref("AWS::StackName") }] }, { "Fn::Sub": [" --resource ClusterNodeLaunchConfig --region ${Region}", { "Region": Ref("AWS::Region") }] }])),
-    ImageId=FindInMap("AWSRegionArch2AMI", Ref("AWS::Region"), FindInMap("AWSInstanceType2Arch", Ref(ClusterNodeInstanceType), "Arch")),
-    BlockDeviceMappings=[{ "DeviceName": "/dev/xvda", "Ebs": { "VolumeSize": Ref(ClusterNodeVolumeSize) } }, { "DeviceName": "/dev/xvdf", "NoDevice": True, "Ebs": {  } }],
-    KeyName=If("KeyProvided", Ref(KeyPairName), { "Fn::ImportValue": "ATL-DefaultKey" }),
-    SecurityGroups=[Ref(SecurityGroup)],
-    IamInstanceProfile=Ref(JiraClusterNodeInstanceProfile),
-    InstanceType=Ref(ClusterNodeInstanceType),
-    AssociatePublicIpAddress=False,
-    DependsOn=["EFSMountAz1", "EFSMountAz2", "DB"],
-))
-
-DBEncryptionKey = t.add_output(Output(
-    "DBEncryptionKey",
-    Value=Ref(EncryptionKeyAlias),
-    Description="The alias of the encryption key created for RDS",
-    Condition="UseDatabaseEncryption",
-))
-
-EFSCname = t.add_output(Output(
-    "EFSCname",
-    Export={ "Name": Join("", [Ref("AWS::StackName"), "-EFSCname"]) },
-    Description="The cname of the EFS",
-    Value=If("UseHostedZone", Ref(EFSCname), Ref(ElasticFileSystem)),
-))
-
-SGname = t.add_output(Output(
-    "SGname",
-    Export={ "Name": Join("", [Ref("AWS::StackName"), "-SGname"]) },
-    Description="The name of the SecurityGroup",
-    Value=Ref(SecurityGroup),
-))
-
-DBEndpointAddress = t.add_output(Output(
-    "DBEndpointAddress",
-    Description="The Database Connection String",
-    Value=GetAtt(DB, "Endpoint.Address"),
-))
-
-LoadBalancerURL = t.add_output(Output(
-    "LoadBalancerURL",
-    Description="The Load Balancer URL",
-    Value={ "Fn::Sub": ["${HTTP}://${LoadBalancerDNSName}", { "HTTP": If("SSLScheme", "https", "http"), "LoadBalancerDNSName": GetAtt(LoadBalancer, "DNSName") }] },
-))
-
-ServiceURL = t.add_output(Output(
-    "ServiceURL",
-    Description="The URL to access this Atlassian service",
-    Value=If("UseCustomDnsName", { "Fn::Sub": ["${HTTP}://${CustomDNSName}${ContextPath}", { "CustomDNSName": Ref(CustomDnsName), "HTTP": If("SSLScheme", "https", "http"), "ContextPath": Ref(TomcatContextPath) }] }, If("UseHostedZone", { "Fn::Sub": ["${HTTP}://${LBCName}${ContextPath}", { "ContextPath": Ref(TomcatContextPath), "HTTP": If("SSLScheme", "https", "http"), "LBCName": Ref(LoadBalancerCname) }] }, { "Fn::Sub": ["${HTTP}://${LoadBalancerDNSName}${ContextPath}", { "HTTP": If("SSLScheme", "https", "http"), "LoadBalancerDNSName": GetAtt(LoadBalancer, "DNSName"), "ContextPath": Ref(TomcatContextPath) }] })),
-))
-
-print(t.to_json())
+from troposphere.efs import FileSystem, MountTarget
+from troposphere.elasticloadbalancing import ConnectionDrainingPolicy
+from troposphere.elasticloadbalancing import ConnectionSettings, HealthCheck
+from troposphere.elasticloadbalancing import LoadBalancer
+from troposphere.elasticloadbalancingv2 import Action, Certificate, Listener
+from troposphere.elasticloadbalancingv2 import LoadBalancerAttributes
+from troposphere.elasticloadbalancingv2 import TargetGroup
+from troposphere.elasticloadbalancingv2 import TargetGroupAttribute
+from troposphere.iam import InstanceProfile, Policy, Role
+from troposphere.imagebuilder import Component, ComponentConfiguration, Image
+from troposphere.imagebuilder import ImageRecipe, ImageTestsConfiguration
+from troposphere.imagebuilder import InfrastructureConfiguration
+from troposphere.kms import Alias, Key
+from troposphere.rds import DBInstance, DBSubnetGroup
+from troposphere.route53 import AliasTarget, RecordSetType
+from troposphere.s3 import Bucket, BucketEncryption, LifecycleConfiguration
+from troposphere.s3 import LifecycleRule, PublicAccessBlockConfiguration
+from troposphere.s3 import ServerSideEncryptionByDefault
+from troposphere.s3 import ServerSideEncryptionRule
+from troposphere.validators import integer
+
+try:
+    from troposphere.autoscaling import WarmPool
+except ImportError:
+    class WarmPool(AWSObject):
+        resource_type = "AWS::AutoScaling::WarmPool"
+        props = {
+            "AutoScalingGroupName": (str, True),
+            "MaxGroupPreparedCapacity": (integer, False),
+            "MinSize": (integer, False),
+            "PoolState": (str, False),
+        }
+
+
+def build(**overrides):
+    """Return the Template, with the Default of each parameter named in
+    overrides replaced by its value.
+    """
+    t = Template()
+
+    t.add_version("2010-09-09")
+
+    t.add_description("Atlassian Jira Data Center QS(0035)")
+    t.add_metadata({ "AWS::CloudFormation::Interface": { "ParameterGroups": [{ "Label": { "default": "Jira setup" }, "Parameters": ["JiraProduct", "JiraVersion"] }, { "Label": { "default": "Cluster nodes" }, "Parameters": ["ClusterNodeInstanceType", "ClusterNodeMax", "ClusterNodeMixedInstances", "ClusterNodeMin", "ClusterNodeHttpTokens", "ClusterNodeVolumeSize", "LocalHomeVolumeSize", "LocalHomeVolumeType", "LocalHomeVolumeIops", "LocalHomeVolumeThroughput", "ClusterNodeBaseImage", "BakeClusterNodeImage", "ClusterNodeImageVersion"] }, { "Label": { "default": "Database" }, "Parameters": ["DBInstanceClass", "DBIops", "DBMasterUserPassword", "DBMultiAZ", "DBPassword", "DBStorage", "DBStorageEncrypted", "DBStorageType"] }, { "Label": { "default": "Networking" }, "Parameters": ["AssociatePublicIpAddress", "CidrBlock", "KeyPairName", "SSLCertificateARN", "LoadBalancerType", "NodeSlowStart"] }, { "Label": { "default": "Scaling" }, "Parameters": ["ClusterNodeWarmup", "ScalingRequestsPerNode", "ScalingCpuTarget", "ScalingGcTime", "ScalingOldGen", "WarmPoolSize", "BusinessHoursMin", "BusinessHoursStart", "BusinessHoursEnd"] }, { "Label": { "default": "DNS (Optional)" }, "Parameters": ["CustomDnsName", "HostedZone"] }, { "Label": { "default": "Cluster Node Deployment Repository; this is used to install and configure the application." }, "Parameters": ["DeploymentAutomationRepository", "DeploymentAutomationBranch", "DeploymentAutomationPlaybook", "DeploymentAutomationKeyName"] }, { "Label": { "default": "Application Tuning (Optional) - dbref - https://confluence.atlassian.com/display/AdminJIRAServer/Tuning+database+connections tomcatref - http://tomcat.apache.org/tomcat-7.0-doc/config/http.html" }, "Parameters": ["TomcatContextPath", "CatalinaOpts", "JvmHeapOverride", "DBPoolMaxSize", "DBPoolMinSize", "DBMaxIdle", "DBMaxWaitMillis", "DBMinEvictableIdleTimeMillis", "DBMinIdle", "DBRemoveAbandoned", "DBRemoveAbandonedTimeout", "DBTestOnBorrow", "DBTestWhileIdle", "DBTimeBetweenEvictionRunsMillis", "MailEnabled", "TomcatAcceptCount", "TomcatConnectionTimeout", "TomcatDefaultConnectorPort", "TomcatEnableLookups", "TomcatMaxThreads", "TomcatMinSpareThreads", "TomcatProtocol", "TomcatRedirectPort", "TomcatScheme"] }], "ParameterLabels": { "AssociatePublicIpAddress": { "default": "Assign public IP" }, "BakeClusterNodeImage": { "default": "Bake cluster node image" }, "BusinessHoursEnd": { "default": "Business hours end" }, "BusinessHoursMin": { "default": "Business hours minimum nodes" }, "BusinessHoursStart": { "default": "Business hours start" }, "CatalinaOpts": { "default": "Catalina options" }, "CidrBlock": { "default": "Permitted IP range" }, "ClusterNodeBaseImage": { "default": "Cluster node base AMI" }, "ClusterNodeHttpTokens": { "default": "Instance metadata tokens" }, "ClusterNodeImageVersion": { "default": "Cluster node image version" }, "ClusterNodeMax": { "default": "Maximum number of cluster nodes" }, "ClusterNodeMixedInstances": { "default": "Mixed instance types" }, "ClusterNodeMin": { "default": "Minimum number of cluster nodes" }, "ClusterNodeInstanceType": { "default": "Cluster node instance type" }, "ClusterNodeVolumeSize": { "default": "Cluster node instance volume size" }, "ClusterNodeWarmup": { "default": "Cluster node warm-up" }, "CustomDnsName": { "default": "Existing DNS name (optional)" }, "DBInstanceClass": { "default": "Database instance class" }, "DBIops": { "default": "RDS Provisioned IOPS" }, "DBMasterUserPassword": { "default": "Master (admin) password *" }, "DBMaxIdle": { "default": "DB Maximum Idle" }, "DBMaxWaitMillis": { "default": "DB Maximum Wait" }, "DBMinEvictableIdleTimeMillis": { "default": "DB Minimum Evictable Idle Time" }, "DBMinIdle": { "default": "DB Minimum Idle Connections" }, "DBMultiAZ": { "default": "Enable RDS Multi-AZ deployment" }, "DBPassword": { "default": "Application user database password *" }, "DBPoolMaxSize": { "default": "DB Pool Maximum Size" }, "DBPoolMinSize": { "default": "DB Pool Minimum Size" }, "DBRemoveAbandoned": { "default": "DB Remove Abandoned?" }, "DBRemoveAbandonedTimeout": { "default": "DB Remove Abandoned Timeout" }, "DBStorage": { "default": "Database storage" }, "DBStorageEncrypted": { "default": "Database encryption" }, "DBStorageType": { "default": "Database storage type" }, "DBTestOnBorrow": { "default": "DB Test On Borrow?" }, "DBTestWhileIdle": { "default": "DB Test While Idle?" }, "DBTimeBetweenEvictionRunsMillis": { "default": "DB Time Between Eviction Runs" }, "DeploymentAutomationRepository": { "default": "Deployment Automation Git Repository URL" }, "DeploymentAutomationBranch": { "default": "Deployment Automation Branch" }, "DeploymentAutomationPlaybook": { "default": "The Ansible playbook to invoke to initialise the instance." }, "DeploymentAutomationKeyName": { "default": "SSH keyname to use with the repository (Optional)" }, "HostedZone": { "default": "Route 53 Hosted Zone (optional)" }, "JiraProduct": { "default": "Jira Product *" }, "JiraVersion": { "default": "Version *" }, "JvmHeapOverride": { "default": "JVM Heap Size Override" }, "KeyPairName": { "default": "Key Name *" }, "LoadBalancerType": { "default": "Load balancer type" }, "LocalHomeVolumeIops": { "default": "Local home volume IOPS" }, "LocalHomeVolumeSize": { "default": "Local home volume size" }, "LocalHomeVolumeThroughput": { "default": "Local home volume throughput" }, "LocalHomeVolumeType": { "default": "Local home volume type" }, "MailEnabled": { "default": "Enable App to Process Email" }, "NodeSlowStart": { "default": "Node slow start" }, "SSLCertificateARN": { "default": "SSL Certificate ARN" }, "ScalingCpuTarget": { "default": "CPU target" }, "ScalingGcTime": { "default": "GC time threshold" }, "ScalingOldGen": { "default": "Old generation threshold" }, "ScalingRequestsPerNode": { "default": "Requests per node target" }, "TomcatAcceptCount": { "default": "Tomcat Accept Count" }, "TomcatConnectionTimeout": { "default": "Tomcat Connection Timeout" }, "TomcatContextPath": { "default": "Tomcat Context Path" }, "TomcatDefaultConnectorPort": { "default": "Tomcat Default Connector Port" }, "TomcatEnableLookups": { "default": "Tomcat Enable DNS Lookups" }, "TomcatMaxThreads": { "default": "Tomcat Maximum Threads" }, "TomcatMinSpareThreads": { "default": "Tomcat Minimum Spare Threads" }, "TomcatProtocol": { "default": "Tomcat Protocol" }, "TomcatRedirectPort": { "default": "Tomcat Redirect Port" }, "TomcatScheme": { "default": "Tomcat protocol Scheme" }, "WarmPoolSize": { "default": "Warm pool size" } } } })
+
+    AssociatePublicIpAddress = t.add_parameter(Parameter(
+        "AssociatePublicIpAddress",
+        Default="true",
+        AllowedValues=[True, False],
+        ConstraintDescription="Must be 'true' or 'false'.",
+        Description="Controls if the EC2 instances are assigned a public IP address",
+        Type="String",
+    ))
+
+    BakeClusterNodeImage = t.add_parameter(Parameter(
+        "BakeClusterNodeImage",
+        Default="false",
+        AllowedValues=["true", "false"],
+        Description="Bake the packages, the deployment automation, Ansible and the Jira install into a cluster node AMI with EC2 Image Builder, built on ClusterNodeBaseImage, instead of installing them as each node launches; the nodes still configure Jira at boot",
+        Type="String",
+    ))
+
+    BusinessHoursEnd = t.add_parameter(Parameter(
+        "BusinessHoursEnd",
+        Default="0 18 * * 1-5",
+        Description="Cron expression (UTC) for the end of business hours, when the minimum goes back to ClusterNodeMin",
+        Type="String",
+    ))
+
+    BusinessHoursMin = t.add_parameter(Parameter(
+        "BusinessHoursMin",
+        Default=0,
+        MinValue=0,
+        MaxValue=12,
+        Description="Minimum number of cluster nodes during business hours, at most ClusterNodeMax; 0 for no schedule",
+        Type="Number",
+    ))
+
+    BusinessHoursStart = t.add_parameter(Parameter(
+        "BusinessHoursStart",
+        Default="0 7 * * 1-5",
+        Description="Cron expression (UTC) for the start of business hours, leaving the new nodes time to warm up",
+        Type="String",
+    ))
+
+    CatalinaOpts = t.add_parameter(Parameter(
+        "CatalinaOpts",
+        Default="",
+        Description="Pass in any additional jvm options to tune Catalina",
+        Type="String",
+    ))
+
+    CidrBlock = t.add_parameter(Parameter(
+        "CidrBlock",
+        AllowedPattern="(\\d{1,3})\\.(\\d{1,3})\\.(\\d{1,3})\\.(\\d{1,3})/(\\d{1,2})",
+        ConstraintDescription="Must be a valid IP CIDR range of the form x.x.x.x/x.",
+        Description="CIDR Block allowed to access the Atlassian product. This should be set to a trusted IP range; if you want to give public access use '0.0.0.0/0'.",
+        Type="String",
+        MinLength=9,
+        MaxLength=18,
+    ))
+
+    ClusterNodeBaseImage = t.add_parameter(Parameter(
+        "ClusterNodeBaseImage",
+        Default="/aws/service/ami-amazon-linux-latest/amzn2-ami-hvm-x86_64-gp2",
+        Description="SSM parameter holding the AMI the cluster nodes, or the baked image, start from; the public one for the latest Amazon Linux 2 by default",
+        Type="AWS::SSM::Parameter::Value<AWS::EC2::Image::Id>",
+    ))
+
+    ClusterNodeHttpTokens = t.add_parameter(Parameter(
+        "ClusterNodeHttpTokens",
+        Default="required",
+        AllowedValues=["required", "optional"],
+        Description="Whether the instance metadata service of the cluster nodes only answers requests with an IMDSv2 session token; optional also lets IMDSv1 tools through",
+        Type="String",
+    ))
+
+    ClusterNodeImageVersion = t.add_parameter(Parameter(
+        "ClusterNodeImageVersion",
+        Default="1.0.0",
+        AllowedPattern="\\d+\\.\\d+\\.\\d+",
+        ConstraintDescription="Must be a version number like 1.0.0",
+        Description="Version of the baked cluster node AMI; raise it to bake a new one, for OS updates or a new DeploymentAutomationBranch",
+        Type="String",
+    ))
+
+    ClusterNodeInstanceType = t.add_parameter(Parameter(
+        "ClusterNodeInstanceType",
+        Default="c5.xlarge",
+        AllowedValues=["c4.large", "c4.xlarge", "c4.2xlarge", "c4.4xlarge", "c4.8xlarge", "c5.large", "c5.xlarge", "c5.2xlarge", "c5.4xlarge", "c5.9xlarge", "c5.18xlarge", "c5d.large", "c5d.xlarge", "c5d.2xlarge", "c5d.4xlarge", "c5d.9xlarge", "c5d.18xlarge", "d2.xlarge", "d2.2xlarge", "d2.4xlarge", "d2.8xlarge", "h1.2xlarge", "h1.4xlarge", "h1.8xlarge", "h1.16xlarge", "i3.large", "i3.xlarge", "i3.2xlarge", "i3.4xlarge", "i3.8xlarge", "i3.16xlarge", "i3.metal", "m4.large", "m4.xlarge", "m4.2xlarge", "m4.4xlarge", "m4.10xlarge", "m4.16xlarge", "m5.large", "m5.xlarge", "m5.2xlarge", "m5.4xlarge", "m5.12xlarge", "m5.24xlarge", "m5d.large", "m5d.xlarge", "m5d.2xlarge", "m5d.4xlarge", "m5d.12xlarge", "m5d.24xlarge", "r4.large", "r4.xlarge", "r4.2xlarge", "r4.4xlarge", "r4.8xlarge", "r4.16xlarge", "r5.large", "r5.xlarge", "r5.2xlarge", "r5.4xlarge", "r5.12xlarge", "r5.24xlarge", "r5d.large", "r5d.xlarge", "r5d.2xlarge", "r5d.4xlarge", "r5d.12xlarge", "r5d.24xlarge", "t2.medium", "t2.large", "t2.xlarge", "t2.2xlarge", "t3.medium", "t3.large", "t3.xlarge", "t3.2xlarge", "x1.16xlarge", "x1.32xlarge", "x1e.xlarge", "x1e.2xlarge", "x1e.4xlarge", "x1e.8xlarge", "x1e.16xlarge", "x1e.32xlarge", "z1d.large", "z1d.xlarge", "z1d.2xlarge", "z1d.3xlarge", "z1d.6xlarge", "z1d.12xlarge"],
+        ConstraintDescription="Must be an EC2 instance type from the selection list",
+        Description="Instance type for the cluster application nodes.",
+        Type="String",
+    ))
+
+    ClusterNodeMax = t.add_parameter(Parameter(
+        "ClusterNodeMax",
+        Description="Maximum number of nodes in the cluster.",
+        Default=1,
+        MaxValue=12,
+        Type="Number",
+    ))
+
+    ClusterNodeMixedInstances = t.add_parameter(Parameter(
+        "ClusterNodeMixedInstances",
+        Default="true",
+        AllowedValues=["true", "false"],
+        Description="Also launch instance types with the same vCPUs and memory when ClusterNodeInstanceType is out of capacity",
+        Type="String",
+    ))
+
+    ClusterNodeMin = t.add_parameter(Parameter(
+        "ClusterNodeMin",
+        Default=1,
+        Description="Set to 1 for new deployment. Can be updated post launch.",
+        Type="Number",
+    ))
+
+    ClusterNodeVolumeSize = t.add_parameter(Parameter(
+        "ClusterNodeVolumeSize",
+        Default=50,
+        Description="Size of cluster node root volume in Gb (note - size based upon Application indexes x 4)",
+        Type="Number",
+    ))
+
+    ClusterNodeWarmup = t.add_parameter(Parameter(
+        "ClusterNodeWarmup",
+        Default=900,
+        MinValue=60,
+        Description="Seconds a new node takes to start Jira and warm up, before its metrics count for scaling",
+        Type="Number",
+    ))
+
+    CustomDnsName = t.add_parameter(Parameter(
+        "CustomDnsName",
+        Default="",
+        Description="Use custom existing DNS name for your Data Center instance. This will take precedence over HostedZone. Please note: you must own the domain and configure it to point at the load balancer.",
+        Type="String",
+    ))
+
+    DBInstanceClass = t.add_parameter(Parameter(
+        "DBInstanceClass",
+        Default="db.m4.large",
+        AllowedValues=["db.m4.large", "db.m4.xlarge", "db.m4.2xlarge", "db.m4.4xlarge", "db.m4.10xlarge", "db.m4.16xlarge", "db.r4.large", "db.r4.xlarge", "db.r4.2xlarge", "db.r4.4xlarge", "db.r4.8xlarge", "db.r4.16xlarge", "db.t2.medium", "db.t2.large", "db.t2.xlarge", "db.t2.2xlarge"],
+        ConstraintDescription="Must be a valid RDS instance class, from the selection list",
+        Description="RDS instance type",
+        Type="String",
+    ))
+
+    DBIops = t.add_parameter(Parameter(
+        "DBIops",
+        Default=1000,
+        ConstraintDescription="Must be in the range 1000 - 30000",
+        Description="Must be in the range of 1000 - 30000 and a multiple of 1000. This value is only used with Provisioned IOPS. Note: The ratio of IOPS per allocated-storage must be between 3.00 and 10.00",
+        MaxValue=30000,
+        MinValue=1000,
+        Type="Number",
+    ))
+
+    DBMasterUserPassword = t.add_parameter(Parameter(
+        "DBMasterUserPassword",
+        AllowedPattern="[a-zA-Z0-9]*",
+        ConstraintDescription="Must be at least 8 alphanumeric characters.",
+        Description="Database admin account password.",
+        NoEcho=True,
+        MaxLength=128,
+        MinLength=8,
+        Type="String",
+    ))
+
+    DBMaxIdle = t.add_parameter(Parameter(
+        "DBMaxIdle",
+        Default="20",
+        Description="The maximum number of database connections that are allowed to remain idle in the pool",
+        Type="String",
+    ))
+
+    DBMaxWaitMillis = t.add_parameter(Parameter(
+        "DBMaxWaitMillis",
+        Default="10000",
+        Description="The length of time (in milliseconds) that Jira is allowed to wait for a database connection to become available (while there are no free ones available in the pool), before returning an error",
+        Type="String",
+    ))
+
+    DBMinEvictableIdleTimeMillis = t.add_parameter(Parameter(
+        "DBMinEvictableIdleTimeMillis",
+        Default="180000",
+        Description="The minimum amount of time an object may sit idle in the database connection pool before it is eligible for eviction by the idle object eviction",
+        Type="String",
+    ))
+
+    DBMinIdle = t.add_parameter(Parameter(
+        "DBMinIdle",
+        Default="10",
+        Description="The minimum number of idle database connections that are kept open at any time",
+        Type="String",
+    ))
+
+    DBMultiAZ = t.add_parameter(Parameter(
+        "DBMultiAZ",
+        Description="Whether to provision a multi-AZ RDS instance.",
+        Default="true",
+        AllowedValues=[True, False],
+        ConstraintDescription="Must be 'true' or 'false'.",
+        Type="String",
+    ))
+
+    DBPassword = t.add_parameter(Parameter(
+        "DBPassword",
+        AllowedPattern="[a-zA-Z0-9]*",
+        ConstraintDescription="Must be at least 8 alphanumeric characters.",
+        Description="Database user account password.",
+        MinLength=8,
+        MaxLength=128,
+        NoEcho=True,
+        Type="String",
+    ))
+
+    DBPoolMaxSize = t.add_parameter(Parameter(
+        "DBPoolMaxSize",
+        Default="20",
+        Description="The maximum number of database connections that can be opened at any time",
+        AllowedValues=["10", "20", "30", "40", "50", "75", "100"],
+        Type="String",
+    ))
+
+    DBPoolMinSize = t.add_parameter(Parameter(
+        "DBPoolMinSize",
+        Default="20",
+        Description="The minimum number of idle database connections that are kept open at any time",
+        Type="String",
+    ))
+
+    DBRemoveAbandoned = t.add_parameter(Parameter(
+        "DBRemoveAbandoned",
+        Default="true",
+        Description="Flag to remove abandoned database connections if they exceed the Removed Abandoned Timeout",
+        Type="String",
+    ))
+
+    DBRemoveAbandonedTimeout = t.add_parameter(Parameter(
+        "DBRemoveAbandonedTimeout",
+        Default="60",
+        Description="The length of time (in seconds) that a database connection can be idle before it is considered abandoned",
+        Type="String",
+    ))
+
+    DBStorage = t.add_parameter(Parameter(
+        "DBStorage",
+        Default=200,
+        Description="Database allocated storage size, in gigabytes (GB)",
+        Type="Number",
+    ))
+
+    DBStorageEncrypted = t.add_parameter(Parameter(
+        "DBStorageEncrypted",
+        Default="false",
+        AllowedValues=[True, False],
+        Description="Whether or not to encrypt the database",
+        Type="String",
+    ))
+
+    DBStorageType = t.add_parameter(Parameter(
+        "DBStorageType",
+        Default="General Purpose (SSD)",
+        AllowedValues=["General Purpose (SSD)", "Provisioned IOPS"],
+        ConstraintDescription="Must be 'General Purpose (SSD)' or 'Provisioned IOPS'.",
+        Description="Database storage type",
+        Type="String",
+    ))
+
+    DBTestOnBorrow = t.add_parameter(Parameter(
+        "DBTestOnBorrow",
+        Default="false",
+        Description="Tests if the database connection is valid when it is borrowed from the database connection pool by Jira",
+        Type="String",
+    ))
+
+    DBTestWhileIdle = t.add_parameter(Parameter(
+        "DBTestWhileIdle",
+        Default="true",
+        Description="Periodically tests if the database connection is valid when it is idle",
+        Type="String",
+    ))
+
+    DBTimeBetweenEvictionRunsMillis = t.add_parameter(Parameter(
+        "DBTimeBetweenEvictionRunsMillis",
+        Default="60000",
+        Description="The number of milliseconds to sleep between runs of the idle object eviction thread. When non-positive, no idle object eviction thread will be run",
+        Type="String",
+    ))
+
+    DeploymentAutomationRepository = t.add_parameter(Parameter(
+        "DeploymentAutomationRepository",
+        Default="https://bitbucket.org/atlassian/dc-deployments-automation.git",
+        Type="String",
+        Description="The deployment automation repository to use for per-node initialisation. Leave this as default unless you have customisations.",
+    ))
+
+    DeploymentAutomationBranch = t.add_parameter(Parameter(
+        "DeploymentAutomationBranch",
+        Default="master",
+        Type="String",
+        Description="The deployment automation repository branch to pull from.",
+    ))
+
+    DeploymentAutomationPlaybook = t.add_parameter(Parameter(
+        "DeploymentAutomationPlaybook",
+        Default="aws_jira_dc_node.yml",
+        Type="String",
+        Description="The Ansible playbook to invoke to initialise the Jira node on first start.",
+    ))
+
+    DeploymentAutomationKeyName = t.add_parameter(Parameter(
+        "DeploymentAutomationKeyName",
+        Default="",
+        Type="String",
+        Description="Named KeyPair name to use with this repository. The key should be imported into the SSM parameter store. (Optional)",
+    ))
+
+    HostedZone = t.add_parameter(Parameter(
+        "HostedZone",
+        Default="",
+        ConstraintDescription="Must be the name of an existing Route53 Hosted Zone.",
+        Description="The domain name of the Route53 PRIVATE Hosted Zone in which to create cnames",
+        Type="String",
+    ))
+
+    JiraProduct = t.add_parameter(Parameter(
+        "JiraProduct",
+        Default="Software",
+        Description="The Jira product to install.",
+        Type="String",
+        ConstraintDescription="Must be \"Core\", \"Software\", or \"ServiceDesk\"",
+        AllowedValues=["Core", "Software", "ServiceDesk"],
+    ))
+
+    JiraVersion = t.add_parameter(Parameter(
+        "JiraVersion",
+        Default="7.13.3",
+        AllowedPattern="(\\d+\\.\\d+\\.\\d+(-?.*))|(latest)",
+        ConstraintDescription="Must be a valid version number or 'latest'; for example, 8.1.0 for Jira Software, or 4.1.0 for ServiceDesk.",
+        Description="The version of Jira Software or Jira Service Desk to install. Find valid versions at https://confluence.atlassian.com/x/TVlNLg (Jira Software), https://confluence.atlassian.com/x/jh9-Lg (Jira Service Desk), or https://confluence.atlassian.com/x/XM2EO (Atlassian Enterprise Releases).",
+        Type="String",
+    ))
+
+    JvmHeapOverride = t.add_parameter(Parameter(
+        "JvmHeapOverride",
+        Default="",
+        Description="Override the default amount of memory to allocate to the JVM for your instance type - set size in meg or gig e.g. 1024m or 1g",
+        Type="String",
+    ))
+
+    KeyPairName = t.add_parameter(Parameter(
+        "KeyPairName",
+        Default="",
+        ConstraintDescription="Must be the name of an existing EC2 Key Pair.",
+        Description="The EC2 Key Pair to allow SSH access to the instances",
+        Type="String",
+    ))
+
+    LoadBalancerType = t.add_parameter(Parameter(
+        "LoadBalancerType",
+        Default="Classic",
+        AllowedValues=["Classic", "Application"],
+        Description="Classic ELB or Application Load Balancer",
+        Type="String",
+    ))
+
+    LocalHomeVolumeIops = t.add_parameter(Parameter(
+        "LocalHomeVolumeIops",
+        Default=3000,
+        AllowedValues=["3000", "6000", "10000", "16000", "32000", "64000"],
+        Description="Provisioned IOPS of the local home volume: up to 16000 for gp3, and at most 500 per GiB, which Rules check",
+        Type="Number",
+    ))
+
+    LocalHomeVolumeSize = t.add_parameter(Parameter(
+        "LocalHomeVolumeSize",
+        Default=0,
+        MinValue=0,
+        Description="Size in GiB of a separate EBS volume for the Jira local home and its indexes; 0 keeps the local home on the root volume",
+        Type="Number",
+    ))
+
+    LocalHomeVolumeThroughput = t.add_parameter(Parameter(
+        "LocalHomeVolumeThroughput",
+        Default=125,
+        ConstraintDescription="Must be in the range 125 - 1000",
+        Description="Throughput of a gp3 local home volume in MiB/s",
+        MaxValue=1000,
+        MinValue=125,
+        Type="Number",
+    ))
+
+    LocalHomeVolumeType = t.add_parameter(Parameter(
+        "LocalHomeVolumeType",
+        Default="gp3",
+        AllowedValues=["gp3", "io2"],
+        Description="EBS volume type of the local home volume",
+        Type="String",
+    ))
+
+    MailEnabled = t.add_parameter(Parameter(
+        "MailEnabled",
+        AllowedValues=[True, False],
+        ConstraintDescription="Must be 'true' or 'false'.",
+        Default="true",
+        Description="Enable mail processing and sending",
+        Type="String",
+    ))
+
+    NodeSlowStart = t.add_parameter(Parameter(
+        "NodeSlowStart",
+        Default=300,
+        MinValue=0,
+        MaxValue=900,
+        Description="Seconds a new node takes to get its full share of requests behind an Application Load Balancer, from 30 to 900; 0 routes to the least busy node instead",
+        Type="Number",
+    ))
+
+    SSLCertificateARN = t.add_parameter(Parameter(
+        "SSLCertificateARN",
+        Default="",
+        Description="Amazon Resource Name (ARN) of your SSL certificate. Every certificate created with the AWS Certificate Manager has a corresponding ARN. To use a certificate generated outside of AWS, you need to import it into AWS Certificate Manager first. AWS Certificate Manager will provide you with its ARN, which you can use here.",
+        MinLength=0,
+        MaxLength=90,
+        Type="String",
+    ))
+
+    ScalingCpuTarget = t.add_parameter(Parameter(
+        "ScalingCpuTarget",
+        Default=0,
+        MinValue=0,
+        MaxValue=100,
+        Description="Average CPU utilization (%) to keep the cluster nodes at; 0 for none",
+        Type="Number",
+    ))
+
+    ScalingGcTime = t.add_parameter(Parameter(
+        "ScalingGcTime",
+        Default=0,
+        MinValue=0,
+        MaxValue=100,
+        Description="Share of time (%) the JVMs may spend in garbage collection before nodes are added; 0 for none",
+        Type="Number",
+    ))
+
+    ScalingOldGen = t.add_parameter(Parameter(
+        "ScalingOldGen",
+        Default=0,
+        MinValue=0,
+        MaxValue=100,
+        Description="Old generation occupancy (%) of the JVM heaps beyond which nodes are added; 0 for none",
+        Type="Number",
+    ))
+
+    ScalingRequestsPerNode = t.add_parameter(Parameter(
+        "ScalingRequestsPerNode",
+        Default=0,
+        MinValue=0,
+        Description="Requests per node per minute to keep to with an Application Load Balancer; 0 for none",
+        Type="Number",
+    ))
+
+    TomcatAcceptCount = t.add_parameter(Parameter(
+        "TomcatAcceptCount",
+        Default="10",
+        Description="The maximum queue length for incoming connection requests when all possible request processing threads are in use",
+        Type="String",
+    ))
+
+    TomcatConnectionTimeout = t.add_parameter(Parameter(
+        "TomcatConnectionTimeout",
+        Default="20000",
+        Description="The number of milliseconds this Connector will wait, after accepting a connection, for the request URI line to be presented",
+        Type="String",
+    ))
+
+    TomcatContextPath = t.add_parameter(Parameter(
+        "TomcatContextPath",
+        Default="",
+        AllowedPattern="^(\\/[A-z_\\-0-9\\.]+)?$",
+        Description="The context path of this web application, which is matched against the beginning of each request URI to select the appropriate web application for processing. If used, must include leading \"/\"",
+        Type="String",
+    ))
+
+    TomcatDefaultConnectorPort = t.add_parameter(Parameter(
+        "TomcatDefaultConnectorPort",
+        Default="8080",
+        Description="The port on which to serve the application",
+        Type="String",
+    ))
+
+    TomcatEnableLookups = t.add_parameter(Parameter(
+        "TomcatEnableLookups",
+        Default="false",
+        Description="Set to true if you want calls to request.getRemoteHost() to perform DNS lookups in order to return the actual host name of the remote client",
+        Type="String",
+    ))
+
+    TomcatMaxThreads = t.add_parameter(Parameter(
+        "TomcatMaxThreads",
+        Default="200",
+        Description="The maximum number of request processing threads to be created by this Connector, which therefore determines the maximum number of simultaneous requests that can be handled",
+        Type="String",
+    ))
+
+    TomcatMinSpareThreads = t.add_parameter(Parameter(
+        "TomcatMinSpareThreads",
+        Default="10",
+        Description="The minimum number of threads always kept running",
+        Type="String",
+    ))
+
+    TomcatProtocol = t.add_parameter(Parameter(
+        "TomcatProtocol",
+        Default="HTTP/1.1",
+        Description="Sets the protocol to handle incoming traffic",
+        Type="String",
+    ))
+
+    TomcatRedirectPort = t.add_parameter(Parameter(
+        "TomcatRedirectPort",
+        Default="8443",
+        Description="The port number for Catalina to use when automatically redirecting a non-SSL connector actioning a redirect to a SSL URI",
+        Type="String",
+    ))
+
+    TomcatScheme = t.add_parameter(Parameter(
+        "TomcatScheme",
+        Default="http",
+        Description="The name of the protocol you wish to have returned, ie 'https' for an SSL Connector. The value of this setting also configures Tomcat's proxy port (443/80) and secure (true/false) settings appropriately.",
+        Type="String",
+        AllowedValues=["http", "https"],
+    ))
+
+    WarmPoolSize = t.add_parameter(Parameter(
+        "WarmPoolSize",
+        Default=0,
+        MinValue=0,
+        Description="Number of stopped, already installed cluster nodes to keep ready to join the cluster on scale-out; 0 for no warm pool",
+        MaxValue=3,
+        Type="Number",
+    ))
+
+    t.add_rule("DBConnections",
+        { "Assertions": [{ "Assert": Not(And(Or(And({ "Fn::Contains": [["db.m4.large", "db.t2.large"], Ref(DBInstanceClass)] }, Equals(Ref(DBPoolMaxSize), "50")), And(Equals(Ref(DBInstanceClass), "db.r4.large"), Equals(Ref(DBPoolMaxSize), "100"))), And(Equals(Ref(ClusterNodeMax), "12"), Equals(Ref(WarmPoolSize), "3")))), "AssertDescription": "ClusterNodeMax + WarmPoolSize may be at most 14 with this DBInstanceClass and DBPoolMaxSize" }, { "Assert": Not(And(And(Equals(Ref(DBInstanceClass), "db.t2.medium"), Equals(Ref(DBPoolMaxSize), "30")), Or(And(Equals(Ref(ClusterNodeMax), "12"), Not(Equals(Ref(WarmPoolSize), "0"))), And(Equals(Ref(ClusterNodeMax), "11"), { "Fn::Contains": [["2", "3"], Ref(WarmPoolSize)] }), And(Equals(Ref(ClusterNodeMax), "10"), Equals(Ref(WarmPoolSize), "3"))))), "AssertDescription": "ClusterNodeMax + WarmPoolSize may be at most 12 with this DBInstanceClass and DBPoolMaxSize" }, { "Assert": Not(And(And({ "Fn::Contains": [["db.m4.large", "db.t2.large"], Ref(DBInstanceClass)] }, Equals(Ref(DBPoolMaxSize), "75")), Or({ "Fn::Contains": [["10", "11", "12"], Ref(ClusterNodeMax)] }, And(Equals(Ref(ClusterNodeMax), "9"), Not(Equals(Ref(WarmPoolSize), "0"))), And(Equals(Ref(ClusterNodeMax), "8"), { "Fn::Contains": [["2", "3"], Ref(WarmPoolSize)] }), And(Equals(Ref(ClusterNodeMax), "7"), Equals(Ref(WarmPoolSize), "3"))))), "AssertDescription": "ClusterNodeMax + WarmPoolSize may be at most 9 with this DBInstanceClass and DBPoolMaxSize" }, { "Assert": Not(And(And(Equals(Ref(DBInstanceClass), "db.t2.medium"), Equals(Ref(DBPoolMaxSize), "40")), Or({ "Fn::Contains": [["9", "10", "11", "12"], Ref(ClusterNodeMax)] }, And(Equals(Ref(ClusterNodeMax), "8"), Not(Equals(Ref(WarmPoolSize), "0"))), And(Equals(Ref(ClusterNodeMax), "7"), { "Fn::Contains": [["2", "3"], Ref(WarmPoolSize)] }), And(Equals(Ref(ClusterNodeMax), "6"), Equals(Ref(WarmPoolSize), "3"))))), "AssertDescription": "ClusterNodeMax + WarmPoolSize may be at most 8 with this DBInstanceClass and DBPoolMaxSize" }, { "Assert": Not(And(Or(And(Equals(Ref(DBInstanceClass), "db.t2.medium"), Equals(Ref(DBPoolMaxSize), "50")), And({ "Fn::Contains": [["db.m4.large", "db.t2.large"], Ref(DBInstanceClass)] }, Equals(Ref(DBPoolMaxSize), "100"))), Or({ "Fn::Contains": [["7", "8", "9", "10", "11", "12"], Ref(ClusterNodeMax)] }, And(Equals(Ref(ClusterNodeMax), "6"), Not(Equals(Ref(WarmPoolSize), "0"))), And(Equals(Ref(ClusterNodeMax), "5"), { "Fn::Contains": [["2", "3"], Ref(WarmPoolSize)] }), And(Equals(Ref(ClusterNodeMax), "4"), Equals(Ref(WarmPoolSize), "3"))))), "AssertDescription": "ClusterNodeMax + WarmPoolSize may be at most 6 with this DBInstanceClass and DBPoolMaxSize" }, { "Assert": Not(And(And(Equals(Ref(DBInstanceClass), "db.t2.medium"), Equals(Ref(DBPoolMaxSize), "75")), Or(Not({ "Fn::Contains": [["1", "2", "3", "4"], Ref(ClusterNodeMax)] }), And(Equals(Ref(ClusterNodeMax), "4"), Not(Equals(Ref(WarmPoolSize), "0"))), And(Equals(Ref(ClusterNodeMax), "3"), { "Fn::Contains": [["2", "3"], Ref(WarmPoolSize)] }), And(Equals(Ref(ClusterNodeMax), "2"), Equals(Ref(WarmPoolSize), "3"))))), "AssertDescription": "ClusterNodeMax + WarmPoolSize may be at most 4 with this DBInstanceClass and DBPoolMaxSize" }, { "Assert": Or(Not(And(Equals(Ref(DBInstanceClass), "db.t2.medium"), Equals(Ref(DBPoolMaxSize), "100"))), And(Equals(Ref(WarmPoolSize), "0"), { "Fn::Contains": [["1", "2"], Ref(ClusterNodeMax)] }), And(Equals(Ref(WarmPoolSize), "1"), Equals(Ref(ClusterNodeMax), "1"))), "AssertDescription": "ClusterNodeMax + WarmPoolSize may be at most 2 with this DBInstanceClass and DBPoolMaxSize" }] }
+    )
+
+    t.add_rule("NodeSlowStart",
+        { "RuleCondition": Not(Equals(Ref(NodeSlowStart), "0")), "Assertions": [{ "Assert": Not({ "Fn::Contains": [["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "13", "14", "15", "16", "17", "18", "19", "20", "21", "22", "23", "24", "25", "26", "27", "28", "29"], Ref(NodeSlowStart)] }), "AssertDescription": "NodeSlowStart must be 0, or from 30 to 900 seconds" }] }
+    )
+
+    t.add_rule("BusinessHoursMin",
+        { "Assertions": [{ "Assert": And(And(Or(Not(Equals(Ref(BusinessHoursMin), "2")), Not(Equals(Ref(ClusterNodeMax), "1"))), Or(Not(Equals(Ref(BusinessHoursMin), "3")), Not({ "Fn::Contains": [["1", "2"], Ref(ClusterNodeMax)] })), Or(Not(Equals(Ref(BusinessHoursMin), "4")), Not({ "Fn::Contains": [["1", "2", "3"], Ref(ClusterNodeMax)] })), Or(Not(Equals(Ref(BusinessHoursMin), "5")), Not({ "Fn::Contains": [["1", "2", "3", "4"], Ref(ClusterNodeMax)] })), Or(Not(Equals(Ref(BusinessHoursMin), "6")), Not({ "Fn::Contains": [["1", "2", "3", "4", "5"], Ref(ClusterNodeMax)] })), Or(Not(Equals(Ref(BusinessHoursMin), "7")), { "Fn::Contains": [["7", "8", "9", "10", "11", "12"], Ref(ClusterNodeMax)] })), And(Or(Not(Equals(Ref(BusinessHoursMin), "8")), { "Fn::Contains": [["8", "9", "10", "11", "12"], Ref(ClusterNodeMax)] }), Or(Not(Equals(Ref(BusinessHoursMin), "9")), { "Fn::Contains": [["9", "10", "11", "12"], Ref(ClusterNodeMax)] }), Or(Not(Equals(Ref(BusinessHoursMin), "10")), { "Fn::Contains": [["10", "11", "12"], Ref(ClusterNodeMax)] }), Or(Not(Equals(Ref(BusinessHoursMin), "11")), { "Fn::Contains": [["11", "12"], Ref(ClusterNodeMax)] }), Or(Not(Equals(Ref(BusinessHoursMin), "12")), Equals(Ref(ClusterNodeMax), "12")))), "AssertDescription": "BusinessHoursMin may be at most ClusterNodeMax" }] }
+    )
+
+    t.add_rule("LocalHomeVolumeIops",
+        { "RuleCondition": Not(Equals(Ref(LocalHomeVolumeSize), "0")), "Assertions": [{ "Assert": Or(Not(Equals(Ref(LocalHomeVolumeType), "gp3")), Not({ "Fn::Contains": [["32000", "64000"], Ref(LocalHomeVolumeIops)] })), "AssertDescription": "gp3 volumes allow 3000 to 16000 IOPS" }, { "Assert": Or(Not({ "Fn::Contains": [["1", "2", "3", "4", "5"], Ref(LocalHomeVolumeSize)] }), And(Equals(Ref(LocalHomeVolumeType), "gp3"), Equals(Ref(LocalHomeVolumeIops), "3000"))), "AssertDescription": "LocalHomeVolumeIops may be at most 500 per GiB of LocalHomeVolumeSize" }, { "Assert": Or(Not({ "Fn::Contains": [["6", "7", "8", "9", "10", "11"], Ref(LocalHomeVolumeSize)] }), Equals(Ref(LocalHomeVolumeIops), "3000")), "AssertDescription": "LocalHomeVolumeIops may be at most 500 per GiB of LocalHomeVolumeSize" }, { "Assert": Or(Not({ "Fn::Contains": [["12", "13", "14", "15", "16", "17", "18", "19"], Ref(LocalHomeVolumeSize)] }), { "Fn::Contains": [["3000", "6000"], Ref(LocalHomeVolumeIops)] }), "AssertDescription": "LocalHomeVolumeIops may be at most 500 per GiB of LocalHomeVolumeSize" }, { "Assert": Or(Not({ "Fn::Contains": [["20", "21", "22", "23", "24", "25", "26", "27", "28", "29", "30", "31"], Ref(LocalHomeVolumeSize)] }), { "Fn::Contains": [["3000", "6000", "10000"], Ref(LocalHomeVolumeIops)] }), "AssertDescription": "LocalHomeVolumeIops may be at most 500 per GiB of LocalHomeVolumeSize" }, { "Assert": Or(Not({ "Fn::Contains": [["32", "33", "34", "35", "36", "37", "38", "39", "40", "41", "42", "43", "44", "45", "46", "47", "48", "49", "50", "51", "52", "53", "54", "55", "56", "57", "58", "59", "60", "61", "62", "63"], Ref(LocalHomeVolumeSize)] }), Not({ "Fn::Contains": [["32000", "64000"], Ref(LocalHomeVolumeIops)] })), "AssertDescription": "LocalHomeVolumeIops may be at most 500 per GiB of LocalHomeVolumeSize" }, { "Assert": Or(Not({ "Fn::Contains": [["64", "65", "66", "67", "68", "69", "70", "71", "72", "73", "74", "75", "76", "77", "78", "79", "80", "81", "82", "83", "84", "85", "86", "87", "88", "89", "90", "91", "92", "93", "94", "95", "96", "97", "98", "99", "100", "101", "102", "103", "104", "105", "106", "107", "108", "109", "110", "111", "112", "113", "114", "115", "116", "117", "118", "119", "120", "121", "122", "123", "124", "125", "126", "127"], Ref(LocalHomeVolumeSize)] }), Not(Equals(Ref(LocalHomeVolumeIops), "64000"))), "AssertDescription": "LocalHomeVolumeIops may be at most 500 per GiB of LocalHomeVolumeSize" }] }
+    )
+
+    t.add_condition("DBProvisionedIops",
+        Equals(Ref(DBStorageType), "Provisioned IOPS")
+    )
+
+    t.add_condition("DisableMail",
+        Not(Equals(Ref(MailEnabled), True))
+    )
+
+    t.add_condition("DoSetDBMasterUserPassword",
+        Not(Equals(Ref(DBMasterUserPassword), ""))
+    )
+
+    t.add_condition("DoSSL",
+        Not(Equals(Ref(SSLCertificateARN), ""))
+    )
+
+    t.add_condition("KeyProvided",
+        Not(Equals(Ref(KeyPairName), ""))
+    )
+
+    t.add_condition("SSLScheme",
+        Equals(Ref(TomcatScheme), "https")
+    )
+
+    t.add_condition("OverrideHeap",
+        Not(Equals(Ref(JvmHeapOverride), ""))
+    )
+
+    t.add_condition("UseApplicationLoadBalancer",
+        Equals(Ref(LoadBalancerType), "Application")
+    )
+
+    t.add_condition("UseApplicationLoadBalancerSSL",
+        And(Condition("UseApplicationLoadBalancer"), Condition("DoSSL"))
+    )
+
+    t.add_condition("UseClassicLoadBalancer",
+        Not(Condition("UseApplicationLoadBalancer"))
+    )
+
+    t.add_condition("UseClusterNodeAlt1",
+        And(Equals(Ref(ClusterNodeMixedInstances), "true"), Not(Equals(FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Alt1"), Ref(ClusterNodeInstanceType))))
+    )
+
+    t.add_condition("UseClusterNodeAlt2",
+        And(Equals(Ref(ClusterNodeMixedInstances), "true"), Not(Equals(FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Alt2"), Ref(ClusterNodeInstanceType))))
+    )
+
+    t.add_condition("UseBakedImage",
+        Equals(Ref(BakeClusterNodeImage), "true")
+    )
+
+    t.add_condition("UseBusinessHours",
+        Not(Equals(Ref(BusinessHoursMin), "0"))
+    )
+
+    t.add_condition("UseContextPath",
+        Not(Equals(Ref(TomcatContextPath), ""))
+    )
+
+    t.add_condition("UseCustomDnsName",
+        Not(Equals(Ref(CustomDnsName), ""))
+    )
+
+    t.add_condition("UseDatabaseEncryption",
+        Equals(Ref(DBStorageEncrypted), True)
+    )
+
+    t.add_condition("UseHostedZone",
+        Not(Equals(Ref(HostedZone), ""))
+    )
+
+    t.add_condition("UseGp3LocalHome",
+        Equals(Ref(LocalHomeVolumeType), "gp3")
+    )
+
+    t.add_condition("UseLocalHomeVolume",
+        Not(Equals(Ref(LocalHomeVolumeSize), "0"))
+    )
+
+    t.add_condition("UsePublicIp",
+        Equals(Ref(AssociatePublicIpAddress), "true")
+    )
+
+    t.add_condition("UseSlowStart",
+        Not(Equals(Ref(NodeSlowStart), "0"))
+    )
+
+    t.add_condition("UseCpuScaling",
+        Not(Equals(Ref(ScalingCpuTarget), "0"))
+    )
+
+    t.add_condition("UseGcTimeScaling",
+        Not(Equals(Ref(ScalingGcTime), "0"))
+    )
+
+    t.add_condition("UseJvmScaling",
+        Or(Condition("UseGcTimeScaling"), Condition("UseOldGenScaling"))
+    )
+
+    t.add_condition("UseOldGenScaling",
+        Not(Equals(Ref(ScalingOldGen), "0"))
+    )
+
+    t.add_condition("UseRequestScaling",
+        And(Condition("UseApplicationLoadBalancer"), Not(Equals(Ref(ScalingRequestsPerNode), "0")))
+    )
+
+    t.add_condition("UseWarmPool",
+        Not(Equals(Ref(WarmPoolSize), "0"))
+    )
+
+    t.add_mapping("JIRAProduct2NameAndVersion",
+    {'Core': {'fulldisplayname': '"Atlassian Jira Core"',
+              'name': 'jira-core',
+              'shortdisplayname': '"Jira Core"'},
+     'ServiceDesk': {'fulldisplayname': '"Atlassian Jira Service Desk"',
+                     'name': 'servicedesk',
+                     'shortdisplayname': '"Jira SD"'},
+     'Software': {'fulldisplayname': '"Atlassian Jira Software"',
+                  'name': 'jira-software',
+                  'shortdisplayname': '"Jira SW"'}}
+    )
+
+    t.add_mapping("InstanceType2Size",
+    {'c4.2xlarge': {'Size': '8x15'},
+     'c4.4xlarge': {'Size': '16x30'},
+     'c4.8xlarge': {'Size': '36x60'},
+     'c4.large': {'Size': '2x3.75'},
+     'c4.xlarge': {'Size': '4x7.5'},
+     'c5.18xlarge': {'Size': '72x144'},
+     'c5.2xlarge': {'Size': '8x16'},
+     'c5.4xlarge': {'Size': '16x32'},
+     'c5.9xlarge': {'Size': '36x72'},
+     'c5.large': {'Size': '2x4'},
+     'c5.xlarge': {'Size': '4x8'},
+     'c5d.18xlarge': {'Size': '72x144'},
+     'c5d.2xlarge': {'Size': '8x16'},
+     'c5d.4xlarge': {'Size': '16x32'},
+     'c5d.9xlarge': {'Size': '36x72'},
+     'c5d.large': {'Size': '2x4'},
+     'c5d.xlarge': {'Size': '4x8'},
+     'd2.2xlarge': {'Size': '8x61'},
+     'd2.4xlarge': {'Size': '16x122'},
+     'd2.8xlarge': {'Size': '36x244'},
+     'd2.xlarge': {'Size': '4x30.5'},
+     'h1.16xlarge': {'Size': '64x256'},
+     'h1.2xlarge': {'Size': '8x32'},
+     'h1.4xlarge': {'Size': '16x64'},
+     'h1.8xlarge': {'Size': '32x128'},
+     'i3.16xlarge': {'Size': '64x488'},
+     'i3.2xlarge': {'Size': '8x61'},
+     'i3.4xlarge': {'Size': '16x122'},
+     'i3.8xlarge': {'Size': '32x244'},
+     'i3.large': {'Size': '2x15.25'},
+     'i3.metal': {'Size': '72x512'},
+     'i3.xlarge': {'Size': '4x30.5'},
+     'm4.10xlarge': {'Size': '40x160'},
+     'm4.16xlarge': {'Size': '64x256'},
+     'm4.2xlarge': {'Size': '8x32'},
+     'm4.4xlarge': {'Size': '16x64'},
+     'm4.large': {'Size': '2x8'},
+     'm4.xlarge': {'Size': '4x16'},
+     'm5.12xlarge': {'Size': '48x192'},
+     'm5.24xlarge': {'Size': '96x384'},
+     'm5.2xlarge': {'Size': '8x32'},
+     'm5.4xlarge': {'Size': '16x64'},
+     'm5.large': {'Size': '2x8'},
+     'm5.xlarge': {'Size': '4x16'},
+     'm5d.12xlarge': {'Size': '48x192'},
+     'm5d.24xlarge': {'Size': '96x384'},
+     'm5d.2xlarge': {'Size': '8x32'},
+     'm5d.4xlarge': {'Size': '16x64'},
+     'm5d.large': {'Size': '2x8'},
+     'm5d.xlarge': {'Size': '4x16'},
+     'r4.16xlarge': {'Size': '64x488'},
+     'r4.2xlarge': {'Size': '8x61'},
+     'r4.4xlarge': {'Size': '16x122'},
+     'r4.8xlarge': {'Size': '32x244'},
+     'r4.large': {'Size': '2x15.25'},
+     'r4.xlarge': {'Size': '4x30.5'},
+     'r5.12xlarge': {'Size': '48x384'},
+     'r5.24xlarge': {'Size': '96x768'},
+     'r5.2xlarge': {'Size': '8x64'},
+     'r5.4xlarge': {'Size': '16x128'},
+     'r5.large': {'Size': '2x16'},
+     'r5.xlarge': {'Size': '4x32'},
+     'r5d.12xlarge': {'Size': '48x384'},
+     'r5d.24xlarge': {'Size': '96x768'},
+     'r5d.2xlarge': {'Size': '8x64'},
+     'r5d.4xlarge': {'Size': '16x128'},
+     'r5d.large': {'Size': '2x16'},
+     'r5d.xlarge': {'Size': '4x32'},
+     't2.2xlarge': {'Size': '8x32-burstable'},
+     't2.large': {'Size': '2x8-burstable'},
+     't2.medium': {'Size': '2x4-burstable'},
+     't2.xlarge': {'Size': '4x16-burstable'},
+     't3.2xlarge': {'Size': '8x32-burstable'},
+     't3.large': {'Size': '2x8-burstable'},
+     't3.medium': {'Size': '2x4-burstable'},
+     't3.xlarge': {'Size': '4x16-burstable'},
+     'x1.16xlarge': {'Size': '64x976'},
+     'x1.32xlarge': {'Size': '128x1952'},
+     'x1e.16xlarge': {'Size': '64x1952'},
+     'x1e.2xlarge': {'Size': '8x244'},
+     'x1e.32xlarge': {'Size': '128x3904'},
+     'x1e.4xlarge': {'Size': '16x488'},
+     'x1e.8xlarge': {'Size': '32x976'},
+     'x1e.xlarge': {'Size': '4x122'},
+     'z1d.12xlarge': {'Size': '48x384'},
+     'z1d.2xlarge': {'Size': '8x64'},
+     'z1d.3xlarge': {'Size': '12x96'},
+     'z1d.6xlarge': {'Size': '24x192'},
+     'z1d.large': {'Size': '2x16'},
+     'z1d.xlarge': {'Size': '4x32'}}
+    )
+
+    t.add_mapping("Size2Node",
+    {'128x1952': {'Alt1': 'x1.32xlarge',
+                  'Alt2': 'x1.32xlarge',
+                  'Plan': '31744m-16m-1024m-2048m'},
+     '128x3904': {'Alt1': 'x1e.32xlarge',
+                  'Alt2': 'x1e.32xlarge',
+                  'Plan': '31744m-16m-1024m-2048m'},
+     '12x96': {'Alt1': 'z1d.3xlarge',
+               'Alt2': 'z1d.3xlarge',
+               'Plan': '31744m-16m-1024m-2048m'},
+     '16x122': {'Alt1': 'r4.4xlarge',
+                'Alt2': 'i3.4xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '16x128': {'Alt1': 'r5.4xlarge',
+                'Alt2': 'r5d.4xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '16x30': {'Alt1': 'c4.4xlarge',
+               'Alt2': 'c4.4xlarge',
+               'Plan': '18176m-16m-1024m-1088m'},
+     '16x32': {'Alt1': 'c5.4xlarge',
+               'Alt2': 'c5d.4xlarge',
+               'Plan': '19456m-16m-1024m-1216m'},
+     '16x488': {'Alt1': 'x1e.4xlarge',
+                'Alt2': 'x1e.4xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '16x64': {'Alt1': 'm5.4xlarge',
+               'Alt2': 'm5d.4xlarge',
+               'Plan': '31744m-16m-1024m-2048m'},
+     '24x192': {'Alt1': 'z1d.6xlarge',
+                'Alt2': 'z1d.6xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '2x15.25': {'Alt1': 'r4.large',
+                 'Alt2': 'i3.large',
+                 'Plan': '8704m-8m-512m-512m'},
+     '2x16': {'Alt1': 'r5.large',
+              'Alt2': 'r5d.large',
+              'Plan': '8960m-8m-1024m-512m'},
+     '2x3.75': {'Alt1': 'c4.large',
+                'Alt2': 'c4.large',
+                'Plan': '1024m-1m-512m-256m'},
+     '2x4': {'Alt1': 'c5.large', 'Alt2': 'c5d.large', 'Plan': '1024m-1m-512m-256m'},
+     '2x4-burstable': {'Alt1': 't3.medium',
+                       'Alt2': 't2.medium',
+                       'Plan': '1024m-1m-512m-256m'},
+     '2x8': {'Alt1': 'm5.large', 'Alt2': 'm5d.large', 'Plan': '3840m-2m-512m-256m'},
+     '2x8-burstable': {'Alt1': 't3.large',
+                       'Alt2': 't2.large',
+                       'Plan': '3840m-2m-512m-256m'},
+     '32x128': {'Alt1': 'h1.8xlarge',
+                'Alt2': 'h1.8xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '32x244': {'Alt1': 'r4.8xlarge',
+                'Alt2': 'i3.8xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '32x976': {'Alt1': 'x1e.8xlarge',
+                'Alt2': 'x1e.8xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '36x244': {'Alt1': 'd2.8xlarge',
+                'Alt2': 'd2.8xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '36x60': {'Alt1': 'c4.8xlarge',
+               'Alt2': 'c4.8xlarge',
+               'Plan': '31744m-16m-1024m-2048m'},
+     '36x72': {'Alt1': 'c5.9xlarge',
+               'Alt2': 'c5d.9xlarge',
+               'Plan': '31744m-16m-1024m-2048m'},
+     '40x160': {'Alt1': 'm4.10xlarge',
+                'Alt2': 'm4.10xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '48x192': {'Alt1': 'm5.12xlarge',
+                'Alt2': 'm5d.12xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '48x384': {'Alt1': 'r5.12xlarge',
+                'Alt2': 'r5d.12xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '4x122': {'Alt1': 'x1e.xlarge',
+               'Alt2': 'x1e.xlarge',
+               'Plan': '31744m-16m-1024m-2048m'},
+     '4x16': {'Alt1': 'm5.xlarge',
+              'Alt2': 'm5d.xlarge',
+              'Plan': '8704m-8m-1024m-512m'},
+     '4x16-burstable': {'Alt1': 't3.xlarge',
+                        'Alt2': 't2.xlarge',
+                        'Plan': '8704m-8m-1024m-512m'},
+     '4x30.5': {'Alt1': 'r4.xlarge',
+                'Alt2': 'i3.xlarge',
+                'Plan': '18688m-16m-1024m-1152m'},
+     '4x32': {'Alt1': 'r5.xlarge',
+              'Alt2': 'r5d.xlarge',
+              'Plan': '19712m-16m-1024m-1216m'},
+     '4x7.5': {'Alt1': 'c4.xlarge',
+               'Alt2': 'c4.xlarge',
+               'Plan': '3328m-2m-512m-256m'},
+     '4x8': {'Alt1': 'c5.xlarge',
+             'Alt2': 'c5d.xlarge',
+             'Plan': '3584m-2m-512m-256m'},
+     '64x1952': {'Alt1': 'x1e.16xlarge',
+                 'Alt2': 'x1e.16xlarge',
+                 'Plan': '31744m-16m-1024m-2048m'},
+     '64x256': {'Alt1': 'm4.16xlarge',
+                'Alt2': 'h1.16xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '64x488': {'Alt1': 'r4.16xlarge',
+                'Alt2': 'i3.16xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '64x976': {'Alt1': 'x1.16xlarge',
+                'Alt2': 'x1.16xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '72x144': {'Alt1': 'c5.18xlarge',
+                'Alt2': 'c5d.18xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '72x512': {'Alt1': 'i3.metal',
+                'Alt2': 'i3.metal',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '8x15': {'Alt1': 'c4.2xlarge',
+              'Alt2': 'c4.2xlarge',
+              'Plan': '8448m-8m-512m-512m'},
+     '8x16': {'Alt1': 'c5.2xlarge',
+              'Alt2': 'c5d.2xlarge',
+              'Plan': '8704m-8m-1024m-512m'},
+     '8x244': {'Alt1': 'x1e.2xlarge',
+               'Alt2': 'x1e.2xlarge',
+               'Plan': '31744m-16m-1024m-2048m'},
+     '8x32': {'Alt1': 'm5.2xlarge',
+              'Alt2': 'm5d.2xlarge',
+              'Plan': '19712m-16m-1024m-1216m'},
+     '8x32-burstable': {'Alt1': 't3.2xlarge',
+                        'Alt2': 't2.2xlarge',
+                        'Plan': '19712m-16m-1024m-1216m'},
+     '8x61': {'Alt1': 'r4.2xlarge',
+              'Alt2': 'i3.2xlarge',
+              'Plan': '31744m-16m-1024m-2048m'},
+     '8x64': {'Alt1': 'r5.2xlarge',
+              'Alt2': 'r5d.2xlarge',
+              'Plan': '31744m-16m-1024m-2048m'},
+     '96x384': {'Alt1': 'm5.24xlarge',
+                'Alt2': 'm5d.24xlarge',
+                'Plan': '31744m-16m-1024m-2048m'},
+     '96x768': {'Alt1': 'r5.24xlarge',
+                'Alt2': 'r5d.24xlarge',
+                'Plan': '31744m-16m-1024m-2048m'}}
+    )
+
+    t.add_mapping("Plan2Jvm",
+    {'1024m-1m-512m-256m': {'Jvmdirect': '256m',
+                            'Jvmheap': '1024m',
+                            'Jvmmeta': '512m',
+                            'Jvmregion': '1m'},
+     '18176m-16m-1024m-1088m': {'Jvmdirect': '1088m',
+                                'Jvmheap': '18176m',
+                                'Jvmmeta': '1024m',
+                                'Jvmregion': '16m'},
+     '18688m-16m-1024m-1152m': {'Jvmdirect': '1152m',
+                                'Jvmheap': '18688m',
+                                'Jvmmeta': '1024m',
+                                'Jvmregion': '16m'},
+     '19456m-16m-1024m-1216m': {'Jvmdirect': '1216m',
+                                'Jvmheap': '19456m',
+                                'Jvmmeta': '1024m',
+                                'Jvmregion': '16m'},
+     '19712m-16m-1024m-1216m': {'Jvmdirect': '1216m',
+                                'Jvmheap': '19712m',
+                                'Jvmmeta': '1024m',
+                                'Jvmregion': '16m'},
+     '31744m-16m-1024m-2048m': {'Jvmdirect': '2048m',
+                                'Jvmheap': '31744m',
+                                'Jvmmeta': '1024m',
+                                'Jvmregion': '16m'},
+     '3328m-2m-512m-256m': {'Jvmdirect': '256m',
+                            'Jvmheap': '3328m',
+                            'Jvmmeta': '512m',
+                            'Jvmregion': '2m'},
+     '3584m-2m-512m-256m': {'Jvmdirect': '256m',
+                            'Jvmheap': '3584m',
+                            'Jvmmeta': '512m',
+                            'Jvmregion': '2m'},
+     '3840m-2m-512m-256m': {'Jvmdirect': '256m',
+                            'Jvmheap': '3840m',
+                            'Jvmmeta': '512m',
+                            'Jvmregion': '2m'},
+     '8448m-8m-512m-512m': {'Jvmdirect': '512m',
+                            'Jvmheap': '8448m',
+                            'Jvmmeta': '512m',
+                            'Jvmregion': '8m'},
+     '8704m-8m-1024m-512m': {'Jvmdirect': '512m',
+                             'Jvmheap': '8704m',
+                             'Jvmmeta': '1024m',
+                             'Jvmregion': '8m'},
+     '8704m-8m-512m-512m': {'Jvmdirect': '512m',
+                            'Jvmheap': '8704m',
+                            'Jvmmeta': '512m',
+                            'Jvmregion': '8m'},
+     '8960m-8m-1024m-512m': {'Jvmdirect': '512m',
+                             'Jvmheap': '8960m',
+                             'Jvmmeta': '1024m',
+                             'Jvmregion': '8m'}}
+    )
+
+    DeploymentArtifacts = t.add_resource(Bucket(
+        "DeploymentArtifacts",
+        BucketEncryption=BucketEncryption(
+            ServerSideEncryptionConfiguration=[
+                ServerSideEncryptionRule(
+                    ServerSideEncryptionByDefault=ServerSideEncryptionByDefault(
+                        SSEAlgorithm="AES256",
+                    ),
+                ),
+            ],
+        ),
+        LifecycleConfiguration=LifecycleConfiguration(
+            Rules=[
+                LifecycleRule(
+                    Id="RefreshDeploymentAutomation",
+                    Prefix="deployment-automation/",
+                    ExpirationInDays=30,
+                    Status="Enabled",
+                ),
+            ],
+        ),
+        PublicAccessBlockConfiguration=PublicAccessBlockConfiguration(
+            BlockPublicAcls=True,
+            BlockPublicPolicy=True,
+            IgnorePublicAcls=True,
+            RestrictPublicBuckets=True,
+        ),
+        DeletionPolicy="Retain",
+    ))
+
+    ClusterNodeImageComponent = t.add_resource(Component(
+        "ClusterNodeImageComponent",
+        Name=Sub("${AWS::StackName}-cluster-node"),
+        Platform="Linux",
+        Version=Ref(ClusterNodeImageVersion),
+        Data=Sub("name: JiraClusterNodeInstall\ndescription: Run the bake config set of ClusterNodeInstall\nschemaVersion: 1.0\nphases:\n  - name: build\n    steps:\n      - name: Install\n        action: ExecuteBash\n        inputs:\n          commands:\n            - yum update -y aws-cfn-bootstrap\n            - /opt/aws/bin/cfn-init -v --stack ${AWS::StackName} --resource ClusterNodeInstall --configsets bake --region ${AWS::Region}\n            - rm -f /root/.ssh/deployment_repo_key\n"),
+        Condition="UseBakedImage",
+    ))
+
+    ElasticFileSystem = t.add_resource(FileSystem(
+        "ElasticFileSystem",
+        FileSystemTags=Tags(
+            Name=Join(" ", [Ref("AWS::StackName"), "cluster shared-files"]),
+            Application=Ref("AWS::StackId"),
+        ),
+    ))
+
+    DBSubnetGroup_ = t.add_resource(DBSubnetGroup(
+        "DBSubnetGroup",
+        DBSubnetGroupDescription="DBSubnetGroup",
+        SubnetIds=Split(",", ImportValue("ATL-PriNets")),
+    ))
+
+    ClusterNodeTargetGroup = t.add_resource(TargetGroup(
+        "ClusterNodeTargetGroup",
+        Port=Ref(TomcatDefaultConnectorPort),
+        Protocol="HTTP",
+        VpcId=ImportValue("ATL-VPCID"),
+        HealthCheckPath=If("UseContextPath", Sub("${TomcatContextPath}/status"), "/status"),
+        HealthCheckTimeoutSeconds=29,
+        HealthyThresholdCount=2,
+        TargetGroupAttributes=[
+            TargetGroupAttribute(
+                Key="deregistration_delay.timeout_seconds",
+                Value="60",
+            ),
+            TargetGroupAttribute(
+                Key="slow_start.duration_seconds",
+                Value=Ref(NodeSlowStart),
+            ),
+            TargetGroupAttribute(
+                Key="load_balancing.algorithm.type",
+                Value=If("UseSlowStart", "round_robin", "least_outstanding_requests"),
+            ),
+            TargetGroupAttribute(
+                Key="stickiness.enabled",
+                Value="true",
+            ),
+            TargetGroupAttribute(
+                Key="stickiness.type",
+                Value="app_cookie",
+            ),
+            TargetGroupAttribute(
+                Key="stickiness.app_cookie.cookie_name",
+                Value="JSESSIONID",
+            ),
+        ],
+        Condition="UseApplicationLoadBalancer",
+    ))
+
+    SecurityGroup_ = t.add_resource(SecurityGroup(
+        "SecurityGroup",
+        GroupDescription="Security group allowing SSH and HTTP/HTTPS access",
+        SecurityGroupIngress=[{ "IpProtocol": "tcp", "FromPort": 22, "ToPort": 22, "CidrIp": Ref(CidrBlock) }, { "IpProtocol": "tcp", "FromPort": 80, "ToPort": 80, "CidrIp": Ref(CidrBlock) }, { "IpProtocol": "tcp", "FromPort": 443, "ToPort": 443, "CidrIp": Ref(CidrBlock) }],
+        Tags=Tags(
+            Name=Join(" ", [Ref("AWS::StackName"), "sg"]),
+        ),
+        VpcId=ImportValue("ATL-VPCID"),
+    ))
+
+    EncryptionKey = t.add_resource(Key(
+        "EncryptionKey",
+        KeyPolicy={ "Version": "2012-10-17", "Id": Sub("${AWS::StackName}"), "Statement": [{ "Effect": "Allow", "Principal": { "AWS": [Sub("arn:aws:iam::${AWS::AccountId}:root")] }, "Action": "kms:*", "Resource": "*" }] },
+        Tags=Tags(
+            Name=Sub("${StackName} Encryption Key", { "StackName": Ref("AWS::StackName") }),
+        ),
+        DeletionPolicy="Retain",
+        Condition="UseDatabaseEncryption",
+    ))
+
+    JiraClusterNodeRole = t.add_resource(Role(
+        "JiraClusterNodeRole",
+        AssumeRolePolicyDocument={ "Version": "2012-10-17", "Statement": [{ "Effect": "Allow", "Principal": { "Service": ["ec2.amazonaws.com"] }, "Action": ["sts:AssumeRole"] }] },
+        ManagedPolicyArns=["arn:aws:iam::aws:policy/service-role/AmazonEC2RoleforSSM"],
+        Path="/",
+        Policies=[
+            Policy(
+                PolicyName="JiraClusterNodePolicy",
+                PolicyDocument={ "Version": "2012-10-17", "Statement": [{ "Action": ["autoscaling:CompleteLifecycleAction", "autoscaling:DescribeAutoScalingInstances", "cloudwatch:PutMetricData", "ec2:DescribeInstances", "route53:ListHostedZones", "route53:ListResourceRecordSet"], "Effect": "Allow", "Resource": ["*"] }, { "Action": ["route53:ChangeResourceRecordSets"], "Effect": "Allow", "Resource": ["arn:aws:route53:::healthcheck/*", "arn:aws:route53:::change/*", "arn:aws:route53:::hostedzone/*", "arn:aws:route53:::delegationset/*"] }, { "Action": ["s3:GetObject", "s3:PutObject"], "Effect": "Allow", "Resource": [Sub("arn:aws:s3:::${DeploymentArtifacts}/deployment-automation/*")] }] },
+            ),
+        ],
+    ))
+
+    ClusterNodeImageRole = t.add_resource(Role(
+        "ClusterNodeImageRole",
+        AssumeRolePolicyDocument={ "Version": "2012-10-17", "Statement": [{ "Effect": "Allow", "Principal": { "Service": ["ec2.amazonaws.com"] }, "Action": ["sts:AssumeRole"] }] },
+        ManagedPolicyArns=["arn:aws:iam::aws:policy/AmazonSSMManagedInstanceCore", "arn:aws:iam::aws:policy/EC2InstanceProfileForImageBuilder"],
+        Path="/",
+        Policies=[
+            Policy(
+                PolicyName="ClusterNodeImagePolicy",
+                PolicyDocument={ "Version": "2012-10-17", "Statement": [{ "Action": ["cloudformation:DescribeStackResource"], "Effect": "Allow", "Resource": [Ref("AWS::StackId")] }, { "Action": ["s3:GetObject", "s3:PutObject"], "Effect": "Allow", "Resource": [Sub("arn:aws:s3:::${DeploymentArtifacts}/deployment-automation/*")] }] },
+            ),
+        ],
+        Condition="UseBakedImage",
+    ))
+
+    ClusterNodeImageRecipe = t.add_resource(ImageRecipe(
+        "ClusterNodeImageRecipe",
+        Name=Sub("${AWS::StackName}-cluster-node"),
+        Version=Ref(ClusterNodeImageVersion),
+        ParentImage=Ref(ClusterNodeBaseImage),
+        Components=[
+            ComponentConfiguration(
+                ComponentArn=Sub("arn:aws:imagebuilder:${AWS::Region}:aws:component/update-linux/x.x.x"),
+            ),
+            ComponentConfiguration(
+                ComponentArn=Ref(ClusterNodeImageComponent),
+            ),
+        ],
+        Condition="UseBakedImage",
+    ))
+
+    ClusterNodeInstall = t.add_resource(WaitConditionHandle(
+        "ClusterNodeInstall",
+        Metadata={ "Comment": "What a cluster node needs before it is configured: installed at launch, or baked into ClusterNodeImage", "AWS::CloudFormation::Init": { "configSets": { "install": ["install"], "bake": ["install", "bake"] }, "install": { "files": { "/opt/atlassian/bin/clone_deployment_repo": { "content": Sub("#!/bin/bash\nkey_location=/root/.ssh/deployment_repo_key\nkey_name=\"${DeploymentAutomationKeyName}\"\n\nyum install -y git\nif [[ ! -z \"$key_name\" ]]; then\n    # Ensure awscli is up to date\n    yum install -y awscli jq\n    key_val=$(aws --region=${AWS::Region} ssm get-parameters --names \"$key_name\" --with-decryption | jq --raw-output '.Parameters[0] .Value')\n    echo -e $key_val > $key_location\n    chmod 600 $key_location\n    export GIT_SSH_COMMAND=\"ssh -o IdentitiesOnly=yes -o StrictHostKeyChecking=no -i $key_location\"\nelse\n    export GIT_SSH_COMMAND=\"ssh -o IdentitiesOnly=yes -o StrictHostKeyChecking=no\"\nfi\n\ngit clone \"${DeploymentAutomationRepository}\" -b \"${DeploymentAutomationBranch}\" /opt/atlassian/dc-deployments-automation/\n"), "mode": "000750", "owner": "root", "group": "root" }, "/opt/atlassian/bin/deployment_repo_cache": { "content": Sub("#!/bin/bash\n# Fetch the deployment automation, with the Ansible environment built in\n# the checkout and its .ansible-installed marker, from the artifact cache of\n# the stack, or publish it there: a tarball named by its SHA-256, and a\n# pointer to it per repository, branch, OS release and Python version, which\n# the virtualenv is built for. Both expire after 30 days, and the next bake\n# or node publishes again. The checksum lives in the same bucket, so\n# it catches a truncated or corrupt download, not a tarball replaced by\n# someone who may write to the bucket.\ncache=s3://${DeploymentArtifacts}/deployment-automation\nrelease=$(. /etc/os-release && echo $ID-$VERSION_ID)\npython=$(python3 -V 2>&1)\npointer=$cache/$(echo -n \"${DeploymentAutomationRepository}#${DeploymentAutomationBranch}#$release#$python\" | sha256sum | cut -c1-16)\ntarball=/tmp/deployment-automation.tar.gz\ncd /opt/atlassian\ncase \"$1\" in\nfetch)\n    sum=$(aws s3 cp --region ${AWS::Region} $pointer - 2>/dev/null) &&\n        aws s3 cp --region ${AWS::Region} --quiet $cache/sha256/$sum.tar.gz $tarball &&\n        echo \"$sum  $tarball\" | sha256sum -c --quiet &&\n        tar -xzf $tarball &&\n        touch /opt/atlassian/.deployment-repo-cached\n    status=$?\n    [ $status = 0 ] || rm -rf dc-deployments-automation\n    ;;\npublish)\n    tar -czf $tarball dc-deployments-automation &&\n        sum=$(sha256sum $tarball | cut -d' ' -f1) &&\n        aws s3 cp --region ${AWS::Region} --quiet $tarball $cache/sha256/$sum.tar.gz &&\n        echo -n $sum | aws s3 cp --region ${AWS::Region} - $pointer &&\n        touch /opt/atlassian/.deployment-repo-cached\n    status=$?\n    ;;\n*)\n    echo \"usage: $0 fetch|publish\" >&2\n    status=2\n    ;;\nesac\nrm -f $tarball\nexit $status\n"), "mode": "000750", "owner": "root", "group": "root" } }, "commands": { "070_create_atl_dir": { "test": "test ! -d /opt/atlassian/", "command": "mkdir -p /opt/atlassian", "ignoreErrors": False }, "071_install_packages": { "command": "yum install -y git python-virtualenv mdadm", "ignoreErrors": True }, "072_clone_atl_scripts": { "test": "test ! -d /opt/atlassian/dc-deployments-automation/", "command": "/opt/atlassian/bin/deployment_repo_cache fetch || /opt/atlassian/bin/clone_deployment_repo", "ignoreErrors": True }, "073_install_ansible": { "test": "test ! -f /opt/atlassian/dc-deployments-automation/.ansible-installed", "command": "cd /opt/atlassian/dc-deployments-automation/ && ./bin/install-ansible && touch /opt/atlassian/dc-deployments-automation/.ansible-installed", "env": { "PIPENV_VENV_IN_PROJECT": "1" }, "ignoreErrors": True }, "074_publish_atl_scripts": { "test": "test -f /opt/atlassian/dc-deployments-automation/.ansible-installed -a ! -f /opt/atlassian/.deployment-repo-cached", "command": "/opt/atlassian/bin/deployment_repo_cache publish", "ignoreErrors": True } } }, "bake": { "files": { "/opt/atlassian/bin/install_product": { "content": Sub("#!/bin/bash\n# Install Jira into the image being baked with the product roles of the\n# playbook alone, from an /etc/atl with the product settings and none of\n# the credentials. The playbook finds it installed when the node boots.\ncd /opt/atlassian/dc-deployments-automation/\ncat > bake-product.yml <<EOF\n- hosts: aws_node_local\n  become: true\n  roles:\n    - product_common\n    - product_install\nEOF\ncat > /etc/atl <<EOF\nATL_PRODUCT_FAMILY=jira\nATL_PRODUCT_EDITION=${JiraProduct}\nATL_PRODUCT_VERSION=${JiraVersion}\nATL_RELEASE_S3_BUCKET=atlassian-software\nATL_RELEASE_S3_PATH=releases\nEOF\n./bin/ansible-with-atl-env inv/aws_node_local bake-product.yml /var/log/ansible-bake.log\nstatus=$?\nrm -f /etc/atl bake-product.yml\nexit $status\n"), "mode": "000750", "owner": "root", "group": "root" } }, "commands": { "076_install_product": { "command": "/opt/atlassian/bin/install_product", "ignoreErrors": False }, "077_publish_atl_scripts": { "command": "/opt/atlassian/bin/deployment_repo_cache publish", "ignoreErrors": True } } } } },
+    ))
+
+    EFSMountAz1 = t.add_resource(MountTarget(
+        "EFSMountAz1",
+        FileSystemId=Ref(ElasticFileSystem),
+        SecurityGroups=[Ref(SecurityGroup_)],
+        SubnetId=Select(0, Split(",", ImportValue("ATL-PriNets"))),
+    ))
+
+    EFSMountAz2 = t.add_resource(MountTarget(
+        "EFSMountAz2",
+        FileSystemId=Ref(ElasticFileSystem),
+        SecurityGroups=[Ref(SecurityGroup_)],
+        SubnetId=Select(1, Split(",", ImportValue("ATL-PriNets"))),
+    ))
+
+    EFSCname = t.add_resource(RecordSetType(
+        "EFSCname",
+        HostedZoneName=Ref(HostedZone),
+        Comment="Route53 cname for the efs",
+        Name=If("UseHostedZone", Join(".", [Ref("AWS::StackName"), "efs", Ref(HostedZone)]), ""),
+        Type="CNAME",
+        TTL=900,
+        ResourceRecords=[Join(".", [Ref(ElasticFileSystem), "efs", Ref("AWS::Region"), "amazonaws.com."])],
+        Condition="UseHostedZone",
+    ))
+
+    DB = t.add_resource(DBInstance(
+        "DB",
+        AllocatedStorage=Ref(DBStorage),
+        DBInstanceClass=Ref(DBInstanceClass),
+        DBInstanceIdentifier=Ref("AWS::StackName"),
+        DBSubnetGroupName=Ref(DBSubnetGroup_),
+        Engine="postgres",
+        EngineVersion="9.6",
+        Iops=If("DBProvisionedIops", Ref(DBIops), Ref("AWS::NoValue")),
+        KmsKeyId=If("UseDatabaseEncryption", GetAtt(EncryptionKey, "Arn"), Ref("AWS::NoValue")),
+        MasterUsername="postgres",
+        MasterUserPassword=If("DoSetDBMasterUserPassword", Ref(DBMasterUserPassword), Ref("AWS::NoValue")),
+        MultiAZ=Ref(DBMultiAZ),
+        StorageEncrypted=If("UseDatabaseEncryption", Ref(DBStorageEncrypted), Ref("AWS::NoValue")),
+        StorageType=If("DBProvisionedIops", "io1", "gp2"),
+        Tags=Tags(
+            Name=Sub("${StackName} Jira PostgreSQL Database", { "StackName": Ref("AWS::StackName") }),
+        ),
+        VPCSecurityGroups=[Ref(SecurityGroup_)],
+    ))
+
+    LoadBalancer_ = t.add_resource(LoadBalancer(
+        "LoadBalancer",
+        AppCookieStickinessPolicy=[{ "CookieName": "JSESSIONID", "PolicyName": "JSessionIdStickiness" }],
+        ConnectionDrainingPolicy=ConnectionDrainingPolicy(
+            Enabled=True,
+            Timeout=30,
+        ),
+        ConnectionSettings=ConnectionSettings(
+            IdleTimeout=3600,
+        ),
+        CrossZone=True,
+        Listeners=[{ "LoadBalancerPort": 80, "Protocol": "HTTP", "InstancePort": Ref(TomcatDefaultConnectorPort), "InstanceProtocol": "HTTP", "PolicyNames": ["JSessionIdStickiness"] }, If("DoSSL", { "LoadBalancerPort": "443", "Protocol": "HTTPS", "InstancePort": Ref(TomcatDefaultConnectorPort), "InstanceProtocol": "HTTP", "PolicyNames": ["JSessionIdStickiness"], "SSLCertificateId": Ref(SSLCertificateARN) }, Ref("AWS::NoValue"))],
+        HealthCheck=HealthCheck(
+            Target=If("UseContextPath", Join("", ["HTTP:", Ref(TomcatDefaultConnectorPort), Ref(TomcatContextPath), "/status"]), Join("", ["HTTP:", Ref(TomcatDefaultConnectorPort), "/status"])),
+            Timeout=29,
+            Interval=30,
+            UnhealthyThreshold=2,
+            HealthyThreshold=2,
+        ),
+        Scheme=If("UsePublicIp", "internet-facing", "internal"),
+        SecurityGroups=[Ref(SecurityGroup_)],
+        Subnets=Split(",", ImportValue("ATL-PubNets")),
+        Tags=Tags(
+            Name=Sub("${StackName}-LoadBalancer", { "StackName": Ref("AWS::StackName") }),
+            Cluster=Ref("AWS::StackName"),
+        ),
+        Condition="UseClassicLoadBalancer",
+    ))
+
+    ApplicationLoadBalancer = t.add_resource(elasticloadbalancingv2.LoadBalancer(
+        "ApplicationLoadBalancer",
+        Type="application",
+        Scheme=If("UsePublicIp", "internet-facing", "internal"),
+        SecurityGroups=[Ref(SecurityGroup_)],
+        Subnets=Split(",", ImportValue("ATL-PubNets")),
+        LoadBalancerAttributes=[
+            LoadBalancerAttributes(
+                Key="routing.http2.enabled",
+                Value="true",
+            ),
+            LoadBalancerAttributes(
+                Key="idle_timeout.timeout_seconds",
+                Value="3600",
+            ),
+        ],
+        Tags=Tags(
+            Name=Sub("${StackName}-LoadBalancer", { "StackName": Ref("AWS::StackName") }),
+            Cluster=Ref("AWS::StackName"),
+        ),
+        Condition="UseApplicationLoadBalancer",
+    ))
+
+    SecurityGroupIngress_ = t.add_resource(SecurityGroupIngress(
+        "SecurityGroupIngress",
+        GroupId=Ref(SecurityGroup_),
+        IpProtocol="-1",
+        FromPort=-1,
+        ToPort=-1,
+        SourceSecurityGroupId=Ref(SecurityGroup_),
+    ))
+
+    EncryptionKeyAlias = t.add_resource(Alias(
+        "EncryptionKeyAlias",
+        AliasName=Sub("alias/${AWS::StackName}"),
+        TargetKeyId=Ref(EncryptionKey),
+        Condition="UseDatabaseEncryption",
+    ))
+
+    JiraClusterNodeInstanceProfile = t.add_resource(InstanceProfile(
+        "JiraClusterNodeInstanceProfile",
+        Path="/",
+        Roles=[Ref(JiraClusterNodeRole)],
+    ))
+
+    ClusterNodeImageInstanceProfile = t.add_resource(InstanceProfile(
+        "ClusterNodeImageInstanceProfile",
+        Path="/",
+        Roles=[Ref(ClusterNodeImageRole)],
+        Condition="UseBakedImage",
+    ))
+
+    DBCname = t.add_resource(RecordSetType(
+        "DBCname",
+        HostedZoneName=Ref(HostedZone),
+        Comment="Route53 cname for the RDS",
+        Name=Join(".", [Ref("AWS::StackName"), "db", Ref(HostedZone)]),
+        Type="CNAME",
+        TTL=900,
+        ResourceRecords=[GetAtt(DB, "Endpoint.Address")],
+        Condition="UseHostedZone",
+    ))
+
+    HttpListener = t.add_resource(Listener(
+        "HttpListener",
+        LoadBalancerArn=Ref(ApplicationLoadBalancer),
+        Port=80,
+        Protocol="HTTP",
+        DefaultActions=[
+            If("DoSSL", { "Type": "redirect", "RedirectConfig": { "Protocol": "HTTPS", "Port": "443", "StatusCode": "HTTP_301" } }, { "Type": "forward", "TargetGroupArn": Ref(ClusterNodeTargetGroup) }),
+        ],
+        Condition="UseApplicationLoadBalancer",
+    ))
+
+    HttpsListener = t.add_resource(Listener(
+        "HttpsListener",
+        LoadBalancerArn=Ref(ApplicationLoadBalancer),
+        Port=443,
+        Protocol="HTTPS",
+        Certificates=[
+            Certificate(
+                CertificateArn=Ref(SSLCertificateARN),
+            ),
+        ],
+        SslPolicy="ELBSecurityPolicy-TLS-1-2-2017-01",
+        DefaultActions=[
+            Action(
+                Type="forward",
+                TargetGroupArn=Ref(ClusterNodeTargetGroup),
+            ),
+        ],
+        Condition="UseApplicationLoadBalancerSSL",
+    ))
+
+    LoadBalancerCname = t.add_resource(RecordSetType(
+        "LoadBalancerCname",
+        HostedZoneName=Ref(HostedZone),
+        Comment="Route53 alias for the load balancer",
+        Name=Join(".", [Ref("AWS::StackName"), Ref(HostedZone)]),
+        Type="A",
+        AliasTarget=AliasTarget(
+            DNSName=If("UseApplicationLoadBalancer", GetAtt(ApplicationLoadBalancer, "DNSName"), GetAtt(LoadBalancer_, "DNSName")),
+            HostedZoneId=If("UseApplicationLoadBalancer", GetAtt(ApplicationLoadBalancer, "CanonicalHostedZoneID"), GetAtt(LoadBalancer_, "CanonicalHostedZoneNameID")),
+        ),
+        Condition="UseHostedZone",
+    ))
+
+    ClusterNodeImageInfrastructure = t.add_resource(InfrastructureConfiguration(
+        "ClusterNodeImageInfrastructure",
+        Name=Sub("${AWS::StackName}-cluster-node"),
+        InstanceProfileName=Ref(ClusterNodeImageInstanceProfile),
+        InstanceTypes=[Ref(ClusterNodeInstanceType)],
+        SecurityGroupIds=[Ref(SecurityGroup_)],
+        SubnetId=Select(0, Split(",", ImportValue("ATL-PriNets"))),
+        TerminateInstanceOnFailure=True,
+        Condition="UseBakedImage",
+    ))
+
+    ClusterNodeImage = t.add_resource(Image(
+        "ClusterNodeImage",
+        ImageRecipeArn=Ref(ClusterNodeImageRecipe),
+        InfrastructureConfigurationArn=Ref(ClusterNodeImageInfrastructure),
+        ImageTestsConfiguration=ImageTestsConfiguration(
+            ImageTestsEnabled=False,
+            TimeoutMinutes=60,
+        ),
+        DependsOn=ClusterNodeInstall,
+        Condition="UseBakedImage",
+    ))
+
+    ClusterNodeLaunchTemplate = t.add_resource(LaunchTemplate(
+        "ClusterNodeLaunchTemplate",
+        Metadata={ "Comment": "", "AWS::CloudFormation::Init": { "configSets": { "prepare": ["prepare"] }, "prepare": { "files": { "/etc/atl": { "mode": "000640", "owner": "root", "group": "root", "content": Join("\n", ["ATL_PRODUCT_FAMILY=jira", "ATL_DB_DRIVER=org.postgresql.Driver", "ATL_JDBC_DB_NAME=jira", "ATL_JDBC_USER=atljira", "ATL_APP_DATA_MOUNT_ENABLED=false", "ATL_ENABLED_PRODUCTS=Jira", "ATL_ENABLED_SHARED_HOMES=", "ATL_NGINX_ENABLED=false", "ATL_POSTGRES_ENABLED=false", "ATL_RELEASE_S3_BUCKET=atlassian-software", "ATL_RELEASE_S3_PATH=releases", "ATL_SSL_SELF_CERT_ENABLED=false", "", Sub("ATL_PRODUCT_EDITION=${Edition}", { "Edition": Ref(JiraProduct) }), Sub("ATL_PRODUCT_VERSION=${ProductVersion}", { "ProductVersion": Ref(JiraVersion) }), Sub("ATL_EFS_ID=${ElasticFileSystem}", { "ElasticFileSystem": Ref(ElasticFileSystem) }), If("SSLScheme", "ATL_SSL_PROXY=true", Ref("AWS::NoValue")), Sub("ATL_AWS_STACK_NAME=${StackName}", { "StackName": Ref("AWS::StackName") }), Sub("ATL_CATALINA_OPTS=\"${JvmOpts} ${CatalinaOpts} ${MailOpts}\"", { "JvmOpts": If("OverrideHeap", "", Sub("-XX:+UseG1GC -XX:G1HeapRegionSize=${Region} -XX:MaxMetaspaceSize=${Metaspace} -XX:MaxDirectMemorySize=${DirectMemory}", { "Region": FindInMap("Plan2Jvm", FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Plan"), "Jvmregion"), "Metaspace": FindInMap("Plan2Jvm", FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Plan"), "Jvmmeta"), "DirectMemory": FindInMap("Plan2Jvm", FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Plan"), "Jvmdirect") })), "CatalinaOpts": Ref(CatalinaOpts), "MailOpts": If("DisableMail", "-Datlassian.mail.senddisabled=true -Datlassian.mail.fetchdisabled=true -Datlassian.mail.popdisabled=true", "") }), Sub("ATL_DB_HOST=${DBEndpointAddress}", { "DBEndpointAddress": GetAtt(DB, "Endpoint.Address") }), Sub("ATL_DB_MAXIDLE=${DBMaxIdle}", { "DBMaxIdle": Ref(DBMaxIdle) }), Sub("ATL_DB_MAXWAITMILLIS=${DBMaxWaitMillis}", { "DBMaxWaitMillis": Ref(DBMaxWaitMillis) }), Sub("ATL_DB_MINEVICTABLEIDLETIMEMILLIS=${DBMinEvictableIdleTimeMillis}", { "DBMinEvictableIdleTimeMillis": Ref(DBMinEvictableIdleTimeMillis) }), Sub("ATL_DB_MINIDLE=${DBMinIdle}", { "DBMinIdle": Ref(DBMinIdle) }), Sub("ATL_DB_ROOT_PASSWORD='${DBMasterUserPassword}'", { "DBMasterUserPassword": Ref(DBMasterUserPassword) }), Sub("ATL_DB_POOLMAXSIZE=${DBPoolMaxSize}", { "DBPoolMaxSize": Ref(DBPoolMaxSize) }), Sub("ATL_DB_POOLMINSIZE=${DBPoolMinSize}", { "DBPoolMinSize": Ref(DBPoolMinSize) }), Sub("ATL_DB_PORT=${DBEndpointPort}", { "DBEndpointPort": GetAtt(DB, "Endpoint.Port") }), Sub("ATL_DB_REMOVEABANDONED=${DBRemoveAbandoned}", { "DBRemoveAbandoned": Ref(DBRemoveAbandoned) }), Sub("ATL_DB_REMOVEABANDONEDTIMEOUT=${DBRemoveAbandonedTimeout}", { "DBRemoveAbandonedTimeout": Ref(DBRemoveAbandonedTimeout) }), Sub("ATL_DB_TESTONBORROW=${DBTestOnBorrow}", { "DBTestOnBorrow": Ref(DBTestOnBorrow) }), Sub("ATL_DB_TESTWHILEIDLE=${DBTestWhileIdle}", { "DBTestWhileIdle": Ref(DBTestWhileIdle) }), Sub("ATL_DB_TIMEBETWEENEVICTIONRUNSMILLIS=${DBTimeBetweenEvictionRunsMillis}", { "DBTimeBetweenEvictionRunsMillis": Ref(DBTimeBetweenEvictionRunsMillis) }), Sub("ATL_HOSTEDZONE=${HostedZone}", { "HostedZone": Ref(HostedZone) }), Sub("ATL_JDBC_PASSWORD='${DBPassword}'", { "DBPassword": Ref(DBPassword) }), Sub("ATL_JDBC_URL=jdbc:postgresql://${DBEndpointAddress}:${DBEndpointPort}/jira", { "DBEndpointAddress": GetAtt(DB, "Endpoint.Address"), "DBEndpointPort": GetAtt(DB, "Endpoint.Port") }), Sub("ATL_JIRA_FULL_DISPLAY_NAME=${JiraFullDisplayName}", { "JiraFullDisplayName": FindInMap("JIRAProduct2NameAndVersion", Ref(JiraProduct), "fulldisplayname") }), Sub("ATL_JIRA_NAME=${JiraProductName}", { "JiraProductName": FindInMap("JIRAProduct2NameAndVersion", Ref(JiraProduct), "name") }), Sub("ATL_JIRA_SHORT_DISPLAY_NAME=${JiraShortDisplayName}", { "JiraShortDisplayName": FindInMap("JIRAProduct2NameAndVersion", Ref(JiraProduct), "shortdisplayname") }), Sub("ATL_JVM_HEAP=${AtlJvmHeap}", { "AtlJvmHeap": If("OverrideHeap", Ref(JvmHeapOverride), FindInMap("Plan2Jvm", FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Plan"), "Jvmheap")) }), Sub("ATL_PROXY_NAME=${AtlProxyName}", { "AtlProxyName": If("UseCustomDnsName", Ref(CustomDnsName), If("UseHostedZone", Ref(LoadBalancerCname), If("UseApplicationLoadBalancer", GetAtt(ApplicationLoadBalancer, "DNSName"), GetAtt(LoadBalancer_, "DNSName")))) }), Sub("ATL_TOMCAT_ACCEPTCOUNT=${TomcatAcceptCount}", { "TomcatAcceptCount": Ref(TomcatAcceptCount) }), Sub("ATL_TOMCAT_CONNECTIONTIMEOUT=${TomcatConnectionTimeout}", { "TomcatConnectionTimeout": Ref(TomcatConnectionTimeout) }), Sub("ATL_TOMCAT_CONTEXTPATH=${TomcatContextPath}", { "TomcatContextPath": Ref(TomcatContextPath) }), Sub("ATL_TOMCAT_DEFAULTCONNECTORPORT=${TomcatDefaultConnectorPort}", { "TomcatDefaultConnectorPort": Ref(TomcatDefaultConnectorPort) }), Sub("ATL_TOMCAT_ENABLELOOKUPS=${TomcatEnableLookups}", { "TomcatEnableLookups": Ref(TomcatEnableLookups) }), Sub("ATL_TOMCAT_MAXTHREADS=${TomcatMaxThreads}", { "TomcatMaxThreads": Ref(TomcatMaxThreads) }), Sub("ATL_TOMCAT_MINSPARETHREADS=${TomcatMinSpareThreads}", { "TomcatMinSpareThreads": Ref(TomcatMinSpareThreads) }), Sub("ATL_TOMCAT_PROTOCOL=${TomcatProtocol}", { "TomcatProtocol": Ref(TomcatProtocol) }), Sub("ATL_TOMCAT_PROXYPORT=${TomcatProxyPort}", { "TomcatProxyPort": If("SSLScheme", 443, 80) }), Sub("ATL_TOMCAT_REDIRECTPORT=${TomcatRedirectPort}", { "TomcatRedirectPort": Ref(TomcatRedirectPort) }), Sub("ATL_TOMCAT_SCHEME=${TomcatScheme}", { "TomcatScheme": If("SSLScheme", "https", "http") }), Sub("ATL_TOMCAT_SECURE=${TomcatSecure}", { "TomcatSecure": If("SSLScheme", True, False) }), Sub("ATL_DEPLOYMENT_REPOSITORY=${DeployRepository}", { "DeployRepository": Ref(DeploymentAutomationRepository) }), Sub("ATL_DEPLOYMENT_REPOSITORY_BRANCH=${DeployRepositoryBranch}", { "DeployRepositoryBranch": Ref(DeploymentAutomationBranch) }), Sub("ATL_DEPLOYMENT_REPOSITORY_PLAYBOOK=${DeployRepositoryPlaybook}", { "DeployRepositoryPlaybook": Ref(DeploymentAutomationPlaybook) }), Sub("ATL_DEPLOYMENT_REPOSITORY_KEYNAME=${DeployRepositoryKeyName}", { "DeployRepositoryKeyName": Ref(DeploymentAutomationKeyName) })]) }, "/opt/atlassian/bin/publish_jvm_metrics": { "content": Sub("#!/bin/bash\n# Publish the old generation occupancy of the Jira JVM and the share of\n# the last minute it spent in GC; CloudWatch averages them over the nodes\npid=$(pgrep -o -f org.apache.catalina.startup.Bootstrap) || exit 0\nuser=$(ps -o user= -p $pid)\njstat=$(dirname $(readlink /proc/$pid/exe))/jstat\n[ -x $jstat ] || jstat=jstat\nread old gct <<< $(sudo -u $user $jstat -gcutil $pid | awk 'NR == 2 {print $4, $NF}')\n[ -n \"$gct\" ] || exit 0\nstate=/var/run/jira-gc-time\nlast=$(cat $state 2>/dev/null || echo $gct)\necho $gct > $state\ngc=$(awk \"BEGIN {d = $gct - $last; print (d > 0 ? d : 0) * 100 / 60}\")\ndimensions=\"Dimensions=[{Name=Cluster,Value=${AWS::StackName}}]\"\naws cloudwatch put-metric-data --region ${AWS::Region} --namespace Jira --metric-data \\\n    \"MetricName=OldGenUsed,$dimensions,Value=$old,Unit=Percent\" \\\n    \"MetricName=GCTime,$dimensions,Value=$gc,Unit=Percent\"\n"), "mode": "000750", "owner": "root", "group": "root" }, "/etc/cron.d/jira-jvm-metrics": { "content": "* * * * * root /opt/atlassian/bin/publish_jvm_metrics\n", "mode": "000644", "owner": "root", "group": "root" }, "/opt/atlassian/bin/mount_local_home": { "content": "#!/bin/bash\n# Mount the local home volume at the Jira local home before the playbook\n# installs Jira there, formatting it when new. The fstab entry mounts it\n# again on later boots.\nhome=/var/atlassian/application-data/jira\ndevice=/dev/xvdf\nfor i in $(seq 30); do\n    [ -b $device ] && break\n    sleep 2\ndone\n[ -b $device ] || exit 1\nmountpoint -q $home && exit 0\nblkid $device > /dev/null || mkfs.ext4 -q -L jira-local-home $device || exit 1\nmkdir -p $home\ngrep -q jira-local-home /etc/fstab ||\n    echo \"LABEL=jira-local-home $home ext4 defaults,noatime,nofail 0 2\" >> /etc/fstab\nmount $home\n", "mode": "000750", "owner": "root", "group": "root" }, "/opt/atlassian/bin/mount_instance_store": { "content": "#!/bin/bash\n# Put the Jira caches, the Lucene index among them, and temporary files on\n# the NVMe instance store, striped over its disks, when the instance type\n# has one. The rest of the local home stays on EBS. The store is empty\n# again after a stop and start; Jira then recovers its index from the\n# snapshot in the shared home, or from another node.\nhome=/var/atlassian/application-data/jira\nstore=/media/instance-store\ndevices=$(lsblk -dnpo NAME,MODEL | awk '/Amazon EC2 NVMe Instance Storage/ {print $1}')\n[ -n \"$devices\" ] || exit 0\nif ! mountpoint -q $store; then\n    set -- $devices\n    device=$1\n    if [ $# -gt 1 ]; then\n        device=/dev/md0\n        if [ ! -b $device ] && ! mdadm --assemble $device \"$@\" 2>/dev/null; then\n            mdadm --create $device --run --level=0 --raid-devices=$# \"$@\" || exit 1\n            mdadm --detail --scan > /etc/mdadm.conf\n        fi\n    fi\n    blkid $device > /dev/null || mkfs.ext4 -q -F -m 0 -E nodiscard $device || exit 1\n    mkdir -p $store && mount -o noatime $device $store || exit 1\nfi\nfor dir in caches tmp; do\n    mountpoint -q $home/$dir && continue\n    systemctl stop jira\n    mkdir -p $home/$dir $store/$dir\n    chown --reference=$home $store/$dir\n    mount --bind $store/$dir $home/$dir\ndone\n", "mode": "000750", "owner": "root", "group": "root" }, "/opt/atlassian/bin/join_cluster": { "content": Sub("#!/bin/bash\n# Second phase of the node bootstrap, run after the first and on every\n# later boot: start Jira and join the cluster, or stop it if the node\n# is going into the warm pool, and complete the launch lifecycle action\n# instance metadata through IMDSv2, which works whatever ClusterNodeHttpTokens\ntoken=$(curl -sf -X PUT http://169.254.169.254/latest/api/token \\\n    -H 'X-aws-ec2-metadata-token-ttl-seconds: 21600')\nimds() {\n    curl -sf -H \"X-aws-ec2-metadata-token: $token\" \\\n        http://169.254.169.254/latest/meta-data/$1\n}\ninstance=$(imds instance-id)\nfor i in $(seq 30); do\n    state=$(imds autoscaling/target-lifecycle-state) && break\n    sleep 2\ndone\n/opt/atlassian/bin/mount_instance_store\nresult=CONTINUE\ncase \"$state\" in\nWarmed:*)\n    systemctl stop jira\n    ;;\n*)\n    systemctl start jira\n    result=ABANDON\n    deadline=$((SECONDS + ${ClusterNodeWarmup}))\n    while [ $SECONDS -lt $deadline ]; do\n        if curl -sf http://localhost:${TomcatDefaultConnectorPort}${TomcatContextPath}/status |\n                grep -qE 'RUNNING|FIRST_RUN'; then\n            result=CONTINUE\n            break\n        fi\n        sleep 10\n    done\n    # seconds from boot until Jira answered, for cfntools.boottime\n    [ $result = CONTINUE ] && aws cloudwatch put-metric-data --region ${AWS::Region} \\\n        --namespace Jira --metric-name NodeReadyTime --unit Seconds \\\n        --dimensions Cluster=${AWS::StackName} --value $(cut -d' ' -f1 /proc/uptime)\n    ;;\nesac\ngroup=$(aws autoscaling describe-auto-scaling-instances --region ${AWS::Region} \\\n    --instance-ids $instance --output text \\\n    --query 'AutoScalingInstances[0].AutoScalingGroupName')\naws autoscaling complete-lifecycle-action --region ${AWS::Region} \\\n    --auto-scaling-group-name $group --lifecycle-hook-name ClusterNodeLaunching \\\n    --instance-id $instance --lifecycle-action-result $result || true\n"), "mode": "000750", "owner": "root", "group": "root" } }, "commands": { "075_mount_local_home": { "test": If("UseLocalHomeVolume", "true", "false"), "command": "/opt/atlassian/bin/mount_local_home", "ignoreErrors": False }, "080_run_atl_init_node": { "command": Sub("cd /opt/atlassian/dc-deployments-automation/ && ./bin/ansible-with-atl-env inv/aws_node_local ${DeploymentAutomationPlaybook} /var/log/ansible-bootstrap.log\n"), "ignoreErrors": True }, "090_join_on_boot": { "command": "mkdir -p /var/lib/cloud/scripts/per-boot && ln -sf /opt/atlassian/bin/join_cluster /var/lib/cloud/scripts/per-boot/", "ignoreErrors": False } } } } },
+        LaunchTemplateData=LaunchTemplateData(
+            BlockDeviceMappings=[
+                LaunchTemplateBlockDeviceMapping(
+                    DeviceName="/dev/xvda",
+                    Ebs=EBSBlockDevice(
+                        VolumeSize=Ref(ClusterNodeVolumeSize),
+                    ),
+                ),
+                If("UseLocalHomeVolume", { "DeviceName": "/dev/xvdf", "Ebs": { "DeleteOnTermination": True, "Iops": Ref(LocalHomeVolumeIops), "Throughput": If("UseGp3LocalHome", Ref(LocalHomeVolumeThroughput), Ref("AWS::NoValue")), "VolumeSize": Ref(LocalHomeVolumeSize), "VolumeType": Ref(LocalHomeVolumeType) } }, { "DeviceName": "/dev/xvdf", "NoDevice": "" }),
+            ],
+            IamInstanceProfile=IamInstanceProfile(
+                Arn=GetAtt(JiraClusterNodeInstanceProfile, "Arn"),
+            ),
+            ImageId=If("UseBakedImage", GetAtt(ClusterNodeImage, "ImageId"), Ref(ClusterNodeBaseImage)),
+            InstanceType=Ref(ClusterNodeInstanceType),
+            KeyName=If("KeyProvided", Ref(KeyPairName), ImportValue("ATL-DefaultKey")),
+            MetadataOptions=MetadataOptions(
+                HttpEndpoint="enabled",
+                HttpPutResponseHopLimit=1,
+                HttpTokens=Ref(ClusterNodeHttpTokens),
+            ),
+            SecurityGroupIds=[Ref(SecurityGroup_)],
+            UserData=Base64(Join("", ["#!/bin/bash -xe\n", "yum update -y aws-cfn-bootstrap\n", Sub("/opt/aws/bin/cfn-init -v --stack ${AWS::StackName} --resource ClusterNodeInstall --configsets install --region ${AWS::Region}\n"), Sub("/opt/aws/bin/cfn-init -v --stack ${StackName}", { "StackName": Ref("AWS::StackName") }), Sub(" --resource ClusterNodeLaunchTemplate --configsets prepare --region ${Region}\n", { "Region": Ref("AWS::Region") }), "/opt/atlassian/bin/join_cluster\n", Sub("/opt/aws/bin/cfn-signal -e $? --stack ${StackName}", { "StackName": Ref("AWS::StackName") }), Sub(" --resource ClusterNodeLaunchTemplate --region ${Region}", { "Region": Ref("AWS::Region") })])),
+        ),
+        DependsOn=[EFSMountAz1, EFSMountAz2],
+    ))
+
+    ClusterNodeGroup = t.add_resource(AutoScalingGroup(
+        "ClusterNodeGroup",
+        HealthCheckGracePeriod=Ref(ClusterNodeWarmup),
+        LifecycleHookSpecificationList=If("UseWarmPool", [{ "LifecycleHookName": "ClusterNodeLaunching", "LifecycleTransition": "autoscaling:EC2_INSTANCE_LAUNCHING", "HeartbeatTimeout": 3600, "DefaultResult": "ABANDON" }], Ref("AWS::NoValue")),
+        MixedInstancesPolicy=MixedInstancesPolicy(
+            InstancesDistribution=InstancesDistribution(
+                OnDemandAllocationStrategy="prioritized",
+                OnDemandPercentageAboveBaseCapacity=100,
+            ),
+            LaunchTemplate=autoscaling.LaunchTemplate(
+                LaunchTemplateSpecification=LaunchTemplateSpecification(
+                    LaunchTemplateId=Ref(ClusterNodeLaunchTemplate),
+                    Version=GetAtt(ClusterNodeLaunchTemplate, "LatestVersionNumber"),
+                ),
+                Overrides=[
+                    LaunchTemplateOverrides(
+                        InstanceType=Ref(ClusterNodeInstanceType),
+                    ),
+                    If("UseClusterNodeAlt1", { "InstanceType": FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Alt1") }, Ref("AWS::NoValue")),
+                    If("UseClusterNodeAlt2", { "InstanceType": FindInMap("Size2Node", FindInMap("InstanceType2Size", Ref(ClusterNodeInstanceType), "Size"), "Alt2") }, Ref("AWS::NoValue")),
+                ],
+            ),
+        ),
+        MaxSize=Ref(ClusterNodeMax),
+        MinSize=Ref(ClusterNodeMin),
+        LoadBalancerNames=If("UseClassicLoadBalancer", [Ref(LoadBalancer_)], Ref("AWS::NoValue")),
+        TargetGroupARNs=If("UseApplicationLoadBalancer", [Ref(ClusterNodeTargetGroup)], Ref("AWS::NoValue")),
+        TerminationPolicies=["OldestLaunchTemplate", "NewestInstance"],
+        VPCZoneIdentifier=Split(",", ImportValue("ATL-PriNets")),
+        Tags=[{ "Key": "Name", "Value": Sub("${StackName} Jira Node", { "StackName": Ref("AWS::StackName") }), "PropagateAtLaunch": True }, { "Key": "Cluster", "Value": Ref("AWS::StackName"), "PropagateAtLaunch": True }],
+    ))
+
+    ClusterNodeWarmPool = t.add_resource(WarmPool(
+        "ClusterNodeWarmPool",
+        AutoScalingGroupName=Ref(ClusterNodeGroup),
+        MinSize=Ref(WarmPoolSize),
+        PoolState="Stopped",
+        Condition="UseWarmPool",
+    ))
+
+    ClusterNodeRequestScaling = t.add_resource(ScalingPolicy(
+        "ClusterNodeRequestScaling",
+        AutoScalingGroupName=Ref(ClusterNodeGroup),
+        PolicyType="TargetTrackingScaling",
+        TargetTrackingConfiguration=TargetTrackingConfiguration(
+            PredefinedMetricSpecification=PredefinedMetricSpecification(
+                PredefinedMetricType="ALBRequestCountPerTarget",
+                ResourceLabel=Sub("${ApplicationLoadBalancer.LoadBalancerFullName}/${ClusterNodeTargetGroup.TargetGroupFullName}"),
+            ),
+            TargetValue=Ref(ScalingRequestsPerNode),
+        ),
+        EstimatedInstanceWarmup=Ref(ClusterNodeWarmup),
+        Condition="UseRequestScaling",
+    ))
+
+    ClusterNodeCpuScaling = t.add_resource(ScalingPolicy(
+        "ClusterNodeCpuScaling",
+        AutoScalingGroupName=Ref(ClusterNodeGroup),
+        PolicyType="TargetTrackingScaling",
+        TargetTrackingConfiguration=TargetTrackingConfiguration(
+            PredefinedMetricSpecification=PredefinedMetricSpecification(
+                PredefinedMetricType="ASGAverageCPUUtilization",
+            ),
+            TargetValue=Ref(ScalingCpuTarget),
+        ),
+        EstimatedInstanceWarmup=Ref(ClusterNodeWarmup),
+        Condition="UseCpuScaling",
+    ))
+
+    ClusterNodeJvmScaling = t.add_resource(ScalingPolicy(
+        "ClusterNodeJvmScaling",
+        AutoScalingGroupName=Ref(ClusterNodeGroup),
+        PolicyType="StepScaling",
+        AdjustmentType="ChangeInCapacity",
+        MetricAggregationType="Average",
+        StepAdjustments=[
+            StepAdjustments(
+                MetricIntervalLowerBound=0,
+                MetricIntervalUpperBound=10,
+                ScalingAdjustment=1,
+            ),
+            StepAdjustments(
+                MetricIntervalLowerBound=10,
+                ScalingAdjustment=2,
+            ),
+        ],
+        EstimatedInstanceWarmup=Ref(ClusterNodeWarmup),
+        Condition="UseJvmScaling",
+    ))
+
+    ClusterNodeJvmScaleIn = t.add_resource(ScalingPolicy(
+        "ClusterNodeJvmScaleIn",
+        AutoScalingGroupName=Ref(ClusterNodeGroup),
+        PolicyType="SimpleScaling",
+        AdjustmentType="ChangeInCapacity",
+        ScalingAdjustment=-1,
+        Cooldown="900",
+        Condition="UseJvmScaling",
+    ))
+
+    ClusterNodeBusinessHoursStart = t.add_resource(ScheduledAction(
+        "ClusterNodeBusinessHoursStart",
+        AutoScalingGroupName=Ref(ClusterNodeGroup),
+        MinSize=Ref(BusinessHoursMin),
+        Recurrence=Ref(BusinessHoursStart),
+        Condition="UseBusinessHours",
+    ))
+
+    ClusterNodeBusinessHoursEnd = t.add_resource(ScheduledAction(
+        "ClusterNodeBusinessHoursEnd",
+        AutoScalingGroupName=Ref(ClusterNodeGroup),
+        MinSize=Ref(ClusterNodeMin),
+        Recurrence=Ref(BusinessHoursEnd),
+        Condition="UseBusinessHours",
+    ))
+
+    ClusterNodeGcTimeAlarm = t.add_resource(Alarm(
+        "ClusterNodeGcTimeAlarm",
+        AlarmDescription=Sub("Add Jira nodes when GCTime is over ${ScalingGcTime}%"),
+        Namespace="Jira",
+        MetricName="GCTime",
+        Dimensions=[
+            MetricDimension(
+                Name="Cluster",
+                Value=Ref("AWS::StackName"),
+            ),
+        ],
+        Statistic="Average",
+        Period=60,
+        EvaluationPeriods=5,
+        Threshold=Ref(ScalingGcTime),
+        ComparisonOperator="GreaterThanThreshold",
+        TreatMissingData="notBreaching",
+        AlarmActions=[Ref(ClusterNodeJvmScaling)],
+        Condition="UseGcTimeScaling",
+    ))
+
+    ClusterNodeOldGenAlarm = t.add_resource(Alarm(
+        "ClusterNodeOldGenAlarm",
+        AlarmDescription=Sub("Add Jira nodes when OldGenUsed is over ${ScalingOldGen}%"),
+        Namespace="Jira",
+        MetricName="OldGenUsed",
+        Dimensions=[
+            MetricDimension(
+                Name="Cluster",
+                Value=Ref("AWS::StackName"),
+            ),
+        ],
+        Statistic="Average",
+        Period=60,
+        EvaluationPeriods=5,
+        Threshold=Ref(ScalingOldGen),
+        ComparisonOperator="GreaterThanThreshold",
+        TreatMissingData="notBreaching",
+        AlarmActions=[Ref(ClusterNodeJvmScaling)],
+        Condition="UseOldGenScaling",
+    ))
+
+    ClusterNodeJvmLowAlarm = t.add_resource(Alarm(
+        "ClusterNodeJvmLowAlarm",
+        AlarmDescription="Remove a Jira node when GCTime and OldGenUsed stay under half their scaling thresholds",
+        Metrics=[
+            If("UseGcTimeScaling", { "Id": "gc", "MetricStat": { "Metric": { "Namespace": "Jira", "MetricName": "GCTime", "Dimensions": [{ "Name": "Cluster", "Value": Ref("AWS::StackName") }] }, "Period": 60, "Stat": "Average" }, "ReturnData": False }, Ref("AWS::NoValue")),
+            If("UseOldGenScaling", { "Id": "oldgen", "MetricStat": { "Metric": { "Namespace": "Jira", "MetricName": "OldGenUsed", "Dimensions": [{ "Name": "Cluster", "Value": Ref("AWS::StackName") }] }, "Period": 60, "Stat": "Average" }, "ReturnData": False }, Ref("AWS::NoValue")),
+            MetricDataQuery(
+                Id="load",
+                Label="JVM load (% of the scaling thresholds)",
+                Expression=If("UseGcTimeScaling", If("UseOldGenScaling", Sub("MAX([gc * 100 / ${ScalingGcTime}, oldgen * 100 / ${ScalingOldGen}])"), Sub("gc * 100 / ${ScalingGcTime}")), Sub("oldgen * 100 / ${ScalingOldGen}")),
+                ReturnData=True,
+            ),
+        ],
+        EvaluationPeriods=15,
+        Threshold=50,
+        ComparisonOperator="LessThanThreshold",
+        TreatMissingData="notBreaching",
+        AlarmActions=[Ref(ClusterNodeJvmScaleIn)],
+        Condition="UseJvmScaling",
+    ))
+
+    t.add_output(Output(
+        "ServiceURL",
+        Description="The URL to access this Atlassian service",
+        Value=If("UseCustomDnsName", Sub("${HTTP}://${CustomDNSName}${ContextPath}", { "HTTP": If("SSLScheme", "https", "http"), "CustomDNSName": Ref(CustomDnsName), "ContextPath": Ref(TomcatContextPath) }), If("UseHostedZone", Sub("${HTTP}://${LBCName}${ContextPath}", { "HTTP": If("SSLScheme", "https", "http"), "LBCName": Ref(LoadBalancerCname), "ContextPath": Ref(TomcatContextPath) }), Sub("${HTTP}://${LoadBalancerDNSName}${ContextPath}", { "HTTP": If("SSLScheme", "https", "http"), "LoadBalancerDNSName": If("UseApplicationLoadBalancer", GetAtt(ApplicationLoadBalancer, "DNSName"), GetAtt(LoadBalancer_, "DNSName")), "ContextPath": Ref(TomcatContextPath) }))),
+    ))
+
+    t.add_output(Output(
+        "LoadBalancerURL",
+        Description="The Load Balancer URL",
+        Value=Sub("${HTTP}://${LoadBalancerDNSName}", { "HTTP": If("SSLScheme", "https", "http"), "LoadBalancerDNSName": If("UseApplicationLoadBalancer", GetAtt(ApplicationLoadBalancer, "DNSName"), GetAtt(LoadBalancer_, "DNSName")) }),
+    ))
+
+    t.add_output(Output(
+        "SGname",
+        Description="The name of the SecurityGroup",
+        Value=Ref(SecurityGroup_),
+        Export=Export(Join("", [Ref("AWS::StackName"), "-SGname"])),
+    ))
+
+    t.add_output(Output(
+        "DBEndpointAddress",
+        Description="The Database Connection String",
+        Value=GetAtt(DB, "Endpoint.Address"),
+    ))
+
+    t.add_output(Output(
+        "DBEncryptionKey",
+        Condition="UseDatabaseEncryption",
+        Description="The alias of the encryption key created for RDS",
+        Value=Ref(EncryptionKeyAlias),
+    ))
+
+    t.add_output(Output(
+        "EFSCname",
+        Description="The cname of the EFS",
+        Value=If("UseHostedZone", Ref(EFSCname), Ref(ElasticFileSystem)),
+        Export=Export(Join("", [Ref("AWS::StackName"), "-EFSCname"])),
+    ))
+
+    for name, value in overrides.items():
+        if name not in t.parameters:
+            raise ValueError("unknown parameter {}".format(name))
+        t.parameters[name].Default = value
+    return t
+
+
+if __name__ == '__main__':
+    print(build().to_json())
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the benchmark scripts import their common module as a sibling
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import roundtrip  # noqa: E402
+import synthetic  # noqa: E402
+
+
+class RoundTripTest(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(
+            roundtrip.normalize({
+                'Value': {'Fn::GetAtt': 'DB.Endpoint.Address'},
+                'DependsOn': 'DB',
+                'Tags': [{'Key': 'b', 'Value': 2}, {'Key': 'a', 'Value': 1}],
+                'Enabled': True}),
+            {'Value': {'Fn::GetAtt': ['DB', 'Endpoint.Address']},
+             'DependsOn': ['DB'],
+             'Tags': [{'Key': 'a', 'Value': '1'},
+                      {'Key': 'b', 'Value': '2'}],
+             'Enabled': 'true'})
+        self.assertEqual(roundtrip.normalize({'DependsOn': ['b', 'a']}),
+                         {'DependsOn': ['a', 'b']})
+
+    def test_differences(self):
+        self.assertEqual(list(roundtrip.differences(
+            {'a': {'b': [1, 2]}, 'c': 1}, {'a': {'b': [1, 3]}, 'd': 1})),
+            [('/a/b/1', 2, 3), ('/c', 1, None), ('/d', None, 1)])
+        self.assertEqual(list(roundtrip.differences([1], [1, 2])),
+                         [('/', [1], [1, 2])])
+
+    def test_regressions(self):
+        baseline = {'results': [{'template': 't', 'convert_seconds': 1.0,
+                                 'exec_seconds': 0.01}]}
+        self.assertEqual(list(roundtrip.regressions(
+            [{'template': 't', 'convert_seconds': 1.05,
+              'exec_seconds': 0.05}], baseline, 0.1)), [])
+        self.assertEqual(len(list(roundtrip.regressions(
+            [{'template': 't', 'convert_seconds': 1.2}], baseline, 0.1))), 1)
+
+
+class SyntheticTest(unittest.TestCase):
+
+    def test_template(self):
+        d = synthetic.generate_template(40, depth=2, mapping_rows=20)
+        self.assertEqual(len(d['Resources']), 40)
+        self.assertEqual(len(d['Outputs']), 4)
+        self.assertEqual(len(d['Mappings']['AWSInstanceType2Arch']), 20)
+        self.assertEqual(d, synthetic.generate_template(40, depth=2,
+                                                        mapping_rows=20))
+
+    def test_sections(self):
+        cfn2py = roundtrip.cfn2py
+        d = synthetic.generate_template(20, depth=2, mapping_rows=10)
+        size, timings = synthetic.timed_sections(
+            cfn2py, d, cfn2py.ConversionContext())
+        self.assertEqual(size, len(''.join(cfn2py.convert(d))))
+        self.assertEqual([name for (name, _) in timings],
+                         ['AWSTemplateFormatVersion', 'Description',
+                          'Parameters', 'Conditions', 'Mappings', 'Resources',
+                          'Outputs', 'Trailer', 'Header'])
+
+
+if __name__ == '__main__':
+    unittest.main()
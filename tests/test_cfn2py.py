@@ -0,0 +1,579 @@
+import ast
+import builtins
+import contextlib
+import importlib.machinery
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import troposphere
+except ImportError:
+    troposphere = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_cfn2py():
+    """Import the cfn2py script, which has no .py extension, as a module"""
+    loader = importlib.machinery.SourceFileLoader(
+        'cfn2py', os.path.join(ROOT, 'cfn2py'))
+    spec = importlib.util.spec_from_loader('cfn2py', loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+cfn2py = load_cfn2py()
+
+# a Parameter with the name of the class of a resource in the template
+parameter_named_like_class = {
+    'Parameters': {
+        'Bucket': {'Type': 'String', 'Description': 'Name of the bucket'},
+    },
+    'Resources': {
+        'Logs': {
+            'Type': 'AWS::S3::Bucket',
+            'Properties': {'BucketName': {'Ref': 'Bucket'}},
+        },
+    },
+    'Outputs': {
+        'Name': {'Value': {'Ref': 'Logs'}},
+    },
+}
+
+
+class ReservedNamesTest(unittest.TestCase):
+
+    def convert(self, d):
+        return ''.join(cfn2py.convert(
+            d, cfn2py.ConversionContext(module=True)))
+
+    def convert_stream(self, d):
+        f = io.StringIO(json.dumps(d, indent=4))
+        return ''.join(cfn2py.convert_stream(
+            f, cfn2py.ConversionContext(module=True)))
+
+    def test_stream_renames_parameter(self):
+        for script in (self.convert(parameter_named_like_class),
+                       self.convert_stream(parameter_named_like_class)):
+            self.assertIn('Bucket_ = t.add_parameter(', script)
+            self.assertIn('Ref(Bucket_)', script)
+
+    def test_stream_matches_convert(self):
+        self.assertEqual(self.convert_stream(parameter_named_like_class),
+                         self.convert(parameter_named_like_class))
+
+    @unittest.skipIf(troposphere is None, 'needs troposphere')
+    def test_round_trip(self):
+        for script in (self.convert(parameter_named_like_class),
+                       self.convert_stream(parameter_named_like_class)):
+            namespace = {}
+            exec(compile(script, 'generated', 'exec'), namespace)
+            self.assertEqual(namespace['build']().to_dict(),
+                             parameter_named_like_class)
+
+
+@unittest.skipIf(troposphere is None, 'needs troposphere')
+class ModuleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.namespace = {}
+        self.output = io.StringIO()
+        script = convert(parameter_named_like_class, module=True)
+        with contextlib.redirect_stdout(self.output):
+            exec(compile(script, 'generated', 'exec'), self.namespace)
+
+    def test_import_has_no_output(self):
+        self.assertEqual(self.output.getvalue(), '')
+
+    def test_overrides(self):
+        build = self.namespace['build']
+        t = build(Bucket='jira-logs')
+        self.assertEqual(t.to_dict()['Parameters']['Bucket']['Default'],
+                         'jira-logs')
+        # every call builds a new Template
+        self.assertNotIn('Default', build().to_dict()['Parameters']['Bucket'])
+        with self.assertRaises(ValueError):
+            build(Buckets='jira-logs')
+
+    def test_main(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'logs.py')
+        with open(path, 'w') as f:
+            f.write(convert(parameter_named_like_class, module=True))
+        out = subprocess.check_output([sys.executable, path],
+                                      universal_newlines=True)
+        self.assertEqual(json.loads(out), parameter_named_like_class)
+
+
+def template_path(name):
+    return os.path.join(ROOT, 'templates', name)
+
+
+def load(name):
+    with open(template_path(name)) as f:
+        return json.load(f)
+
+
+def convert(d, **options):
+    return ''.join(cfn2py.convert(d, cfn2py.ConversionContext(**options)))
+
+
+# a Sub used by three resources, and a Ref used as often
+repeated = {
+    'Parameters': {'KeyPairName': {'Type': 'String'}},
+    'Resources': dict(
+        ('Queue{}'.format(i), {
+            'Type': 'AWS::SQS::Queue',
+            'Properties': {
+                'QueueName': {'Fn::Sub': [
+                    '${AWS::StackName}-${Key}-queue-for-the-jira-cluster-'
+                    'nodes', {'Key': {'Ref': 'KeyPairName'}}]},
+                'Tags': [{'Key': 'Key', 'Value': {'Ref': 'KeyPairName'}}],
+            },
+        }) for i in range(3)),
+}
+
+
+class HoistTest(unittest.TestCase):
+
+    def test_pays_for_itself(self):
+        script = convert(repeated, hoist=True)
+        self.assertIn('sub_AWS_StackName_Key_queue_for_the_jira = ', script)
+        self.assertNotIn('ref_KeyPairName =', script)
+
+    def test_never_larger(self):
+        for name in os.listdir(os.path.join(ROOT, 'templates')):
+            d = load(name)
+            self.assertLessEqual(len(convert(d, hoist=True)), len(convert(d)),
+                                 name)
+
+    def test_nothing_to_hoist(self):
+        ctx = cfn2py.ConversionContext(hoist=True)
+        script = ''.join(cfn2py.convert(load('jira_vpc.json'), ctx))
+        self.assertEqual(ctx.hoisted, {})
+        self.assertNotIn('# Common subexpressions', script)
+
+    @unittest.skipIf(troposphere is None, 'needs troposphere')
+    def test_round_trip(self):
+        namespace = {}
+        exec(compile(convert(repeated, hoist=True, module=True),
+                     'generated', 'exec'), namespace)
+        self.assertEqual(namespace['build']().to_dict(), repeated)
+
+
+def run_cfn2py(*args):
+    """Run the cfn2py script, returning its exit status and output"""
+    p = subprocess.run([sys.executable, os.path.join(ROOT, 'cfn2py')] +
+                       list(args), cwd=ROOT, stdout=subprocess.PIPE,
+                       stderr=subprocess.PIPE, universal_newlines=True)
+    return p.returncode, p.stdout, p.stderr
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_directory(self):
+        status, out, _ = run_cfn2py('-o', self.tmp, '-j', '2', 'templates')
+        self.assertEqual(status, 0)
+        names = sorted(os.listdir(os.path.join(ROOT, 'templates')))
+        self.assertEqual(sorted(os.listdir(self.tmp)),
+                         [n.replace('.json', '.py') for n in names])
+        self.assertIn('{} converted, 0 cached, 0 failed'.format(len(names)),
+                      out)
+        for name in names:
+            with open(os.path.join(self.tmp, name.replace('.json', '.py'))) \
+                    as f:
+                self.assertEqual(f.read(),
+                                 cfn2py.convert_file(template_path(name)),
+                                 name)
+
+    def test_unchanged_output_is_kept(self):
+        run_cfn2py('-o', self.tmp, 'templates/jira_vpc.json')
+        path = os.path.join(self.tmp, 'jira_vpc.py')
+        os.utime(path, (0, 0))
+        _, out, _ = run_cfn2py('-o', self.tmp, 'templates/jira_vpc.json')
+        self.assertIn('(converted, unchanged)', out)
+        self.assertEqual(os.path.getmtime(path), 0)
+
+    def test_failures_are_counted(self):
+        bad = os.path.join(self.tmp, 'bad.json')
+        with open(bad, 'w') as f:
+            f.write('{"Resources": ')
+        status, out, err = run_cfn2py('-o', self.tmp, bad,
+                                      'templates/jira_vpc.json')
+        self.assertEqual(status, 1)
+        self.assertIn('1 converted, 0 cached, 1 failed', out)
+        self.assertIn('bad.json', err)
+
+    def test_inputs(self):
+        self.assertEqual(cfn2py.expand_inputs([template_path('jira_*.json')]),
+                         [template_path(n) for n in
+                          ['jira_bastion.json', 'jira_dc.json',
+                           'jira_dc_with_vpc.json', 'jira_vpc.json']])
+        self.assertEqual(cfn2py.output_path('a/foo.template.yaml', 'out'),
+                         os.path.join('out', 'foo.py'))
+        status, _, err = run_cfn2py('-o', self.tmp, 'templates',
+                                    'templates/jira_vpc.json')
+        self.assertEqual(status, 2)
+        self.assertIn('same output file', err)
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.cache = os.path.join(self.tmp, 'cache')
+        self.template = os.path.join(self.tmp, 'jira_vpc.json')
+        shutil.copy(template_path('jira_vpc.json'), self.template)
+
+    def convert(self, *options):
+        status, out, _ = run_cfn2py('-o', os.path.join(self.tmp, 'out'),
+                                    '--cache-dir', self.cache,
+                                    self.template, *options)
+        self.assertEqual(status, 0)
+        return out
+
+    def test_hit(self):
+        self.assertIn('1 converted, 0 cached', self.convert())
+        os.remove(os.path.join(self.tmp, 'out', 'jira_vpc.py'))
+        self.assertIn('0 converted, 1 cached', self.convert())
+        with open(os.path.join(self.tmp, 'out', 'jira_vpc.py')) as f:
+            self.assertEqual(f.read(), cfn2py.convert_file(self.template))
+
+    def test_options_and_content_miss(self):
+        self.convert()
+        self.assertIn('1 converted, 0 cached', self.convert('--module'))
+        with open(self.template, 'a') as f:
+            f.write('\n')
+        self.assertIn('1 converted, 0 cached', self.convert())
+
+    def test_key(self):
+        self.assertEqual(cfn2py.cache_key(b'{}'), cfn2py.cache_key(b'{}'))
+        self.assertNotEqual(cfn2py.cache_key(b'{}'),
+                            cfn2py.cache_key(b'{}', {'hoist': True}))
+        self.assertNotEqual(cfn2py.cache_key(b'{}'), cfn2py.cache_key(b'[]'))
+
+
+class EmitterTest(unittest.TestCase):
+
+    def test_fragments_end_lines(self):
+        for options in ({}, {'module': True}):
+            fragments = list(cfn2py.convert(
+                load('jira_dc.json'), cfn2py.ConversionContext(**options)))
+            self.assertGreater(len(fragments), 1000)
+            self.assertEqual([f for f in fragments if not f.endswith('\n')],
+                             [])
+
+    def test_chunked_writes(self):
+        class Recorder(object):
+            def __init__(self):
+                self.writes = []
+
+            def write(self, text):
+                self.writes.append(text)
+
+        out = Recorder()
+        cfn2py.write_output(iter(['x' * 10 + '\n'] * 1000), out,
+                            bufsize=4096)
+        self.assertEqual(''.join(out.writes), ('x' * 10 + '\n') * 1000)
+        self.assertEqual(len(out.writes), 3)
+
+    def test_stdout(self):
+        status, out, _ = run_cfn2py('templates/jira_dc.json')
+        self.assertEqual(status, 0)
+        self.assertEqual(out, cfn2py.convert_file(template_path(
+            'jira_dc.json')))
+
+
+# an Output and a resource referring to a resource further down
+forward_references = {
+    'Resources': {
+        'Alias': {
+            'Type': 'AWS::Route53::RecordSet',
+            'Properties': {
+                'HostedZoneName': 'example.com.',
+                'Name': 'jira.example.com.',
+                'Type': 'CNAME',
+                'TTL': '300',
+                'ResourceRecords': [{'Fn::GetAtt': ['Logs', 'DomainName']}],
+            },
+        },
+        'Logs': {'Type': 'AWS::S3::Bucket'},
+    },
+    'Outputs': {
+        'Name': {'Value': {'Ref': 'Logs'}},
+    },
+}
+
+
+class StreamTest(unittest.TestCase):
+
+    def test_small_chunks(self):
+        # values, numbers among them, split over many reads
+        for name in os.listdir(os.path.join(ROOT, 'templates')):
+            with open(template_path(name)) as f:
+                stream = cfn2py.json_stream(f, chunk_size=3)
+                d = dict((k, stream.value()) for k in stream.keys())
+            self.assertEqual(d, load(name), name)
+
+    def test_members(self):
+        with open(template_path('jira_dc.json')) as f:
+            members = list(cfn2py.stream_template(f))
+        d = load('jira_dc.json')
+        self.assertEqual([name for (section, name, _) in members
+                          if section == 'Resources'], list(d['Resources']))
+        self.assertIn(('Description', None, d['Description']), members)
+
+    def test_converted_in_order(self):
+        # convert() emits Logs first so Alias can use its variable
+        script = convert(forward_references)
+        self.assertLess(script.index('Logs = '), script.index('Alias = '))
+        self.assertIn('GetAtt(Logs, "DomainName")', script)
+
+    @unittest.skipIf(troposphere is None, 'needs troposphere')
+    def test_round_trip(self):
+        f = io.StringIO(json.dumps(forward_references))
+        script = ''.join(cfn2py.convert_stream(
+            f, cfn2py.ConversionContext(module=True)))
+        namespace = {}
+        exec(compile(script, 'generated', 'exec'), namespace)
+        self.assertEqual(namespace['build']().to_dict(), forward_references)
+
+    def test_json_only(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'vpc.yaml')
+        with open(path, 'w') as f:
+            f.write('Resources: {}\n')
+        status, _, err = run_cfn2py('--stream', path)
+        self.assertEqual(status, 2)
+        self.assertIn('only supports JSON', err)
+
+
+@unittest.skipIf(yaml is None, 'needs PyYAML')
+class YamlInputTest(unittest.TestCase):
+
+    def test_same_script(self):
+        for name in ('jira_vpc.json', 'jira_dc.json'):
+            text = yaml.safe_dump(load(name), sort_keys=False)
+            self.assertEqual(cfn2py.convert_data(text.encode('utf-8'),
+                                                 name[:-5] + '.yaml'),
+                             cfn2py.convert_file(template_path(name)), name)
+
+
+class ContextTest(unittest.TestCase):
+
+    def test_threads(self):
+        # conversions with different options share no state
+        jobs = [(name, options)
+                for name in sorted(os.listdir(os.path.join(ROOT, 'templates')))
+                for options in ({}, {'module': True}, {'hoist': True},
+                                {'prune_depends_on': True})]
+        serial = [convert(load(name), **options) for (name, options) in jobs]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            threaded = list(pool.map(
+                lambda job: convert(load(job[0]), **job[1]), jobs * 2))
+        self.assertEqual(threaded, serial * 2)
+
+    def test_state(self):
+        first = cfn2py.ConversionContext(module=True)
+        second = cfn2py.ConversionContext()
+        ''.join(cfn2py.convert(load('jira_vpc.json'), first))
+        self.assertIn('VPCStack', first.objects.objects)
+        self.assertIn(('', 'Parameter'), first.imports)
+        self.assertEqual((second.objects.objects, second.imports),
+                         ({}, set()))
+        self.assertFalse(second.module)
+
+    def test_use(self):
+        ctx = cfn2py.ConversionContext()
+        self.assertEqual(ctx.use('LoadBalancer', 'elasticloadbalancing'),
+                         'LoadBalancer')
+        self.assertEqual(ctx.use('LoadBalancer', 'elasticloadbalancingv2'),
+                         'elasticloadbalancingv2.LoadBalancer')
+        self.assertIn('elasticloadbalancingv2', ctx.objects.reserved)
+
+
+# what the round-trip harness found cfn2py dropping or mangling
+policies_and_metadata = {
+    'Parameters': {
+        'Version': {'Type': 'String', 'Default': '8.5'},
+    },
+    'Resources': {
+        'Logs': {
+            'Type': 'AWS::S3::Bucket',
+            'DeletionPolicy': 'Retain',
+            'UpdateReplacePolicy': 'Retain',
+            'Metadata': {
+                'AWS::CloudFormation::Init': {'config': {'commands': {
+                    '010_quote': {'command': 'echo "it\'s \\ here"'},
+                }}},
+            },
+            'Properties': {
+                'Tags': [{'Key': 'Name',
+                          'Value': {'Fn::Sub': '${AWS::StackName}-logs'}}],
+            },
+        },
+        'Group': {
+            'Type': 'AWS::AutoScaling::AutoScalingGroup',
+            'CreationPolicy': {'ResourceSignal': {'Timeout': 'PT30M'}},
+            'Properties': {'MaxSize': '2', 'MinSize': '1',
+                           'VPCZoneIdentifier': ['subnet-1']},
+        },
+        'Live': {
+            'Type': 'AWS::Lambda::Alias',
+            'UpdatePolicy': {'CodeDeployLambdaAliasUpdate': {
+                'ApplicationName': 'jira', 'DeploymentGroupName': 'live'}},
+            'Properties': {'FunctionName': 'jira-hook',
+                           'FunctionVersion': '1', 'Name': 'live'},
+        },
+    },
+}
+
+
+class RoundTripTest(unittest.TestCase):
+
+    @unittest.skipIf(troposphere is None, 'needs troposphere')
+    def test_policies_and_metadata(self):
+        namespace = {}
+        exec(compile(convert(policies_and_metadata, module=True),
+                     'generated', 'exec'), namespace)
+        self.assertEqual(namespace['build']().to_dict(),
+                         policies_and_metadata)
+
+
+# a resource type troposphere 2.x has no class for
+warm_pool = {
+    'Parameters': {
+        'Group': {'Type': 'String'},
+        'Size': {'Type': 'Number', 'Default': 2},
+    },
+    'Resources': {
+        'WarmPool': {
+            'Type': 'AWS::AutoScaling::WarmPool',
+            'Properties': {
+                'AutoScalingGroupName': {'Ref': 'Group'},
+                'MinSize': {'Ref': 'Size'},
+                'PoolState': 'Stopped',
+            },
+        },
+    },
+}
+
+
+class FallbackClassTest(unittest.TestCase):
+
+    def test_script(self):
+        script = convert(warm_pool, module=True)
+        self.assertIn('try:\n'
+                      '    from troposphere.autoscaling import WarmPool\n'
+                      'except ImportError:\n'
+                      '    class WarmPool(AWSObject):\n'
+                      '        resource_type = '
+                      '"AWS::AutoScaling::WarmPool"\n', script)
+        self.assertIn('            "MinSize": (integer, False),\n', script)
+        imported, _ = names_of(script)
+        self.assertIn('integer', imported)
+        self.assertNotIn('str', imported)
+        self.assertIn('WarmPool_ = t.add_resource(WarmPool(\n', script)
+
+    @unittest.skipIf(troposphere is None, 'needs troposphere')
+    def test_round_trip(self):
+        import troposphere.autoscaling
+        script = convert(warm_pool, module=True)
+        for hidden in (False, True):
+            saved = troposphere.autoscaling.__dict__.get('WarmPool')
+            if hidden and saved is not None:
+                del troposphere.autoscaling.WarmPool
+            try:
+                namespace = {}
+                exec(compile(script, 'generated', 'exec'), namespace)
+            finally:
+                if saved is not None:
+                    troposphere.autoscaling.WarmPool = saved
+            self.assertEqual(namespace['build']().to_dict(), warm_pool)
+            if hidden:
+                self.assertIsNot(namespace['WarmPool'], saved)
+
+
+def names_of(script):
+    """The names a script imports, and those it reads"""
+    imported = set()
+    loaded = set()
+    for node in ast.walk(ast.parse(script)):
+        if isinstance(node, ast.ImportFrom):
+            imported.update(a.asname or a.name for a in node.names)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            loaded.add(node.id)
+    return imported, loaded
+
+
+def defined_in(script):
+    """The names a script assigns, defines or takes as arguments"""
+    defined = set()
+    for node in ast.walk(ast.parse(script)):
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            defined.add(node.name)
+        elif isinstance(node, ast.arg):
+            defined.add(node.arg)
+        elif isinstance(node, ast.Name) and \
+                not isinstance(node.ctx, ast.Load):
+            defined.add(node.id)
+    return defined
+
+
+class ImportsTest(unittest.TestCase):
+
+    def check(self, script, name):
+        imported, loaded = names_of(script)
+        self.assertEqual(imported - loaded, set(), name)
+        self.assertEqual(loaded - imported - defined_in(script) -
+                         set(dir(builtins)), set(), name)
+
+    def test_used_and_complete(self):
+        for name in os.listdir(os.path.join(ROOT, 'templates')):
+            for options in ({}, {'module': True}, {'hoist': True}):
+                self.check(convert(load(name), **options), name)
+            with open(template_path(name)) as f:
+                self.check(''.join(cfn2py.convert_stream(f)), name)
+
+    def test_no_fixed_imports(self):
+        script = convert(parameter_named_like_class)
+        self.assertEqual(script.split('\n\n', 1)[0].split('\n'),
+                         ['from troposphere import Output, Parameter, Ref, '
+                          'Template',
+                          'from troposphere.s3 import Bucket'])
+
+
+class PruneDependsOnTest(unittest.TestCase):
+
+    def test_jira_dc(self):
+        # the launch template reads the DB endpoint with GetAtt
+        d = load('jira_dc.json')
+        self.assertIn('    DependsOn=[EFSMountAz1, EFSMountAz2, DB],\n',
+                      convert(d))
+        self.assertIn('    DependsOn=[EFSMountAz1, EFSMountAz2],\n',
+                      convert(d, prune_depends_on=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import unittest
+
+from cfntools import connections
+from cfntools.evaluate import (EvaluationError, Evaluator, evaluate_rules,
+                               specialize)
+from cfntools.jvm import catalog_path, load_catalog
+from cfntools.template import load_template
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ConnectionsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = load_catalog(catalog_path)
+        cls.template = load_template(
+            os.path.join(ROOT, 'templates', 'jira_dc.json'))
+
+    def specialize(self, **parameters):
+        parameters.setdefault('AWS::Region', 'us-east-1')
+        parameters.setdefault('DBInstanceClass', 'db.t2.medium')
+        return specialize(self.template, parameters)
+
+    def test_warm_pool_counts(self):
+        values = connections.solve('db.t2.medium', 'c5.2xlarge', 6,
+                                   self.catalog)
+        self.assertEqual(values['WarmPoolSize'], '0')
+        self.assertEqual(list(connections.check(values, self.catalog)), [])
+        values['WarmPoolSize'] = '30'
+        self.assertEqual(len(list(connections.check(values, self.catalog))),
+                         1)
+        warm = connections.solve('db.t2.medium', 'c5.2xlarge', 6,
+                                 self.catalog, warm_pool=6)
+        self.assertLess(int(warm['DBPoolMaxSize']),
+                        int(values['DBPoolMaxSize']))
+
+    def test_rules_in_template(self):
+        classes = self.template['Parameters']['DBInstanceClass'][
+            'AllowedValues']
+        self.assertEqual(dict((k, r) for k, r in self.template['Rules'].items()
+                              if k.startswith('DBConnections')),
+                         connections.rules(classes, self.catalog))
+
+    def test_pool_sizes_allowed(self):
+        with self.assertRaises(EvaluationError):
+            self.specialize(DBPoolMaxSize='25', ClusterNodeMax='2')
+        for pool in connections.pool_sizes:
+            self.specialize(DBPoolMaxSize=str(pool), ClusterNodeMax='1',
+                            DBInstanceClass='db.r4.large')
+
+    def test_node_limit(self):
+        fit = connections.max_nodes('db.t2.medium', 30, self.catalog)
+        self.specialize(DBPoolMaxSize='30', ClusterNodeMax=str(fit))
+        with self.assertRaises(EvaluationError):
+            self.specialize(DBPoolMaxSize='30', ClusterNodeMax=str(fit + 1))
+        with self.assertRaises(EvaluationError):
+            self.specialize(DBPoolMaxSize='100', ClusterNodeMax='3')
+
+    def test_warm_pool_limit(self):
+        fit = connections.max_nodes('db.t2.medium', 30, self.catalog)
+        self.specialize(DBPoolMaxSize='30', ClusterNodeMax=str(fit - 3),
+                        WarmPoolSize='3')
+        with self.assertRaises(EvaluationError):
+            self.specialize(DBPoolMaxSize='30', ClusterNodeMax=str(fit - 2),
+                            WarmPoolSize='3')
+
+    def test_rejected(self):
+        for parameters in [
+                # about 513 of 405 connections
+                dict(DBPoolMaxSize='25', ClusterNodeMax='19'),
+                # 1233 of 811
+                dict(DBInstanceClass='db.m4.large', ClusterNodeMax='60'),
+                dict(DBPoolMaxSize='20', ClusterNodeMax='10',
+                     WarmPoolSize='10')]:
+            with self.assertRaises(EvaluationError):
+                self.specialize(**parameters)
+
+    def test_rules_match_check(self):
+        # every combination the parameters allow passes the Rules exactly
+        # when check() finds it within the budget
+        rules = dict((k, r) for k, r in self.template['Rules'].items()
+                     if k.startswith('DBConnections'))
+        for db_class in self.template['Parameters']['DBInstanceClass'][
+                'AllowedValues']:
+            for pool in connections.pool_sizes:
+                for nodes in range(1, connections.max_cluster_nodes + 1):
+                    for warm_pool in range(connections.max_warm_pool + 1):
+                        values = {'DBInstanceClass': db_class,
+                                  'DBPoolMaxSize': str(pool),
+                                  'ClusterNodeMax': str(nodes),
+                                  'WarmPoolSize': str(warm_pool)}
+                        fits = not any(
+                            'connections' in message for message in
+                            connections.check(dict(
+                                values, DBPoolMinSize='5', DBMinIdle='5',
+                                DBMaxIdle='5', TomcatMaxThreads='400'),
+                                self.catalog))
+                        try:
+                            evaluate_rules(Evaluator({}, values), rules)
+                        except EvaluationError:
+                            self.assertFalse(fits, values)
+                        else:
+                            self.assertTrue(fits, values)
+
+
+if __name__ == '__main__':
+    unittest.main()
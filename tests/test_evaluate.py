@@ -0,0 +1,196 @@
+import json
+import os
+import tempfile
+import unittest
+
+from cfntools.evaluate import (EvaluationError, evaluate_matrix,
+                               interface_for, matrix_axis, parse_parameters,
+                               specialize)
+from cfntools.template import load_template
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def template():
+    return {
+        'Parameters': {
+            'Env': {'Type': 'String', 'Default': 'prod',
+                    'AllowedValues': ['prod', 'dev']},
+            'Size': {'Type': 'Number', 'Default': '2',
+                     'MinValue': 1, 'MaxValue': 4},
+            'Subnets': {'Type': 'CommaDelimitedList', 'Default': 'a,b'},
+            'Password': {'Type': 'String', 'NoEcho': True,
+                         'Default': 'secret'},
+            'Image': {'Type': 'AWS::SSM::Parameter::Value'
+                              '<AWS::EC2::Image::Id>',
+                      'Default': '/aws/service/ami'},
+        },
+        'Mappings': {
+            'EnvSize': {'prod': {'Type': 'm5.large'},
+                        'dev': {'Type': 't3.small'}},
+            'Unused': {'a': {'b': 'c'}},
+        },
+        'Conditions': {
+            'IsProd': {'Fn::Equals': [{'Ref': 'Env'}, 'prod']},
+            'IsDev': {'Fn::Not': [{'Condition': 'IsProd'}]},
+        },
+        'Resources': {
+            'Node': {
+                'Type': 'AWS::EC2::Instance',
+                'DependsOn': ['Debug'],
+                'Properties': {
+                    'ImageId': {'Ref': 'Image'},
+                    'InstanceType': {'Fn::FindInMap': [
+                        'EnvSize', {'Ref': 'Env'}, 'Type']},
+                    'SubnetId': {'Fn::Select': [1, {'Ref': 'Subnets'}]},
+                    'Monitoring': {'Fn::If': ['IsProd', True,
+                                              {'Ref': 'AWS::NoValue'}]},
+                    'UserData': {'Fn::Base64': {'Fn::Sub':
+                                                'size=${Size} ${Password}'}},
+                    'Tags': [{'Key': 'Name', 'Value': {'Fn::Join': [
+                        '-', [{'Ref': 'AWS::StackName'}, {'Ref': 'Env'},
+                              'node']]}}],
+                },
+            },
+            'Debug': {'Type': 'AWS::SNS::Topic', 'Condition': 'IsDev'},
+        },
+        'Outputs': {
+            'Address': {'Value': {'Fn::GetAtt': ['Node', 'PrivateIp']}},
+            'Topic': {'Value': {'Ref': 'Debug'}, 'Condition': 'IsDev'},
+        },
+    }
+
+
+class SpecializeTest(unittest.TestCase):
+
+    def test_folds(self):
+        t, stats = specialize(template(), {})
+        node = t['Resources']['Node']
+        self.assertEqual(node['Properties'], {
+            'ImageId': {'Ref': 'Image'},
+            'InstanceType': 'm5.large',
+            'SubnetId': 'b',
+            'Monitoring': True,
+            'UserData': {'Fn::Base64': {'Fn::Sub': 'size=2 ${Password}'}},
+            'Tags': [{'Key': 'Name', 'Value': {'Fn::Join': [
+                '-', [{'Ref': 'AWS::StackName'}, 'prod-node']]}}]})
+        self.assertEqual(stats['conditions'], 2)
+        self.assertNotIn('Conditions', t)
+
+    def test_prunes(self):
+        t, stats = specialize(template(), {})
+        self.assertEqual(list(t['Resources']), ['Node'])
+        self.assertNotIn('DependsOn', t['Resources']['Node'])
+        self.assertEqual(list(t['Outputs']), ['Address'])
+        self.assertNotIn('Mappings', t)
+        self.assertEqual(stats['resources'], ['Debug'])
+        self.assertEqual(stats['outputs'], ['Topic'])
+        self.assertEqual(stats['mappings'], ['EnvSize', 'Unused'])
+
+    def test_other_branch(self):
+        t, _ = specialize(template(), {'Env': 'dev'})
+        node = t['Resources']['Node']
+        self.assertEqual(node['DependsOn'], ['Debug'])
+        self.assertNotIn('Monitoring', node['Properties'])
+        self.assertEqual(node['Properties']['InstanceType'], 't3.small')
+        self.assertEqual(t['Outputs']['Topic'], {'Value': {'Ref': 'Debug'}})
+
+    def test_secrets_kept(self):
+        t, stats = specialize(template(), {})
+        self.assertEqual(sorted(t['Parameters']), ['Image', 'Password'])
+        self.assertEqual(stats['parameters'], 3)
+
+    def test_unknown(self):
+        t, _ = specialize(template(), {}, use_defaults=False)
+        self.assertEqual(t['Conditions']['IsProd'],
+                         {'Fn::Equals': [{'Ref': 'Env'}, 'prod']})
+        self.assertEqual(t['Conditions']['IsDev'],
+                         {'Fn::Not': [{'Condition': 'IsProd'}]})
+        self.assertEqual(list(t['Mappings']), ['EnvSize'])
+        self.assertEqual(t['Resources']['Debug']['Condition'], 'IsDev')
+
+    def test_constraints(self):
+        for parameters in ({'Env': 'test'}, {'Size': '5'}, {'Size': 'x'},
+                           {'Missing': '1'}):
+            with self.assertRaises(EvaluationError):
+                specialize(template(), parameters)
+
+    def test_missing_key(self):
+        d = template()
+        del d['Mappings']['EnvSize']['dev']
+        with self.assertRaisesRegex(EvaluationError, 'no dev/Type'):
+            specialize(d, {'Env': 'dev'})
+
+    def test_interface(self):
+        metadata = {'AWS::CloudFormation::Interface': {
+            'ParameterGroups': [
+                {'Label': {'default': 'A'}, 'Parameters': ['Env', 'Size']},
+                {'Label': {'default': 'B'}, 'Parameters': ['Password']}],
+            'ParameterLabels': {'Env': {'default': 'Env'},
+                                'Password': {'default': 'Password'}}}}
+        interface = interface_for(metadata, {'Password': {}})[
+            'AWS::CloudFormation::Interface']
+        self.assertEqual(interface['ParameterGroups'], [
+            {'Label': {'default': 'B'}, 'Parameters': ['Password']}])
+        self.assertEqual(list(interface['ParameterLabels']), ['Password'])
+        self.assertEqual(len(metadata['AWS::CloudFormation::Interface']
+                             ['ParameterGroups'][0]['Parameters']), 2)
+
+
+class MatrixTest(unittest.TestCase):
+
+    def test_matrix(self):
+        d = template()
+        del d['Mappings']['EnvSize']['dev']
+        results = evaluate_matrix(
+            d, {}, [('Env', ['prod', 'dev', 'test']), ('Size', ['1', '3'])])
+        self.assertEqual(len(results), 6)
+        failed = [c for (c, t, s) in results if t is None]
+        self.assertEqual([c['Env'] for c in failed],
+                         ['dev', 'dev', 'test', 'test'])
+        for (c, t, s) in results:
+            if c['Env'] == 'prod':
+                self.assertEqual(t['Resources']['Node']['Properties'][
+                    'UserData'], {'Fn::Base64': {'Fn::Sub': 'size={} '
+                                  '${{Password}}'.format(c['Size'])}})
+            else:
+                self.assertIn('Env', s)
+
+    def test_jira_dc(self):
+        d = load_template(os.path.join(ROOT, 'templates', 'jira_dc.json'))
+        axes = [matrix_axis(d, 'ClusterNodeInstanceType'),
+                matrix_axis(d, 'AWS::Region=us-east-1,eu-west-1')]
+        results = evaluate_matrix(d, {}, axes)
+        self.assertEqual(len(results), 2 * len(
+            d['Parameters']['ClusterNodeInstanceType']['AllowedValues']))
+        self.assertEqual([(c, s) for (c, t, s) in results if t is None], [])
+        results = evaluate_matrix(d, {}, [('ClusterNodeInstanceType',
+                                           ['c5.xlarge', 'c5.huge'])])
+        self.assertIsNotNone(results[0][1])
+        self.assertIsNone(results[1][1])
+        self.assertIn('AllowedValues', results[1][2])
+
+    def test_axis(self):
+        d = template()
+        self.assertEqual(matrix_axis(d, 'Env'), ('Env', ['prod', 'dev']))
+        self.assertEqual(matrix_axis(d, 'Size=1,2'), ('Size', ['1', '2']))
+        with self.assertRaises(EvaluationError):
+            matrix_axis(d, 'Size')
+
+
+class ParametersTest(unittest.TestCase):
+
+    def test_parse(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json',
+                                         delete=False) as f:
+            json.dump([{'ParameterKey': 'Env', 'ParameterValue': 'dev'},
+                       {'ParameterKey': 'Size', 'ParameterValue': '3'}], f)
+        try:
+            self.assertEqual(parse_parameters([f.name, 'Size=4', 'A=b=c']),
+                             {'Env': 'dev', 'Size': '4', 'A': 'b=c'})
+        finally:
+            os.remove(f.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import unittest
+
+from cfntools.graph import (CycleError, analyse, dependency_graph,
+                            redundant_depends_on, topological_order)
+from cfntools.template import load_template
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CriticalPathTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = load_template(
+            os.path.join(ROOT, 'templates', 'jira_dc.json'))
+
+    def test_default_conditions(self):
+        # the image is only baked with BakeClusterNodeImage=true
+        report = analyse(self.template)
+        self.assertNotIn('ClusterNodeImage', report['resources'])
+        self.assertEqual(report['critical_path'],
+                         ['DBSubnetGroup', 'DB', 'ClusterNodeLaunchTemplate',
+                          'ClusterNodeGroup'])
+
+    def test_parameters(self):
+        report = analyse(self.template,
+                         parameters={'BakeClusterNodeImage': 'true'})
+        self.assertIn('ClusterNodeImage', report['critical_path'])
+        self.assertGreater(report['seconds'],
+                           analyse(self.template)['seconds'])
+
+    def test_durations(self):
+        report = analyse(self.template, {'AWS::RDS::DBInstance': 60})
+        self.assertNotIn('DB', report['critical_path'])
+
+
+def resource(*depends_on, **properties):
+    r = {'Type': 'AWS::SQS::Queue', 'Properties': properties}
+    if depends_on:
+        r['DependsOn'] = list(depends_on)
+    return r
+
+
+class OrderTest(unittest.TestCase):
+
+    def test_dependencies_first(self):
+        d = {'Resources': {
+            'Alarm': resource(Queue={'Fn::GetAtt': ['Queue', 'Arn']}),
+            'Queue': resource('Key', Name={'Fn::Sub': '${Topic}-queue'}),
+            'Topic': resource(),
+            'Key': resource(),
+        }}
+        self.assertEqual(topological_order(dependency_graph(d)),
+                         ['Topic', 'Key', 'Queue', 'Alarm'])
+
+    def test_cycle(self):
+        d = {'Resources': {
+            'A': resource('B'), 'B': resource('A'), 'C': resource()}}
+        with self.assertRaises(CycleError) as raised:
+            topological_order(dependency_graph(d))
+        self.assertEqual(raised.exception.cycle, ['A', 'B', 'A'])
+        self.assertEqual(topological_order(dependency_graph(d), strict=False),
+                         ['C', 'A', 'B'])
+
+
+class PruneTest(unittest.TestCase):
+
+    def test_implied(self):
+        d = {'Resources': {
+            'Topic': resource(),
+            'Queue': resource(Name={'Ref': 'Topic'}),
+            # Topic directly, and through Queue
+            'Alarm': resource('Topic', 'Queue',
+                              Queue={'Fn::GetAtt': ['Queue', 'Arn']}),
+        }}
+        self.assertEqual(redundant_depends_on(d),
+                         {'Alarm': set(['Topic', 'Queue'])})
+
+    def test_conditional_reference_kept(self):
+        d = {'Resources': {
+            'Topic': resource(),
+            'Queue': resource('Topic', Name={'Fn::If': [
+                'UseTopic', {'Ref': 'Topic'}, 'none']}),
+        }}
+        self.assertEqual(redundant_depends_on(d), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+import os
+import unittest
+
+from cfntools.evaluate import (EvaluationError, Evaluator, evaluate_rules,
+                               specialize)
+from cfntools.template import load_template
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+jvm_scaling = ['ClusterNodeGcTimeAlarm', 'ClusterNodeJvmLowAlarm',
+               'ClusterNodeJvmScaleIn', 'ClusterNodeJvmScaling',
+               'ClusterNodeOldGenAlarm']
+
+
+def jira_dc(**parameters):
+    """The resources of templates/jira_dc.json specialized for parameters"""
+    d = load_template(os.path.join(ROOT, 'templates', 'jira_dc.json'))
+    parameters.setdefault('AWS::Region', 'us-east-1')
+    out, _ = specialize(d, parameters)
+    return out['Resources']
+
+
+def load_expression(resources):
+    return [m for m in resources['ClusterNodeJvmLowAlarm']['Properties'][
+        'Metrics'] if m['Id'] == 'load'][0]['Expression']
+
+
+class JvmScalingTest(unittest.TestCase):
+
+    def test_off_by_default(self):
+        resources = jira_dc()
+        self.assertEqual([k for k in jvm_scaling if k in resources], [])
+
+    def test_gc_time(self):
+        resources = jira_dc(ScalingGcTime='5')
+        self.assertEqual([k for k in jvm_scaling if k in resources],
+                         ['ClusterNodeGcTimeAlarm', 'ClusterNodeJvmLowAlarm',
+                          'ClusterNodeJvmScaleIn', 'ClusterNodeJvmScaling'])
+        alarm = resources['ClusterNodeGcTimeAlarm']['Properties']
+        self.assertEqual(alarm['Threshold'], '5')
+        self.assertEqual(alarm['AlarmActions'],
+                         [{'Ref': 'ClusterNodeJvmScaling'}])
+        low = resources['ClusterNodeJvmLowAlarm']['Properties']
+        self.assertEqual([m['Id'] for m in low['Metrics']], ['gc', 'load'])
+        self.assertEqual(load_expression(resources), 'gc * 100 / 5')
+
+    def test_old_gen(self):
+        resources = jira_dc(ScalingOldGen='80')
+        self.assertNotIn('ClusterNodeGcTimeAlarm', resources)
+        self.assertIn('ClusterNodeOldGenAlarm', resources)
+        self.assertEqual(load_expression(resources), 'oldgen * 100 / 80')
+
+    def test_both(self):
+        resources = jira_dc(ScalingGcTime='5', ScalingOldGen='80')
+        self.assertEqual([k for k in jvm_scaling if k in resources],
+                         jvm_scaling)
+        self.assertEqual(load_expression(resources),
+                         'MAX([gc * 100 / 5, oldgen * 100 / 80])')
+
+    def test_steps(self):
+        resources = jira_dc(ScalingGcTime='5')
+        out = resources['ClusterNodeJvmScaling']['Properties']
+        self.assertEqual([s['ScalingAdjustment']
+                          for s in out['StepAdjustments']], [1, 2])
+        scale_in = resources['ClusterNodeJvmScaleIn']['Properties']
+        self.assertEqual(scale_in['AutoScalingGroupName'],
+                         {'Ref': 'ClusterNodeGroup'})
+        # the alarm invokes it each minute while in ALARM
+        self.assertEqual(scale_in['PolicyType'], 'SimpleScaling')
+        self.assertEqual(scale_in['ScalingAdjustment'], -1)
+        self.assertEqual(scale_in['Cooldown'], '900')
+        low = resources['ClusterNodeJvmLowAlarm']['Properties']
+        self.assertEqual(low['ComparisonOperator'], 'LessThanThreshold')
+        self.assertEqual(low['AlarmActions'],
+                         [{'Ref': 'ClusterNodeJvmScaleIn'}])
+
+
+class BusinessHoursTest(unittest.TestCase):
+
+    def test_schedule(self):
+        resources = jira_dc(BusinessHoursMin='3', ClusterNodeMax='4')
+        self.assertEqual(resources['ClusterNodeBusinessHoursStart'][
+            'Properties']['MinSize'], '3')
+        self.assertNotIn('ClusterNodeBusinessHoursStart', jira_dc())
+
+    def test_at_most_max(self):
+        d = load_template(os.path.join(ROOT, 'templates', 'jira_dc.json'))
+        rule = {'BusinessHoursMin': d['Rules']['BusinessHoursMin']}
+        limit = d['Parameters']['ClusterNodeMax']['MaxValue']
+        for nodes in range(1, limit + 1):
+            for minimum in range(limit + 1):
+                values = {'ClusterNodeMax': str(nodes),
+                          'BusinessHoursMin': str(minimum)}
+                try:
+                    evaluate_rules(Evaluator({}, values), rule)
+                except EvaluationError:
+                    self.assertGreater(minimum, nodes)
+                else:
+                    self.assertLessEqual(minimum, nodes)
+
+
+class LocalHomeVolumeTest(unittest.TestCase):
+
+    @staticmethod
+    def valid(volume_type, size, iops):
+        if volume_type == 'gp3':
+            return iops <= 16000 and (iops == 3000 or iops <= 500 * size)
+        return iops <= 500 * size
+
+    def test_iops_rules(self):
+        d = load_template(os.path.join(ROOT, 'templates', 'jira_dc.json'))
+        parameters = d['Parameters']
+        rule = {'LocalHomeVolumeIops': d['Rules']['LocalHomeVolumeIops']}
+        for volume_type in parameters['LocalHomeVolumeType']['AllowedValues']:
+            for iops in parameters['LocalHomeVolumeIops']['AllowedValues']:
+                for size in range(200):
+                    values = {'LocalHomeVolumeType': volume_type,
+                              'LocalHomeVolumeSize': str(size),
+                              'LocalHomeVolumeIops': iops}
+                    try:
+                        evaluate_rules(Evaluator({}, values), rule)
+                    except EvaluationError:
+                        self.assertFalse(
+                            self.valid(volume_type, size, int(iops)), values)
+                    else:
+                        self.assertTrue(
+                            size == 0 or
+                            self.valid(volume_type, size, int(iops)), values)
+
+    def test_rejected(self):
+        for parameters in [
+                dict(LocalHomeVolumeIops='32000'),
+                dict(LocalHomeVolumeType='io2', LocalHomeVolumeSize='20',
+                     LocalHomeVolumeIops='16000')]:
+            parameters.setdefault('LocalHomeVolumeSize', '100')
+            with self.assertRaises(EvaluationError):
+                jira_dc(**parameters)
+        with self.assertRaises(EvaluationError):
+            jira_dc(LocalHomeVolumeSize='100', LocalHomeVolumeIops='5000')
+        jira_dc(LocalHomeVolumeType='io2', LocalHomeVolumeSize='128',
+                LocalHomeVolumeIops='64000')
+
+
+class HttpListenerTest(unittest.TestCase):
+
+    def default_actions(self, **parameters):
+        return jira_dc(LoadBalancerType='Application', **parameters)[
+            'HttpListener']['Properties']['DefaultActions']
+
+    def test_forward(self):
+        self.assertEqual(
+            self.default_actions(),
+            [{'Type': 'forward',
+              'TargetGroupArn': {'Ref': 'ClusterNodeTargetGroup'}}])
+
+    def test_redirect_with_ssl(self):
+        self.assertEqual(
+            self.default_actions(SSLCertificateARN='arn:aws:acm:cert'),
+            [{'Type': 'redirect',
+              'RedirectConfig': {'Protocol': 'HTTPS', 'Port': '443',
+                                 'StatusCode': 'HTTP_301'}}])
+
+
+class NodeSlowStartTest(unittest.TestCase):
+
+    def test_allowed(self):
+        for seconds in ('0', '30', '300', '900'):
+            jira_dc(NodeSlowStart=seconds)
+
+    def test_rejected_by_load_balancer(self):
+        for seconds in ('1', '29'):
+            with self.assertRaises(EvaluationError):
+                jira_dc(NodeSlowStart=seconds)
+
+
+class BakedImageTest(unittest.TestCase):
+
+    def image_id(self, resources):
+        return resources['ClusterNodeLaunchTemplate']['Properties'][
+            'LaunchTemplateData']['ImageId']
+
+    def test_base_image(self):
+        # no region mapping: ap-east-1 launches from the SSM parameter too
+        resources = jira_dc(**{'AWS::Region': 'ap-east-1'})
+        self.assertEqual(self.image_id(resources),
+                         {'Ref': 'ClusterNodeBaseImage'})
+        self.assertNotIn('ClusterNodeImage', resources)
+
+    def test_same_parent(self):
+        resources = jira_dc(**{'BakeClusterNodeImage': 'true',
+                               'AWS::Region': 'ap-east-1'})
+        recipe = resources['ClusterNodeImageRecipe']['Properties']
+        self.assertEqual(recipe['ParentImage'],
+                         {'Ref': 'ClusterNodeBaseImage'})
+        self.assertEqual(self.image_id(resources),
+                         {'Fn::GetAtt': ['ClusterNodeImage', 'ImageId']})
+
+    def test_bakes_product(self):
+        resources = jira_dc(BakeClusterNodeImage='true')
+        component = resources['ClusterNodeImageComponent']['Properties']
+        self.assertIn('--configsets bake', component['Data']['Fn::Sub'])
+        init = resources['ClusterNodeInstall']['Metadata'][
+            'AWS::CloudFormation::Init']
+        self.assertEqual(init['configSets']['bake'], ['install', 'bake'])
+        script = init['bake']['files']['/opt/atlassian/bin/install_product']
+        self.assertNotIn('PASSWORD', str(script['content']))
+
+
+class MetadataOptionsTest(unittest.TestCase):
+
+    def http_tokens(self, **parameters):
+        return jira_dc(**parameters)['ClusterNodeLaunchTemplate'][
+            'Properties']['LaunchTemplateData']['MetadataOptions'][
+            'HttpTokens']
+
+    def test_required_by_default(self):
+        self.assertEqual(self.http_tokens(), 'required')
+
+    def test_optional(self):
+        self.assertEqual(self.http_tokens(ClusterNodeHttpTokens='optional'),
+                         'optional')
+        with self.assertRaises(EvaluationError):
+            self.http_tokens(ClusterNodeHttpTokens='off')
+
+
+class DeploymentRepoCacheTest(unittest.TestCase):
+
+    def test_pointer_key(self):
+        # the tarball holds a virtualenv, only usable on the same system
+        script = jira_dc()['ClusterNodeInstall']['Metadata'][
+            'AWS::CloudFormation::Init']['install']['files'][
+            '/opt/atlassian/bin/deployment_repo_cache']['content']['Fn::Sub']
+        pointer = [line for line in script.split('\n')
+                   if line.startswith('pointer=')][0]
+        self.assertIn('#$release#$python', pointer)
+
+    def test_bake_publishes(self):
+        init = jira_dc(BakeClusterNodeImage='true')['ClusterNodeInstall'][
+            'Metadata']['AWS::CloudFormation::Init']
+        self.assertEqual(init['bake']['commands']['077_publish_atl_scripts'][
+            'command'], '/opt/atlassian/bin/deployment_repo_cache publish')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+
+from cfntools.jvm import (instance_mappings, load_catalog, mapping_names,
+                          max_heap, size_class, size_classes, size_jvm)
+from cfntools.template import load_template
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SizeJvmTest(unittest.TestCase):
+
+    def test_fits_in_memory(self):
+        for vcpus, memory_gib in ((2, 8), (4, 16), (8, 32), (16, 64),
+                                  (48, 384), (96, 768)):
+            plan = size_jvm(vcpus, memory_gib)
+            self.assertFalse(plan['tight'])
+            self.assertGreater(plan['page_cache'], 0)
+            self.assertLessEqual(plan['heap'], max_heap)
+            self.assertEqual(plan['heap'] % 256, 0)
+            # about 1024 G1 regions, a power of two MiB each
+            self.assertEqual(plan['g1_region'] & (plan['g1_region'] - 1), 0)
+
+    def test_monotonic(self):
+        heaps = [size_jvm(2 * n, 8 * n)['heap'] for n in range(1, 25)]
+        self.assertEqual(heaps, sorted(heaps))
+        self.assertEqual(heaps[-1], max_heap)
+
+    def test_tight(self):
+        self.assertTrue(size_jvm(2, 4)['tight'])
+
+
+class SizeClassTest(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = load_catalog()
+
+    def test_size_class(self):
+        self.assertEqual(size_class('m5.xlarge', self.catalog), '4x16')
+        self.assertEqual(size_class('m5d.xlarge', self.catalog), '4x16')
+        self.assertEqual(size_class('t3.xlarge', self.catalog),
+                         '4x16-burstable')
+
+    def test_order(self):
+        classes = size_classes(['m4.xlarge', 'm5d.xlarge', 'm5.xlarge',
+                                't3.xlarge'], self.catalog)
+        # newer generations first, then those without an instance store
+        self.assertEqual(classes, {
+            '4x16': ['m5.xlarge', 'm5d.xlarge', 'm4.xlarge'],
+            '4x16-burstable': ['t3.xlarge']})
+
+    def test_missing(self):
+        with self.assertRaises(ValueError):
+            instance_mappings(['m5.huge'], self.catalog)
+
+
+class JiraDcTest(unittest.TestCase):
+
+    def test_mappings_up_to_date(self):
+        d = load_template(os.path.join(ROOT, 'templates', 'jira_dc.json'))
+        instance_types = d['Parameters']['ClusterNodeInstanceType'][
+            'AllowedValues']
+        mappings = instance_mappings(instance_types, load_catalog())
+        for name in mapping_names:
+            self.assertEqual(d['Mappings'][name], mappings[name], name)
+
+    def test_shared_plans(self):
+        catalog = load_catalog()
+        mappings = instance_mappings(['m5.xlarge', 'm5d.xlarge', 'r5.large',
+                                      'm5.2xlarge'], catalog)
+        sizes, nodes, plans = [mappings[name] for name in mapping_names]
+        self.assertEqual(sizes['m5d.xlarge'], {'Size': '4x16'})
+        self.assertEqual(nodes['4x16']['Alt1'], 'm5.xlarge')
+        self.assertEqual(nodes['4x16']['Alt2'], 'm5d.xlarge')
+        # a class of one repeats its only instance type
+        self.assertEqual(nodes['2x16']['Alt2'], 'r5.large')
+        self.assertEqual(sorted(plans), sorted(set(
+            node['Plan'] for node in nodes.values())))
+
+
+if __name__ == '__main__':
+    unittest.main()
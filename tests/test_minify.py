@@ -0,0 +1,359 @@
+import copy
+import os
+import unittest
+
+from cfntools.evaluate import specialize
+from cfntools.minify import (TEMPLATE_BODY_LIMIT, canonical,
+                             collapse_mappings, drop_descriptions,
+                             drop_init_defaults, drop_interface, flow_yaml,
+                             merge_assertions, merge_conditions, minify,
+                             rename_conditions, shorten_names, simplify,
+                             simplify_intrinsics, size, trim_script,
+                             trim_scripts, yaml_scalar)
+from cfntools.template import load_template, parse_template
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def template():
+    return {
+        'Parameters': {'Env': {'Type': 'String'}},
+        'Conditions': {
+            'IsProd': {'Fn::Equals': [{'Ref': 'Env'}, 'prod']},
+            'Production': {'Fn::Equals': [{'Ref': 'Env'}, 'prod']},
+            'ProdAndProd': {'Fn::And': [{'Condition': 'Production'},
+                                        {'Condition': 'IsProd'}]},
+        },
+        'Resources': {
+            'Role': {
+                'Type': 'AWS::IAM::Role',
+                'Condition': 'Production',
+                'Properties': {
+                    'AssumeRolePolicyDocument': {'Statement': [{
+                        'Effect': 'Allow',
+                        'Principal': {'Service': 'ec2.amazonaws.com'},
+                        'Action': 'sts:AssumeRole',
+                        'Condition': {'StringEquals': {
+                            'aws:SourceAccount': {'Ref': 'AWS::AccountId'}}},
+                    }]},
+                    'RoleName': {'Fn::If': ['Production', 'prod', 'dev']},
+                },
+            },
+        },
+        'Outputs': {
+            'Role': {'Condition': 'Production', 'Value': {'Ref': 'Role'}},
+        },
+    }
+
+
+class MergeConditionsTest(unittest.TestCase):
+
+    def test_merges_references(self):
+        d = merge_conditions(template())
+        self.assertEqual(sorted(d['Conditions']), ['IsProd', 'ProdAndProd'])
+        self.assertEqual(d['Conditions']['ProdAndProd'],
+                         {'Fn::And': [{'Condition': 'IsProd'},
+                                      {'Condition': 'IsProd'}]})
+        role = d['Resources']['Role']
+        self.assertEqual(role['Condition'], 'IsProd')
+        self.assertEqual(role['Properties']['RoleName'],
+                         {'Fn::If': ['IsProd', 'prod', 'dev']})
+        self.assertEqual(d['Outputs']['Role']['Condition'], 'IsProd')
+
+    def test_policy_condition_is_kept(self):
+        # an IAM statement's Condition is a dict, not a condition name
+        d = merge_conditions(template())
+        statement = d['Resources']['Role']['Properties'][
+            'AssumeRolePolicyDocument']['Statement'][0]
+        self.assertEqual(statement['Condition'], template()['Resources'][
+            'Role']['Properties']['AssumeRolePolicyDocument']['Statement'][0][
+            'Condition'])
+
+    def test_minify(self):
+        d, report = minify(template())
+        self.assertEqual([name for (name, _) in report],
+                         ['compact', 'merge conditions', 'collapse mappings',
+                          'simplify intrinsics', 'shorten names',
+                          'merge assertions', 'trim scripts',
+                          'drop cfn-init defaults', 'drop interface',
+                          'drop descriptions'])
+        self.assertLess(report[-1][1], report[0][1])
+        d, report = minify(template(), as_yaml=True)
+        self.assertEqual(report[-1][0], 'flow YAML')
+        self.assertLess(report[-1][1], report[-2][1])
+
+
+class CollapseMappingsTest(unittest.TestCase):
+
+    def test_uniform_attributes(self):
+        d = collapse_mappings({
+            'Mappings': {
+                'Type': {'a': {'Arch': 'HVM64', 'Jvm': '1g'},
+                         'b': {'Arch': 'HVM64', 'Jvm': '2g'}},
+                'Same': {'a': {'Name': 'x'}, 'b': {'Name': 'x'}},
+            },
+            'Resources': {'R': {'Type': 'T', 'Properties': {
+                'Arch': {'Fn::FindInMap': ['Type', {'Ref': 'P'}, 'Arch']},
+                'Jvm': {'Fn::FindInMap': ['Type', {'Ref': 'P'}, 'Jvm']},
+                'Name': {'Fn::FindInMap': ['Same', 'a', 'Name']}}}},
+        })
+        self.assertEqual(d['Mappings'], {'Type': {'a': {'Jvm': '1g'},
+                                                  'b': {'Jvm': '2g'}}})
+        self.assertEqual(d['Resources']['R']['Properties'], {
+            'Arch': 'HVM64',
+            'Jvm': {'Fn::FindInMap': ['Type', {'Ref': 'P'}, 'Jvm']},
+            'Name': 'x'})
+
+    def test_computed_attribute(self):
+        # the looked up attribute is only known at deploy time
+        d = {
+            'Mappings': {'M': {'a': {'x': '1'}, 'b': {'x': '1'}}},
+            'Resources': {'R': {'Type': 'T', 'Properties': {
+                'V': {'Fn::FindInMap': ['M', 'a', {'Ref': 'P'}]}}}},
+        }
+        self.assertEqual(collapse_mappings(copy.deepcopy(d)), d)
+
+
+class SimplifyTest(unittest.TestCase):
+
+    def test_if(self):
+        self.assertEqual(simplify({'Fn::If': ['C', 'a', 'a']}), 'a')
+        self.assertEqual(simplify({'Fn::If': ['C', 'a', 'b']}),
+                         {'Fn::If': ['C', 'a', 'b']})
+
+    def test_sub(self):
+        self.assertEqual(simplify({'Fn::Sub': ['${A}-${B}', {
+            'A': {'Ref': 'Name'},
+            'B': {'Fn::GetAtt': ['DB', 'Endpoint.Address']}}]}),
+            {'Fn::Sub': '${Name}-${DB.Endpoint.Address}'})
+        self.assertEqual(simplify({'Fn::Sub': 'a ${!b}'}), 'a ${b}')
+        self.assertEqual(simplify({'Fn::Sub': ['${A}', {
+            'A': {'Fn::ImportValue': 'x'}}]}),
+            {'Fn::Sub': ['${A}', {'A': {'Fn::ImportValue': 'x'}}]})
+
+    def test_join(self):
+        self.assertEqual(simplify({'Fn::Join': [':', ['a', 'b']]}), 'a:b')
+        self.assertEqual(
+            simplify({'Fn::Join': ['', [
+                'arn:aws:s3:::', {'Ref': 'Bucket'}, '/${x}',
+                {'Fn::Sub': '/${AWS::Region}'}]]}),
+            {'Fn::Sub': 'arn:aws:s3:::${Bucket}/${!x}/${AWS::Region}'})
+        join = {'Fn::Join': [',', [{'Fn::GetAZs': ''}, 'a']]}
+        self.assertEqual(simplify(join), join)
+
+    def test_not(self):
+        a = {'Condition': 'A'}
+        b = {'Condition': 'B'}
+        self.assertEqual(simplify({'Fn::Not': [{'Fn::Not': [a]}]}), a)
+        self.assertEqual(
+            simplify({'Fn::Or': [{'Fn::Not': [a]}, {'Fn::Not': [b]}]}),
+            {'Fn::Not': [{'Fn::And': [a, b]}]})
+        mixed = {'Fn::And': [{'Fn::Not': [a]}, b]}
+        self.assertEqual(simplify(mixed), mixed)
+
+    def test_intrinsics(self):
+        d = simplify_intrinsics({
+            'Parameters': {'P': {'Type': 'String',
+                                 'Default': {'Fn::If': ['C', 'a', 'a']}}},
+            'Resources': {'R': {'Type': 'T', 'Properties': {
+                'V': [{'Fn::If': ['C', {'Fn::Join': ['-', ['a', 'b']]},
+                                  'a-b']}]}}},
+        })
+        self.assertEqual(d['Resources']['R']['Properties']['V'], ['a-b'])
+        self.assertEqual(d['Parameters']['P']['Default'],
+                         {'Fn::If': ['C', 'a', 'a']})
+
+
+class ShortenNamesTest(unittest.TestCase):
+
+    def template(self):
+        size = {'Fn::FindInMap': ['TypeSize', {'Ref': 'Type'}, 'Size']}
+        return {
+            'Parameters': {'Type': {'Type': 'String'}},
+            'Conditions': {
+                'Rare': {'Fn::Equals': [{'Ref': 'Type'}, 'a']},
+                'Often': {'Fn::Equals': [{'Ref': 'Type'}, 'b']},
+            },
+            'Mappings': {
+                'TypeSize': {'m5.large': {'Size': '2x8'},
+                             'r5.large': {'Size': '2x16'}},
+                'SizeJvm': {'2x8': {'Heap': '4g', 'Meta': '1g'},
+                            '2x16': {'Heap': '12g', 'Meta': '1g'}},
+            },
+            'Resources': {'R': {'Type': 'T', 'Condition': 'Often',
+                                'Properties': {
+                                    'A': {'Fn::If': ['Often', 'x', 'y']},
+                                    'B': {'Fn::If': ['Rare', 'x', 'y']},
+                                    'Heap': {'Fn::FindInMap': [
+                                        'SizeJvm', size, 'Heap']},
+                                    'Meta': {'Fn::FindInMap': [
+                                        'SizeJvm', size, 'Meta']},
+                                    'Heap2': {'Fn::FindInMap': [
+                                        'SizeJvm', size, 'Heap']}}}},
+        }
+
+    def test_conditions(self):
+        d = shorten_names(self.template())
+        # the most used condition gets the first name
+        self.assertEqual(d['Conditions'], {
+            'A': {'Fn::Equals': [{'Ref': 'Type'}, 'b']},
+            'B': {'Fn::Equals': [{'Ref': 'Type'}, 'a']}})
+        resource = d['Resources']['R']
+        self.assertEqual(resource['Condition'], 'A')
+        self.assertEqual(resource['Properties']['B'],
+                         {'Fn::If': ['B', 'x', 'y']})
+
+    def test_mappings(self):
+        d = shorten_names(self.template())
+        # the names of parameters, resources and conditions are taken
+        self.assertEqual(d['Mappings'], {
+            'D': {'m5.large': {'A': 'B'}, 'r5.large': {'A': 'A'}},
+            'C': {'B': {'A': '4g', 'B': '1g'},
+                  'A': {'A': '12g', 'B': '1g'}}})
+        self.assertEqual(d['Resources']['R']['Properties']['Meta'],
+                         {'Fn::FindInMap': ['C', {'Fn::FindInMap': [
+                             'D', {'Ref': 'Type'}, 'A']}, 'B']})
+
+    def test_looked_up_directly(self):
+        # a mapping also looked up by a literal key keeps its keys
+        d = self.template()
+        d['Resources']['R']['Properties']['Fixed'] = {
+            'Fn::FindInMap': ['SizeJvm', '2x8', 'Heap']}
+        d = shorten_names(d)
+        self.assertEqual(sorted(d['Mappings']['C']), ['2x16', '2x8'])
+        self.assertEqual(d['Mappings']['D']['m5.large'], {'A': '2x8'})
+
+    def test_computed_attribute(self):
+        d = self.template()
+        d['Resources']['R']['Properties']['Any'] = {
+            'Fn::FindInMap': ['SizeJvm', '2x8', {'Ref': 'Type'}]}
+        d = shorten_names(d)
+        self.assertEqual(d['Mappings']['C']['2x8'],
+                         {'Heap': '4g', 'Meta': '1g'})
+
+
+class ScriptsTest(unittest.TestCase):
+
+    def test_trim(self):
+        self.assertEqual(trim_script(
+            '#!/bin/bash\n# comment\n\n  if true; then\n    cat <<EOF\n'
+            '  # kept\nEOF\n  fi\n'),
+            '#!/bin/bash\nif true; then\ncat <<EOF\n  # kept\nEOF\nfi\n')
+        # a quoted string may span lines
+        script = '#!/bin/sh\n  echo "a\n  b"\n'
+        self.assertEqual(trim_script(script), script)
+        self.assertEqual(trim_script('  not a script\n'), '  not a script\n')
+
+    def test_init_defaults(self):
+        init = {'configSets': {'all': ['a']}, 'a': {
+            'files': {'/f': {'content': 'x', 'owner': 'root',
+                             'group': 'jira'}},
+            'commands': {'c': {'command': 'true', 'ignoreErrors': False},
+                         'd': {'command': 'true', 'ignoreErrors': True}}}}
+        d = drop_init_defaults({'Resources': {'R': {
+            'Type': 'T', 'Metadata': {'AWS::CloudFormation::Init': init}}}})
+        config = d['Resources']['R']['Metadata'][
+            'AWS::CloudFormation::Init']['a']
+        self.assertEqual(config['files'], {'/f': {'content': 'x',
+                                                  'group': 'jira'}})
+        self.assertEqual(config['commands'], {
+            'c': {'command': 'true'},
+            'd': {'command': 'true', 'ignoreErrors': True}})
+
+
+class MergeAssertionsTest(unittest.TestCase):
+
+    def test_merge(self):
+        asserts = [{'Fn::Equals': [{'Ref': 'P'}, str(i)]} for i in range(12)]
+        d = merge_assertions({'Rules': {'R': {'Assertions': [
+            {'Assert': a, 'AssertDescription': 'same'} for a in asserts] + [
+            {'Assert': {'Fn::Equals': ['a', 'a']},
+             'AssertDescription': 'other'}]}}})
+        merged, other = d['Rules']['R']['Assertions']
+        # Fn::And takes at most 10 conditions
+        self.assertEqual(merged, {
+            'Assert': {'Fn::And': [{'Fn::And': asserts[:10]},
+                                   {'Fn::And': asserts[10:]}]},
+            'AssertDescription': 'same'})
+        self.assertEqual(other['AssertDescription'], 'other')
+
+
+class FlowYamlTest(unittest.TestCase):
+
+    def test_scalars(self):
+        for s in ('AWS::Region', 'yes', 'No', '3000', '1e3', '-x',
+                  '', ' a', 'a ', 'a, b', '#!/bin/bash', 'say "hi"', 'a\nb',
+                  '0x1F', '2010-09-09', 'null', '~'):
+            self.assertNotEqual(yaml_scalar(s), s, s)
+        for s in ('jira-software', '/dev/xvdf', 'c5.large', 'a b.c'):
+            self.assertEqual(yaml_scalar(s), s)
+
+    def test_short_form(self):
+        self.assertEqual(
+            flow_yaml({'A': {'Fn::Base64': {'Fn::Sub': 'x ${B}'}},
+                       'B': {'Fn::GetAtt': ['DB', 'Endpoint.Address']},
+                       'C': {'Fn::If': ['C', {'Ref': 'P'}, True]},
+                       'D': {'Condition': 'C'}}),
+            '{A: !Base64 {"Fn::Sub": "x ${B}"},B: !GetAtt DB.Endpoint.Address,'
+            'C: !If [C,!Ref P,true],D: {Condition: C}}')
+
+    @unittest.skipIf(yaml is None, 'needs PyYAML')
+    def test_same_template(self):
+        for name in ('jira_dc.json', 'aws_vpc.json'):
+            d, _ = minify(load_template(os.path.join(ROOT, 'templates',
+                                                     name)))
+            self.assertEqual(parse_template(flow_yaml(d), 'a.yaml'), d)
+
+
+class JiraDcTest(unittest.TestCase):
+
+    def setUp(self):
+        self.d = load_template(os.path.join(ROOT, 'templates',
+                                            'jira_dc.json'))
+
+    def test_report(self):
+        d, report = minify(self.d)
+        self.assertEqual(report[-1][1], size(d))
+        sizes = [n for (_, n) in report]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertLess(sizes[-1], sizes[0])
+
+    def test_fits(self):
+        _, report = minify(self.d, as_yaml=True)
+        self.assertLessEqual(report[-1][1], TEMPLATE_BODY_LIMIT)
+
+    def specialize(self, d, parameters):
+        """d specialized, with the conditions left, which depend on NoEcho
+        parameters, named as in the original template
+        """
+        d, _ = specialize(d, parameters)
+        names = dict((canonical(v), k)
+                     for k, v in self.d['Conditions'].items())
+        return rename_conditions(d, dict(
+            (k, names[canonical(v)])
+            for k, v in d.get('Conditions', {}).items()))
+
+    def test_same_deployment(self):
+        parameters = {'AWS::Region': 'us-east-1'}
+        expected, _ = specialize(self.d, parameters)
+        # scripts, cfn-init defaults and what the console shows change the
+        # same way either side
+        for step in (trim_scripts, drop_init_defaults, drop_interface,
+                     drop_descriptions):
+            expected = step(expected)
+        d, _ = minify(self.d, skip=('simplify intrinsics',))
+        self.assertEqual(self.specialize(d, parameters), expected)
+        # Fn::Join and Fn::Sub are only folded when every value is known
+        d, _ = minify(self.d)
+        self.assertEqual(
+            simplify_intrinsics(self.specialize(d, parameters)),
+            simplify_intrinsics(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import unittest
+
+from cfntools.template import is_yaml, load_template, parse_template
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+short_form = """\
+AWSTemplateFormatVersion: 2010-09-09
+Conditions:
+  HasKey: !Not [!Equals [!Ref KeyPairName, '']]
+Resources:
+  Node:
+    Type: AWS::EC2::Instance
+    Condition: HasKey
+    Properties:
+      KeyName: !If [HasKey, !Ref KeyPairName, !Ref 'AWS::NoValue']
+      SubnetId: !Select [0, !Split [',', !ImportValue ATL-PriNets]]
+      UserData: !Base64
+        Fn::Sub: |
+          #!/bin/bash
+          echo ${AWS::StackName}
+Outputs:
+  Address:
+    Value: !GetAtt Node.PrivateIp
+  Name:
+    Value: !Join ['-', [!Ref 'AWS::StackName', !GetAtt [Node, PublicIp]]]
+    Condition: HasKey
+"""
+
+
+@unittest.skipIf(yaml is None, 'needs PyYAML')
+class YamlTest(unittest.TestCase):
+
+    def test_short_form(self):
+        d = parse_template(short_form)
+        self.assertEqual(d['AWSTemplateFormatVersion'], '2010-09-09')
+        self.assertEqual(d['Conditions']['HasKey'],
+                         {'Fn::Not': [{'Fn::Equals': [
+                             {'Ref': 'KeyPairName'}, '']}]})
+        properties = d['Resources']['Node']['Properties']
+        self.assertEqual(properties['KeyName'],
+                         {'Fn::If': ['HasKey', {'Ref': 'KeyPairName'},
+                                     {'Ref': 'AWS::NoValue'}]})
+        self.assertEqual(properties['SubnetId'],
+                         {'Fn::Select': [0, {'Fn::Split': [
+                             ',', {'Fn::ImportValue': 'ATL-PriNets'}]}]})
+        self.assertEqual(properties['UserData'], {'Fn::Base64': {
+            'Fn::Sub': '#!/bin/bash\necho ${AWS::StackName}\n'}})
+        outputs = d['Outputs']
+        self.assertEqual(outputs['Address']['Value'],
+                         {'Fn::GetAtt': ['Node', 'PrivateIp']})
+        self.assertEqual(outputs['Name']['Value'], {'Fn::Join': [
+            '-', [{'Ref': 'AWS::StackName'},
+                  {'Fn::GetAtt': ['Node', 'PublicIp']}]]})
+        self.assertEqual(outputs['Name']['Condition'], 'HasKey')
+
+    def test_bytes(self):
+        self.assertEqual(parse_template(short_form.encode('utf-8')),
+                         parse_template(short_form))
+
+    def test_same_as_json(self):
+        d = load_template(os.path.join(ROOT, 'templates', 'jira_vpc.json'))
+        text = yaml.safe_dump(d)
+        self.assertEqual(parse_template(text, 'jira_vpc.yaml'), d)
+
+
+class FormatTest(unittest.TestCase):
+
+    def test_is_yaml(self):
+        self.assertTrue(is_yaml('{}', 'template.yml'))
+        self.assertFalse(is_yaml('Resources: {}', 'template.json'))
+        self.assertFalse(is_yaml(b'  {"Resources": {}}', 'a.template'))
+        self.assertTrue(is_yaml('Resources: {}', 'a.template'))
+        self.assertTrue(is_yaml('Resources: {}'))
+
+    def test_json(self):
+        text = json.dumps({'Resources': {}})
+        self.assertEqual(parse_template(text), {'Resources': {}})
+
+
+if __name__ == '__main__':
+    unittest.main()